@@ -0,0 +1,123 @@
+"""
+Import Time Benchmark
+
+Guards the import-time budget of the epistemx modules used by batch workers.
+Each check imports a set of epistemx modules in a fresh interpreter and fails if
+
+- any heavy optional dependency (streamlit, geopandas, geemap, plotly, matplotlib,
+  seaborn, scipy, sklearn, pandas, shapely) is imported as a side effect, or
+- the import takes longer than the time budget, measured on top of ``import ee``.
+
+Usage
+-----
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --budget 0.5 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+# Optional dependencies that must not be loaded by importing the checked modules
+HEAVY_MODULES = [
+    'streamlit', 'geopandas', 'geemap', 'plotly', 'matplotlib',
+    'seaborn', 'scipy', 'sklearn', 'pandas', 'shapely'
+]
+
+# Module sets imported by batch workers, checked separately
+IMPORT_CHECKS = {
+    'package': ['epistemx'],
+    'batch_worker': ['epistemx.data_acquisition', 'epistemx.classification'],
+    'accuracy': ['epistemx.accuracy'],
+    'sample_quality': ['epistemx.sample_data_quality'],
+}
+
+# Modules allowed to pull in a heavy dependency, as it is part of their interface
+ALLOWED = {
+    'sample_quality': ['pandas'],
+}
+
+DEFAULT_BUDGET = 1.0  # seconds on top of "import ee"
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import ee
+ee_seconds = time.perf_counter() - start
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+seconds = time.perf_counter() - start
+heavy = sorted({{name.split('.')[0] for name in sys.modules}} & set({heavy!r}))
+print(json.dumps({{'ee_seconds': ee_seconds, 'seconds': seconds, 'heavy': heavy}}))
+"""
+
+
+def _source_path() -> str:
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+
+def measure_import(modules: List[str]) -> Dict[str, object]:
+    """
+    Import modules in a fresh interpreter.
+
+    Returns
+    -------
+    dict
+        Seconds spent importing ee and the modules, and the heavy modules that got loaded.
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [_source_path(), env.get('PYTHONPATH')]))
+    probe = _PROBE.format(modules=modules, heavy=HEAVY_MODULES)
+    process = subprocess.run([sys.executable, '-c', probe], env=env, capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"Importing {', '.join(modules)} failed:\n{process.stderr.strip()}")
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def run_import_checks(budget: float = DEFAULT_BUDGET, repeat: int = 3) -> List[Dict[str, object]]:
+    """
+    Run every import check, keeping the fastest of ``repeat`` runs.
+
+    Returns
+    -------
+    list of dict
+        One result per check with 'name', 'seconds', 'heavy' and 'passed'.
+    """
+    results = []
+    for name, modules in IMPORT_CHECKS.items():
+        runs = [measure_import(modules) for _ in range(repeat)]
+        best = min(runs, key=lambda run: run['seconds'])
+        unexpected = [module for module in best['heavy'] if module not in ALLOWED.get(name, [])]
+        results.append({
+            'name': name,
+            'modules': modules,
+            'seconds': best['seconds'],
+            'ee_seconds': best['ee_seconds'],
+            'heavy': unexpected,
+            'passed': not unexpected and best['seconds'] <= budget
+        })
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET,
+                        help='Maximum import time in seconds on top of "import ee"')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per check, the fastest is kept')
+    args = parser.parse_args()
+
+    results = run_import_checks(args.budget, args.repeat)
+    for result in results:
+        status = 'ok' if result['passed'] else 'FAIL'
+        heavy = f", heavy imports: {', '.join(result['heavy'])}" if result['heavy'] else ''
+        print(f"{status:4}  {result['name']:15} {result['seconds']:.3f}s "
+              f"(budget {args.budget:.3f}s, ee {result['ee_seconds']:.3f}s){heavy}")
+    return 0 if all(result['passed'] for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
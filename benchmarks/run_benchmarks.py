@@ -0,0 +1,532 @@
+"""
+epistemx Benchmark Suite
+
+Runs the epistemx workflows against the fake Earth Engine backend (see
+``epistemx.fake_ee``) and reports for every case
+
+- wall time (fastest of ``--repeat`` runs)
+- peak Python memory allocated during a separate run (tracemalloc)
+- Earth Engine round trips (``getInfo()`` calls) and computed pixels
+
+Results are compared with a stored baseline (``benchmarks/baseline.json``). A case
+regresses when it makes more round trips than the baseline, or when it is slower
+or uses more memory than the baseline by more than the tolerance. The import-time
+checks of ``import_time.py`` are run as well, unless ``--skip-imports`` is given.
+
+Cases needing an optional dependency that is not installed (e.g. geopandas) are
+reported as skipped.
+
+Usage
+-----
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --quick --filter separability
+    python benchmarks/run_benchmarks.py --update-baseline
+    python benchmarks/run_benchmarks.py --json results.json
+
+Timings depend on the machine, refresh the baseline with ``--update-baseline``
+when moving the suite to another runner.
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCHMARK_DIR), 'src'))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from epistemx import fake_ee  # noqa: E402
+from import_time import DEFAULT_BUDGET, run_import_checks  # noqa: E402
+
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'baseline.json')
+DEFAULT_TOLERANCE = 0.5  # relative slack on time and memory before a case counts as a regression
+MIN_TIME_DELTA = 0.05    # seconds, differences below this are treated as noise
+MIN_MEMORY_DELTA = 1.0   # MB, differences below this are treated as noise
+
+# Registered cases: name -> (setup function, required optional modules, part of the quick run)
+_CASES: Dict[str, Dict[str, Any]] = {}
+
+
+def benchmark(name: str, requires: tuple = (), quick: bool = True):
+    """
+    Register a benchmark case.
+
+    The decorated function receives the fake backend, does any setup that should
+    not be measured, and returns the zero-argument callable to measure.
+    """
+    def register(setup: Callable[[fake_ee.FakeBackend], Callable[[], Any]]):
+        _CASES[name] = {'setup': setup, 'requires': requires, 'quick': quick}
+        return setup
+    return register
+
+
+# ---------------------------------------------------------------------------
+# Shared inputs
+# ---------------------------------------------------------------------------
+
+def _composite(backend: fake_ee.FakeBackend):
+    from epistemx.data_acquisition import Reflectance_Data
+    collection, _ = Reflectance_Data(log_level=logging.WARNING).get_optical_data(
+        backend.aoi(), 2024, 2024, cloud_cover=60, verbose=False, compute_detailed_stats=False)
+    return collection.median()
+
+
+def _training_samples(backend: fake_ee.FakeBackend, n_per_class: int = 40):
+    image = _composite(backend)
+    roi = backend.sample_points(n_per_class)
+    return image, image.sampleRegions(collection=roi, properties=['kelas'], scale=30)
+
+
+def _points_gdf(n: int, n_classes: int = 10, invalid_fraction: float = 0.0, seed: int = 0):
+    import geopandas as gpd
+    import numpy as np
+    from shapely.geometry import Point
+    rng = np.random.default_rng(seed)
+    lon = rng.uniform(104.0, 104.2, n)
+    lat = rng.uniform(-3.5, -3.3, n)
+    geometries = [Point(x, y) for x, y in zip(lon, lat)]
+    n_invalid = int(n * invalid_fraction)
+    for i in rng.choice(n, n_invalid, replace=False):
+        # Out of range coordinates, removed by the validator
+        geometries[i] = Point(500.0, 500.0)
+    return gpd.GeoDataFrame({'kelas': rng.integers(1, n_classes + 1, n)}, geometry=geometries, crs='EPSG:4326')
+
+
+def _spectral_df(n_classes: int, rows_per_class: int = 200, bands: Optional[List[str]] = None, seed: int = 0):
+    import numpy as np
+    import pandas as pd
+    bands = bands or ['BLUE', 'GREEN', 'RED', 'NIR', 'SWIR1', 'SWIR2']
+    rng = np.random.default_rng(seed)
+    frames = []
+    for class_id in range(1, n_classes + 1):
+        centre = rng.uniform(0.02, 0.45, len(bands))
+        values = centre + rng.normal(0, 0.02, (rows_per_class, len(bands)))
+        frame = pd.DataFrame(values, columns=bands)
+        frame['kelas'] = class_id
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+# ---------------------------------------------------------------------------
+# Cases
+# ---------------------------------------------------------------------------
+
+@benchmark('get_optical_data[detailed_stats]')
+def _optical_detailed(backend):
+    from epistemx.data_acquisition import Reflectance_Data
+    data = Reflectance_Data(log_level=logging.WARNING)
+    return lambda: data.get_optical_data(backend.aoi(), 2020, 2024, cloud_cover=60, verbose=True,
+                                         compute_detailed_stats=True)
+
+
+@benchmark('get_optical_data[basic]')
+def _optical_basic(backend):
+    from epistemx.data_acquisition import Reflectance_Data
+    data = Reflectance_Data(log_level=logging.WARNING)
+    return lambda: data.get_optical_data(backend.aoi(), 2020, 2024, cloud_cover=60, verbose=True,
+                                         compute_detailed_stats=False)
+
+
+@benchmark('get_optical_data[aoi_cloud]')
+def _optical_aoi_cloud(backend):
+    from epistemx.data_acquisition import Reflectance_Data
+    data = Reflectance_Data(log_level=logging.WARNING)
+    return lambda: data.get_optical_data(backend.aoi(), 2020, 2024, cloud_cover=60, verbose=True,
+                                         compute_detailed_stats=True, aoi_cloud_cover=30)
+
+
+@benchmark('get_optical_data[catalog]')
+def _optical_catalog(backend):
+    import tempfile
+    from epistemx.data_acquisition import Reflectance_Data
+    from epistemx.scene_catalog import SceneCatalog
+    data = Reflectance_Data(log_level=logging.WARNING)
+    catalog = SceneCatalog(os.path.join(tempfile.mkdtemp(prefix='epistemx_bench_'), 'scenes.sqlite'))
+    aoi = backend.aoi()
+    catalog.sync('L8_SR', aoi, '2020-01-01', '2024-12-31')
+    return lambda: data.get_optical_data(aoi, 2020, 2024, cloud_cover=60, verbose=True,
+                                         compute_detailed_stats=True, catalog=catalog)
+
+
+@benchmark('get_optical_thermal_data[fused]')
+def _optical_thermal_fused(backend):
+    from epistemx.data_acquisition import Reflectance_Data
+    import ee
+    data = Reflectance_Data(log_level=logging.WARNING)
+
+    def run():
+        collection, _ = data.get_optical_thermal_data(backend.aoi(), 2024, 2024, cloud_cover=60, verbose=True,
+                                                      compute_detailed_stats=True)
+        return len(ee.serializer.toJSON(collection.median()))
+    return run
+
+
+@benchmark('get_harmonized_data[4_sensors]')
+def _harmonized(backend):
+    from epistemx.data_acquisition import Reflectance_Data
+    import ee
+    data = Reflectance_Data(log_level=logging.WARNING)
+
+    def run():
+        collection, _ = data.get_harmonized_data(backend.aoi(), 2020, 2024, cloud_cover=60, verbose=True,
+                                                 compute_detailed_stats=True)
+        return len(ee.serializer.toJSON(collection.median()))
+    return run
+
+
+def _optical_collection(backend: fake_ee.FakeBackend):
+    from epistemx.data_acquisition import Reflectance_Data
+    collection, _ = Reflectance_Data(log_level=logging.WARNING).get_optical_data(
+        backend.aoi(), 2020, 2024, cloud_cover=60, verbose=False, compute_detailed_stats=False)
+    return collection
+
+
+@benchmark('composite[percentiles]')
+def _composite_percentiles(backend):
+    from epistemx.composite import Reflectance_Composite
+    import ee
+    collection = _optical_collection(backend)
+    compositor = Reflectance_Composite(log_level=logging.WARNING)
+    image = compositor.composite(collection, method='combined', reducers=('mean', 'stdDev'),
+                                 percentiles=(10, 25, 50, 75, 90))
+    return lambda: image.reduceRegion(ee.Reducer.mean(), backend.aoi(), 300).getInfo()
+
+
+@benchmark('composite[seasonal_medoid]', quick=False)
+def _composite_seasonal(backend):
+    from epistemx.composite import Reflectance_Composite
+    import ee
+    collection = _optical_collection(backend)
+    compositor = Reflectance_Composite(log_level=logging.WARNING)
+    image = compositor.seasonal(collection, method='medoid', as_bands=True)
+    return lambda: image.reduceRegion(ee.Reducer.mean(), backend.aoi(), 300).getInfo()
+
+
+@benchmark('chunked_composite[5_years]')
+def _chunked_composite(backend):
+    from epistemx.temporal_chunks import chunked_composite
+    import ee
+
+    def run():
+        image, _ = chunked_composite(backend.aoi(), 2020, 2024, 'L8_SR', cloud_cover=60, window='year',
+                                     bands=['RED', 'NIR'])
+        return len(ee.serializer.toJSON(image))
+    return run
+
+
+def _distance_case(method: str):
+    @benchmark(f"distance_image[{method}]")
+    def setup(backend):
+        from epistemx.helpers import distance_image
+        import ee
+        scene = ee.ImageCollection('LANDSAT/LC08/C02/T1_L2').filterDate('2022-01-01', '2022-03-01').first()
+        distances = distance_image(scene.select('SR_B5').gt(22000), max_dist=5000, method=method)
+        return lambda: distances.reduceRegion(ee.Reducer.mean(), backend.aoi(), 30).getInfo()
+    return setup
+
+
+for _method in ('cumulative_cost', 'distance_transform'):
+    _distance_case(_method)
+
+
+@benchmark('validate_distance_transform[pyramid]', quick=False)
+def _distance_pyramid(backend):
+    from epistemx.helpers import validate_distance_transform
+    # 7.7 km grid with two small source patches and a 64 pixel neighborhood (1.92 km at 30 m): about half
+    # of the pixels get their distance from the coarser pyramid levels
+    grid = fake_ee.FakeBackend(bounds=(104.0, -3.5, 104.0768, -3.4232), shape=(256, 256))
+    west, south, east, north = grid.bounds
+
+    def patch(x0, y0, x1, y1):
+        import ee
+        rectangle = ee.Geometry.Rectangle([west + x0 * (east - west), south + y0 * (north - south),
+                                           west + x1 * (east - west), south + y1 * (north - south)])
+        return ee.Image(1).clip(rectangle).unmask(0)
+
+    def run():
+        fake_ee.install(grid)
+        try:
+            sources = patch(0.2, 0.3, 0.25, 0.32).add(patch(0.7, 0.8, 0.72, 0.85)).gt(0)
+            stats = validate_distance_transform(sources, grid.aoi(), max_dist=20000, max_neighborhood=64)
+        finally:
+            fake_ee.install(backend)
+        if not stats['within_tolerance']:
+            raise RuntimeError(f"distance_transform is off by {stats['relative_error']:.1%} of cumulativeCost")
+        return stats
+    return run
+
+
+@benchmark('get_collection_statistics[summary_only]')
+def _collection_summary(backend):
+    from epistemx.data_acquisition import Reflectance_Stats
+    import ee
+    collection = ee.ImageCollection('LANDSAT/LC08/C02/T1_L2').filterDate('2020-01-01', '2024-12-31')
+    stats = Reflectance_Stats(log_level=logging.WARNING)
+    return lambda: stats.get_collection_statistics(collection, use_cache=False, summary_only=True)
+
+
+@benchmark('get_info[result_cache]')
+def _result_cache(backend):
+    import tempfile
+    import ee
+    from epistemx.ee_cache import configure_cache
+    from epistemx.ee_fetch import get_info
+    collection = ee.ImageCollection('LANDSAT/LC08/C02/T1_L2').filterDate('2020-01-01', '2024-12-31')
+    requests = [collection.size(), collection.aggregate_array('CLOUD_COVER_LAND'),
+                collection.aggregate_array('system:time_start')]
+
+    def run():
+        # Fresh cache on every run: one cold pass reaches the backend, the warm pass must not,
+        # so a cache that stops answering shows up as extra round trips
+        cache = configure_cache(tempfile.mkdtemp(prefix='epistemx_bench_'))
+        try:
+            for _ in range(2):
+                for request in requests:
+                    get_info(request)
+            if cache.stats()['hits'] != len(requests):
+                raise RuntimeError(f"Result cache answered {cache.stats()['hits']} of {len(requests)} repeated requests")
+        finally:
+            configure_cache(enabled=False)
+    return run
+
+
+@benchmark('stratified_split')
+def _stratified_split(backend):
+    from epistemx.classification import FeatureExtraction
+    image = _composite(backend)
+    roi = backend.sample_points(40)
+    extraction = FeatureExtraction()
+
+    return lambda: extraction.stratified_split(roi, image, 'kelas')
+
+
+@benchmark('soft_classification[graph]')
+def _soft_classification_graph(backend):
+    from epistemx.classification import Generate_LULC
+    import ee
+    image, training = _training_samples(backend)
+    lulc = Generate_LULC()
+
+    def run():
+        result = lulc.soft_classification(training, 'kelas', image)
+        return len(ee.serializer.toJSON(result))
+    return run
+
+
+def _separability_case(n_classes: int, quick: bool):
+    @benchmark(f"check_class_separability[{n_classes}_classes]", requires=('pandas',), quick=quick)
+    def setup(backend):
+        from epistemx.sample_data_quality import sample_quality
+        bands = ['BLUE', 'GREEN', 'RED', 'NIR', 'SWIR1', 'SWIR2']
+        image = _composite(backend).select(bands)
+        quality = sample_quality(backend.sample_points(10), image, 'kelas', backend.aoi())
+        df = _spectral_df(n_classes, bands=bands)
+        return lambda: quality.check_class_separability(df)
+    return setup
+
+
+for _n_classes, _quick in ((5, True), (20, True), (50, False)):
+    _separability_case(_n_classes, _quick)
+
+
+def _convert_roi_case(n_features: int, quick: bool):
+    @benchmark(f"convert_roi_gdf[{n_features}]", requires=('geopandas', 'shapely'), quick=quick)
+    def setup(backend):
+        from epistemx.input_utils import EE_converter
+        gdf = _points_gdf(n_features)
+        converter = EE_converter(verbose=False)
+        return lambda: converter.convert_roi_gdf(gdf)
+    return setup
+
+
+def _validate_geometry_case(n_features: int, quick: bool):
+    @benchmark(f"validate_and_fix_geometry[{n_features}]", requires=('geopandas', 'shapely'), quick=quick)
+    def setup(backend):
+        from epistemx.input_utils import shapefile_validator
+        gdf = _points_gdf(n_features, invalid_fraction=0.01)
+        validator = shapefile_validator(verbose=False)
+        return lambda: validator.validate_and_fix_geometry(gdf.copy(), geometry='point')
+    return setup
+
+
+for _n_features, _quick in ((1000, True), (10000, False), (100000, False)):
+    _convert_roi_case(_n_features, _quick)
+    _validate_geometry_case(_n_features, _quick)
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def _missing_modules(modules: tuple) -> List[str]:
+    return [name for name in modules if importlib.util.find_spec(name) is None]
+
+
+def run_case(name: str, backend: fake_ee.FakeBackend, repeat: int = 3) -> Dict[str, Any]:
+    """
+    Run one case ``repeat`` times, plus once under tracemalloc to measure memory.
+
+    Returns
+    -------
+    dict
+        name, seconds (fastest run), peak_memory_mb, round_trips and computed_pixels
+        (per run), or 'skipped' with the reason.
+    """
+    case = _CASES[name]
+    missing = _missing_modules(case['requires'])
+    if missing:
+        return {'name': name, 'skipped': f"missing {', '.join(missing)}"}
+    with contextlib.redirect_stdout(io.StringIO()):
+        func = case['setup'](backend)
+        seconds = []
+        for _ in range(repeat):
+            backend.reset_counters()
+            start = time.perf_counter()
+            func()
+            seconds.append(time.perf_counter() - start)
+        stats = backend.stats()
+        # Memory is measured in a separate run, tracing allocations slows the code down a lot
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {
+        'name': name,
+        'seconds': min(seconds),
+        'peak_memory_mb': peak / 2 ** 20,
+        'round_trips': stats['round_trips'],
+        'computed_pixels': stats['computed_pixels']
+    }
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    Compare a result with its baseline entry.
+
+    Returns
+    -------
+    list of str
+        Regressions found, empty if the case is within the baseline.
+    """
+    problems = []
+    if result['round_trips'] > baseline['round_trips']:
+        problems.append(f"round trips {baseline['round_trips']} -> {result['round_trips']}")
+    limit = baseline['seconds'] * (1 + tolerance)
+    if result['seconds'] > limit and result['seconds'] - baseline['seconds'] > MIN_TIME_DELTA:
+        problems.append(f"time {baseline['seconds']:.3f}s -> {result['seconds']:.3f}s")
+    limit = baseline['peak_memory_mb'] * (1 + tolerance)
+    if result['peak_memory_mb'] > limit and result['peak_memory_mb'] - baseline['peak_memory_mb'] > MIN_MEMORY_DELTA:
+        problems.append(f"memory {baseline['peak_memory_mb']:.1f}MB -> {result['peak_memory_mb']:.1f}MB")
+    return problems
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get('cases', {})
+
+
+def save_baseline(results: List[Dict[str, Any]], path: str = BASELINE_PATH) -> None:
+    """Store the measured cases as the new baseline, keeping entries of cases that were not run."""
+    cases = load_baseline(path)
+    for result in results:
+        if 'skipped' not in result:
+            cases[result['name']] = {
+                'seconds': round(result['seconds'], 4),
+                'peak_memory_mb': round(result['peak_memory_mb'], 2),
+                'round_trips': result['round_trips'],
+                'computed_pixels': result['computed_pixels']
+            }
+    with open(path, 'w') as f:
+        json.dump({'python': sys.version.split()[0], 'cases': dict(sorted(cases.items()))}, f, indent=2)
+        f.write('\n')
+
+
+def run_benchmarks(names: Optional[List[str]] = None, repeat: int = 3) -> List[Dict[str, Any]]:
+    """
+    Run benchmark cases on a fresh fake backend.
+
+    Parameters
+    ----------
+    names : list of str, optional
+        Cases to run, all cases by default.
+    repeat : int
+        Runs per case.
+    """
+    from epistemx.ee_throttle import configure_rate_limit
+    backend = fake_ee.install()
+    # The fake backend has no quota, token bucket waits would only add noise to the timings
+    configure_rate_limit(requests_per_second=None)
+    try:
+        return [run_case(name, backend, repeat) for name in (names or list(_CASES))]
+    finally:
+        fake_ee.uninstall()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filter', default=None, help='Only run cases whose name contains this text')
+    parser.add_argument('--quick', action='store_true', help='Skip the largest inputs')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per case, the fastest time is kept')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Relative slack on time and memory before a case counts as a regression')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Baseline file')
+    parser.add_argument('--update-baseline', action='store_true', help='Store the results as the new baseline')
+    parser.add_argument('--skip-imports', action='store_true', help='Do not run the import-time checks')
+    parser.add_argument('--json', default=None, help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    names = [name for name, case in _CASES.items()
+             if (args.filter is None or args.filter in name) and (case['quick'] or not args.quick)]
+    results = run_benchmarks(names, args.repeat)
+    baseline = load_baseline(args.baseline)
+
+    failed = False
+    print(f"{'case':45} {'time':>9} {'memory':>9} {'trips':>6} {'pixels':>12}  status")
+    for result in results:
+        if 'skipped' in result:
+            print(f"{result['name']:45} {'':>9} {'':>9} {'':>6} {'':>12}  skipped ({result['skipped']})")
+            continue
+        if args.update_baseline:
+            status = 'baseline updated'
+        elif result['name'] not in baseline:
+            status = 'no baseline'
+        else:
+            problems = compare(result, baseline[result['name']], args.tolerance)
+            failed |= bool(problems)
+            status = 'REGRESSION: ' + '; '.join(problems) if problems else 'ok'
+        print(f"{result['name']:45} {result['seconds']:8.3f}s {result['peak_memory_mb']:7.1f}MB "
+              f"{result['round_trips']:6d} {result['computed_pixels']:12d}  {status}")
+
+    imports = []
+    if not args.skip_imports:
+        imports = run_import_checks(DEFAULT_BUDGET, repeat=args.repeat)
+        for check in imports:
+            heavy = f", heavy imports: {', '.join(check['heavy'])}" if check['heavy'] else ''
+            print(f"{'import ' + check['name']:45} {check['seconds']:8.3f}s "
+                  f"{'':>9} {'':>6} {'':>12}  {'ok' if check['passed'] else 'FAIL'}{heavy}")
+            failed |= not check['passed']
+
+    if args.update_baseline:
+        save_baseline(results, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'cases': results, 'imports': imports}, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,9 +1,9 @@
-from scipy import stats
 import numpy as np
 import ee
 from typing import Dict, List, Tuple, Any, Optional
 import logging
 from .ee_config import ensure_ee_initialized
+from .ee_fetch import DeferredFetch
 
 # Do not initialize Earth Engine at import time. Initialize when classes are instantiated.
 
@@ -37,14 +37,19 @@ class Thematic_Accuracy_Assessment:
                        class_property: str, scale: int) -> Tuple[bool, Optional[str]]:
         """Validate input parameters for accuracy assessment"""
         try:
+            # Retrieve band names and validation properties in one request
+            info = DeferredFetch({
+                'band_names': lcmap.bandNames(),
+                'properties': validation_data.first().propertyNames()
+            }).resolve()
+            
             # Check if lcmap has classification band
-            band_names = lcmap.bandNames().getInfo()
+            band_names = info['band_names']
             if 'classification' not in band_names:
                 return False, "Input land cover map must contain a band named 'classification'"
             
             # Check if validation data has the specified class property
-            first_feature = validation_data.first()
-            properties = first_feature.propertyNames().getInfo()
+            properties = info['properties']
             if class_property not in properties:
                 return False, f"Class property '{class_property}' not found in validation data"
             
@@ -63,6 +68,9 @@ class Thematic_Accuracy_Assessment:
         if n_total == 0:
             return 0.0, 0.0
         
+        # scipy is only needed here, import it on first use to keep module import light
+        from scipy import stats
+        
         p = n_correct / n_total
         se = np.sqrt((p * (1 - p)) / n_total)
         z = stats.norm.ppf((1 + confidence) / 2)
@@ -89,17 +97,20 @@ class Thematic_Accuracy_Assessment:
     def _extract_confusion_matrix_data(self, confusion_matrix: ee.ConfusionMatrix) -> Dict[str, Any]:
         """Extract all metrics from Earth Engine confusion matrix"""
         try:
-            # Get basic metrics
-            overall_accuracy = confusion_matrix.accuracy().getInfo()
-            kappa = confusion_matrix.kappa().getInfo()
-            
-            # Get per-class accuracies
-            producers_accuracy_raw = confusion_matrix.producersAccuracy().getInfo()
-            consumers_accuracy_raw = confusion_matrix.consumersAccuracy().getInfo()
-            
-            # Get confusion matrix array
-            cm_info = confusion_matrix.getInfo()
-            cm_array = cm_info['array'] if isinstance(cm_info, dict) else cm_info
+            # Register basic metrics, per-class accuracies and the confusion matrix array,
+            # then retrieve them in a single request
+            cm_info = DeferredFetch({
+                'overall_accuracy': confusion_matrix.accuracy(),
+                'kappa': confusion_matrix.kappa(),
+                'producers_accuracy': confusion_matrix.producersAccuracy(),
+                'consumers_accuracy': confusion_matrix.consumersAccuracy(),
+                'cm_array': confusion_matrix.array()
+            }).resolve()
+            overall_accuracy = cm_info['overall_accuracy']
+            kappa = cm_info['kappa']
+            producers_accuracy_raw = cm_info['producers_accuracy']
+            consumers_accuracy_raw = cm_info['consumers_accuracy']
+            cm_array = cm_info['cm_array']
             
             # Flatten accuracy arrays
             producers_accuracy = np.array(producers_accuracy_raw).flatten().tolist()
@@ -188,6 +199,17 @@ class Thematic_Accuracy_Assessment:
             error_msg = f"Accuracy assessment failed: {str(e)}"
             logger.error(error_msg)
             return False, {"error": error_msg}
+
+    async def run_accuracy_assessment_async(self, lcmap: ee.Image, validation_data: ee.FeatureCollection,
+                                            class_property: str, scale: int = 30,
+                                            confidence: float = 0.95) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Async variant of run_accuracy_assessment, runs on the shared executor (see ee_async).
+        Several maps can be assessed concurrently with ee_async.gather_limited.
+        """
+        from .ee_async import run_blocking
+        return await run_blocking(self.run_accuracy_assessment, lcmap, validation_data,
+                                  class_property, scale, confidence)
     
     @staticmethod
     def format_accuracy_summary(results: Dict[str, Any]) -> Dict[str, str]:
@@ -0,0 +1,279 @@
+"""
+Earth Engine Asset Cache Module
+
+Export expensive covariate stacks once to an Earth Engine asset and reuse them.
+
+Terrain metrics (``helpers.get_terrain``), distance images
+(``helpers.distance_metric_stack``, several ``cumulativeCost`` computations) and
+spectral index stacks (``spectral_transformation_calcultator.calculate_index``)
+depend only on the AOI and their parameters, but are otherwise recomputed in every
+session. With an ``AssetCache`` the stack is exported (``ee_graph.start_export``) to
+an asset named after a hash of the AOI and the parameters, and later calls return
+``ee.Image(asset_id)``, which is read from storage instead of recomputed.
+
+Asset ids are ``<folder>/<name>_<key>``, where ``key`` is the first 16 hex digits of
+the SHA-256 hash of the serialized AOI, the JSON parameters and the export scale.
+``list()`` and ``invalidate()`` show and delete the cached assets of the folder,
+also from the command line::
+
+    python -m epistemx.asset_cache list --folder projects/my-project/assets/epistemx_cache
+    python -m epistemx.asset_cache invalidate --name distance_metric_stack
+
+The folder must exist. Use ``configure_asset_cache()`` or the
+``EPISTEMX_ASSET_FOLDER`` environment variable to set a default cache, used by the
+helpers when called with ``asset_cache=True``.
+
+Example
+-------
+>>> from epistemx.asset_cache import AssetCache
+>>> from epistemx.helpers import distance_metric_stack
+>>> cache = AssetCache('projects/my-project/assets/epistemx_cache')
+>>> distances = distance_metric_stack(aoi, asset_cache=cache)   # exported once, then reused
+>>> cache.list()
+[{'asset_id': 'projects/my-project/assets/epistemx_cache/distance_metric_stack_3f2a9c0d1e4b5a67', ...}]
+>>> cache.invalidate('distance_metric_stack')
+"""
+
+import argparse
+import ee
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional
+from .ee_graph import asset_exists, start_export, wait_for_task, DEFAULT_POLL_INTERVAL
+from .ee_throttle import ee_call
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Global cache, created by configure_asset_cache() or from EPISTEMX_ASSET_FOLDER
+_asset_cache = None
+_asset_cache_lock = threading.Lock()
+
+_ASSET_NAME = re.compile(r'^(?P<name>.+)_(?P<key>[0-9a-f]{16})$')
+
+
+def _serialize(value: Any) -> str:
+    if isinstance(value, ee.ComputedObject):
+        return ee.serializer.toJSON(value)
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+class AssetCache:
+    """
+    Cache of images exported to Earth Engine assets, keyed by AOI and parameters.
+
+    Parameters
+    ----------
+    folder : str
+        Existing asset folder, e.g. 'projects/my-project/assets/epistemx_cache'.
+    scale : float, default 30
+        Export scale in meters.
+    wait : bool, default True
+        Block until a new export finished and return the asset. If False, start the
+        export, return the computed image, and reuse the asset from the next call on.
+    poll_interval : float, default 10
+        Seconds between export task status checks.
+    timeout : float, optional
+        Maximum seconds to wait for an export.
+    """
+    def __init__(self, folder: str, scale: float = 30, wait: bool = True,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, timeout: Optional[float] = None):
+        self.folder = folder.rstrip('/')
+        self.scale = scale
+        self.wait = wait
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        #Exports started by this cache, asset id to task, so a running export is not started twice
+        self._tasks: Dict[str, Any] = {}
+        self._tasks_lock = threading.Lock()
+
+    @staticmethod
+    def key(aoi: Any, params: Optional[Dict[str, Any]] = None) -> str:
+        """Hash of the serialized AOI and the parameters (16 hex digits)."""
+        payload = _serialize(aoi) + _serialize({k: _serialize(v) for k, v in (params or {}).items()})
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+    def asset_id(self, name: str, aoi: Any, params: Optional[Dict[str, Any]] = None,
+                 scale: Optional[float] = None) -> str:
+        """Asset id of a cached image exported at ``scale`` (default: the cache scale)."""
+        #The export scale is part of the key, an asset exported at 30 m must not answer a 10 m request
+        keyed = dict(params or {}, export_scale=scale or self.scale)
+        return f"{self.folder}/{name}_{self.key(aoi, keyed)}"
+
+    def get_or_create(self, name: str, build: Callable[[], Any], aoi: Any,
+                      params: Optional[Dict[str, Any]] = None, scale: Optional[float] = None) -> Any:
+        """
+        Return the cached image, exporting it first if it is not cached yet.
+
+        Parameters
+        ----------
+        name : str
+            Name of the stack, e.g. 'terrain'.
+        build : callable
+            Zero-argument function building the ee.Image when it is not cached.
+        aoi : ee.Geometry or ee.FeatureCollection
+            Area of interest, part of the key and the export region.
+        params : dict, optional
+            Parameters of the stack, part of the key.
+        scale : float, optional
+            Export scale in meters (default: the cache scale).
+
+        Returns
+        -------
+        ee.Image
+            The cached asset, or the computed image while a non-blocking export runs.
+        """
+        asset_id = self.asset_id(name, aoi, params, scale)
+        if asset_exists(asset_id):
+            logger.info(f"Reusing cached {name} from {asset_id}")
+            return ee.Image(asset_id)
+        image = build().set({'epistemx_cache': name, 'epistemx_params': _serialize(params or {})})
+        region = aoi.geometry() if isinstance(aoi, (ee.FeatureCollection, ee.Feature)) else aoi
+        with self._tasks_lock:
+            task = self._tasks.get(asset_id)
+            running = task is not None and ee_call(task.status).get('state') in ('READY', 'RUNNING')
+            if running:
+                logger.info(f"Export of {name} to {asset_id} is still running (task {task.id})")
+            else:
+                logger.info(f"Caching {name} to {asset_id}")
+                task = start_export(image, asset_id, region=region, scale=scale or self.scale)
+                self._tasks[asset_id] = task
+        if not self.wait:
+            return image
+        wait_for_task(task, self.poll_interval, self.timeout)
+        with self._tasks_lock:
+            self._tasks.pop(asset_id, None)
+        return ee.Image(asset_id)
+
+    def list(self, name: Optional[str] = None) -> List[Dict[str, str]]:
+        """
+        List the cached assets of the folder.
+
+        Parameters
+        ----------
+        name : str, optional
+            Only list the assets of this stack.
+
+        Returns
+        -------
+        list of dict
+            'asset_id', 'name' and 'key' of every cached asset.
+        """
+        listing = ee_call(ee.data.listAssets, {'parent': self.folder})
+        entries = []
+        for asset in listing.get('assets', []):
+            asset_id = asset.get('id') or asset.get('name')
+            match = _ASSET_NAME.match(asset_id.rsplit('/', 1)[-1])
+            if match and (name is None or match.group('name') == name):
+                entries.append({'asset_id': asset_id, 'name': match.group('name'), 'key': match.group('key')})
+        return entries
+
+    def invalidate(self, name: Optional[str] = None, aoi: Any = None,
+                   params: Optional[Dict[str, Any]] = None, scale: Optional[float] = None) -> List[str]:
+        """
+        Delete cached assets so they are rebuilt on the next call.
+
+        Parameters
+        ----------
+        name : str, optional
+            Stack to invalidate. None invalidates every cached asset of the folder.
+        aoi : ee.Geometry or ee.FeatureCollection, optional
+            With ``name``, only invalidate the asset of this AOI and ``params``.
+        params : dict, optional
+            Parameters of the asset to invalidate, used with ``aoi``.
+        scale : float, optional
+            Export scale of the asset to invalidate, used with ``aoi`` (default: the cache scale).
+
+        Returns
+        -------
+        list of str
+            Deleted asset ids.
+        """
+        if name is not None and aoi is not None:
+            asset_ids = [self.asset_id(name, aoi, params, scale)]
+            asset_ids = [asset_id for asset_id in asset_ids if asset_exists(asset_id)]
+        else:
+            asset_ids = [entry['asset_id'] for entry in self.list(name)]
+        for asset_id in asset_ids:
+            ee_call(ee.data.deleteAsset, asset_id)
+            logger.info(f"Deleted cached asset {asset_id}")
+        return asset_ids
+
+
+def configure_asset_cache(folder: Optional[str] = None, **kwargs: Any) -> Optional[AssetCache]:
+    """
+    Set the default asset cache used with ``asset_cache=True``.
+
+    Parameters
+    ----------
+    folder : str, optional
+        Asset folder. None disables the default cache.
+    **kwargs
+        Other AssetCache arguments (scale, wait, poll_interval, timeout).
+
+    Returns
+    -------
+    AssetCache or None
+        The default cache.
+    """
+    global _asset_cache
+    with _asset_cache_lock:
+        _asset_cache = AssetCache(folder, **kwargs) if folder else None
+    if folder:
+        logger.info(f"Asset cache folder: {folder}")
+    return _asset_cache
+
+
+def get_asset_cache() -> Optional[AssetCache]:
+    """Get the default asset cache, created from EPISTEMX_ASSET_FOLDER on first use."""
+    global _asset_cache
+    with _asset_cache_lock:
+        if _asset_cache is None and os.environ.get('EPISTEMX_ASSET_FOLDER'):
+            _asset_cache = AssetCache(os.environ['EPISTEMX_ASSET_FOLDER'])
+        return _asset_cache
+
+
+def resolve_asset_cache(asset_cache: Any) -> Optional[AssetCache]:
+    """
+    Resolve the ``asset_cache`` argument of the helpers.
+
+    None or False: no cache. True: the default cache (an error if none is configured).
+    An AssetCache instance is returned as is.
+    """
+    if asset_cache is None or asset_cache is False:
+        return None
+    if asset_cache is True:
+        cache = get_asset_cache()
+        if cache is None:
+            raise ValueError("No default asset cache, use configure_asset_cache() or set EPISTEMX_ASSET_FOLDER")
+        return cache
+    return asset_cache
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point: list or invalidate the cached assets of a folder."""
+    parser = argparse.ArgumentParser(description="List or invalidate cached epistemx assets")
+    parser.add_argument('command', choices=['list', 'invalidate'])
+    parser.add_argument('--folder', default=os.environ.get('EPISTEMX_ASSET_FOLDER'),
+                        help="Asset folder (default: EPISTEMX_ASSET_FOLDER)")
+    parser.add_argument('--name', help="Only this stack, e.g. distance_metric_stack")
+    args = parser.parse_args(argv)
+    if not args.folder:
+        parser.error("--folder is required when EPISTEMX_ASSET_FOLDER is not set")
+    from .ee_config import ensure_ee_initialized
+    ensure_ee_initialized()
+    cache = AssetCache(args.folder)
+    if args.command == 'list':
+        for entry in cache.list(args.name):
+            print(f"{entry['name']:<30} {entry['key']}  {entry['asset_id']}")
+    else:
+        deleted = cache.invalidate(args.name)
+        print(f"Deleted {len(deleted)} cached assets")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,7 @@
-import pandas as pd
 import numpy as np
 import ee
 from .ee_config import ensure_ee_initialized
+from .ee_fetch import DeferredFetch, get_info
 
 # Do not initialize Earth Engine at import time. Initialize when classes are instantiated.
 
@@ -50,8 +50,9 @@ class FeatureExtraction:
                             scale = pixel_size,
                             tileScale = tile_scale 
         )
-        print('Single Random Split Training Pixel Size:', training_pixels.size().getInfo())
-        print('Single Random Split Testing Pixel Size:', testing_pixels.size().getInfo())
+        sizes = DeferredFetch({'training': training_pixels.size(), 'testing': testing_pixels.size()}).resolve()
+        print('Single Random Split Training Pixel Size:', sizes['training'])
+        print('Single Random Split Testing Pixel Size:', sizes['testing'])
         return training_pixels, testing_pixels
     ############################## 2. Strafied Random Split ###########################
     # Conduct stratified train and test split, ideal for proportional split of the data
@@ -83,8 +84,9 @@ class FeatureExtraction:
         #filter for training and testing
         train_fc = split_fc.filter(ee.Filter.eq('fraction', 'training'))
         test_fc = split_fc.filter(ee.Filter.eq('fraction', 'testing'))
-        print('Stratified Random Split Training Pixel Size:', train_fc.size().getInfo())
-        print('Stratified Random Split Testing Pixel Size:', test_fc.size().getInfo())      
+        sizes = DeferredFetch({'training': train_fc.size(), 'testing': test_fc.size()}).resolve()
+        print('Stratified Random Split Training Pixel Size:', sizes['training'])
+        print('Stratified Random Split Testing Pixel Size:', sizes['testing'])
         #sample the image based stratified split data
         train_pix = image.sampleRegions(
                             collection=train_fc,
@@ -99,6 +101,16 @@ class FeatureExtraction:
         )
   
         return train_pix, test_pix
+    ############################## Async variants ###########################
+    # Run the splits on the shared executor (see ee_async), so an async front end is not blocked
+    async def random_split_async(self, *args, **kwargs):
+        """Async variant of random_split, takes the same arguments"""
+        from .ee_async import run_blocking
+        return await run_blocking(self.random_split, *args, **kwargs)
+    async def stratified_split_async(self, *args, **kwargs):
+        """Async variant of stratified_split, takes the same arguments"""
+        from .ee_async import run_blocking
+        return await run_blocking(self.stratified_split, *args, **kwargs)
 
 class Generate_LULC:
     def __init__(self):
@@ -242,19 +254,22 @@ class Generate_LULC:
         ############################# Feature importance ###########################
         #feature importance that can be used by hard or soft classification
     ## System Response 6.3 Model Evaluation
-    def get_feature_importance(self, trained_model, training_data=None, class_property=None):
+    def get_feature_importance(self, trained_model, training_data=None, class_property=None, use_cache=True):
         """
         Extract feature importance from a trained Random Forest model
         Parameters:
             trained_model: ee.Classifier - Trained Random Forest model
             training_data: ee.FeatureCollection - Training data used to train the model (optional, for fallback)
             class_property: str - Class property name (optional, for fallback)
+            use_cache: bool - Set to False to bypass the Earth Engine result cache (see ee_cache)
         Returns:
             pandas.DataFrame containing model's feature importance (unitless values)
         """
+        import pandas as pd
+        
         try:
             # Try to get model explanation directly
-            model_explanation = trained_model.explain().getInfo()
+            model_explanation = get_info(trained_model.explain(), use_cache=use_cache)
             
             # Extract feature importance
             if 'importance' not in model_explanation:
@@ -278,7 +293,7 @@ class Generate_LULC:
                 try:
                     # Get band names from training data
                     sample_feature = training_data.first()
-                    band_names = sample_feature.propertyNames().filter(ee.Filter.neq('item', class_property)).getInfo()
+                    band_names = get_info(sample_feature.propertyNames().filter(ee.Filter.neq('item', class_property)), use_cache=use_cache)
                     
                     # Create a simple importance estimate based on model structure
                     # This is a fallback - not as accurate as true feature importance
@@ -319,22 +334,33 @@ class Generate_LULC:
             predicted='classification'
         )
         
+        #All values below are registered first and retrieved in a single request
+        fetch = DeferredFetch()
         # Get the actual class IDs that appear in the confusion matrix
         # These are the classes that were actually present in the test data and predicted by the model
-        actual_class_ids = test_data.aggregate_array(class_property).distinct().sort().getInfo()
-        predicted_class_ids = test_classified.aggregate_array('classification').distinct().sort().getInfo()
+        fetch.add('actual_class_ids', test_data.aggregate_array(class_property).distinct().sort())
+        fetch.add('predicted_class_ids', test_classified.aggregate_array('classification').distinct().sort())
         
         #Get accuracy metrics
         #Producer accuracy / Recall (sensitivity)
         #User accuracy / Precision 
         # Get accuracy metrics from confusion matrix object
-        overall_accuracy = confusion_matrix.accuracy().getInfo()
-        kappa = confusion_matrix.kappa().getInfo()
+        fetch.add('overall_accuracy', confusion_matrix.accuracy())
+        fetch.add('kappa', confusion_matrix.kappa())
         #here still used earth engine terminology
-        producers_accuracy_ls = confusion_matrix.producersAccuracy().getInfo()
+        fetch.add('producers_accuracy', confusion_matrix.producersAccuracy())
         #here still used earth engine terminology
-        consumers_accuracy_ls = confusion_matrix.consumersAccuracy().getInfo()
-        confusion_matrix_array = confusion_matrix.getInfo()
+        fetch.add('consumers_accuracy', confusion_matrix.consumersAccuracy())
+        fetch.add('confusion_matrix', confusion_matrix.array())
+        metrics = fetch.resolve()
+
+        actual_class_ids = metrics['actual_class_ids']
+        predicted_class_ids = metrics['predicted_class_ids']
+        overall_accuracy = metrics['overall_accuracy']
+        kappa = metrics['kappa']
+        producers_accuracy_ls = metrics['producers_accuracy']
+        consumers_accuracy_ls = metrics['consumers_accuracy']
+        confusion_matrix_array = metrics['confusion_matrix']
 
         #Flatten using numpy
         producers_accuracy = np.array(producers_accuracy_ls).flatten().tolist()
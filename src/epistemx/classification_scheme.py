@@ -1,6 +1,9 @@
-import pandas as pd
 import random
-from typing import List, Dict, Optional, Any, Tuple
+from typing import List, Dict, Optional, Any, Tuple, TYPE_CHECKING
+
+# pandas is imported on first use to keep module import light
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class LULC_Scheme_Manager:
@@ -288,7 +291,7 @@ class LULC_Scheme_Manager:
     #Change so that csv is more tolaratable 
 # Module 2: Classification Scheme Definition
 ## System Response 2.1a: Upload Classification Scheme
-    def process_csv_upload(self, df: pd.DataFrame, id_col: str, name_col: str, 
+    def process_csv_upload(self, df: 'pd.DataFrame', id_col: str, name_col: str, 
                           color_col: Optional[str] = None) -> Tuple[bool, str]:
         """
         Process CSV upload - validate and prepare for color assignment.
@@ -309,6 +312,7 @@ class LULC_Scheme_Manager:
         Tuple[bool, str]
             Tuple of (success, message). Message contains details about the operation.
         """
+        import pandas as pd
         try:
             class_list = []
             used_ids = set()
@@ -410,7 +414,7 @@ class LULC_Scheme_Manager:
         df = self.get_dataframe()
         return df.to_csv(index=False).encode('utf-8')
     
-    def get_dataframe(self) -> pd.DataFrame:
+    def get_dataframe(self) -> 'pd.DataFrame':
         """
         Get the classification scheme as a normalized DataFrame.
         
@@ -419,6 +423,7 @@ class LULC_Scheme_Manager:
         pd.DataFrame
             DataFrame with standardized column names for display and export
         """
+        import pandas as pd
         if not self.classes:
             return pd.DataFrame(columns=["ID", "Land Cover Class", "Color Palette"])
 
@@ -505,7 +510,7 @@ class LULC_Scheme_Manager:
         }
     
     @staticmethod
-    def auto_detect_csv_columns(df: pd.DataFrame) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    def auto_detect_csv_columns(df: 'pd.DataFrame') -> Tuple[Optional[str], Optional[str], Optional[str]]:
         """
         Auto-detect ID, Name, and Color columns in CSV.
         
@@ -0,0 +1,240 @@
+"""
+Earth Engine Composite Module
+
+Reduce a masked Landsat collection (e.g. from ``Reflectance_Data.get_optical_data``)
+to a single image, or to one image per season.
+
+Methods
+-------
+- 'median': per-band median (band names unchanged)
+- 'medoid': for every pixel, the observation closest to the per-band median over
+  all bands, so the bands of the output come from one real acquisition
+- 'percentile': several percentiles of every band from a single reducer pass
+  (bands named BAND_p10, BAND_p50, ...)
+- 'greenest': greenest-pixel composite, ``qualityMosaic`` on NDVI
+- 'combined': several statistics (mean, stdDev, min, max, ... and percentiles)
+  combined into one reducer, so the collection is read once
+
+Seasonal composites are built with a server-side map over the season list: the
+expression graph does not grow with the number of seasons, and a stacked image
+(bands named SEASON_BAND...) is available with ``as_bands=True``.
+
+Example
+-------
+>>> from epistemx.composite import Reflectance_Composite
+>>> collection, stats = Reflectance_Data().get_optical_data(aoi, 2023, 2024, 'L8_SR')
+>>> compositor = Reflectance_Composite()
+>>> covariates = compositor.composite(collection, method='combined', reducers=('mean', 'stdDev'),
+...                                   percentiles=(10, 50, 90))
+>>> seasonal = compositor.seasonal(collection, method='median', as_bands=True)
+"""
+
+import ee
+import logging
+from typing import Dict, Optional, Sequence, Tuple
+from .ee_config import ensure_ee_initialized
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+# Tropical monsoon seasons, months inclusive. A season may wrap around the end of the year
+DEFAULT_SEASONS: Dict[str, Tuple[int, int]] = {'dry': (5, 10), 'wet': (11, 4)}
+COMPOSITE_METHODS = ('median', 'medoid', 'percentile', 'greenest', 'combined')
+# Reducers available to the 'combined' method
+_REDUCERS = {
+    'mean': lambda: ee.Reducer.mean(),
+    'median': lambda: ee.Reducer.median(),
+    'min': lambda: ee.Reducer.min(),
+    'max': lambda: ee.Reducer.max(),
+    'stdDev': lambda: ee.Reducer.stdDev(),
+    'sum': lambda: ee.Reducer.sum(),
+    'count': lambda: ee.Reducer.count()
+}
+
+
+class Reflectance_Composite:
+    """Class for building median, medoid, percentile, greenest-pixel and seasonal composites."""
+    def __init__(self, log_level=logging.INFO):
+        """
+        Initialize the Reflectance_Composite object and set up a class-specific logger.
+        Ensure Earth Engine is initialized lazily (avoids import-time failures).
+        """
+        ensure_ee_initialized()
+
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.logger.setLevel(log_level)
+
+    @staticmethod
+    def _select(collection, bands):
+        return collection.select(list(bands)) if bands else collection
+
+    def median(self, collection, bands: Optional[Sequence[str]] = None):
+        """
+        Per-band median composite.
+
+        Parameters
+        ----------
+        collection : ee.ImageCollection. Masked image collection.
+        bands : list of str, optional. Bands to composite (default: all).
+
+        Returns
+        -------
+        ee.Image : Median of every band, band names unchanged.
+        """
+        return self._select(collection, bands).median()
+
+    def percentiles(self, collection, percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+                    bands: Optional[Sequence[str]] = None):
+        """
+        Percentile stack of every band, computed with a single reducer pass.
+
+        Parameters
+        ----------
+        collection : ee.ImageCollection. Masked image collection.
+        percentiles : list of float. Percentiles to compute (default: 10, 25, 50, 75, 90).
+        bands : list of str, optional. Bands to composite (default: all).
+
+        Returns
+        -------
+        ee.Image : Bands named BAND_p10, BAND_p25, ...
+        """
+        return self._select(collection, bands).reduce(ee.Reducer.percentile(list(percentiles)))
+
+    def combined(self, collection, reducers: Sequence[str] = ('mean', 'stdDev'),
+                 percentiles: Optional[Sequence[float]] = None, bands: Optional[Sequence[str]] = None):
+        """
+        Several statistics of every band from one combined reducer, so the collection is read once.
+
+        Parameters
+        ----------
+        collection : ee.ImageCollection. Masked image collection.
+        reducers : list of str. Any of 'mean', 'median', 'min', 'max', 'stdDev', 'sum', 'count'
+            (default: mean and stdDev).
+        percentiles : list of float, optional. Percentiles added to the same reducer.
+        bands : list of str, optional. Bands to composite (default: all).
+
+        Returns
+        -------
+        ee.Image : Bands named BAND_mean, BAND_stdDev, ..., BAND_p10, ...
+        """
+        unknown = [name for name in reducers if name not in _REDUCERS]
+        if unknown:
+            raise ValueError(f"Unknown reducers {unknown}, must be among {list(_REDUCERS)}")
+        parts = [_REDUCERS[name]() for name in reducers]
+        if percentiles:
+            parts.append(ee.Reducer.percentile(list(percentiles)))
+        if not parts:
+            raise ValueError("At least one reducer or percentile is required")
+        reducer = parts[0]
+        for part in parts[1:]:
+            reducer = reducer.combine(reducer2=part, sharedInputs=True)
+        return self._select(collection, bands).reduce(reducer)
+
+    def medoid(self, collection, bands: Optional[Sequence[str]] = None):
+        """
+        Medoid composite: for every pixel, the observation with the smallest sum of squared
+        differences to the per-band median.
+
+        Parameters
+        ----------
+        collection : ee.ImageCollection. Masked image collection.
+        bands : list of str, optional. Bands used for the distance and returned (default: all).
+
+        Returns
+        -------
+        ee.Image : Bands of the selected observation, band names unchanged.
+        """
+        collection = self._select(collection, bands)
+        median = collection.median()
+
+        def score(img):
+            distance = img.subtract(median).pow(2).reduce(ee.Reducer.sum())
+            return img.addBands(distance.multiply(-1).rename('MEDOID_SCORE'))
+        composite = collection.map(score).qualityMosaic('MEDOID_SCORE')
+        return composite.select(list(bands)) if bands else composite.select(median.bandNames())
+
+    def greenest(self, collection, nir: str = 'NIR', red: str = 'RED'):
+        """
+        Greenest-pixel composite: for every pixel, the observation with the highest NDVI.
+
+        Parameters
+        ----------
+        collection : ee.ImageCollection. Masked image collection with renamed bands.
+        nir : str. Near infrared band (default: 'NIR').
+        red : str. Red band (default: 'RED').
+
+        Returns
+        -------
+        ee.Image : Bands of the selected observation plus 'NDVI'.
+        """
+        return (collection
+                .map(lambda img: img.addBands(img.normalizedDifference([nir, red]).rename('NDVI')))
+                .qualityMosaic('NDVI'))
+
+    def composite(self, collection, method: str = 'median', **kwargs):
+        """
+        Build a composite with the selected method.
+
+        Parameters
+        ----------
+        collection : ee.ImageCollection. Masked image collection.
+        method : str. One of 'median', 'medoid', 'percentile', 'greenest', 'combined' (default: 'median').
+        **kwargs : Arguments of the method (bands, percentiles, reducers, nir, red).
+
+        Returns
+        -------
+        ee.Image : Composite.
+        """
+        builders = {
+            'median': self.median,
+            'medoid': self.medoid,
+            'percentile': self.percentiles,
+            'greenest': self.greenest,
+            'combined': self.combined
+        }
+        if method not in builders:
+            raise ValueError(f"method must be one of: {list(COMPOSITE_METHODS)}")
+        return builders[method](collection, **kwargs)
+
+    def seasonal(self, collection, seasons: Optional[Dict[str, Tuple[int, int]]] = None, method: str = 'median',
+                 as_bands: bool = False, **kwargs):
+        """
+        One composite per season, built with a server-side map over the seasons.
+
+        Parameters
+        ----------
+        collection : ee.ImageCollection. Masked image collection.
+        seasons : dict, optional
+            Season name to (first month, last month), inclusive. A season may wrap around
+            the end of the year, e.g. (11, 4). Default: dry (May-October) and wet (November-April).
+        method : str. Composite method, see composite() (default: 'median').
+        as_bands : bool
+            If True, return a single image with bands named SEASON_BAND (default: False).
+        **kwargs : Arguments of the composite method.
+
+        Returns
+        -------
+        ee.ImageCollection or ee.Image
+            One image per season with a 'season' property, or the stacked image.
+            A season without observations gives an image without bands.
+        """
+        seasons = seasons or DEFAULT_SEASONS
+        for name, (first, last) in seasons.items():
+            if not (1 <= first <= 12 and 1 <= last <= 12):
+                raise ValueError(f"Months of season '{name}' must be between 1 and 12")
+
+        def season_composite(item):
+            item = ee.List(item)
+            name = ee.String(item.get(0))
+            subset = collection.filter(ee.Filter.calendarRange(item.get(1), item.get(2), 'month'))
+            image = ee.Image(self.composite(subset, method, **kwargs))
+            names = image.bandNames().map(lambda band: name.cat('_').cat(band))
+            return image.rename(names).set('season', name)
+        images = ee.List([[name, first, last] for name, (first, last) in seasons.items()]).map(season_composite)
+        composites = ee.ImageCollection.fromImages(images)
+        if not as_bands:
+            return composites
+        #toBands prefixes band names with the image index, the season prefix is restored from each image
+        band_names = images.map(lambda image: ee.Image(image).bandNames()).flatten()
+        return composites.toBands().rename(band_names)
@@ -2,6 +2,8 @@ import ee
 from datetime import datetime
 import logging
 from .ee_config import ensure_ee_initialized
+from .ee_fetch import get_info
+from .sensors import LANDSAT_C2_QA, SENSORS, band_selection, get_sensor
 
 # Do not initialize Earth Engine at import time. Initialize when an instance is created.
 
@@ -10,6 +12,31 @@ logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
+
+#Helper function so that the user can input only the year or a specific date
+def parse_year_or_date(date_input, is_start=True):
+    """
+    Expand a year (2024 or '2024') to its first or last day, pass a full date through.
+
+    Parameters
+    ----------
+    date_input : int or str. Year (YYYY) or date in format 'YYYY-MM-DD'.
+    is_start : bool. Expand a year to January 1st if True, to December 31st otherwise (default: True).
+
+    Returns
+    -------
+    str : Date in format 'YYYY-MM-DD'.
+    """
+    if isinstance(date_input, int):  # User gave integer year like 2024
+        return f"{date_input}-01-01" if is_start else f"{date_input}-12-31"
+    elif isinstance(date_input, str):
+        if len(date_input) == 4 and date_input.isdigit():
+            return f"{date_input}-01-01" if is_start else f"{date_input}-12-31"
+        else:
+            return date_input  # Already full date
+    else:
+        raise ValueError("Date must be either YYYY or YYYY-MM-DD format")
+
 # Module 1: Cloudless Image Mosaic
 ## System Response 1.2: Search and Filter Imagery
 class Reflectance_Data:
@@ -113,6 +140,15 @@ class Reflectance_Data:
             'description': 'Landsat 9 Top-of-atmosphere reflectance'      
         }
     }
+    #Thermal band of each TOA sensor
+    THERMAL_BANDS = {'L4': 'B6', 'L5': 'B6', 'L7': 'B6_VCID_2', 'L8': 'B10', 'L9': 'B10'}
+    #Bands shared by TM, ETM+ and OLI after rename_landsat_bands, used by the harmonized time series
+    HARMONIZED_BANDS = ['BLUE', 'GREEN', 'RED', 'NIR', 'SWIR1', 'SWIR2']
+    #ETM+ to OLI surface reflectance OLS coefficients (Roy et al. 2016, Table 2), in HARMONIZED_BANDS order
+    #Roy, D.P. et al. (2016). Characterization of Landsat-7 to Landsat-8 reflective wavelength and normalized
+    #difference vegetation index continuity. Remote Sensing of Environment, 185, 57-70.
+    ETM_TO_OLI_SLOPES = [0.8474, 0.8483, 0.9047, 0.8462, 0.8937, 0.9071]
+    ETM_TO_OLI_INTERCEPTS = [0.0003, 0.0088, 0.0061, 0.0412, 0.0254, 0.0172]
     #Initialize the class
     def __init__(self, log_level=logging.INFO):
         """
@@ -126,6 +162,31 @@ class Reflectance_Data:
         self.logger.setLevel(log_level)
 
         self.logger.info("ReflectanceData initialized.")
+
+    @classmethod
+    def register_optical_dataset(cls, name, collection, sensor, description, cloud_property='CLOUD_COVER_LAND',
+                                 type='landsat_sr'):
+        """
+        Add an optical dataset, preprocessed with the band metadata of a registered sensor.
+
+        Parameters
+        ----------
+        name : str. Dataset key, e.g. 'L8_VIS', used as optical_data.
+        collection : str. Earth Engine image collection id.
+        sensor : str. Sensor registered in the sensors registry (see sensors.register_sensor).
+        description : str. Human readable name, reported in the statistics.
+        cloud_property : str. Scene cloud cover property (default: 'CLOUD_COVER_LAND').
+        type : str. Dataset type, 'landsat_sr' datasets can be harmonized (default: 'landsat_sr').
+        """
+        if sensor not in SENSORS:
+            raise ValueError(f"Sensor {sensor} is not registered, use sensors.register_sensor first")
+        cls.OPTICAL_DATASETS[name] = {
+            'collection': collection,
+            'cloud_property': cloud_property,
+            'type': type,
+            'sensor': sensor,
+            'description': description
+        }
     
     def has_thermal_capability(self, optical_data):
         """
@@ -176,25 +237,72 @@ class Reflectance_Data:
             #Implementatio on Image
             >>> masked_image = get_landsat.mask_landsat_sr(image)
             """
-            qa = image.select('QA_PIXEL')
-            #Deterministic bits ---
-            cloud_bit = 1 << 3
-            shadow_bit = 1 << 4
-            cloud_mask = qa.bitwiseAnd(cloud_bit).eq(0)
-            shadow_mask = qa.bitwiseAnd(shadow_bit).eq(0)
-            #Confidence bits ---
-            cloud_conf = qa.rightShift(8).bitwiseAnd(3)     # Bits 8–9
-            shadow_conf = qa.rightShift(10).bitwiseAnd(3)   # Bits 10–11
-            #snow_conf = qa.rightShift(12).bitwiseAnd(3)     # Bits 12–13
-            cirrus_conf = qa.rightShift(14).bitwiseAnd(3)   # Bits 14–15
-            #Keep pixels below thresholds
-            conf_mask = (cloud_conf.lt(cloud_conf_thresh)
-                        .And(shadow_conf.lt(shadow_conf_thresh))
-                        #.And(snow_conf.lt(snow_conf_thresh))
-                        .And(cirrus_conf.lt(cirrus_conf_thresh)))
-            #Final mask
-            final_mask = cloud_mask.And(shadow_mask).And(conf_mask)
+            final_mask = self._qa_clear_mask(image.select('QA_PIXEL'), LANDSAT_C2_QA,
+                                             cloud_conf_thresh, shadow_conf_thresh, cirrus_conf_thresh)
             return image.updateMask(final_mask).copyProperties(image, image.propertyNames())
+    #Clear-pixel mask from a QA band and its bit layout
+    def _qa_clear_mask(self, qa, layout, cloud_conf_thresh=2, shadow_conf_thresh=2, cirrus_conf_thresh=2):
+        """
+        Clear-pixel mask (1 = keep) from a QA band, following a sensors registry QA layout.
+
+        Pixels with the cloud or shadow bit set, or a cloud / shadow / cirrus confidence
+        (2-bit fields, 0=None to 3=High) at or above the thresholds are masked. Fields
+        missing from the layout are not tested.
+        """
+        clear = None
+        #Deterministic bits ---
+        bits = sum(1 << layout[key] for key in ('cloud_bit', 'shadow_bit') if key in layout)
+        if bits:
+            clear = qa.bitwiseAnd(bits).eq(0)
+        #Confidence bits, keep pixels below thresholds ---
+        for key, thresh in (('cloud_confidence', cloud_conf_thresh), ('shadow_confidence', shadow_conf_thresh),
+                            ('cirrus_confidence', cirrus_conf_thresh)):
+            if key in layout:
+                conf = qa.rightShift(layout[key]).bitwiseAnd(3).lt(thresh)
+                clear = conf if clear is None else clear.And(conf)
+        return ee.Image.constant(1) if clear is None else clear
+    #Select, scale, mask and rename in a single step, driven by the sensors registry
+    def prepare_image(self, image, sensor, bands=None, passthrough=None, properties=None,
+                      cloud_conf_thresh=2, shadow_conf_thresh=2, cirrus_conf_thresh=2):
+        """
+        Preprocess one image with the band metadata of its sensor (see the sensors module).
+
+        Equivalent to mask_landsat_sr, apply_scale_factors and rename_landsat_bands in one
+        function, so a collection needs a single map. Only the selected bands are scaled
+        and masked, every other band is dropped first.
+
+        Parameters
+        ----------
+        image : ee.Image. Landsat image with the source bands and the QA band.
+        sensor : str. Registered sensor, e.g. 'L8'.
+        bands : list of str, optional. Standardized bands to keep (default: all bands of the sensor).
+        passthrough : list of str, optional. Other bands of the image kept as is (masked, not scaled).
+        properties : ee.List, optional. Image properties to copy (default: all).
+        cloud_conf_thresh, shadow_conf_thresh, cirrus_conf_thresh : int. See mask_landsat_sr.
+
+        Returns
+        -------
+        ee.Image : Masked reflectance with standardized band names and the image properties.
+
+        Example
+        --------
+        >>> get_landsat = Reflectance_Data()
+        >>> collection = collection.map(lambda img: get_landsat.prepare_image(img, 'L8'))
+        """
+        spec = get_sensor(sensor)
+        sources, names = band_selection(sensor, bands)
+        prepared = image.select(sources, names)
+        if spec['scale'] is not None or spec['offset'] is not None:
+            prepared = prepared.multiply(1 if spec['scale'] is None else spec['scale'])
+            prepared = prepared.add(0 if spec['offset'] is None else spec['offset'])
+        if passthrough:
+            prepared = prepared.addBands(image.select(list(passthrough)))
+        if spec['qa_band']:
+            prepared = prepared.updateMask(self._qa_clear_mask(image.select(spec['qa_band']), spec['qa'],
+                                                               cloud_conf_thresh, shadow_conf_thresh,
+                                                               cirrus_conf_thresh))
+        #copyProperties returns an ee.Element, cast back so the result can be chained as an image
+        return ee.Image(prepared.copyProperties(image, image.propertyNames() if properties is None else properties))
     #Functions to rename Landsat bands 
     def rename_landsat_bands(self, image, sensor_type):
         """
@@ -203,7 +311,7 @@ class Reflectance_Data:
         Parameters
         ----------
         image : ee.Image. Landsat SR image
-        sensor_type : str. Sensor type ('L5', 'L7', 'L8', 'L9')
+        sensor_type : str. Sensor registered in the sensors registry ('L1' to 'L9' by default)
 
         Returns
         -------
@@ -213,25 +321,8 @@ class Reflectance_Data:
         --------
 
         """
-        if sensor_type in ['L4','L5', 'L7']:
-            # Landsat 5/7 SR bands
-            return image.select(
-                ['SR_B1', 'SR_B2', 'SR_B3', 'SR_B4', 'SR_B5', 'SR_B7'], 
-                ['BLUE', 'GREEN', 'RED', 'NIR', 'SWIR1', 'SWIR2']
-            )
-        elif sensor_type in ['L1', 'L2', 'L3']:
-            return image.select(
-                ['B4', 'B5', 'B6', 'B7'],
-                ['GREEN', 'RED', 'NIR1', 'NIR2']
-            )
-        elif sensor_type in ['L8', 'L9']:
-            # Landsat 8/9 SR bands
-            return image.select(
-                ['SR_B1','SR_B2', 'SR_B3', 'SR_B4', 'SR_B5', 'SR_B6', 'SR_B7'], 
-                ['AEROSOL','BLUE', 'GREEN', 'RED', 'NIR', 'SWIR1', 'SWIR2']
-            )
-        else:
-            raise ValueError(f"Unsupported sensor type for SR data: {sensor_type}")
+        sources, names = band_selection(sensor_type)
+        return image.select(sources, names)
     #function to implement Landsat Collection 2 Tier 1 SR scale factor
     def apply_scale_factors(self, image):
         """
@@ -250,41 +341,96 @@ class Reflectance_Data:
         optical_bands = image.select('SR_B.').multiply(0.0000275).add(-0.2)
         #thermal_bands = image.select('ST_B.*').multiply(0.00341802).add(149.0)
         return image.addBands(optical_bands, None, True)
-    #Function to retrive Landsat multispectral bands
-    def get_optical_data(self, aoi, start_date, end_date, optical_data='L8_SR',
-                        cloud_cover=30,
-                        verbose=True, compute_detailed_stats=True):
+    #Function to harmonize TM/ETM+ reflectance to OLI
+    def harmonize_to_oli(self, image):
         """
-        Get optical image collection for Landsat 1-9 SR data with detailed information logging.
+        Transform TM/ETM+ surface reflectance to OLI with the Roy et al. (2016) OLS coefficients.
 
         Parameters
         ----------
-        aoi :  ee.FeatureCollection. Area of interest.
-        start_date : str. Start date in format 'YYYY-MM-DD' or year.
-        end_date : str. End date in format 'YYYY-MM-DD' or year.
-        optical_data : str. Dataset type: i.e 'L5_SR', 'L7_SR', 'L8_SR', 'L9_SR'.
-        cloud_cover : int. Maximum cloud cover percentage on land (default: 30).
-        verbose : bool. Print detailed information about the collection (default: True).
-        compute_detailed_stats : bool
-            If True, compute detailed statistics 
-            If False, return only basic information (default: True).
+        image : ee.Image. Scaled Landsat 4/5/7 SR image with the HARMONIZED_BANDS names.
 
         Returns
         -------
-        tuple : (ee.ImageCollection, dict)
-            Filtered and preprocessed image collection with statistics.
+        ee.Image : HARMONIZED_BANDS in OLI-equivalent reflectance, with the image properties.
+        """
+        return ee.Image(image.select(self.HARMONIZED_BANDS)
+                        .multiply(ee.Image.constant(self.ETM_TO_OLI_SLOPES))
+                        .add(ee.Image.constant(self.ETM_TO_OLI_INTERCEPTS))
+                        .rename(self.HARMONIZED_BANDS)
+                        .copyProperties(image, image.propertyNames()))
+    #Function to compute cloud percentage within the area of interest
+    def add_aoi_cloud(self, image, aoi, scale=300, cloud_property='CLOUD_COVER_LAND', skip_contained=False):
+        """
+        Add the cloud and cloud shadow percentage within the AOI as the 'CLOUDY_PERC_AOI' property.
+
+        The percentage is the mean of the QA_PIXEL cloud mask, computed with a single
+        reduceRegion at a coarse scale (bestEffort), so the cost per scene stays small
+        for large AOIs. Scenes without valid pixels in the AOI get 100.
+
+        Parameters
+        ----------
+        image : ee.Image. Landsat Collection 2 image with a QA_PIXEL band.
+        aoi : ee.FeatureCollection or ee.Geometry. Area of interest.
+        scale : float. Scale of the evaluation in meters (default: 300).
+        cloud_property : str. Scene cloud property used when the AOI scoring is skipped (default: 'CLOUD_COVER_LAND').
+        skip_contained : bool
+            If True, scenes whose footprint contains the whole AOI take the scene cloud
+            cover instead of being scored (default: False).
+
+        Returns
+        -------
+        ee.Image : Image with the 'CLOUDY_PERC_AOI' property.
+        """
+        geometry = aoi if isinstance(aoi, ee.Geometry) else aoi.geometry()
+        qa = image.select('QA_PIXEL')
+        cloud_mask = qa.bitwiseAnd(1 << 3).Or(qa.bitwiseAnd(1 << 4)).gt(0)
+        cloud_fraction = cloud_mask.reduceRegion(
+            reducer=ee.Reducer.mean(), geometry=geometry, scale=scale, bestEffort=True, maxPixels=1e9
+        ).get('QA_PIXEL')
+        cloud_perc = ee.Algorithms.If(ee.Algorithms.IsEqual(cloud_fraction, None), 100,
+                                      ee.Number(cloud_fraction).multiply(100))
+        if skip_contained:
+            cloud_perc = ee.Algorithms.If(image.geometry().contains(geometry, 100),
+                                          image.get(cloud_property), cloud_perc)
+        return image.set({'CLOUDY_PERC_AOI': cloud_perc})
+    #Function to select scenes from the local scene metadata catalog
+    def _select_from_catalog(self, catalog, dataset, aoi, start_date, end_date, cloud_cover, compute_detailed_stats):
+        """
+        Select scenes with the local scene catalog (see scene_catalog) instead of Earth Engine metadata queries.
+
+        Returns
+        -------
+        tuple : (ee.ImageCollection, ee.ImageCollection, dict, dict)
+            Collections before and after the cloud cover filter, restricted to the selected
+            scene ids, and their statistics computed from the catalog.
+        """
+        from .scene_catalog import statistics_from_scenes
+        config = {**self.OPTICAL_DATASETS, **self.THERMAL_DATASETS}[dataset]
+        scenes = catalog.query(dataset, aoi, start_date, end_date)
+        selected = [s for s in scenes if s['cloud_cover'] is not None and s['cloud_cover'] < cloud_cover]
+        base = ee.ImageCollection(config['collection']).filterDate(start_date, end_date)
+        initial_collection = base.filter(ee.Filter.inList('system:index', [s['scene_id'] for s in scenes]))
+        collection = base.filter(ee.Filter.inList('system:index', [s['scene_id'] for s in selected]))
+        if compute_detailed_stats:
+            return initial_collection, collection, statistics_from_scenes(scenes), statistics_from_scenes(selected)
+        stats_object = Reflectance_Stats()
+        return (initial_collection, collection, stats_object.get_collection_statistics(initial_collection, False),
+                stats_object.get_collection_statistics(collection, False))
+    #Function to retrive Landsat multispectral bands
+    #Function to search and filter the optical scenes, shared by the optical and fused builders
+    def _select_optical_scenes(self, aoi, start_date, end_date, optical_data, cloud_cover, verbose,
+                               compute_detailed_stats, aoi_cloud_cover, aoi_cloud_scale, skip_contained_aoi, catalog):
+        """
+        Filter an optical dataset by AOI, date and cloud cover and compute the collection statistics
+        (see get_optical_data for the parameters).
+
+        Returns
+        -------
+        tuple : (ee.ImageCollection, dict, dict, dict, str, str)
+            Filtered collection before masking, dataset configuration, statistics before and
+            after cloud filtering, parsed start and end dates.
         """
-        #Helper function so that the user only input year or specific date range
-        def parse_year_or_date(date_input, is_start=True):
-            if isinstance(date_input, int):  # User gave integer year like 2024
-                return f"{date_input}-01-01" if is_start else f"{date_input}-12-31"
-            elif isinstance(date_input, str):
-                if len(date_input) == 4 and date_input.isdigit():
-                    return f"{date_input}-01-01" if is_start else f"{date_input}-12-31"
-                else:
-                    return date_input  # Already full date
-            else:
-                raise ValueError("Date must be either YYYY or YYYY-MM-DD format")
         # Parse inputs (handles both year and full date)
         start_date = parse_year_or_date(start_date, is_start=True)
         end_date   = parse_year_or_date(end_date, is_start=False)
@@ -302,37 +448,33 @@ class Reflectance_Data:
             if not compute_detailed_stats:
                 self.logger.info("detailed statistics will not be computed")
 
-        #Initial collection
-        initial_collection = (ee.ImageCollection(config['collection'])
-                            .filterBounds(aoi)
-                            .filterDate(start_date, end_date))
-        #Compute cloud within the area of interest (produce additional processing time)
-        '''
-        def add_aoi_cloud(img):
-            qa = img.select('QA_PIXEL')
-            cloud_mask = qa.bitwiseAnd(1 << 3).Or(qa.bitwiseAnd(1<<4))
-            total = ee.Number(cloud_mask.reduceRegion(
-                reducer=ee.Reducer.count(), geometry=aoi, scale=30, maxPixels=1e9
-            ).values().get(0))
-            cloudy = ee.Number(cloud_mask.reduceRegion(
-                reducer=ee.Reducer.sum(), geometry=aoi, scale=30, maxPixels=1e9
-            ).values().get(0))
-            cloud_perc = cloudy.divide(total).multiply(100)
-            return img.set({'CLOUDY_PERC_AOI': cloud_perc})
-        
-        #Apply the AOI cloud percentage to the image collection
-        initial_collection = initial_collection.map(add_aoi_cloud)
-        '''
-        #initial_stats = self.get_collection_statistics(initial_collection, compute_detailed_stats)
         stats_object = Reflectance_Stats()
-        initial_stats = stats_object.get_collection_statistics(initial_collection, compute_detailed_stats)
+        if catalog is not None:
+            #Scene selection and statistics from the local catalog
+            initial_collection, collection, initial_stats, filtered_stats = self._select_from_catalog(
+                catalog, optical_data, aoi, start_date, end_date, cloud_cover, compute_detailed_stats)
+        else:
+            #Initial collection
+            initial_collection = (ee.ImageCollection(config['collection'])
+                                .filterBounds(aoi)
+                                .filterDate(start_date, end_date))
+            initial_stats = stats_object.get_collection_statistics(initial_collection, compute_detailed_stats)
+            #Collection after cloud cover filter
+            collection = initial_collection.filter(ee.Filter.lt(config['cloud_property'], cloud_cover))
         if verbose and compute_detailed_stats and initial_stats.get('total_images', 0) > 0:
             self.logger.info(f"Initial collection (before cloud filtering): {initial_stats['total_images']} images")
             self.logger.info(f"Date range of available images: {initial_stats['date_range']}")
 
-        #Collection after cloud cover filter
-        collection = initial_collection.filter(ee.Filter.lt(config['cloud_property'], cloud_cover))
-        filtered_stats = stats_object.get_collection_statistics(collection, compute_detailed_stats)
+        #Score cloud within the AOI only for scenes passing the metadata filter
+        if aoi_cloud_cover is not None:
+            if verbose:
+                self.logger.info(f"AOI cloud cover threshold: {aoi_cloud_cover}% (evaluated at {aoi_cloud_scale} m)")
+            collection = (collection
+                        .map(lambda img: self.add_aoi_cloud(img, aoi, aoi_cloud_scale, config['cloud_property'],
+                                                            skip_contained_aoi))
+                        .filter(ee.Filter.lt('CLOUDY_PERC_AOI', aoi_cloud_cover)))
+        if catalog is None or aoi_cloud_cover is not None:
+            filtered_stats = stats_object.get_collection_statistics(collection, compute_detailed_stats)
         #Computing image statistics
         if verbose and compute_detailed_stats:
             if filtered_stats.get('total_images', 0) > 0:
@@ -341,7 +483,9 @@ class Reflectance_Data:
                                 f"{filtered_stats['cloud_cover']['min']:.1f}% - "
                                 f"{filtered_stats['cloud_cover']['max']:.1f}%")
                 self.logger.info(f"Average cloud cover: {filtered_stats['cloud_cover']['mean']:.1f}%")
-                if len(filtered_stats['individual_dates']) <= 20:
+                if not filtered_stats['individual_dates']:
+                    self.logger.info(f"Images span {filtered_stats['date_range']}")
+                elif len(filtered_stats['individual_dates']) <= 20:
                     self.logger.info(f"Image dates: {', '.join(filtered_stats['individual_dates'])}")
                 else:
                     self.logger.info(f"Images span from {min(filtered_stats['individual_dates'])} "
@@ -361,11 +505,47 @@ class Reflectance_Data:
         elif verbose:
             self.logger.info("Filtered collection created (use compute_detailed_stats=True for more information)")
 
-        #Apply masking and band renaming to image collection after filtering
-        collection = (collection
-                    .map(lambda img: self.mask_landsat_sr(img))
-                    .map(lambda img: self.apply_scale_factors(img))
-                    .map(lambda img: self.rename_landsat_bands(img, config['sensor'])))
+        return collection, config, initial_stats, filtered_stats, start_date, end_date
+    def get_optical_data(self, aoi, start_date, end_date, optical_data='L8_SR',
+                        cloud_cover=30,
+                        verbose=True, compute_detailed_stats=True,
+                        aoi_cloud_cover=None, aoi_cloud_scale=300, skip_contained_aoi=False, catalog=None):
+        """
+        Get optical image collection for Landsat 1-9 SR data with detailed information logging.
+
+        Parameters
+        ----------
+        aoi :  ee.FeatureCollection. Area of interest.
+        start_date : str. Start date in format 'YYYY-MM-DD' or year.
+        end_date : str. End date in format 'YYYY-MM-DD' or year.
+        optical_data : str. Dataset type: i.e 'L5_SR', 'L7_SR', 'L8_SR', 'L9_SR'.
+        cloud_cover : int. Maximum cloud cover percentage on land (default: 30).
+        verbose : bool. Print detailed information about the collection (default: True).
+        compute_detailed_stats : bool
+            If True, compute detailed statistics 
+            If False, return only basic information (default: True).
+        aoi_cloud_cover : float, optional
+            Maximum cloud percentage within the AOI. Scenes passing the scene cloud filter
+            are scored with add_aoi_cloud. None disables AOI scoring (default: None).
+        aoi_cloud_scale : float. Scale of the AOI cloud evaluation in meters (default: 300).
+        skip_contained_aoi : bool
+            If True, scenes whose footprint contains the whole AOI use the scene cloud cover
+            instead of AOI scoring (default: False).
+        catalog : scene_catalog.SceneCatalog, optional
+            Select scenes and compute the statistics from a local scene metadata catalog,
+            synced incrementally. Only the selected scene ids are sent to Earth Engine (default: None).
+
+        Returns
+        -------
+        tuple : (ee.ImageCollection, dict)
+            Filtered and preprocessed image collection with statistics.
+        """
+        collection, config, initial_stats, filtered_stats, start_date, end_date = self._select_optical_scenes(
+            aoi, start_date, end_date, optical_data, cloud_cover, verbose, compute_detailed_stats,
+            aoi_cloud_cover, aoi_cloud_scale, skip_contained_aoi, catalog)
+
+        #Apply band selection, scaling, masking and renaming in a single map after filtering
+        collection = collection.map(lambda img: self.prepare_image(img, config['sensor']))
 
         #Return results
         return collection, {
@@ -373,13 +553,203 @@ class Reflectance_Data:
             'sensor': config['sensor'],
             'date_range_requested': f"{start_date} to {end_date}",
             'cloud_cover_threshold': cloud_cover,
+            'aoi_cloud_cover_threshold': aoi_cloud_cover,
             'initial_collection': initial_stats,
             'filtered_collection': filtered_stats,
             'detailed_stats_computed': compute_detailed_stats
         }
     #TOA-based Thermal Bands
+    async def get_optical_data_async(self, *args, **kwargs):
+        """
+        Async variant of get_optical_data, runs on the shared executor (see ee_async).
+        Takes the same arguments and returns the same (collection, stats) tuple.
+        """
+        from .ee_async import run_blocking
+        return await run_blocking(self.get_optical_data, *args, **kwargs)
+
+    #Harmonized multi-sensor time series in a single collection
+    def get_harmonized_data(self, aoi, start_date, end_date, optical_data=('L5_SR', 'L7_SR', 'L8_SR', 'L9_SR'),
+                            cloud_cover=30, harmonize=True,
+                            verbose=True, compute_detailed_stats=True,
+                            aoi_cloud_cover=None, aoi_cloud_scale=300, skip_contained_aoi=False, catalog=None):
+        """
+        Get a merged Landsat TM/ETM+/OLI surface reflectance time series from several sensors.
+
+        Each sensor is filtered, masked, scaled and renamed with a single map, optionally
+        harmonized to OLI (harmonize_to_oli), and merged into one collection sorted by
+        acquisition time. Statistics are computed once on the merged collection instead of
+        once per sensor.
+
+        Parameters
+        ----------
+        aoi :  ee.FeatureCollection. Area of interest.
+        start_date : str. Start date in format 'YYYY-MM-DD' or year.
+        end_date : str. End date in format 'YYYY-MM-DD' or year.
+        optical_data : list of str. OPTICAL_DATASETS keys, 'L4_SR' to 'L9_SR' (default: L5, L7, L8 and L9).
+        cloud_cover : int. Maximum cloud cover percentage on land (default: 30).
+        harmonize : bool. Transform TM/ETM+ reflectance to OLI (default: True).
+        Other parameters are the same as get_optical_data.
+
+        Returns
+        -------
+        tuple : (ee.ImageCollection, dict)
+            Collection with the HARMONIZED_BANDS and a 'SENSOR' property, and statistics.
+
+        Example
+        --------
+        >>> get_landsat = Reflectance_Data()
+        >>> collection, stats = get_landsat.get_harmonized_data(aoi, 1990, 2024, cloud_cover=30)
+        """
+        start_date = parse_year_or_date(start_date, is_start=True)
+        end_date   = parse_year_or_date(end_date, is_start=False)
+
+        if isinstance(optical_data, str):
+            optical_data = [optical_data]
+        for dataset in optical_data:
+            if dataset not in self.OPTICAL_DATASETS:
+                raise ValueError(f"optical_data must be one of: {list(self.OPTICAL_DATASETS.keys())}")
+            if self.OPTICAL_DATASETS[dataset]['type'] != 'landsat_sr':
+                raise ValueError(f"{dataset} is not a surface reflectance dataset, MSS data cannot be harmonized")
+        if verbose:
+            self.logger.info(f"Starting harmonized data fetch for {', '.join(optical_data)}")
+            self.logger.info(f"Date range: {start_date} to {end_date}")
+            self.logger.info(f"Cloud cover threshold: {cloud_cover}%")
+
+        #Filter every sensor, then merge the raw collections so statistics are computed once
+        initial_collection = None
+        collection = None
+        prepared = None
+        for dataset in optical_data:
+            config = self.OPTICAL_DATASETS[dataset]
+            if catalog is not None:
+                initial, filtered, _, _ = self._select_from_catalog(
+                    catalog, dataset, aoi, start_date, end_date, cloud_cover, False)
+            else:
+                initial = (ee.ImageCollection(config['collection'])
+                           .filterBounds(aoi)
+                           .filterDate(start_date, end_date))
+                filtered = initial.filter(ee.Filter.lt(config['cloud_property'], cloud_cover))
+            if aoi_cloud_cover is not None:
+                filtered = (filtered
+                            .map(lambda img, cloud_property=config['cloud_property']:
+                                 self.add_aoi_cloud(img, aoi, aoi_cloud_scale, cloud_property, skip_contained_aoi))
+                            .filter(ee.Filter.lt('CLOUDY_PERC_AOI', aoi_cloud_cover)))
+
+            #Masking, scaling, renaming and harmonization in a single map per sensor
+            def prepare(img, sensor=config['sensor']):
+                image = self.prepare_image(img, sensor, bands=self.HARMONIZED_BANDS)
+                if harmonize and sensor in ['L4', 'L5', 'L7']:
+                    image = self.harmonize_to_oli(image)
+                return image.set('SENSOR', sensor)
+            sensor_collection = filtered.map(prepare)
+            initial_collection = initial if initial_collection is None else initial_collection.merge(initial)
+            collection = filtered if collection is None else collection.merge(filtered)
+            prepared = sensor_collection if prepared is None else prepared.merge(sensor_collection)
+
+        stats_object = Reflectance_Stats()
+        initial_stats = stats_object.get_collection_statistics(initial_collection, compute_detailed_stats)
+        filtered_stats = stats_object.get_collection_statistics(collection, compute_detailed_stats)
+        if verbose and compute_detailed_stats:
+            if filtered_stats.get('total_images', 0) > 0:
+                self.logger.info(f"Initial collection (before cloud filtering): {initial_stats['total_images']} images")
+                self.logger.info(f"After cloud filtering (<{cloud_cover}%): {filtered_stats['total_images']} images, "
+                                 f"{filtered_stats['date_range']}")
+                self.logger.info(f"Average cloud cover: {filtered_stats['cloud_cover']['mean']:.1f}%")
+            else:
+                self.logger.warning(f"No images found matching criteria (cloud cover < {cloud_cover}%)")
+        elif verbose:
+            self.logger.info("Harmonized collection created (use compute_detailed_stats=True for more information)")
+
+        return prepared.sort('system:time_start'), {
+            'dataset': [self.OPTICAL_DATASETS[d]['description'] for d in optical_data],
+            'sensor': [self.OPTICAL_DATASETS[d]['sensor'] for d in optical_data],
+            'harmonized': harmonize,
+            'date_range_requested': f"{start_date} to {end_date}",
+            'cloud_cover_threshold': cloud_cover,
+            'aoi_cloud_cover_threshold': aoi_cloud_cover,
+            'initial_collection': initial_stats,
+            'filtered_collection': filtered_stats,
+            'detailed_stats_computed': compute_detailed_stats
+        }
+    async def get_harmonized_data_async(self, *args, **kwargs):
+        """
+        Async variant of get_harmonized_data, runs on the shared executor (see ee_async).
+        """
+        from .ee_async import run_blocking
+        return await run_blocking(self.get_harmonized_data, *args, **kwargs)
+    #Optical and thermal bands from a single filtered, masked collection
+    def get_optical_thermal_data(self, aoi, start_date, end_date, optical_data='L8_SR',
+                                 cloud_cover=30,
+                                 verbose=True, compute_detailed_stats=True,
+                                 aoi_cloud_cover=None, aoi_cloud_scale=300, skip_contained_aoi=False, catalog=None):
+        """
+        Get optical SR bands and the TOA thermal band in one image collection.
+
+        Scenes are searched, filtered and described once (as get_optical_data), then the
+        thermal band of the matching TOA scene is joined by 'system:index'. The QA mask is
+        applied once to both, instead of building get_optical_data and get_thermal_bands
+        as two parallel pipelines.
+
+        Parameters
+        ----------
+        Same as get_optical_data. optical_data must have a thermal counterpart
+        (see has_thermal_capability), i.e. 'L4_SR' to 'L9_SR'.
+
+        Returns
+        -------
+        tuple : (ee.ImageCollection, dict)
+            Collection with the standardized optical bands and 'THERMAL', and statistics.
+            Scenes without a matching TOA scene are dropped.
+
+        Example
+        --------
+        >>> get_landsat = Reflectance_Data()
+        >>> collection, stats = get_landsat.get_optical_thermal_data(aoi, 2024, 2024, 'L8_SR', cloud_cover=30)
+        >>> composite = collection.median()
+        """
+        if not self.has_thermal_capability(optical_data):
+            raise ValueError(f"{optical_data} has no thermal band, use get_optical_data instead")
+        collection, config, initial_stats, filtered_stats, start_date, end_date = self._select_optical_scenes(
+            aoi, start_date, end_date, optical_data, cloud_cover, verbose, compute_detailed_stats,
+            aoi_cloud_cover, aoi_cloud_scale, skip_contained_aoi, catalog)
+        thermal_data = optical_data.replace('_SR', '_TOA')
+        thermal_config = self.THERMAL_DATASETS[thermal_data]
+        thermal_band = self.THERMAL_BANDS[config['sensor']]
+        #TOA scenes share system:index with the SR scenes, the join drops the unmatched ones
+        toa = (ee.ImageCollection(thermal_config['collection'])
+               .filterBounds(aoi)
+               .filterDate(start_date, end_date)
+               .select([thermal_band]))
+        joined = ee.ImageCollection(ee.Join.saveFirst('TOA_SCENE').apply(
+            primary=collection, secondary=toa,
+            condition=ee.Filter.equals(leftField='system:index', rightField='system:index')))
+
+        def fuse(img):
+            image = img.addBands(ee.Image(img.get('TOA_SCENE')).rename(['THERMAL']))
+            return self.prepare_image(image, config['sensor'], passthrough=['THERMAL'],
+                                      properties=img.propertyNames().remove('TOA_SCENE'))
+        collection = joined.map(fuse)
+
+        return collection, {
+            'dataset': config['description'],
+            'thermal_dataset': thermal_config['description'],
+            'sensor': config['sensor'],
+            'thermal_band': thermal_band,
+            'date_range_requested': f"{start_date} to {end_date}",
+            'cloud_cover_threshold': cloud_cover,
+            'aoi_cloud_cover_threshold': aoi_cloud_cover,
+            'initial_collection': initial_stats,
+            'filtered_collection': filtered_stats,
+            'detailed_stats_computed': compute_detailed_stats
+        }
+    async def get_optical_thermal_data_async(self, *args, **kwargs):
+        """
+        Async variant of get_optical_thermal_data, runs on the shared executor (see ee_async).
+        """
+        from .ee_async import run_blocking
+        return await run_blocking(self.get_optical_thermal_data, *args, **kwargs)
     def get_thermal_bands(self, aoi, start_date, end_date, thermal_data = 'L8_TOA', cloud_cover=30,
-                        verbose=True, compute_detailed_stats=True):
+                        verbose=True, compute_detailed_stats=True, catalog=None):
         """
         Get the thermal bands from landsat TOA data
     
@@ -394,57 +764,26 @@ class Reflectance_Data:
         compute_detailed_stats : bool
             If True, compute detailed statistics 
             If False, return only basic information (default: True).
+        catalog : scene_catalog.SceneCatalog, optional
+            Select scenes and compute the statistics from a local scene metadata catalog (default: None).
             
         Returns
         -------
         tuple : (ee.ImageCollection, dict)
             Filtered and preprocessed image collection with statistics.
         """
-        #Helper function to parse the date so that the user can only input the year
-        def parse_year_or_date(date_input, is_start=True):
-            if isinstance(date_input, int):  # User gave integer year like 2024
-                return f"{date_input}-01-01" if is_start else f"{date_input}-12-31"
-            elif isinstance(date_input, str):
-                if len(date_input) == 4 and date_input.isdigit():
-                    return f"{date_input}-01-01" if is_start else f"{date_input}-12-31"
-                else:
-                    return date_input  # Already full date
-            else:
-                raise ValueError("Date must be either YYYY or YYYY-MM-DD format")
         # Parse inputs (handles both year and full date)
         start_date = parse_year_or_date(start_date, is_start=True)
         end_date   = parse_year_or_date(end_date, is_start=False)
-        #Helper function to rename the bands
-        def rename_thermal_band(img):
-            sensor = config['sensor']
-            thermal_band_map = {
-                'L4': ['B6'],
-                'L5': ['B6'],
-                'L7': ['B6_VCID_2'],
-                'L8': ['B10'],
-                'L9': ['B10']
-            }
-            band_names = thermal_band_map.get(sensor, [])
-            if len(band_names) == 1:
-                return img.select(band_names).rename(['THERMAL'])
-            else:
-                return img
         #The core function for thermal bnd
         if thermal_data not in self.THERMAL_DATASETS:
                 raise ValueError(f"thermal_data must be one of: {list(self.THERMAL_DATASETS.keys())}")
 
         config = self.THERMAL_DATASETS[thermal_data]
 
-        #Decide which thermal band to select
+        #Thermal band of the sensor, from the same registry used by get_optical_thermal_data
         sensor = config['sensor']
-        if sensor in ['L4', 'L5']:
-            thermal_band = 'B6'
-        elif sensor == 'L7':
-            thermal_band = 'B6_VCID_2'
-        elif sensor in ['L8', 'L9']:
-            thermal_band = 'B10'
-        else:
-            raise ValueError(f"Unsupported sensor type: {sensor}")
+        thermal_band = self.THERMAL_BANDS[sensor]
         stats = Reflectance_Stats()
         #Logging
         if verbose:
@@ -453,18 +792,23 @@ class Reflectance_Data:
             self.logger.info(f"Cloud cover threshold: {cloud_cover}%")
             if not compute_detailed_stats:
                 self.logger.info("Fast mode enabled - detailed statistics will not be computed")
-        #Initial collection
-        initial_collection = (ee.ImageCollection(config['collection'])
-                            .filterBounds(aoi)
-                            .filterDate(start_date, end_date))
-        initial_stats = stats.get_collection_statistics(initial_collection, compute_detailed_stats)
+        if catalog is not None:
+            #Scene selection and statistics from the local catalog
+            initial_collection, collection, initial_stats, filtered_stats = self._select_from_catalog(
+                catalog, thermal_data, aoi, start_date, end_date, cloud_cover, compute_detailed_stats)
+        else:
+            #Initial collection
+            initial_collection = (ee.ImageCollection(config['collection'])
+                                .filterBounds(aoi)
+                                .filterDate(start_date, end_date))
+            initial_stats = stats.get_collection_statistics(initial_collection, compute_detailed_stats)
+            #Apply cloud cover filter
+            collection = initial_collection.filter(ee.Filter.lt(config['cloud_property'], cloud_cover))
+            filtered_stats = stats.get_collection_statistics(collection, compute_detailed_stats)
 
         if verbose and compute_detailed_stats and initial_stats.get('total_images', 0) > 0:
             self.logger.info(f"Initial collection (before cloud filtering): {initial_stats['total_images']} images")
             self.logger.info(f"Date range of available images: {initial_stats['date_range']}")
-        #Apply cloud cover filter
-        collection = initial_collection.filter(ee.Filter.lt(config['cloud_property'], cloud_cover))
-        filtered_stats = stats.get_collection_statistics(collection, compute_detailed_stats)
         if verbose and compute_detailed_stats:
             if filtered_stats.get('total_images', 0) > 0:
                 self.logger.info(f"After cloud filtering (<{cloud_cover}%): {filtered_stats['total_images']} images")
@@ -477,8 +821,7 @@ class Reflectance_Data:
         
         #Apply masking (QA-based)
         collection = collection.map(lambda img: self.mask_landsat_sr(img))
-        collection = collection.select(thermal_band)
-        collection = collection.map(rename_thermal_band)
+        collection = collection.select([thermal_band], ['THERMAL'])
 
         #Return collection and stats
         return collection, {
@@ -507,58 +850,92 @@ class Reflectance_Stats:
         self.logger.setLevel(log_level)
 
         self.logger.info("Reflectance Stats initialized.")
-    def get_collection_statistics(self, collection, compute_stats=True, print_report=False):
+    def collection_statistics_dictionary(self, collection, summary_only=False):
+        """
+        Build the statistics of an image collection as a single server-side dictionary.
+
+        Parameters
+        ----------
+        collection : ee.ImageCollection. Landsat image collection.
+        summary_only : bool
+            If True, only aggregates are included, without the per-scene cloud cover,
+            dates and scene ids (default: False).
+
+        Returns
+        -------
+        ee.Dictionary : 'total_images' only for an empty collection, otherwise the cloud cover
+            min/max/mean, first and last acquisition time, number of scenes per month
+            ('yyyy-MM'), distinct WRS paths/rows and, unless summary_only, the per-scene lists.
+        """
+        size = collection.size()
+        #One image per WRS path/row, so the path and row lists stay aligned
+        tiles = (collection.filter(ee.Filter.notNull(['WRS_PATH', 'WRS_ROW']))
+                .distinct(['WRS_PATH', 'WRS_ROW']))
+        months = collection.map(
+            lambda img: img.set('YEAR_MONTH', ee.Date(img.get('system:time_start')).format('yyyy-MM')))
+        statistics = {
+            'total_images': size,
+            'cloud_min': collection.aggregate_min('CLOUD_COVER_LAND'),
+            'cloud_max': collection.aggregate_max('CLOUD_COVER_LAND'),
+            'cloud_mean': collection.aggregate_mean('CLOUD_COVER_LAND'),
+            'date_min': collection.aggregate_min('system:time_start'),
+            'date_max': collection.aggregate_max('system:time_start'),
+            'monthly_histogram': months.aggregate_histogram('YEAR_MONTH'),
+            'paths': tiles.aggregate_array('WRS_PATH'),
+            'rows': tiles.aggregate_array('WRS_ROW')
+        }
+        if not summary_only:
+            statistics.update({
+                'cloud_values': collection.aggregate_array('CLOUD_COVER_LAND'),
+                'dates': collection.aggregate_array('system:time_start'),
+                'scene_id': collection.aggregate_array('system:index')
+            })
+        #Aggregates of an empty collection are not evaluated
+        return ee.Dictionary(ee.Algorithms.If(size.gt(0), ee.Dictionary(statistics),
+                                              ee.Dictionary({'total_images': 0})))
+    def get_collection_statistics(self, collection, compute_stats=True, print_report=False, use_cache=True,
+                                  summary_only=False):
         """
         Get comprehensive statistics about an image collection.
+        The statistics are computed server-side and retrieved in a single request.
+        Set use_cache=False to bypass the Earth Engine result cache (see ee_cache).
+        Set summary_only=True for collections with thousands of scenes: only the aggregates
+        are retrieved and 'values', 'individual_dates' and 'Scene_ids' are empty lists.
         """
         #Get the number of image used 
         try:
             size = collection.size()
             if compute_stats:
-                total_images = size.getInfo() #Client side operation, produce number of image collection
+                #Client side operation, produce the statistics of the image collection
+                info = get_info(self.collection_statistics_dictionary(collection, summary_only), use_cache=use_cache)
+                total_images = info['total_images']
                 if total_images > 0:
                     #Get the cloud cover percentage, and image aqcusition date
-                    cloud_values = collection.aggregate_array('CLOUD_COVER_LAND').getInfo()
-                    dates = collection.aggregate_array('system:time_start').getInfo()
-                    dates_readable = [datetime.fromtimestamp(d/1000).strftime('%Y-%m-%d') for d in dates]
-                    date_range = f"{min(dates_readable)} to {max(dates_readable)}"
-                    #add lines to identify collection ID
-                    scene_id = collection.aggregate_array('system:index').getInfo()
-                    date_range = f"{min(dates_readable)} to {max(dates_readable)}"
+                    cloud_values = info.get('cloud_values', [])
+                    dates_readable = [datetime.fromtimestamp(d/1000).strftime('%Y-%m-%d') for d in info.get('dates', [])]
+                    first_date = datetime.fromtimestamp(info['date_min']/1000).strftime('%Y-%m-%d')
+                    last_date = datetime.fromtimestamp(info['date_max']/1000).strftime('%Y-%m-%d')
                     #Get information regarding image's WRS path and row
-                    try:
-                        first_img = collection.first()
-                        has_path_row = first_img.propertyNames().contains('WRS_PATH').getInfo()
-                        if has_path_row:
-                            paths = collection.aggregate_array('WRS_PATH').getInfo()
-                            rows = collection.aggregate_array('WRS_ROW').getInfo()
-                            path_rows = list(set(zip(paths, rows)))
-                            path_rows.sort()
-                        else:
-                            path_rows = []
-                    except Exception:
-                        path_rows = []
+                    path_rows = sorted(set(zip(info['paths'], info['rows'])))
                     #Image collections information 
                     stats = {
                         'total_images': total_images,
-                        'date_range': date_range,
+                        'date_range': f"{first_date} to {last_date}",
                         'cloud_cover': {
-                            'min': min(cloud_values) if cloud_values else None,
-                            'max': max(cloud_values) if cloud_values else None,
-                            'mean': sum(cloud_values) / len(cloud_values) if cloud_values else None,
+                            'min': info.get('cloud_min'),
+                            'max': info.get('cloud_max'),
+                            'mean': info.get('cloud_mean'),
                             'values': cloud_values
                         },
                         'path_row_tiles': path_rows,
                         'unique_tiles': len(path_rows),
                         'individual_dates': dates_readable,
-                        'Scene_ids': scene_id
+                        'monthly_histogram': dict(sorted(info['monthly_histogram'].items())),
+                        'Scene_ids': info.get('scene_id', []),
+                        'summary_only': summary_only
                     }
                     if print_report:
                         self.print_collection_report(stats)
-                    #if total_images <= 20:
-                    #    self.logger.info(f"Scene IDs:{', '.join(scene_id)}")
-                    #else:
-                    #    self.logger.info(f"Scene IDs (first 10): {', '.join(scene_id[:10])}")
                 else:
                     stats = {
                         'total_images': 0,
@@ -567,7 +944,9 @@ class Reflectance_Stats:
                         'path_row_tiles': [],
                         'unique_tiles': 0,
                         'individual_dates': [],
-                        'Scene_ids':[]
+                        'monthly_histogram': {},
+                        'Scene_ids':[],
+                        'summary_only': summary_only
                     }
                     if print_report:
                         print("="*60)
@@ -587,6 +966,15 @@ class Reflectance_Stats:
         except Exception as e:
             self.logger.error(f"Error getting collection statistics: {str(e)}")
             return {'error': str(e)} 
+    async def get_collection_statistics_async(self, collection, compute_stats=True, print_report=False, use_cache=True,
+                                              summary_only=False):
+        """
+        Async variant of get_collection_statistics, runs on the shared executor (see ee_async).
+        Statistics of several collections can be gathered concurrently with ee_async.gather_limited.
+        """
+        from .ee_async import run_blocking
+        return await run_blocking(self.get_collection_statistics, collection, compute_stats, print_report, use_cache,
+                                  summary_only)
     def print_collection_report(self, stats):
         """
         Print a formatted report of collection statistics.
@@ -646,6 +1034,15 @@ class Reflectance_Stats:
                 print(f"Date range: {min(stats['individual_dates'])} to {max(stats['individual_dates'])}")
                 print(f"({len(stats['individual_dates'])} total acquisition dates)")
             print()
+        elif stats.get('monthly_histogram'):
+            print("Scenes per Month:")
+            print("-" * 30)
+            months = list(stats['monthly_histogram'].items())
+            for month, count in months[:24]:
+                print(f"{month}: {count}")
+            if len(months) > 24:
+                print(f"... and {len(months) - 24} more months")
+            print()
         # Sample Scene IDs
         if stats['Scene_ids']:
             print("Scene IDs (first 10):")
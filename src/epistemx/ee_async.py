@@ -0,0 +1,159 @@
+"""
+Earth Engine Asyncio Module
+
+Asyncio support for the blocking Earth Engine calls made by epistemx, so that an
+async front end (FastAPI, Streamlit with asyncio, ...) can serve several users from
+one process without stalling its event loop on ``getInfo()``.
+
+Blocking work is run on a bounded thread pool shared by the process. Requests still
+go through the rate limiter, retry policy and session pool (see ``ee_throttle``), so
+the pool size bounds the number of busy threads, not the load on Earth Engine.
+
+Cancellation: cancelling the awaiting task drops work that has not started yet.
+Work that is already running cannot be interrupted mid-request, but it stops before
+its next request or retry and its result is discarded.
+
+The ``*_async`` methods of ``Reflectance_Data``, ``Reflectance_Stats``,
+``FeatureExtraction`` and ``Thematic_Accuracy_Assessment`` are built on
+``run_blocking()``.
+
+Example
+-------
+>>> import asyncio
+>>> from epistemx.ee_async import gather_limited
+>>> stats = Reflectance_Stats()
+>>> async def report(collections):
+...     return await gather_limited(*(stats.get_collection_statistics_async(c) for c in collections), limit=4)
+>>> results = asyncio.run(report([collection_2019, collection_2024]))
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, List, Optional
+from .ee_throttle import cancel_scope
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 8
+
+# Global executor shared by every async call, created on first use
+_executor: Optional[ThreadPoolExecutor] = None
+_max_workers = DEFAULT_MAX_WORKERS
+_executor_lock = threading.Lock()
+
+
+def configure_async_executor(max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+    """
+    Set the number of threads running blocking Earth Engine work for async callers.
+
+    Work already submitted to the previous executor finishes in the background.
+
+    Parameters
+    ----------
+    max_workers : int, default 8
+        Maximum number of blocking calls running at the same time.
+    """
+    global _executor, _max_workers
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    with _executor_lock:
+        previous = _executor
+        _executor = None
+        _max_workers = max_workers
+    if previous is not None:
+        previous.shutdown(wait=False)
+    logger.info(f"Async Earth Engine executor: {max_workers} worker threads")
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get the process-wide executor, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_max_workers, thread_name_prefix='epistemx-ee')
+        return _executor
+
+
+def _run_cancellable(cancelled: threading.Event, context: contextvars.Context,
+                     func: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+    def call():
+        with cancel_scope(cancelled):
+            return func(*args, **kwargs)
+    return context.run(call)
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking function on the shared executor and await its result.
+
+    Context variables of the caller are visible to ``func``. If the awaiting task is
+    cancelled, pending work is dropped and running work stops before its next Earth
+    Engine request or retry.
+
+    Parameters
+    ----------
+    func : callable
+        Blocking function, e.g. a method making ``getInfo()`` calls.
+    *args, **kwargs
+        Arguments passed to ``func``.
+
+    Returns
+    -------
+    Any
+        Return value of ``func``.
+
+    Example
+    -------
+    >>> from epistemx.ee_async import run_blocking
+    >>> n_images = await run_blocking(get_info, collection.size())
+    """
+    loop = asyncio.get_running_loop()
+    cancelled = threading.Event()
+    future = loop.run_in_executor(
+        get_executor(),
+        functools.partial(_run_cancellable, cancelled, contextvars.copy_context(), func, args, kwargs)
+    )
+    try:
+        return await future
+    except asyncio.CancelledError:
+        cancelled.set()
+        raise
+
+
+async def gather_limited(*aws: Awaitable[Any], limit: Optional[int] = None,
+                         return_exceptions: bool = False) -> List[Any]:
+    """
+    Await several awaitables concurrently, at most ``limit`` at a time.
+
+    Like ``asyncio.gather``, results are returned in the order of the arguments and
+    cancelling the gather cancels every awaitable that has not finished.
+
+    Parameters
+    ----------
+    *aws : awaitable
+        Coroutines or futures, e.g. ``stats.get_collection_statistics_async(c)``.
+    limit : int, optional
+        Maximum number running at the same time. None runs all of them at once.
+    return_exceptions : bool, default False
+        Return exceptions as results instead of raising the first one.
+
+    Returns
+    -------
+    list
+        Results in argument order.
+    """
+    if limit is None:
+        return await asyncio.gather(*aws, return_exceptions=return_exceptions)
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    semaphore = asyncio.Semaphore(limit)
+
+    async def limited(aw: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await aw
+    return await asyncio.gather(*(limited(aw) for aw in aws), return_exceptions=return_exceptions)
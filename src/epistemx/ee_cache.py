@@ -0,0 +1,283 @@
+"""
+Earth Engine Result Cache Module
+
+Persistent, content-addressed cache for Earth Engine ``getInfo()`` results.
+
+Results are stored in a local SQLite file and keyed by a SHA-256 hash of the
+serialized Earth Engine expression graph plus the active Google Cloud project.
+Identical requests (same graph, same project) are answered from disk instead of
+Earth Engine. Entries expire after a time-to-live (TTL) and the file is kept
+under a size limit by evicting the least recently used entries.
+
+The cache is disabled by default. Enable it with ``configure_cache()`` or by
+setting the ``EPISTEMX_CACHE_DIR`` environment variable.
+"""
+
+import contextlib
+import ee
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'epistemx')
+DEFAULT_TTL = 24 * 60 * 60              # 1 day, in seconds
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024   # 256 MB
+
+# Global cache instance, created by configure_cache() or from EPISTEMX_CACHE_DIR
+_cache = None
+_cache_configured = False
+_cache_lock = threading.Lock()
+
+
+class ResultCache:
+    """
+    On-disk cache of Earth Engine results with TTL and size-bounded LRU eviction.
+
+    Example
+    -------
+    >>> from epistemx.ee_cache import ResultCache
+    >>> cache = ResultCache('/tmp/epistemx_cache.sqlite', ttl=3600)
+    >>> key = cache.make_key(collection.size(), project='my-project')
+    >>> hit, value = cache.get(key)
+    """
+    def __init__(self, path: str, ttl: Optional[float] = DEFAULT_TTL,
+                 max_bytes: Optional[int] = DEFAULT_MAX_BYTES):
+        """
+        Initialize the cache and create the SQLite file if needed.
+
+        Parameters
+        ----------
+        path : str
+            Path of the SQLite cache file.
+        ttl : float, optional
+            Time-to-live of an entry in seconds. None keeps entries until evicted.
+        max_bytes : int, optional
+            Maximum total size of cached values in bytes. None disables eviction.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed_at)")
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection, commit (or roll back) the transaction and close it on exit."""
+        # sqlite3's own context manager only ends the transaction, it does not close the connection
+        with contextlib.closing(sqlite3.connect(self.path, timeout=30)) as conn, conn:
+            yield conn
+
+    @staticmethod
+    def make_key(ee_object: Any, project: Optional[str] = None) -> str:
+        """
+        Build the cache key of an Earth Engine object.
+
+        Parameters
+        ----------
+        ee_object : ee.ComputedObject
+            Object whose expression graph identifies the request.
+        project : str, optional
+            Google Cloud project the request is billed to.
+
+        Returns
+        -------
+        str
+            Hex digest identifying the request.
+        """
+        if isinstance(ee_object, ee.ComputedObject):
+            graph = ee.serializer.toJSON(ee_object)
+        else:
+            graph = json.dumps(ee_object, sort_keys=True, default=str)
+        digest = hashlib.sha256()
+        digest.update((project or '').encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(graph.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look up a cached value.
+
+        Parameters
+        ----------
+        key : str
+            Key from ``make_key()``.
+
+        Returns
+        -------
+        tuple : (bool, Any)
+            (True, value) on a hit, (False, None) on a miss or expired entry.
+        """
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT value, created_at FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return False, None
+            value, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                self.misses += 1
+                return False, None
+            conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return True, json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a value and evict least recently used entries if the cache is full.
+
+        Parameters
+        ----------
+        key : str
+            Key from ``make_key()``.
+        value : Any
+            JSON-serializable result of ``getInfo()``.
+        """
+        payload = json.dumps(value)
+        size = len(payload.encode('utf-8'))
+        if self.max_bytes is not None and size > self.max_bytes:
+            logger.debug(f"Result of {size} bytes exceeds cache size limit, not cached")
+            return
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, size, now, now)
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Remove expired entries, then least recently used entries above max_bytes."""
+        if self.ttl is not None:
+            conn.execute("DELETE FROM results WHERE created_at < ?", (time.time() - self.ttl,))
+        if self.max_bytes is None:
+            return
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY accessed_at ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        logger.debug(f"Evicted {evicted} least recently used cache entries")
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM results")
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache usage information.
+
+        Returns
+        -------
+        dict
+            Number of entries, total size in bytes, hits and misses of this instance.
+        """
+        with self._lock, self._connect() as conn:
+            entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+            hits, misses = self.hits, self.misses
+        return {
+            'path': self.path,
+            'entries': entries,
+            'size_bytes': total,
+            'max_bytes': self.max_bytes,
+            'ttl': self.ttl,
+            'hits': hits,
+            'misses': misses
+        }
+
+
+def configure_cache(cache_dir: Optional[str] = None, ttl: Optional[float] = DEFAULT_TTL,
+                    max_bytes: Optional[int] = DEFAULT_MAX_BYTES, enabled: bool = True) -> Optional[ResultCache]:
+    """
+    Enable, reconfigure or disable the package-wide result cache.
+
+    Parameters
+    ----------
+    cache_dir : str, optional
+        Directory of the cache file. Defaults to ``EPISTEMX_CACHE_DIR`` or ~/.cache/epistemx.
+    ttl : float, optional
+        Time-to-live of an entry in seconds (default: 1 day). None disables expiry.
+    max_bytes : int, optional
+        Maximum cache size in bytes (default: 256 MB). None disables eviction.
+    enabled : bool, default True
+        If False, disable the cache.
+
+    Returns
+    -------
+    ResultCache or None
+        The active cache, or None when disabled.
+
+    Example
+    -------
+    >>> from epistemx.ee_cache import configure_cache
+    >>> configure_cache(ttl=6 * 3600)
+    """
+    global _cache, _cache_configured
+    with _cache_lock:
+        _cache_configured = True
+        if not enabled:
+            _cache = None
+            logger.info("Earth Engine result cache disabled")
+            return None
+        cache_dir = cache_dir or os.environ.get('EPISTEMX_CACHE_DIR') or DEFAULT_CACHE_DIR
+        _cache = ResultCache(os.path.join(cache_dir, 'ee_results.sqlite'), ttl=ttl, max_bytes=max_bytes)
+        logger.info(f"Earth Engine result cache enabled at {_cache.path}")
+        return _cache
+
+
+def get_cache() -> Optional[ResultCache]:
+    """
+    Get the package-wide result cache.
+
+    Returns
+    -------
+    ResultCache or None
+        The active cache, or None if caching is disabled.
+    """
+    global _cache, _cache_configured
+    if not _cache_configured:
+        with _cache_lock:
+            if not _cache_configured:
+                _cache_configured = True
+                cache_dir = os.environ.get('EPISTEMX_CACHE_DIR')
+                if cache_dir:
+                    _cache = ResultCache(os.path.join(cache_dir, 'ee_results.sqlite'))
+                    logger.info(f"Earth Engine result cache enabled at {_cache.path}")
+    return _cache
+
+
+def clear_cache() -> None:
+    """Remove every entry from the package-wide result cache, if enabled."""
+    cache = get_cache()
+    if cache is not None:
+        cache.clear()
@@ -5,34 +5,435 @@ Centralized Earth Engine authentication and initialization for the epistemx pack
 This module ensures Earth Engine is properly set up before any GEE operations.
 
 Supports both service account authentication and manual user authentication.
+
+Every successful initialization registers a named session (credentials + project)
+in a process-wide session pool. Registering several service accounts and/or
+projects spreads Earth Engine requests over their quotas, see ``SessionPool``.
 """
 
 import ee
+import atexit
+import base64
+import contextlib
+import functools
 import logging
 import os
 import json
-from typing import Optional, Dict, Any
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Iterator, List
 from pathlib import Path
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Global flag to track initialization status
-_ee_initialized = False
+# Re-entrant lock serializing initialization, so concurrent callers trigger a single ee.Initialize
+_init_lock = threading.RLock()
+
+# Memoized result of service account discovery and the temporary credential file of this process
+_NOT_RESOLVED = object()
+_service_account_file = _NOT_RESOLVED
+_temp_credential_file = None
+_credential_lock = threading.Lock()
+
+def _synchronized(func):
+    """Run the decorated function while holding the initialization lock."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _init_lock:
+            return func(*args, **kwargs)
+    return wrapper
+
+# Strategies used by the session pool to pick the session serving the next request
+DISPATCH_STRATEGIES = ('round_robin', 'least_loaded')
+DEFAULT_REQUESTS_PER_SWITCH = 20
+DEFAULT_THROTTLE_COOLDOWN = 30.0    # seconds
+
+
+@dataclass
+class EESession:
+    """
+    One Earth Engine identity: credentials plus the project requests are billed to.
+    
+    Attributes
+    ----------
+    name : str
+        Unique name of the session in the pool.
+    project : str, optional
+        Google Cloud project of the session. None uses the default project.
+    service_account_file : str, optional
+        Service account JSON key file. None uses the persistent user credentials.
+    service_account_email : str, optional
+        Client email of the service account.
+    """
+    name: str
+    project: Optional[str] = None
+    service_account_file: Optional[str] = None
+    service_account_email: Optional[str] = None
+    credentials: Any = field(default=None, repr=False)
+    in_flight: int = 0
+    waiting: int = 0
+    total_requests: int = 0
+    failed_requests: int = 0
+    busy_seconds: float = 0.0
+    throttled_until: float = 0.0
+    
+    def get_credentials(self) -> Any:
+        """Return the credentials of this session, None for the persistent user credentials."""
+        if self.credentials is None and self.service_account_file and self.service_account_email:
+            self.credentials = ee.ServiceAccountCredentials(
+                email=self.service_account_email,
+                key_file=self.service_account_file
+            )
+        return self.credentials
+    
+    def activate(self, previous: Optional['EESession'] = None) -> None:
+        """
+        Point the Earth Engine client at this session.
+        
+        Switching between sessions that share credentials only changes the project,
+        other switches call ``ee.Initialize`` again.
+        """
+        credentials = self.get_credentials()
+        if previous is not None and previous.get_credentials() is credentials and credentials is not None:
+            ee.data.setCloudApiUserProject(self.project)
+            return
+        if self.project:
+            ee.Initialize(credentials, project=self.project)
+        else:
+            ee.Initialize(credentials)
+
+
+class SessionPool:
+    """
+    Pool of named Earth Engine sessions sharing the request load.
+    
+    The Earth Engine client keeps its credentials and project in process-global
+    state, so only one session is active at a time. The active session serves
+    ``requests_per_switch`` requests, then the next request is dispatched with the
+    configured strategy. Switching holds back new requests until the in-flight
+    requests of the active session finish, then re-points the client.
+    
+    - ``'round_robin'``: cycle through the sessions, spreading request counts evenly.
+    - ``'least_loaded'``: pick the session with the least accumulated request time,
+      which follows Earth Engine compute quota use more closely than counts.
+    
+    A session that returned a quota error is skipped for ``throttle_cooldown``
+    seconds while other sessions are available, so retries go to another project.
+    
+    Example
+    -------
+    >>> from epistemx.ee_config import get_session_pool
+    >>> pool = get_session_pool()
+    >>> pool.strategy = 'least_loaded'
+    >>> with pool.acquire() as session:
+    ...     result = image.getInfo()
+    """
+    def __init__(self, strategy: str = 'round_robin',
+                 requests_per_switch: int = DEFAULT_REQUESTS_PER_SWITCH,
+                 throttle_cooldown: float = DEFAULT_THROTTLE_COOLDOWN):
+        self._sessions: Dict[str, EESession] = {}
+        self._active: Optional[EESession] = None
+        self._switch_target: Optional[EESession] = None
+        self._exclusive = False
+        self._in_flight = 0
+        self._served = 0
+        self._cond = threading.Condition(threading.Lock())
+        self.switches = 0
+        self.strategy = strategy
+        self.requests_per_switch = max(1, requests_per_switch)
+        self.throttle_cooldown = throttle_cooldown
+    
+    @property
+    def strategy(self) -> str:
+        return self._strategy
+    
+    @strategy.setter
+    def strategy(self, value: str) -> None:
+        if value not in DISPATCH_STRATEGIES:
+            raise ValueError(f"Unknown dispatch strategy '{value}'. Choose from {DISPATCH_STRATEGIES}")
+        self._strategy = value
+    
+    @property
+    def active(self) -> Optional[EESession]:
+        """Session the Earth Engine client currently points at."""
+        return self._active
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._sessions
+    
+    def sessions(self) -> List[EESession]:
+        """Return the registered sessions in registration order."""
+        with self._cond:
+            return list(self._sessions.values())
+    
+    def find(self, service_account_file: Optional[str] = None, project: Optional[str] = None) -> Optional[EESession]:
+        """Return a registered session using the given credentials file and project, if any."""
+        with self._cond:
+            for session in self._sessions.values():
+                if session.service_account_file == service_account_file and (project is None or session.project == project):
+                    return session
+        return None
+    
+    def register(self, session: EESession) -> EESession:
+        """
+        Add a session whose credentials were just passed to ``ee.Initialize``.
+        
+        The session becomes the active session. Registering a name twice replaces
+        the previous session but keeps its request counters.
+        """
+        with self._cond:
+            existing = self._sessions.get(session.name)
+            if existing is not None:
+                session.total_requests = existing.total_requests
+                session.failed_requests = existing.failed_requests
+                session.busy_seconds = existing.busy_seconds
+            self._sessions[session.name] = session
+            self._active = session
+            self._served = 0
+            self._cond.notify_all()
+        logger.info(f"Registered Earth Engine session '{session.name}' (project: {session.project}), "
+                    f"{len(self._sessions)} session(s) in pool")
+        return session
+    
+    def remove(self, name: str) -> None:
+        """Remove a session from the pool. Requests already dispatched to it complete normally."""
+        with self._cond:
+            session = self._sessions.pop(name)
+            if self._switch_target is session:
+                self._switch_target = None
+            self._cond.notify_all()
+    
+    def clear(self) -> None:
+        """Remove every session."""
+        with self._cond:
+            self._sessions.clear()
+            self._active = None
+            self._switch_target = None
+            self._served = 0
+            self._cond.notify_all()
+    
+    def _select(self) -> EESession:
+        # Join a pending switch instead of starting another one
+        if self._switch_target is not None:
+            return self._switch_target
+        now = time.monotonic()
+        active = self._active
+        if (active is not None and self._sessions.get(active.name) is active
+                and self._served < self.requests_per_switch and active.throttled_until <= now):
+            return active
+        sessions = list(self._sessions.values())
+        available = [session for session in sessions if session.throttled_until <= now] or sessions
+        if len(available) == 1:
+            return available[0]
+        if self._strategy == 'least_loaded':
+            return min(available, key=lambda s: (s.busy_seconds, s.total_requests))
+        # Round robin: the next available session after the active one
+        start = sessions.index(active) + 1 if active in sessions else 0
+        for offset in range(len(sessions)):
+            session = sessions[(start + offset) % len(sessions)]
+            if session in available:
+                return session
+        return available[0]
+    
+    def mark_throttled(self, session: EESession) -> None:
+        """Skip a session that returned a quota error for ``throttle_cooldown`` seconds."""
+        with self._cond:
+            session.throttled_until = time.monotonic() + self.throttle_cooldown
+        logger.debug(f"Earth Engine session '{session.name}' throttled for {self.throttle_cooldown}s")
+    
+    @contextlib.contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """
+        Hold back new requests and wait for in-flight requests to finish.
+        
+        Used around ``ee.Initialize`` calls made outside the pool, so running
+        requests are not switched to other credentials halfway.
+        """
+        with self._cond:
+            while self._exclusive:
+                self._cond.wait()
+            self._exclusive = True
+            while self._in_flight:
+                self._cond.wait()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._exclusive = False
+                self._cond.notify_all()
+    
+    @contextlib.contextmanager
+    def acquire(self) -> Iterator[Optional[EESession]]:
+        """
+        Dispatch one request to a session for the duration of the ``with`` block.
+        
+        Yields None without any bookkeeping when no session is registered, e.g. when
+        Earth Engine was initialized outside epistemx.
+        
+        Yields
+        ------
+        EESession or None
+            The session serving the request.
+        """
+        with self._cond:
+            if not self._sessions:
+                session = None
+            else:
+                session = self._select()
+                session.waiting += 1
+                try:
+                    while True:
+                        if not self._exclusive and self._switch_target in (None, session):
+                            if self._active is session:
+                                break
+                            if not self._in_flight:
+                                logger.debug(f"Switching Earth Engine session to '{session.name}'")
+                                session.activate(self._active)
+                                self._active = session
+                                self._served = 0
+                                self.switches += 1
+                                break
+                            # Hold back requests of other sessions until the active one drains
+                            self._switch_target = session
+                        self._cond.wait()
+                finally:
+                    session.waiting -= 1
+                    if self._switch_target is session:
+                        self._switch_target = None
+                    self._cond.notify_all()
+                session.in_flight += 1
+                session.total_requests += 1
+                self._in_flight += 1
+                self._served += 1
+        if session is None:
+            yield None
+            return
+        start = time.monotonic()
+        failed = False
+        try:
+            yield session
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            with self._cond:
+                session.in_flight -= 1
+                self._in_flight -= 1
+                session.busy_seconds += time.monotonic() - start
+                if failed:
+                    session.failed_requests += 1
+                self._cond.notify_all()
+    
+    def status(self) -> List[Dict[str, Any]]:
+        """
+        Get per-session utilization.
+        
+        Returns
+        -------
+        list of dict
+            Name, project, active flag, in-flight, waiting, total and failed requests,
+            busy time and share of all requests of every session.
+        """
+        with self._cond:
+            total = sum(session.total_requests for session in self._sessions.values())
+            return [
+                {
+                    'name': session.name,
+                    'project': session.project,
+                    'service_account': session.service_account_email,
+                    'active': session is self._active,
+                    'throttled': session.throttled_until > time.monotonic(),
+                    'in_flight': session.in_flight,
+                    'waiting': session.waiting,
+                    'total_requests': session.total_requests,
+                    'failed_requests': session.failed_requests,
+                    'busy_seconds': round(session.busy_seconds, 3),
+                    'share': session.total_requests / total if total else 0.0
+                }
+                for session in self._sessions.values()
+            ]
+
 
+# Process-wide session pool, empty until Earth Engine is initialized
+_session_pool = SessionPool()
+
+def get_session_pool() -> SessionPool:
+    """
+    Get the process-wide Earth Engine session pool.
+    
+    Returns
+    -------
+    SessionPool
+        Pool holding every session registered by the initialization functions.
+    """
+    return _session_pool
+
+def set_dispatch_strategy(strategy: str, requests_per_switch: Optional[int] = None) -> None:
+    """
+    Set how requests are dispatched over the registered sessions.
+    
+    Parameters
+    ----------
+    strategy : str
+        'round_robin' or 'least_loaded'.
+    requests_per_switch : int, optional
+        Requests served by the active session before the next one is picked.
+        
+    Example
+    -------
+    >>> from epistemx.ee_config import setup_earth_engine, set_dispatch_strategy
+    >>> setup_earth_engine(service_account_file='auth/project-a.json')
+    >>> setup_earth_engine(service_account_file='auth/project-b.json')
+    >>> set_dispatch_strategy('least_loaded')
+    """
+    _session_pool.strategy = strategy
+    if requests_per_switch is not None:
+        _session_pool.requests_per_switch = max(1, requests_per_switch)
+
+def _register_session(
+    session_name: Optional[str],
+    project: Optional[str],
+    service_account_file: Optional[str] = None,
+    service_account_email: Optional[str] = None,
+    credentials: Any = None
+) -> EESession:
+    """Register the session that was just initialized in the session pool."""
+    name = session_name or project or service_account_email or 'default'
+    return _session_pool.register(EESession(
+        name=name,
+        project=project,
+        service_account_file=service_account_file,
+        service_account_email=service_account_email,
+        credentials=credentials
+    ))
+
+@_synchronized
 def initialize_with_service_account(
     service_account_file: str, 
-    project: Optional[str] = None
+    project: Optional[str] = None,
+    session_name: Optional[str] = None
 ) -> bool:
     """
     Initialize Earth Engine using a service account.
     
+    The service account is registered as a session in the session pool. Calling
+    this function again with other credentials or projects adds sessions that
+    requests are dispatched over.
+    
     Parameters
     ----------
     service_account_file : str
         Path to the service account JSON key file.
     project : str, optional
         GEE project ID. If None, uses project from service account.
+    session_name : str, optional
+        Name of the session in the pool. Defaults to the project ID.
         
     Returns
     -------
@@ -43,9 +444,9 @@ def initialize_with_service_account(
     -------
     >>> from epistemx.ee_config import initialize_with_service_account
     >>> initialize_with_service_account('path/to/service-account.json')
+    >>> # Add a second project to spread requests over both quotas
+    >>> initialize_with_service_account('path/to/other-account.json', project='other-project')
     """
-    global _ee_initialized
-    
     # Initialize service_account_info variable
     service_account_info = None
     
@@ -78,13 +479,14 @@ def initialize_with_service_account(
         # Set the environment variable for Google Application Credentials
         os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = service_account_file
         
-        # Initialize Earth Engine with the project
-        if project:
-            ee.Initialize(project=project)
-        else:
-            ee.Initialize()
+        # Initialize Earth Engine with the project, once in-flight requests of other sessions are done
+        with _session_pool.exclusive():
+            if project:
+                ee.Initialize(project=project)
+            else:
+                ee.Initialize()
         
-        _ee_initialized = True
+            _register_session(session_name, project, service_account_file, service_account_info.get('client_email'))
         logger.info(f"Earth Engine initialized successfully with service account for project: {project}")
         return True
         
@@ -99,12 +501,14 @@ def initialize_with_service_account(
                     key_file=service_account_file
                 )
                 
-                if project:
-                    ee.Initialize(credentials, project=project)
-                else:
-                    ee.Initialize(credentials)
-                
-                _ee_initialized = True
+                with _session_pool.exclusive():
+                    if project:
+                        ee.Initialize(credentials, project=project)
+                    else:
+                        ee.Initialize(credentials)
+                    
+                    _register_session(session_name, project, service_account_file,
+                                      service_account_info['client_email'], credentials)
                 logger.info(f"Earth Engine initialized with alternative method for project: {project}")
                 return True
                 
@@ -115,6 +519,7 @@ def initialize_with_service_account(
             logger.error("Cannot try alternative method - service account info not available")
             return False
 
+@_synchronized
 def authenticate_manually(project: Optional[str] = None) -> bool:
     """
     Perform manual Earth Engine authentication.
@@ -136,18 +541,17 @@ def authenticate_manually(project: Optional[str] = None) -> bool:
     >>> from epistemx.ee_config import authenticate_manually
     >>> authenticate_manually()
     """
-    global _ee_initialized
-    
     try:
         logger.info("Starting manual Earth Engine authentication...")
         ee.Authenticate()
         
-        if project:
-            ee.Initialize(project=project)
-        else:
-            ee.Initialize()
-        
-        _ee_initialized = True
+        with _session_pool.exclusive():
+            if project:
+                ee.Initialize(project=project)
+            else:
+                ee.Initialize()
+            
+            _register_session(None, project)
         logger.info("Earth Engine authenticated and initialized successfully")
         return True
         
@@ -178,7 +582,8 @@ def _print_manual_auth_instructions() -> None:
 def initialize_earth_engine(
     project: Optional[str] = None, 
     service_account_file: Optional[str] = None,
-    force_reinit: bool = False
+    force_reinit: bool = False,
+    session_name: Optional[str] = None
 ) -> bool:
     """
     Initialize Google Earth Engine with authentication.
@@ -191,6 +596,8 @@ def initialize_earth_engine(
         Path to service account JSON file. If provided, uses service account auth.
     force_reinit : bool, default False
         Force re-initialization even if already initialized.
+    session_name : str, optional
+        Name of the session registered in the session pool.
         
     Returns
     -------
@@ -205,24 +612,47 @@ def initialize_earth_engine(
     >>> # Service account authentication
     >>> initialize_earth_engine(service_account_file='service-account.json')
     """
-    global _ee_initialized
-    
-    if _ee_initialized and not force_reinit:
-        logger.debug("Earth Engine already initialized")
+    # Fast path without locking once Earth Engine is initialized
+    if not force_reinit and _is_registered(project, service_account_file):
         return True
     
+    with _init_lock:
+        # Another thread may have completed initialization while this one was waiting
+        if not force_reinit and _is_registered(project, service_account_file):
+            logger.debug("Earth Engine already initialized")
+            return True
+        return _initialize_earth_engine(project=project, service_account_file=service_account_file,
+                                        session_name=session_name)
+
+def _is_registered(project: Optional[str], service_account_file: Optional[str]) -> bool:
+    """
+    Check whether initialization can be skipped: a session with these credentials
+    and project exists. Without credentials or project, any session will do; a
+    new project registers one more session.
+    """
+    if not service_account_file and not project:
+        return len(_session_pool) > 0
+    return _session_pool.find(service_account_file, project) is not None
+
+def _initialize_earth_engine(
+    project: Optional[str] = None, 
+    service_account_file: Optional[str] = None,
+    session_name: Optional[str] = None
+) -> bool:
+    """Initialize Earth Engine. Must be called while holding the initialization lock."""
     # Use service account if provided
     if service_account_file:
-        return initialize_with_service_account(service_account_file, project)
+        return initialize_with_service_account(service_account_file, project, session_name)
     
     try:
         # Try to initialize without authentication first (for already authenticated users)
-        if project:
-            ee.Initialize(project=project)
-        else:
-            ee.Initialize()
-        
-        _ee_initialized = True
+        with _session_pool.exclusive():
+            if project:
+                ee.Initialize(project=project)
+            else:
+                ee.Initialize()
+            
+            _register_session(session_name, project)
         logger.info("Earth Engine initialized successfully")
         return True
         
@@ -275,7 +705,22 @@ def is_ee_initialized() -> bool:
     bool
         True if Earth Engine is initialized, False otherwise.
     """
-    return _ee_initialized
+    return len(_session_pool) > 0
+
+def get_active_project() -> Optional[str]:
+    """
+    Get the Google Cloud project used by the current Earth Engine session.
+    
+    Returns
+    -------
+    str or None
+        Project of the active session, or the project resolved by the
+        Earth Engine client. None if no project is known.
+    """
+    session = _session_pool.active
+    if session is not None and session.project:
+        return session.project
+    return getattr(ee.data, '_cloud_api_user_project', None)
 
 def get_auth_status() -> Dict[str, Any]:
     """
@@ -284,16 +729,21 @@ def get_auth_status() -> Dict[str, Any]:
     Returns
     -------
     dict
-        Dictionary containing authentication status details.
+        Dictionary containing authentication status details, including the
+        utilization of every session in the session pool under 'sessions'.
     """
+    initialized = is_ee_initialized()
     status = {
-        'initialized': _ee_initialized,
+        'initialized': initialized,
         'authenticated': False,
         'project': None,
-        'user_info': None
+        'user_info': None,
+        'dispatch_strategy': _session_pool.strategy,
+        'session_switches': _session_pool.switches,
+        'sessions': _session_pool.status()
     }
     
-    if _ee_initialized:
+    if initialized:
         try:
             # Try a simple operation to verify authentication
             ee.Number(1).getInfo()
@@ -318,22 +768,26 @@ def print_auth_instructions() -> None:
     """
     _print_manual_auth_instructions()
 
+@_synchronized
 def reset_ee_initialization() -> None:
     """
-    Reset the initialization flag. Useful for testing or troubleshooting.
+    Remove every session from the session pool. Useful for testing or troubleshooting.
     """
-    global _ee_initialized
-    _ee_initialized = False
-    logger.debug("Earth Engine initialization flag reset")
+    _session_pool.clear()
+    logger.debug("Earth Engine sessions reset")
 
 def setup_earth_engine(
     project: Optional[str] = None,
     service_account_file: Optional[str] = None,
-    auto_authenticate: bool = False
+    auto_authenticate: bool = False,
+    session_name: Optional[str] = None
 ) -> bool:
     """
     Comprehensive Earth Engine setup function.
     
+    Each call with a new service account file or project registers one more
+    session in the session pool.
+    
     Parameters
     ----------
     project : str, optional
@@ -342,6 +796,8 @@ def setup_earth_engine(
         Path to service account JSON file.
     auto_authenticate : bool, default False
         If True, attempt manual authentication if needed.
+    session_name : str, optional
+        Name of the session in the pool. Defaults to the project ID.
         
     Returns
     -------
@@ -355,9 +811,12 @@ def setup_earth_engine(
     >>> setup_earth_engine()
     >>> # Setup with service account
     >>> setup_earth_engine(service_account_file='service-account.json')
+    >>> # Register a second project as another session
+    >>> setup_earth_engine(service_account_file='other-account.json', session_name='secondary')
     """
     # First try normal initialization
-    if initialize_earth_engine(project=project, service_account_file=service_account_file):
+    if initialize_earth_engine(project=project, service_account_file=service_account_file,
+                               session_name=session_name):
         return True
     
     # If that fails and auto_authenticate is True, try manual auth
@@ -365,4 +824,121 @@ def setup_earth_engine(
         logger.info("Attempting manual authentication...")
         return authenticate_manually(project=project)
     
-    return False
\ No newline at end of file
+    return False
+
+def _write_temp_credentials(service_account_info: Dict[str, Any]) -> str:
+    """
+    Write service account credentials to the temporary file of this process.
+    The file is created once, readable only by the current user, and removed at exit.
+    """
+    global _temp_credential_file
+    if _temp_credential_file is None:
+        fd, path = tempfile.mkstemp(prefix='epistemx-service-account-', suffix='.json')
+        os.close(fd)
+        _temp_credential_file = path
+        atexit.register(_remove_temp_credentials)
+    with open(_temp_credential_file, 'w') as f:
+        json.dump(service_account_info, f, indent=2)
+    return _temp_credential_file
+
+def _remove_temp_credentials() -> None:
+    """Remove the temporary credential file of this process, if any."""
+    global _temp_credential_file
+    if _temp_credential_file and os.path.exists(_temp_credential_file):
+        try:
+            os.remove(_temp_credential_file)
+        except OSError as e:
+            logger.debug("Could not remove temporary credential file %s: %s", _temp_credential_file, e)
+    _temp_credential_file = None
+
+def _find_json_in_directory(directory: str) -> Optional[str]:
+    """Return the first JSON file found in a directory, or None."""
+    logger.debug("Checking auth directory: %s", directory)
+    if not os.path.isdir(directory):
+        logger.debug("Auth directory does not exist: %s", directory)
+        return None
+    for file in sorted(os.listdir(directory)):
+        if file.endswith('.json'):
+            auth_file = os.path.join(directory, file)
+            if os.path.exists(auth_file):
+                logger.debug("Using auth file: %s", auth_file)
+                return auth_file
+    return None
+
+def _discover_service_account_file() -> Optional[str]:
+    """Look for service account credentials in the environment and in common locations."""
+    logger.debug("GOOGLE_SERVICE_ACCOUNT_JSON_B64 set: %s", bool(os.environ.get('GOOGLE_SERVICE_ACCOUNT_JSON_B64')))
+    logger.debug("GOOGLE_SERVICE_ACCOUNT_JSON set: %s", bool(os.environ.get('GOOGLE_SERVICE_ACCOUNT_JSON')))
+    logger.debug("GOOGLE_APPLICATION_CREDENTIALS: %s", os.environ.get('GOOGLE_APPLICATION_CREDENTIALS'))
+    
+    # Check for Base64 encoded service account JSON first (most robust)
+    service_account_b64 = os.environ.get('GOOGLE_SERVICE_ACCOUNT_JSON_B64')
+    if service_account_b64:
+        try:
+            raw_json = base64.b64decode(service_account_b64).decode('utf-8')
+            path = _write_temp_credentials(json.loads(raw_json))
+            logger.debug("Created temporary service account file from Base64: %s", path)
+            return path
+        except Exception as e:
+            logger.warning(f"Failed to decode GOOGLE_SERVICE_ACCOUNT_JSON_B64: {e}")
+    
+    # Check if service account JSON is provided as environment variable content
+    service_account_json = os.environ.get('GOOGLE_SERVICE_ACCOUNT_JSON')
+    if service_account_json:
+        try:
+            path = _write_temp_credentials(json.loads(service_account_json))
+            logger.debug("Created temporary service account file: %s", path)
+            return path
+        except json.JSONDecodeError as e:
+            logger.warning(f"GOOGLE_SERVICE_ACCOUNT_JSON is not valid JSON: {e}")
+            logger.debug("This usually means the JSON contains unescaped newlines in the private_key field. "
+                         "Use GOOGLE_SERVICE_ACCOUNT_JSON_B64 instead for robust handling")
+    
+    # Check environment variable for file path
+    env_file = os.environ.get('GOOGLE_APPLICATION_CREDENTIALS')
+    if env_file and os.path.exists(env_file):
+        logger.debug("Using GOOGLE_APPLICATION_CREDENTIALS: %s", env_file)
+        return env_file
+    
+    # Check the project auth/ directory, the relative auth/ directory and the Docker container path
+    project_root = Path(__file__).resolve().parents[2]  # Go up from src/epistemx to project root
+    for directory in (str(project_root / 'auth'), 'auth', '/home/user/app/auth'):
+        auth_file = _find_json_in_directory(directory)
+        if auth_file:
+            return auth_file
+    
+    # Check common file names in current directory
+    common_names = [
+        'service-account.json',
+        'gee-service-account.json',
+        'earth-engine-service-account.json',
+        'credentials.json'
+    ]
+    for name in common_names:
+        if os.path.exists(name):
+            return name
+    
+    return None
+
+def find_service_account_file(refresh: bool = False) -> Optional[str]:
+    """
+    Locate service account credentials, scanning the environment and auth directories once per process.
+    
+    Credentials provided through GOOGLE_SERVICE_ACCOUNT_JSON_B64 or GOOGLE_SERVICE_ACCOUNT_JSON
+    are written to a single temporary file that is removed when the process exits.
+    
+    Parameters
+    ----------
+    refresh : bool, default False
+        Discard the memoized result and scan again.
+        
+    Returns
+    -------
+    str or None
+        Path to the service account JSON file, or None if not found.
+    """
+    global _service_account_file
+    with _credential_lock:
+        if refresh or _service_account_file is _NOT_RESOLVED:
+            _service_account_file = _discover_service_account_file()
+        return _service_account_file
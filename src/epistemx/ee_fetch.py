@@ -0,0 +1,207 @@
+"""
+Earth Engine Fetch Module
+
+Centralized client-side retrieval of Earth Engine results for the epistemx package.
+Every blocking ``getInfo()`` round trip made by epistemx goes through this module.
+
+The ``DeferredFetch`` helper lets callers register several server-side values under
+string keys and resolve all of them in a single ``ee.Dictionary(...).getInfo()``
+round trip, instead of calling ``getInfo()`` once per value.
+
+When the result cache is enabled (see ``ee_cache``), identical requests are answered
+from disk. Pass ``use_cache=False`` to force a fresh request. Requests that do reach
+Earth Engine are rate limited and retried on quota errors (see ``ee_throttle``).
+When instrumentation is enabled (see ``ee_instrument``), every call is recorded
+with its call site, wall time and payload sizes. When the graph guard is enabled
+(see ``ee_graph``), requests are measured before they are sent, and a
+``DeferredFetch`` over the size limit is split into several requests.
+"""
+
+import ee
+import logging
+from typing import Any, Dict, Optional, Tuple
+from .ee_cache import get_cache
+from .ee_config import get_active_project, get_session_pool
+from .ee_graph import check_graph_size, get_graph_limit, graph_size, is_graph_guard_enabled, split_batches
+from .ee_instrument import observe
+from .ee_throttle import ee_call
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def get_info(ee_object: Any, use_cache: bool = True) -> Any:
+    """
+    Retrieve the value of a single Earth Engine object (one round trip).
+
+    Parameters
+    ----------
+    ee_object : ee.ComputedObject
+        Any Earth Engine object (ee.Number, ee.List, ee.FeatureCollection, ...).
+    use_cache : bool, default True
+        Look up and store the result in the result cache, if it is enabled.
+
+    Returns
+    -------
+    Any
+        Client-side (Python) representation of the object.
+
+    Example
+    -------
+    >>> from epistemx.ee_fetch import get_info
+    >>> n_images = get_info(collection.size())
+    """
+    with observe(ee_object) as observation:
+        value, cached = _get_info(ee_object, use_cache)
+        if observation is not None:
+            observation.value = value
+            observation.cached = cached
+            session = get_session_pool().active
+            observation.session = session.name if session is not None else get_active_project()
+    return value
+
+
+def _get_info(ee_object: Any, use_cache: bool) -> Tuple[Any, bool]:
+    """Return (value, cached) for an Earth Engine object, using the result cache if enabled."""
+    if is_graph_guard_enabled():
+        check_graph_size(ee_object)
+    cache = get_cache() if use_cache else None
+    if cache is None:
+        return ee_call(ee_object.getInfo), False
+    key = cache.make_key(ee_object, get_active_project())
+    hit, value = cache.get(key)
+    if hit:
+        logger.debug(f"Result cache hit: {key[:12]}")
+        return value, True
+    value = ee_call(ee_object.getInfo)
+    cache.set(key, value)
+    return value, False
+
+
+class DeferredFetch:
+    """
+    Collect several Earth Engine values and retrieve them in one round trip.
+
+    Values are registered under string keys with ``add()``. Nothing is sent to
+    Earth Engine until ``resolve()`` is called, which wraps all registered values
+    in a single ``ee.Dictionary`` and calls ``getInfo()`` once.
+
+    Example
+    -------
+    >>> from epistemx.ee_fetch import DeferredFetch
+    >>> fetch = DeferredFetch()
+    >>> fetch.add('accuracy', confusion_matrix.accuracy())
+    >>> fetch.add('kappa', confusion_matrix.kappa())
+    >>> results = fetch.resolve()
+    >>> results['kappa']
+    """
+    def __init__(self, values: Optional[Dict[str, Any]] = None, use_cache: bool = True):
+        """
+        Initialize the deferred fetch.
+
+        Parameters
+        ----------
+        values : dict, optional
+            Initial mapping of key to Earth Engine object.
+        use_cache : bool, default True
+            Look up and store the combined result in the result cache, if it is enabled.
+        """
+        self.use_cache = use_cache
+        self._values: Dict[str, Any] = {}
+        self._results: Optional[Dict[str, Any]] = None
+        if values:
+            for key, value in values.items():
+                self.add(key, value)
+
+    def add(self, key: str, value: Any) -> 'DeferredFetch':
+        """
+        Register a server-side value to be retrieved on ``resolve()``.
+
+        Parameters
+        ----------
+        key : str
+            Name under which the result is returned.
+        value : ee.ComputedObject or JSON-compatible value
+            Value to retrieve.
+
+        Returns
+        -------
+        DeferredFetch
+            The same instance, so calls can be chained.
+        """
+        if not isinstance(key, str):
+            raise TypeError(f"DeferredFetch keys must be strings, got {type(key).__name__}")
+        if self._results is not None:
+            raise RuntimeError("Cannot add values to a DeferredFetch that has already been resolved")
+        if key in self._values:
+            raise KeyError(f"Key '{key}' is already registered in this DeferredFetch")
+        self._values[key] = value
+        return self
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.add(key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._values
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def keys(self):
+        """Return the registered keys."""
+        return list(self._values.keys())
+
+    def resolve(self) -> Dict[str, Any]:
+        """
+        Retrieve all registered values in a single round trip.
+
+        The result is memoized, calling ``resolve()`` again does not contact
+        Earth Engine.
+
+        Returns
+        -------
+        dict
+            Mapping of key to client-side value.
+        """
+        if self._results is None:
+            if not self._values:
+                self._results = {}
+            else:
+                combined = ee.Dictionary(self._values)
+                limit = get_graph_limit()
+                if limit is not None and len(self._values) > 1 and graph_size(combined) > limit:
+                    # Over the graph size limit: fetch in several smaller requests
+                    batches = split_batches(self._values, limit)
+                    logger.info(f"Resolving {len(self._values)} deferred values in {len(batches)} requests "
+                                f"to stay under the graph size limit")
+                    self._results = {}
+                    for batch in batches:
+                        self._results.update(get_info(ee.Dictionary(batch), use_cache=self.use_cache))
+                else:
+                    logger.debug(f"Resolving {len(self._values)} deferred values in one request: {self.keys()}")
+                    self._results = get_info(combined, use_cache=self.use_cache)
+        return self._results
+
+
+def fetch_all(values: Dict[str, Any], use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Retrieve several Earth Engine values in one round trip.
+
+    Parameters
+    ----------
+    values : dict
+        Mapping of string key to Earth Engine object.
+    use_cache : bool, default True
+        Look up and store the result in the result cache, if it is enabled.
+
+    Returns
+    -------
+    dict
+        Mapping of key to client-side value.
+
+    Example
+    -------
+    >>> from epistemx.ee_fetch import fetch_all
+    >>> info = fetch_all({'bands': image.bandNames(), 'size': fc.size()})
+    """
+    return DeferredFetch(values, use_cache=use_cache).resolve()
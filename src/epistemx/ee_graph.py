@@ -0,0 +1,357 @@
+"""
+Earth Engine Expression Graph Module
+
+Measure the serialized size of Earth Engine expression graphs built by epistemx and
+guard against requests that are too large to upload and plan quickly.
+
+Every Earth Engine object is sent to the server as a serialized expression graph.
+Chaining many operations (e.g. several ``cumulativeCost`` distance images, or
+client-side loops that unroll one sub-graph per class) makes that graph grow until
+requests become slow or are rejected (the request payload limit is 10 MB).
+
+This module provides
+
+- ``graph_size()`` / ``graph_stats()``: serialized size and number of nodes
+- ``check_graph_size()``: warn over a threshold, raise ``GraphSizeError`` over a limit
+- the request guard: when enabled with ``configure_graph_guard()`` (or the
+  ``EPISTEMX_GRAPH_WARN_BYTES`` environment variable), every ``get_info()`` request
+  is checked before it is sent, and ``DeferredFetch`` splits a combined request
+  that is over the limit into several smaller ones
+- remedies: ``materialize()`` exports an intermediate result to an Earth Engine
+  asset and returns the asset, so later requests reference it by id instead of
+  carrying its whole graph (``start_export()`` only starts the export task and
+  ``asset_exists()`` checks for the asset); ``split_batches()`` splits a mapping
+  of values into groups under a size limit
+
+Example
+-------
+>>> from epistemx.ee_graph import graph_stats, materialize
+>>> graph_stats(distance_metric_stack(aoi))
+{'bytes': 48213, 'nodes': 212}
+>>> distances = materialize(distance_metric_stack(aoi), 'projects/my-project/assets/distance',
+...                         region=aoi, scale=30)
+"""
+
+import ee
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+from .ee_throttle import ee_call
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_WARN_BYTES = 1024 * 1024        # 1 MB
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024    # 10 MB, Earth Engine request payload limit
+DEFAULT_POLL_INTERVAL = 10.0            # seconds between export task status checks
+
+# Request guard, disabled unless configured or EPISTEMX_GRAPH_WARN_BYTES is set
+_guard_enabled = bool(os.environ.get('EPISTEMX_GRAPH_WARN_BYTES'))
+_warn_bytes = int(os.environ.get('EPISTEMX_GRAPH_WARN_BYTES') or DEFAULT_WARN_BYTES)
+_max_bytes: Optional[int] = DEFAULT_MAX_BYTES
+
+
+class GraphSizeError(ValueError):
+    """Raised when a serialized expression graph is over the configured limit."""
+    def __init__(self, message: str, size: int):
+        super().__init__(message)
+        self.size = size
+
+
+def _serialize(ee_object: Any) -> str:
+    if isinstance(ee_object, ee.ComputedObject):
+        return ee.serializer.toJSON(ee_object)
+    return json.dumps(ee_object, default=str)
+
+
+def graph_size(ee_object: Any) -> int:
+    """
+    Size in bytes of the serialized expression graph of an Earth Engine object.
+
+    Parameters
+    ----------
+    ee_object : ee.ComputedObject or JSON-compatible value
+        Object to measure.
+
+    Returns
+    -------
+    int
+        Size of the compact JSON serialization, in bytes.
+    """
+    return len(_serialize(ee_object).encode('utf-8'))
+
+
+def graph_stats(ee_object: Any) -> Dict[str, int]:
+    """
+    Size and number of function call nodes of a serialized expression graph.
+
+    Parameters
+    ----------
+    ee_object : ee.ComputedObject
+        Object to measure.
+
+    Returns
+    -------
+    dict
+        'bytes': serialized size, 'nodes': number of function invocations.
+    """
+    serialized = _serialize(ee_object)
+    return {
+        'bytes': len(serialized.encode('utf-8')),
+        'nodes': serialized.count('"functionInvocationValue"')
+    }
+
+
+def check_graph_size(ee_object: Any, warn_bytes: Optional[int] = None, max_bytes: Optional[int] = None,
+                     label: Optional[str] = None) -> int:
+    """
+    Measure a graph, log a warning over ``warn_bytes`` and raise over ``max_bytes``.
+
+    Parameters
+    ----------
+    ee_object : ee.ComputedObject
+        Object about to be sent to Earth Engine.
+    warn_bytes : int, optional
+        Warning threshold. Defaults to the guard setting (1 MB).
+    max_bytes : int, optional
+        Hard limit. Defaults to the guard setting (10 MB).
+    label : str, optional
+        Name of the object used in messages.
+
+    Returns
+    -------
+    int
+        Serialized size in bytes.
+
+    Raises
+    ------
+    GraphSizeError
+        If the graph is larger than ``max_bytes``.
+    """
+    warn_bytes = _warn_bytes if warn_bytes is None else warn_bytes
+    max_bytes = _max_bytes if max_bytes is None else max_bytes
+    size = graph_size(ee_object)
+    name = label or type(ee_object).__name__
+    if max_bytes is not None and size > max_bytes:
+        raise GraphSizeError(
+            f"Expression graph of {name} is {size / 1024:.0f} KB, over the {max_bytes / 1024:.0f} KB limit. "
+            f"Materialize intermediate results with ee_graph.materialize() or split the request.", size)
+    if warn_bytes is not None and size > warn_bytes:
+        logger.warning(f"Expression graph of {name} is {size / 1024:.0f} KB (warning threshold "
+                       f"{warn_bytes / 1024:.0f} KB); consider materializing intermediate results")
+    return size
+
+
+def configure_graph_guard(warn_bytes: Optional[int] = DEFAULT_WARN_BYTES,
+                          max_bytes: Optional[int] = DEFAULT_MAX_BYTES, enabled: bool = True) -> None:
+    """
+    Enable, reconfigure or disable the size check of every ``get_info()`` request.
+
+    Parameters
+    ----------
+    warn_bytes : int, optional, default 1 MB
+        Log a warning for graphs larger than this. None disables warnings.
+    max_bytes : int, optional, default 10 MB
+        Raise ``GraphSizeError`` for graphs larger than this, before sending them.
+        ``DeferredFetch`` splits combined requests to stay under it. None disables the limit.
+    enabled : bool, default True
+        If False, requests are not measured.
+
+    Example
+    -------
+    >>> from epistemx.ee_graph import configure_graph_guard
+    >>> configure_graph_guard(warn_bytes=256 * 1024)
+    """
+    global _guard_enabled, _warn_bytes, _max_bytes
+    _guard_enabled = enabled
+    _warn_bytes = warn_bytes
+    _max_bytes = max_bytes
+    if enabled:
+        logger.info(f"Expression graph guard enabled: warn over {warn_bytes} bytes, limit {max_bytes} bytes")
+    else:
+        logger.info("Expression graph guard disabled")
+
+
+def is_graph_guard_enabled() -> bool:
+    """Return True if requests are measured before they are sent."""
+    return _guard_enabled
+
+
+def get_graph_limit() -> Optional[int]:
+    """Return the hard limit of the request guard in bytes, or None if there is none."""
+    return _max_bytes if _guard_enabled else None
+
+
+def split_batches(values: Dict[str, Any], max_bytes: int) -> List[Dict[str, Any]]:
+    """
+    Split a mapping of Earth Engine values into groups whose combined graph stays under a size.
+
+    Values are packed in order, measuring the combined ``ee.Dictionary`` of the group
+    as it grows (shared sub-graphs are serialized once). A single value over the
+    limit is put in a group of its own.
+
+    Parameters
+    ----------
+    values : dict
+        Mapping of key to Earth Engine object, e.g. the values of a DeferredFetch.
+    max_bytes : int
+        Target maximum serialized size of one group.
+
+    Returns
+    -------
+    list of dict
+        Groups covering every key exactly once.
+    """
+    batches: List[Dict[str, Any]] = []
+    current: Dict[str, Any] = {}
+    for key, value in values.items():
+        candidate = dict(current, **{key: value})
+        if current and graph_size(ee.Dictionary(candidate)) > max_bytes:
+            batches.append(current)
+            candidate = {key: value}
+        current = candidate
+    if current:
+        batches.append(current)
+    return batches
+
+
+def asset_exists(asset_id: str) -> bool:
+    """True if the asset exists, looked up through the request limiter."""
+    try:
+        return ee_call(ee.data.getAsset, asset_id) is not None
+    except ee.EEException:
+        return False
+
+
+def wait_for_task(task: Any, poll_interval: float = DEFAULT_POLL_INTERVAL, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Block until an Earth Engine task finishes.
+
+    Parameters
+    ----------
+    task : ee.batch.Task
+        Started task.
+    poll_interval : float, default 10
+        Seconds between status checks.
+    timeout : float, optional
+        Maximum seconds to wait. None waits indefinitely.
+
+    Returns
+    -------
+    dict
+        Final task status.
+
+    Raises
+    ------
+    RuntimeError
+        If the task failed, was cancelled or is in an unknown state (e.g. 'UNKNOWN').
+    TimeoutError
+        If the task did not finish within ``timeout``.
+    """
+    started = time.monotonic()
+    while True:
+        status = ee_call(task.status)
+        state = status.get('state')
+        if state == 'COMPLETED':
+            return status
+        if state in ('FAILED', 'CANCELLED', 'CANCEL_REQUESTED'):
+            raise RuntimeError(f"Task {status.get('description', task.id)} {state.lower()}: "
+                               f"{status.get('error_message', '')}")
+        if state not in ('READY', 'RUNNING'):
+            # 'UNKNOWN' (task id not found) or any other state would never reach COMPLETED
+            raise RuntimeError(f"Task {status.get('description', task.id)} is in state {state}")
+        if timeout is not None and time.monotonic() - started > timeout:
+            raise TimeoutError(f"Task {status.get('description', task.id)} still {state} after {timeout:.0f}s")
+        time.sleep(poll_interval)
+
+
+def start_export(ee_object: Any, asset_id: str, region: Any = None, scale: Optional[float] = 30,
+                 max_pixels: float = 1e13) -> Any:
+    """
+    Start exporting an image or feature collection to an asset.
+
+    Parameters
+    ----------
+    ee_object : ee.Image or ee.FeatureCollection
+        Object to export.
+    asset_id : str
+        Destination asset id.
+    region : ee.Geometry, optional
+        Export region of an image. Defaults to the image footprint.
+    scale : float, default 30
+        Export scale of an image in meters.
+    max_pixels : float, default 1e13
+        maxPixels of an image export.
+
+    Returns
+    -------
+    ee.batch.Task
+        The started task.
+    """
+    description = asset_id.rstrip('/').split('/')[-1][:100]
+    if isinstance(ee_object, ee.Image):
+        params = {'image': ee_object, 'description': description, 'assetId': asset_id, 'maxPixels': max_pixels}
+        if region is not None:
+            params['region'] = region
+        if scale is not None:
+            params['scale'] = scale
+        task = ee.batch.Export.image.toAsset(**params)
+    else:
+        task = ee.batch.Export.table.toAsset(collection=ee_object, description=description, assetId=asset_id)
+    ee_call(task.start)
+    return task
+
+
+def materialize(ee_object: Any, asset_id: str, region: Any = None, scale: Optional[float] = 30,
+                overwrite: bool = False, wait: bool = True, poll_interval: float = DEFAULT_POLL_INTERVAL,
+                timeout: Optional[float] = None, max_pixels: float = 1e13) -> Any:
+    """
+    Export an intermediate image or feature collection to an asset and return the asset.
+
+    Requests built on the returned object reference the asset by id, so the graph
+    that produced it is neither sent nor recomputed again. If the asset already
+    exists it is reused without exporting, unless ``overwrite`` is True.
+
+    Parameters
+    ----------
+    ee_object : ee.Image or ee.FeatureCollection
+        Intermediate result to store.
+    asset_id : str
+        Destination asset id, e.g. 'projects/my-project/assets/epistemx/distance'.
+    region : ee.Geometry, optional
+        Export region of an image. Defaults to the image footprint.
+    scale : float, default 30
+        Export scale of an image in meters.
+    overwrite : bool, default False
+        Export again even if the asset exists.
+    wait : bool, default True
+        Block until the export finished. If False, return right after starting it.
+    poll_interval : float, default 10
+        Seconds between task status checks.
+    timeout : float, optional
+        Maximum seconds to wait for the export.
+    max_pixels : float, default 1e13
+        maxPixels of an image export.
+
+    Returns
+    -------
+    ee.Image or ee.FeatureCollection
+        The asset, loaded by id.
+    """
+    is_image = isinstance(ee_object, ee.Image)
+    if not is_image and not isinstance(ee_object, ee.FeatureCollection):
+        raise TypeError(f"Only ee.Image and ee.FeatureCollection can be materialized, got {type(ee_object).__name__}")
+    loader = ee.Image if is_image else ee.FeatureCollection
+    if not overwrite and asset_exists(asset_id):
+        logger.info(f"Reusing materialized asset {asset_id}")
+        return loader(asset_id)
+    if overwrite and asset_exists(asset_id):
+        ee_call(ee.data.deleteAsset, asset_id)
+    task = start_export(ee_object, asset_id, region=region, scale=scale, max_pixels=max_pixels)
+    logger.info(f"Materializing {type(ee_object).__name__} to {asset_id} (task {task.id})")
+    if wait:
+        wait_for_task(task, poll_interval, timeout)
+        logger.info(f"Materialized {asset_id}")
+    return loader(asset_id)
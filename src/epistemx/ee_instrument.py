@@ -0,0 +1,387 @@
+"""
+Earth Engine Request Instrumentation Module
+
+Opt-in recording of every Earth Engine round trip made by epistemx, to find out
+which of the ``getInfo()`` calls dominates a slow session.
+
+For every request routed through ``ee_fetch.get_info()`` or ``ee_throttle.ee_call()``
+(export task starts, task status polls, asset listing and deletion) a record is kept with:
+
+- the calling function, e.g. ``Reflectance_Data.get_optical_data.add_aoi_cloud``
+- wall time of the request
+- size of the serialized request (expression graph) and of the JSON response
+- whether it was answered by the result cache instead of Earth Engine
+
+Records are kept in an in-memory registry. They can be summarized per call site,
+printed as a table, or exported to JSON or to the Chrome trace format (open in
+chrome://tracing or https://ui.perfetto.dev).
+
+Instrumentation is disabled by default. Enable it with ``enable_instrumentation()``
+or by setting the ``EPISTEMX_INSTRUMENT`` environment variable to 1.
+
+Example
+-------
+>>> from epistemx.ee_instrument import enable_instrumentation, get_registry
+>>> enable_instrumentation()
+>>> stats = Reflectance_Stats().get_collection_statistics(collection)
+>>> print(get_registry().summary_table())
+>>> get_registry().export_chrome_trace('ee_trace.json')
+"""
+
+import contextlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterator, List, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Infrastructure modules skipped when looking for the calling function
+_INTERNAL_MODULES = {
+    'epistemx.ee_fetch',
+    'epistemx.ee_instrument',
+    'epistemx.ee_throttle',
+    'epistemx.ee_cache',
+    'epistemx.ee_config',
+    'epistemx.ee_graph'
+}
+
+_enabled = os.environ.get('EPISTEMX_INSTRUMENT', '').lower() in ('1', 'true', 'yes')
+
+# Per-thread flag set while a request is being observed, so nested calls are recorded once
+_observing = threading.local()
+
+
+@dataclass
+class RequestRecord:
+    """
+    One Earth Engine request observed by the instrumentation layer.
+
+    Attributes
+    ----------
+    call_site : str
+        Qualified name of the epistemx function that made the request.
+    kind : str
+        Kind of request, e.g. 'getInfo', 'start' or 'getAsset'.
+    start : float
+        Start time as a UNIX timestamp.
+    duration : float
+        Wall time in seconds.
+    request_bytes : int
+        Size of the serialized expression graph.
+    response_bytes : int
+        Size of the JSON-encoded response, 0 when the request failed.
+    cached : bool
+        True if the result came from the result cache (no round trip).
+    thread : int
+        Identifier of the thread that made the request (``threading.get_ident()``).
+    session : str, optional
+        Name of the Earth Engine session (or project) that served the request.
+    error : str, optional
+        Error message if the request failed.
+    """
+    call_site: str
+    kind: str
+    start: float
+    duration: float
+    request_bytes: int
+    response_bytes: int
+    cached: bool
+    thread: int
+    session: Optional[str] = None
+    error: Optional[str] = None
+
+
+class InstrumentationRegistry:
+    """
+    Thread-safe in-memory collection of request records.
+
+    Example
+    -------
+    >>> from epistemx.ee_instrument import get_registry
+    >>> registry = get_registry()
+    >>> registry.round_trips()
+    12
+    >>> registry.summary()[0]['call_site']
+    'Reflectance_Stats.get_collection_statistics'
+    """
+    def __init__(self):
+        self._records: List[RequestRecord] = []
+        self._lock = threading.Lock()
+
+    def add(self, record: RequestRecord) -> None:
+        """Append a record."""
+        with self._lock:
+            self._records.append(record)
+
+    def records(self) -> List[RequestRecord]:
+        """Return a copy of all records in the order they completed."""
+        with self._lock:
+            return list(self._records)
+
+    def clear(self) -> None:
+        """Remove every record."""
+        with self._lock:
+            self._records.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._records)
+
+    def round_trips(self) -> int:
+        """Number of requests that reached Earth Engine (cache hits excluded)."""
+        return sum(1 for record in self.records() if not record.cached)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Aggregate the records per call site, slowest call site first.
+
+        Returns
+        -------
+        list of dict
+            Per call site: calls, round trips, cache hits, errors, total / mean / max
+            wall time in seconds and total request / response bytes.
+        """
+        sites: Dict[str, Dict[str, Any]] = {}
+        for record in self.records():
+            site = sites.setdefault(record.call_site, {
+                'call_site': record.call_site,
+                'calls': 0,
+                'round_trips': 0,
+                'cache_hits': 0,
+                'errors': 0,
+                'total_s': 0.0,
+                'max_s': 0.0,
+                'request_bytes': 0,
+                'response_bytes': 0
+            })
+            site['calls'] += 1
+            site['cache_hits' if record.cached else 'round_trips'] += 1
+            site['errors'] += record.error is not None
+            site['total_s'] += record.duration
+            site['max_s'] = max(site['max_s'], record.duration)
+            site['request_bytes'] += record.request_bytes
+            site['response_bytes'] += record.response_bytes
+        rows = sorted(sites.values(), key=lambda row: row['total_s'], reverse=True)
+        for row in rows:
+            row['mean_s'] = row['total_s'] / row['calls']
+        return rows
+
+    def summary_table(self, as_dataframe: bool = False) -> Any:
+        """
+        Summary per call site as a text table, or as a pandas DataFrame.
+
+        Parameters
+        ----------
+        as_dataframe : bool, default False
+            Return a pandas DataFrame instead of a string.
+        """
+        rows = self.summary()
+        if as_dataframe:
+            import pandas as pd
+            return pd.DataFrame(rows)
+        columns = ['call_site', 'calls', 'round_trips', 'cache_hits', 'errors',
+                   'total_s', 'mean_s', 'max_s', 'request_bytes', 'response_bytes']
+        cells = [[f"{row[c]:.3f}" if isinstance(row[c], float) else str(row[c]) for c in columns] for row in rows]
+        widths = [max([len(c)] + [len(line[i]) for line in cells]) for i, c in enumerate(columns)]
+        lines = ['  '.join(c.ljust(w) if i == 0 else c.rjust(w) for i, (c, w) in enumerate(zip(columns, widths)))]
+        lines.append('  '.join('-' * w for w in widths))
+        for line in cells:
+            lines.append('  '.join(v.ljust(w) if i == 0 else v.rjust(w) for i, (v, w) in enumerate(zip(line, widths))))
+        return '\n'.join(lines)
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return records and summary as a JSON-serializable dictionary."""
+        return {
+            'records': [asdict(record) for record in self.records()],
+            'summary': self.summary()
+        }
+
+    def export_json(self, path: str) -> str:
+        """
+        Write records and summary to a JSON file.
+
+        Returns
+        -------
+        str
+            Path of the written file.
+        """
+        with open(path, 'w') as f:
+            json.dump(self.to_json(), f, indent=2)
+        return path
+
+    def export_chrome_trace(self, path: str) -> str:
+        """
+        Write the records as a Chrome trace (one complete event per request).
+
+        Returns
+        -------
+        str
+            Path of the written file.
+        """
+        records = self.records()
+        origin = min((record.start for record in records), default=0.0)
+        events = [
+            {
+                'name': record.call_site,
+                'cat': 'cache' if record.cached else record.kind,
+                'ph': 'X',
+                'ts': (record.start - origin) * 1e6,
+                'dur': record.duration * 1e6,
+                'pid': os.getpid(),
+                'tid': record.thread,
+                'args': {
+                    'request_bytes': record.request_bytes,
+                    'response_bytes': record.response_bytes,
+                    'session': record.session,
+                    'error': record.error
+                }
+            }
+            for record in records
+        ]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return path
+
+
+# Global registry shared by every instrumented request
+_registry = InstrumentationRegistry()
+
+
+def enable_instrumentation(enabled: bool = True, clear: bool = False) -> InstrumentationRegistry:
+    """
+    Enable or disable recording of Earth Engine requests.
+
+    Parameters
+    ----------
+    enabled : bool, default True
+        If False, stop recording. Existing records are kept.
+    clear : bool, default False
+        Remove existing records first.
+
+    Returns
+    -------
+    InstrumentationRegistry
+        The package-wide registry.
+    """
+    global _enabled
+    _enabled = enabled
+    if clear:
+        _registry.clear()
+    return _registry
+
+
+def is_instrumentation_enabled() -> bool:
+    """Return True if Earth Engine requests are being recorded."""
+    return _enabled
+
+
+def get_registry() -> InstrumentationRegistry:
+    """Get the package-wide instrumentation registry."""
+    return _registry
+
+
+def _frame_qualname(frame) -> str:
+    """Qualified name of the function running in a frame, without '<locals>' parts."""
+    code = frame.f_code
+    qualname = getattr(code, 'co_qualname', None)  # Python 3.11+
+    if qualname is None:
+        qualname = code.co_name
+        owner = frame.f_locals.get('self', frame.f_locals.get('cls'))
+        if owner is not None:
+            owner_type = owner if isinstance(owner, type) else type(owner)
+            qualname = f"{owner_type.__name__}.{qualname}"
+    return qualname.replace('.<locals>', '')
+
+
+def find_call_site() -> str:
+    """Name of the first function on the stack outside the Earth Engine infrastructure modules."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module not in _INTERNAL_MODULES and not module.startswith('contextlib'):
+            return _frame_qualname(frame)
+        frame = frame.f_back
+    return '<unknown>'
+
+
+def _serialized_size(ee_object: Any) -> int:
+    """Size in bytes of the serialized expression graph of an Earth Engine object."""
+    try:
+        import ee
+        if isinstance(ee_object, ee.ComputedObject):
+            return len(ee.serializer.toJSON(ee_object).encode('utf-8'))
+        return len(json.dumps(ee_object, default=str).encode('utf-8'))
+    except Exception as e:
+        logger.debug(f"Could not serialize request for instrumentation: {e}")
+        return 0
+
+
+class _Observation:
+    """Mutable result holder filled in by the body of ``observe()``."""
+    __slots__ = ('value', 'cached', 'session')
+
+    def __init__(self):
+        self.value = None
+        self.cached = False
+        self.session = None
+
+
+@contextlib.contextmanager
+def observe(ee_object: Any, kind: str = 'getInfo') -> Iterator[Optional[_Observation]]:
+    """
+    Record one request made in the body of the ``with`` block.
+
+    Yields None when instrumentation is disabled, so the overhead is one check,
+    and inside another ``observe()`` block (e.g. ``ee_call`` within ``get_info``),
+    so a request is recorded once. Otherwise set ``value`` (and ``cached``) of the yielded observation to the
+    response.
+
+    Example
+    -------
+    >>> with observe(ee_object) as obs:
+    ...     value = ee_object.getInfo()
+    ...     if obs is not None:
+    ...         obs.value = value
+    """
+    if not _enabled or getattr(_observing, 'active', False):
+        yield None
+        return
+    _observing.active = True
+    call_site = find_call_site()
+    request_bytes = _serialized_size(ee_object)
+    observation = _Observation()
+    start = time.time()
+    started = time.perf_counter()
+    error = None
+    try:
+        yield observation
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _observing.active = False
+        duration = time.perf_counter() - started
+        response_bytes = 0
+        if error is None:
+            try:
+                response_bytes = len(json.dumps(observation.value, default=str).encode('utf-8'))
+            except (TypeError, ValueError):
+                pass
+        _registry.add(RequestRecord(
+            call_site=call_site,
+            kind=kind,
+            start=start,
+            duration=duration,
+            request_bytes=request_bytes,
+            response_bytes=response_bytes,
+            cached=observation.cached,
+            thread=threading.get_ident(),
+            session=observation.session,
+            error=error
+        ))
@@ -0,0 +1,350 @@
+"""
+Earth Engine Request Throttling Module
+
+Process-wide rate limiting and retry for Earth Engine requests made by epistemx.
+
+Every request (``getInfo()``, ``computeFeatures()``, export task starts) is passed to
+``ee_call()``, which:
+
+1. Waits for a token from a token bucket (sustained requests per second + burst).
+2. Waits for a free slot, bounding the number of concurrent requests.
+3. Dispatches the request to a session of the Earth Engine session pool (see
+   ``ee_config.SessionPool``), so registered projects share the load.
+4. Retries quota errors (HTTP 429, "Too many concurrent aggregations", ...) and
+   transient server errors (HTTP 5xx) with jittered exponential backoff.
+
+Example
+-------
+>>> from epistemx.ee_throttle import configure_rate_limit, ee_call
+>>> configure_rate_limit(max_concurrent=4, requests_per_second=5)
+>>> n_images = ee_call(collection.size().getInfo)
+"""
+
+import contextlib
+import contextvars
+import logging
+import random
+import re
+import threading
+import time
+from concurrent.futures import CancelledError
+from typing import Any, Callable, Iterator, Optional
+from .ee_config import get_active_project, get_session_pool
+from .ee_instrument import observe
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENT = 8
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BASE_DELAY = 1.0    # seconds
+DEFAULT_MAX_DELAY = 60.0    # seconds
+
+# Error messages returned by Earth Engine for quota and transient server errors
+_RETRYABLE_PATTERNS = re.compile(
+    r"too many concurrent aggregations|too many requests|rate limit|quota exceeded|"
+    r"resource(s)? exhausted|service unavailable|internal error|"
+    r"backend error|bad gateway|gateway time-?out|deadline exceeded|connection (reset|aborted)|"
+    r"\b(429|500|502|503|504)\b",
+    re.IGNORECASE
+)
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting the sustained request rate.
+
+    Parameters
+    ----------
+    rate : float
+        Tokens added per second (sustained requests per second).
+    capacity : float, optional
+        Maximum number of stored tokens (burst size). Defaults to ``rate``.
+    clock : callable, optional
+        Monotonic clock, replaceable in tests.
+    sleep : callable, optional
+        Sleep function, replaceable in tests.
+    """
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be a positive number")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1.0))
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """
+        Take one token, blocking until one is available.
+
+        Returns
+        -------
+        float
+            Total time spent waiting, in seconds.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+            waited += wait
+
+
+class RequestLimiter:
+    """
+    Combine a token bucket with a bound on concurrent requests.
+
+    Parameters
+    ----------
+    max_concurrent : int
+        Maximum number of requests in flight at the same time.
+    requests_per_second : float, optional
+        Sustained request rate. None disables rate limiting.
+    burst : float, optional
+        Burst size of the token bucket. Defaults to ``requests_per_second``.
+    """
+    def __init__(self, max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+                 requests_per_second: Optional[float] = DEFAULT_REQUESTS_PER_SECOND,
+                 burst: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        self.max_concurrent = max_concurrent
+        self.bucket = TokenBucket(requests_per_second, burst, clock, sleep) if requests_per_second else None
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+
+    def __enter__(self) -> 'RequestLimiter':
+        if self.bucket is not None:
+            self.bucket.acquire()
+        self._slots.acquire()
+        with self._lock:
+            self.in_flight += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff for quota and transient server errors.
+
+    Parameters
+    ----------
+    max_retries : int
+        Number of retries after the first attempt.
+    base_delay : float
+        Backoff of the first retry, in seconds. Doubles on every retry.
+    max_delay : float
+        Upper bound of a single backoff, in seconds.
+    sleep : callable, optional
+        Sleep function, replaceable in tests.
+    """
+    def __init__(self, max_retries: int = DEFAULT_MAX_RETRIES, base_delay: float = DEFAULT_BASE_DELAY,
+                 max_delay: float = DEFAULT_MAX_DELAY, sleep: Callable[[float], None] = time.sleep):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+
+    def backoff(self, attempt: int) -> float:
+        """Return the jittered delay before retry number ``attempt`` (0-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def sleep(self, seconds: float) -> None:
+        self._sleep(seconds)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Check whether an error is a quota or transient server error worth retrying.
+
+    Parameters
+    ----------
+    error : Exception
+        Error raised by an Earth Engine request.
+
+    Returns
+    -------
+    bool
+        True for HTTP 429/5xx, Earth Engine quota messages and dropped connections.
+    """
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    # googleapiclient.errors.HttpError carries the HTTP status on resp
+    status = getattr(getattr(error, 'resp', None), 'status', None)
+    if status is not None:
+        try:
+            return int(status) in _RETRYABLE_STATUS
+        except (TypeError, ValueError):
+            pass
+    return bool(_RETRYABLE_PATTERNS.search(str(error)))
+
+
+# Global limiter and retry policy shared by every epistemx request
+_limiter = RequestLimiter()
+_retry_policy = RetryPolicy()
+
+# Cancellation flag of the calling task, set by ee_async.run_blocking()
+_cancel_event: contextvars.ContextVar = contextvars.ContextVar('epistemx_cancel_event', default=None)
+
+
+@contextlib.contextmanager
+def cancel_scope(event: threading.Event) -> Iterator[threading.Event]:
+    """
+    Stop requests made in the ``with`` block once ``event`` is set.
+
+    A request that is already running completes, but no new request or retry is
+    started: ``call_with_retry()`` raises ``concurrent.futures.CancelledError``.
+    """
+    token = _cancel_event.set(event)
+    try:
+        yield event
+    finally:
+        _cancel_event.reset(token)
+
+
+def configure_rate_limit(max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+                         requests_per_second: Optional[float] = DEFAULT_REQUESTS_PER_SECOND,
+                         burst: Optional[float] = None,
+                         max_retries: int = DEFAULT_MAX_RETRIES,
+                         base_delay: float = DEFAULT_BASE_DELAY,
+                         max_delay: float = DEFAULT_MAX_DELAY) -> None:
+    """
+    Configure the process-wide request limiter and retry policy.
+
+    Parameters
+    ----------
+    max_concurrent : int, default 8
+        Maximum number of Earth Engine requests in flight at the same time.
+    requests_per_second : float, optional, default 10
+        Sustained request rate. None disables rate limiting.
+    burst : float, optional
+        Burst size of the token bucket. Defaults to ``requests_per_second``.
+    max_retries : int, default 5
+        Retries after the first attempt for quota and transient errors.
+    base_delay : float, default 1.0
+        Backoff of the first retry in seconds, doubled on every retry.
+    max_delay : float, default 60.0
+        Upper bound of a single backoff in seconds.
+
+    Example
+    -------
+    >>> from epistemx.ee_throttle import configure_rate_limit
+    >>> configure_rate_limit(max_concurrent=4, requests_per_second=2, max_retries=8)
+    """
+    global _limiter, _retry_policy
+    _limiter = RequestLimiter(max_concurrent, requests_per_second, burst)
+    _retry_policy = RetryPolicy(max_retries, base_delay, max_delay)
+    logger.info(f"Earth Engine request limit: {max_concurrent} concurrent, "
+                f"{requests_per_second or 'unlimited'} requests/s, {max_retries} retries")
+
+
+def call_with_retry(func: Callable[..., Any], *args: Any,
+                    limiter: Optional[RequestLimiter] = None,
+                    retry_policy: Optional[RetryPolicy] = None,
+                    **kwargs: Any) -> Any:
+    """
+    Call ``func`` through a request limiter and the session pool, retrying quota
+    and transient errors. A retry may be dispatched to another session.
+
+    Parameters
+    ----------
+    func : callable
+        Function performing one Earth Engine request.
+    *args, **kwargs
+        Arguments passed to ``func``.
+    limiter : RequestLimiter, optional
+        Limiter to use. Defaults to the process-wide limiter.
+    retry_policy : RetryPolicy, optional
+        Retry policy to use. Defaults to the process-wide policy.
+
+    Returns
+    -------
+    Any
+        Return value of ``func``.
+
+    Raises
+    ------
+    Exception
+        The last error, once it is not retryable or retries are exhausted.
+    concurrent.futures.CancelledError
+        If the calling task was cancelled (see ``cancel_scope()``).
+    """
+    limiter = limiter or _limiter
+    policy = retry_policy or _retry_policy
+    pool = get_session_pool()
+    cancelled = _cancel_event.get()
+    attempt = 0
+    while True:
+        if cancelled is not None and cancelled.is_set():
+            raise CancelledError("Earth Engine request cancelled")
+        session = None
+        try:
+            with limiter, pool.acquire() as session:
+                return func(*args, **kwargs)
+        except Exception as e:
+            if attempt >= policy.max_retries or not is_retryable(e):
+                raise
+            if session is not None:
+                # Let the retry go to another session while this one is over quota
+                pool.mark_throttled(session)
+            delay = policy.backoff(attempt)
+            attempt += 1
+            logger.warning(f"Earth Engine request failed ({e}); retry {attempt}/{policy.max_retries} in {delay:.1f}s")
+            if cancelled is None:
+                policy.sleep(delay)
+            elif cancelled.wait(delay):
+                raise CancelledError("Earth Engine request cancelled") from e
+
+
+def ee_call(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run one Earth Engine request through the process-wide limiter and retry policy.
+
+    The request is recorded by the instrumentation layer (see ``ee_instrument``)
+    under the name of ``func``, e.g. 'start', 'getTaskStatus' or 'getAsset'.
+
+    Parameters
+    ----------
+    func : callable
+        Bound Earth Engine call, e.g. ``image.getInfo`` or ``task.start``.
+    *args, **kwargs
+        Arguments passed to ``func``.
+
+    Returns
+    -------
+    Any
+        Return value of ``func``.
+    """
+    kind = getattr(func, '__name__', type(func).__name__)
+    #Bound methods (image.getInfo, task.start) are sized by their object, plain functions by their arguments
+    request = getattr(func, '__self__', None)
+    if request is None or args or kwargs:
+        request = [list(args), kwargs]
+    with observe(request, kind=kind) as observation:
+        value = call_with_retry(func, *args, **kwargs)
+        if observation is not None:
+            observation.value = value
+            session = get_session_pool().active
+            observation.session = session.name if session is not None else get_active_project()
+    return value
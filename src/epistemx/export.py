@@ -0,0 +1,351 @@
+"""
+Earth Engine Export Module
+
+Managed queue of batch exports for the results of epistemx: composites from
+``Reflectance_Data``, spectral indices from
+``spectral_transformation_calcultator.calculate_index`` and land cover maps from
+``Generate_LULC``.
+
+Large results cannot be pulled with ``getInfo()``; they are exported with
+``ee.batch.Export.image.toAsset`` / ``toDrive`` / ``toCloudStorage``. The
+``Export_Manager``
+
+- tracks every export in a local JSON state file (job id, task id, state, target)
+- deduplicates submissions: the job id is a hash of the serialized image and the
+  export parameters, so submitting the same export twice, or again after a
+  restart, does not start a second task
+- starts at most ``max_concurrent`` tasks at a time, the others wait in the queue
+  (Earth Engine runs a limited number of tasks per user in parallel anyway)
+- polls task status with exponential backoff while nothing changes
+- resumes after a restart: tasks started by a previous process are polled again
+  from the state file. Jobs that were queued but not started are started when
+  they are submitted again
+
+Task starts and status requests go through ``ee_throttle.ee_call`` (rate limit and
+retry). ``fake_ee`` provides a local task service for offline runs.
+
+Example
+-------
+>>> from epistemx.export import Export_Manager
+>>> exports = Export_Manager('exports.json', max_concurrent=2)
+>>> exports.export_image(collection.median(), 'composite_2024', destination='asset',
+...                      asset_id='projects/my-project/assets/epistemx/composite_2024', region=aoi)
+>>> exports.export_image(lulc_map, 'lulc_2024', destination='drive', folder='epistemx', region=aoi)
+>>> exports.run()
+{'COMPLETED': 2}
+"""
+
+import ee
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from .ee_throttle import ee_call
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENT = 3
+DEFAULT_POLL_INTERVAL = 10.0      # seconds before the first status check
+DEFAULT_MAX_POLL_INTERVAL = 300.0 # seconds, upper bound of the backoff
+DEFAULT_BACKOFF = 2.0
+DESTINATIONS = ('asset', 'drive', 'gcs')
+# Job states: QUEUED (not started yet), then the Earth Engine task states
+ACTIVE_STATES = ('READY', 'RUNNING')
+FINAL_STATES = ('COMPLETED', 'FAILED', 'CANCELLED')
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class Export_Manager:
+    """Class for submitting, tracking and resuming Earth Engine batch exports."""
+    def __init__(self, state_path: Optional[str] = None, max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, max_poll_interval: float = DEFAULT_MAX_POLL_INTERVAL,
+                 backoff: float = DEFAULT_BACKOFF, log_level=logging.INFO):
+        """
+        Initialize the export manager and load the jobs of a previous run.
+
+        Parameters
+        ----------
+        state_path : str, optional
+            JSON file holding the jobs. Defaults to ``EPISTEMX_EXPORT_STATE`` or
+            'epistemx_exports.json' in the working directory.
+        max_concurrent : int, default 3
+            Maximum number of tasks running at the same time.
+        poll_interval : float, default 10
+            Seconds between status checks while tasks change state.
+        max_poll_interval : float, default 300
+            Upper bound of the poll interval when nothing changes.
+        backoff : float, default 2
+            Factor applied to the poll interval after a check without changes.
+        """
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        self.state_path = state_path or os.environ.get('EPISTEMX_EXPORT_STATE') or 'epistemx_exports.json'
+        self.max_concurrent = max_concurrent
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff = backoff
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.logger.setLevel(log_level)
+        self._lock = threading.Lock()
+        # Task factories of queued jobs, kept in memory only
+        self._pending: Dict[str, Any] = {}
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                self.jobs = json.load(f).get('jobs', {})
+            active = sum(1 for job in self.jobs.values() if job['state'] in ACTIVE_STATES)
+            queued = sum(1 for job in self.jobs.values() if job['state'] == 'QUEUED')
+            self.logger.info(f"Loaded {len(self.jobs)} export jobs from {self.state_path} ({active} running)")
+            if queued:
+                self.logger.info(f"{queued} exports were queued but not started, submit them again to start them")
+
+    def _save(self) -> None:
+        temporary = f"{self.state_path}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump({'jobs': self.jobs}, f, indent=2, sort_keys=True)
+        os.replace(temporary, self.state_path)
+
+    @staticmethod
+    def job_id(image: Any, params: Dict[str, Any]) -> str:
+        """Hash of the serialized image and the export parameters, identifying an export."""
+        params = {key: ee.serializer.toJSON(value) if isinstance(value, ee.ComputedObject) else value
+                  for key, value in params.items()}
+        payload = ee.serializer.toJSON(image) + json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+    def export_image(self, image: Any, description: str, destination: str = 'asset', asset_id: Optional[str] = None,
+                     folder: Optional[str] = None, bucket: Optional[str] = None, file_prefix: Optional[str] = None,
+                     region: Any = None, scale: float = 30, crs: Optional[str] = None, max_pixels: float = 1e13,
+                     file_format: str = 'GeoTIFF', resubmit_failed: bool = True) -> str:
+        """
+        Queue an image export. An identical export already submitted is not queued again.
+
+        Parameters
+        ----------
+        image : ee.Image
+            Image to export, e.g. a composite, an index stack or a land cover map.
+        description : str
+            Task description (at most 100 characters), also the default file name.
+        destination : str, default 'asset'
+            'asset', 'drive' or 'gcs'.
+        asset_id : str, optional
+            Destination asset id (destination='asset').
+        folder : str, optional
+            Google Drive folder (destination='drive').
+        bucket : str, optional
+            Cloud Storage bucket (destination='gcs').
+        file_prefix : str, optional
+            File name prefix of Drive and Cloud Storage exports (default: description).
+        region : ee.Geometry or ee.FeatureCollection, optional
+            Export region (default: the image footprint).
+        scale : float, default 30
+            Pixel size in meters.
+        crs : str, optional
+            Output projection, e.g. 'EPSG:32748'.
+        max_pixels : float, default 1e13
+            maxPixels of the export.
+        file_format : str, default 'GeoTIFF'
+            File format of Drive and Cloud Storage exports.
+        resubmit_failed : bool, default True
+            Queue the export again if the previous identical job failed or was cancelled.
+
+        Returns
+        -------
+        str
+            Job id.
+        """
+        if destination not in DESTINATIONS:
+            raise ValueError(f"destination must be one of: {list(DESTINATIONS)}")
+        if destination == 'asset' and not asset_id:
+            raise ValueError("asset_id is required for asset exports")
+        if destination == 'gcs' and not bucket:
+            raise ValueError("bucket is required for Cloud Storage exports")
+        description = description[:100]
+        params = {'description': description, 'scale': scale, 'maxPixels': max_pixels}
+        if crs:
+            params['crs'] = crs
+        if destination == 'asset':
+            params['assetId'] = asset_id
+            target = asset_id
+        else:
+            params['fileNamePrefix'] = file_prefix or description
+            params['fileFormat'] = file_format
+            if destination == 'drive':
+                params['folder'] = folder or 'epistemx'
+                target = f"drive:{params['folder']}/{params['fileNamePrefix']}"
+            else:
+                params['bucket'] = bucket
+                target = f"gs://{bucket}/{params['fileNamePrefix']}"
+        if region is not None:
+            params['region'] = region.geometry() if isinstance(region, (ee.FeatureCollection, ee.Feature)) else region
+        job_id = self.job_id(image, dict(params, destination=destination))
+
+        exporters = {
+            'asset': ee.batch.Export.image.toAsset,
+            'drive': ee.batch.Export.image.toDrive,
+            'gcs': ee.batch.Export.image.toCloudStorage
+        }
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is not None and (job['state'] in ACTIVE_STATES + ('COMPLETED',) or job_id in self._pending or
+                                    (job['state'] in FINAL_STATES and not resubmit_failed)):
+                self.logger.info(f"Export {description} already submitted ({job['state']}), not queued again")
+                return job_id
+            self._pending[job_id] = lambda: exporters[destination](image=image, **params)
+            self.jobs[job_id] = {
+                'description': description,
+                'destination': destination,
+                'target': target,
+                'task_id': None,
+                'state': 'QUEUED',
+                'error': None,
+                'submitted': _now(),
+                'updated': _now()
+            }
+            self._save()
+        self.logger.info(f"Queued export {description} to {target}")
+        return job_id
+
+    def _start_queued(self) -> int:
+        """Start queued jobs while fewer than max_concurrent tasks run. Return the number started."""
+        running = sum(1 for job in self.jobs.values() if job['state'] in ACTIVE_STATES)
+        started = 0
+        for job_id, job in self.jobs.items():
+            if running >= self.max_concurrent:
+                break
+            if job['state'] != 'QUEUED' or job_id not in self._pending:
+                continue
+            task = self._pending.pop(job_id)()
+            try:
+                ee_call(task.start)
+            except Exception as e:
+                job.update(state='FAILED', error=f"Task start failed: {e}", updated=_now())
+                self.logger.error(f"Export {job['description']} could not be started: {e}")
+                continue
+            job.update(task_id=task.id, state='READY', updated=_now())
+            running += 1
+            started += 1
+            self.logger.info(f"Started export {job['description']} (task {task.id})")
+        return started
+
+    def poll(self) -> Dict[str, int]:
+        """
+        Check the running tasks once and start queued jobs in the free slots.
+
+        Returns
+        -------
+        dict
+            Number of jobs per state.
+        """
+        with self._lock:
+            active = {job_id: job for job_id, job in self.jobs.items() if job['state'] in ACTIVE_STATES}
+            if active:
+                statuses = ee_call(ee.data.getTaskStatus, [job['task_id'] for job in active.values()])
+                for (job_id, job), status in zip(active.items(), statuses):
+                    state = status.get('state')
+                    error = status.get('error_message')
+                    if state == 'CANCEL_REQUESTED':
+                        state = 'CANCELLED'
+                    elif state not in ACTIVE_STATES + FINAL_STATES:
+                        # 'UNKNOWN' (task id not found, e.g. resumed under another project) would never finish
+                        error = error or f"Earth Engine reports task {job['task_id']} as {state}"
+                        state = 'FAILED'
+                    if state == job['state']:
+                        continue
+                    job.update(state=state, error=error, updated=_now())
+                    if state == 'FAILED':
+                        self.logger.error(f"Export {job['description']} failed: {job['error']}")
+                    else:
+                        self.logger.info(f"Export {job['description']}: {state.lower()}")
+            self._start_queued()
+            self._save()
+            return self.summary()
+
+    def summary(self) -> Dict[str, int]:
+        """Number of jobs per state."""
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job['state']] = counts.get(job['state'], 0) + 1
+        return counts
+
+    def run(self, timeout: Optional[float] = None) -> Dict[str, int]:
+        """
+        Start the queued jobs and wait until every job has finished.
+
+        The poll interval grows by ``backoff`` after every check without changes, up to
+        ``max_poll_interval``, and is reset when a job changes state.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Maximum seconds to wait. None waits until every job has finished.
+
+        Returns
+        -------
+        dict
+            Number of jobs per state.
+
+        Raises
+        ------
+        TimeoutError
+            If jobs are still queued or running after ``timeout``.
+        """
+        started = time.monotonic()
+        interval = self.poll_interval
+        previous = None
+        while True:
+            summary = self.poll()
+            snapshot = {job_id: job['state'] for job_id, job in self.jobs.items()}
+            # Queued jobs of a previous run are only started once submitted again
+            waiting = [job_id for job_id, job in self.jobs.items()
+                       if job['state'] in ACTIVE_STATES or job_id in self._pending]
+            if not waiting:
+                return summary
+            if timeout is not None and time.monotonic() - started > timeout:
+                raise TimeoutError(f"{len(waiting)} exports still queued or running after {timeout:.0f}s")
+            interval = self.poll_interval if snapshot != previous else min(interval * self.backoff,
+                                                                           self.max_poll_interval)
+            previous = snapshot
+            time.sleep(interval)
+
+    def cancel(self, job_id: str) -> None:
+        """Cancel a queued or running job."""
+        with self._lock:
+            job = self.jobs[job_id]
+            if job['state'] in ACTIVE_STATES:
+                ee_call(ee.data.cancelTask, job['task_id'])
+            if job['state'] in ACTIVE_STATES + ('QUEUED',):
+                self._pending.pop(job_id, None)
+                job.update(state='CANCELLED', updated=_now())
+                self._save()
+                self.logger.info(f"Cancelled export {job['description']}")
+
+    def status(self, job_id: str) -> Dict[str, Any]:
+        """Get the record of a job: description, destination, target, task_id, state, error, timestamps."""
+        return dict(self.jobs[job_id])
+
+    def list_jobs(self, state: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        List the jobs, optionally only those in one state.
+
+        Returns
+        -------
+        list of dict
+            Job records with their 'job_id'.
+        """
+        return [dict(job, job_id=job_id) for job_id, job in self.jobs.items() if state is None or job['state'] == state]
+
+    async def run_async(self, timeout: Optional[float] = None) -> Dict[str, int]:
+        """
+        Async variant of run, runs on the shared executor (see ee_async).
+        """
+        from .ee_async import run_blocking
+        return await run_blocking(self.run, timeout)
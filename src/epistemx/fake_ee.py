@@ -0,0 +1,3257 @@
+"""
+Fake Earth Engine Backend Module
+
+Local, network-free stand-in for the subset of the ``ee`` API used by epistemx,
+for offline benchmarking and testing of the workflows (Reflectance_Data,
+FeatureExtraction, Generate_LULC, Thematic_Accuracy_Assessment).
+
+Like the real client library, every call builds a lazy expression node. Nothing
+is computed until ``getInfo()`` is called, which counts one round trip and
+evaluates the graph with NumPy. Nodes serialize to an expression graph with
+``ee.serializer.toJSON()``, so the result cache and graph size checks behave as
+with Earth Engine.
+
+The backend (``FakeBackend``) holds a pixel grid over a small area, synthetic
+Landsat collections generated on first use from a seeded land cover map, and the
+counters used by benchmarks:
+
+- ``round_trips``: number of ``getInfo()`` calls
+- ``computed_pixels``: number of pixel values computed by image operations
+- ``requests``: number of evaluated calls per algorithm name
+
+Batch exports (``ee.batch.Export``) run on ``backend.tasks``, a ``FakeTaskService``
+that completes tasks after a few status requests and registers exported assets.
+
+The grid has a single resolution. ``Image.reproject()`` to a coarser scale is
+emulated on it: neighborhoods of the reprojected expression count output pixels,
+and every block of output pixel size takes one value (center pixel, or the
+reducer of a ``reduceResolution()`` input).
+
+Classifiers are nearest-centroid stand-ins for Random Forest: they train and
+predict fast and give sensible accuracies on the synthetic data, but results
+do not match Earth Engine.
+
+Example
+-------
+>>> from epistemx import fake_ee
+>>> backend = fake_ee.install()
+>>> from epistemx.data_acquisition import Reflectance_Data
+>>> collection, stats = Reflectance_Data().get_optical_data(backend.aoi(), 2024, 2024)
+>>> backend.round_trips
+2
+>>> fake_ee.uninstall()
+"""
+
+import datetime
+import itertools
+import json
+import logging
+import re
+import sys
+import threading
+import types
+import warnings
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Band layout of the synthetic Landsat collections, keyed by the prefix of the collection id
+SENSOR_BANDS = {
+    'MSS': ['B4', 'B5', 'B6', 'B7'],
+    'TM_SR': ['SR_B1', 'SR_B2', 'SR_B3', 'SR_B4', 'SR_B5', 'SR_B7', 'ST_B6', 'QA_PIXEL'],
+    'OLI_SR': ['SR_B1', 'SR_B2', 'SR_B3', 'SR_B4', 'SR_B5', 'SR_B6', 'SR_B7', 'ST_B10', 'QA_PIXEL'],
+    'TM_TOA': ['B1', 'B2', 'B3', 'B4', 'B5', 'B6', 'B7', 'QA_PIXEL'],
+    'ETM_TOA': ['B1', 'B2', 'B3', 'B4', 'B5', 'B6_VCID_1', 'B6_VCID_2', 'B7', 'B8', 'QA_PIXEL'],
+    'OLI_TOA': ['B1', 'B2', 'B3', 'B4', 'B5', 'B6', 'B7', 'B8', 'B9', 'B10', 'B11', 'QA_PIXEL'],
+}
+
+_LANDSAT_ID = re.compile(r'^LANDSAT/L([MTEC])0(\d)/C02/T1(_L2|_TOA)?$')
+
+_MS_PER_DAY = 24 * 60 * 60 * 1000
+
+_backend = None
+_saved_modules: Dict[str, Any] = {}
+
+
+class EEException(Exception):
+    """Error raised by the fake backend, mirrors ee.EEException."""
+
+
+# ---------------------------------------------------------------------------
+# Backend
+# ---------------------------------------------------------------------------
+
+class FakeBackend:
+    """
+    Pixel grid, synthetic datasets and request counters of the fake Earth Engine.
+
+    Parameters
+    ----------
+    bounds : tuple of float
+        (west, south, east, north) of the pixel grid in degrees.
+    shape : tuple of int
+        (rows, cols) of the pixel grid.
+    pixel_size : float
+        Nominal pixel size in meters. ``scale`` arguments are converted to a
+        sampling stride of ``round(scale / pixel_size)`` pixels.
+    n_classes : int
+        Number of land cover classes of the synthetic land cover map.
+    start, end : str
+        Date range of the synthetic Landsat collections.
+    revisit_days : int
+        Days between two synthetic Landsat acquisitions.
+    seed : int
+        Seed of every synthetic dataset.
+    """
+    def __init__(self, bounds: Sequence[float] = (104.0, -3.5, 104.2, -3.3), shape: Sequence[int] = (64, 64),
+                 pixel_size: float = 30.0, n_classes: int = 5, start: str = '2020-01-01',
+                 end: str = '2025-12-31', revisit_days: int = 16, seed: int = 0):
+        self.bounds = tuple(float(b) for b in bounds)
+        self.shape = (int(shape[0]), int(shape[1]))
+        self.pixel_size = float(pixel_size)
+        self.n_classes = n_classes
+        self.start = start
+        self.end = end
+        self.revisit_days = revisit_days
+        self.seed = seed
+        self.assets: Dict[str, Any] = {}
+        self.tasks = FakeTaskService(self)
+        self._lock = threading.Lock()
+        west, south, east, north = self.bounds
+        rows, cols = self.shape
+        self.lon = np.tile(west + (np.arange(cols) + 0.5) * (east - west) / cols, (rows, 1))
+        self.lat = np.tile((north - (np.arange(rows) + 0.5) * (north - south) / rows)[:, None], (1, cols))
+        self._land_cover = None
+        self._signatures: Dict[str, np.ndarray] = {}
+        self.reset_counters()
+
+    # Counters --------------------------------------------------------------
+
+    def reset_counters(self) -> None:
+        """Reset round trip, pixel and request counters."""
+        with self._lock:
+            self.round_trips = 0
+            self.computed_pixels = 0
+            self.requests: Dict[str, int] = {}
+
+    def count_pixels(self, n: int) -> None:
+        with self._lock:
+            self.computed_pixels += int(n)
+
+    def count_request(self, name: str) -> None:
+        with self._lock:
+            self.requests[name] = self.requests.get(name, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the counters.
+
+        Returns
+        -------
+        dict
+            round_trips, computed_pixels and per-algorithm request counts.
+        """
+        with self._lock:
+            return {
+                'round_trips': self.round_trips,
+                'computed_pixels': self.computed_pixels,
+                'requests': dict(self.requests)
+            }
+
+    # Geometry helpers ------------------------------------------------------
+
+    def footprint(self) -> Dict[str, Any]:
+        """GeoJSON polygon of the pixel grid."""
+        west, south, east, north = self.bounds
+        return {'type': 'Polygon', 'coordinates': [[[west, south], [east, south], [east, north],
+                                                    [west, north], [west, south]]]}
+
+    def aoi(self, fraction: float = 0.8) -> 'FeatureCollection':
+        """
+        Area of interest centred on the grid, as an ee.FeatureCollection.
+
+        Parameters
+        ----------
+        fraction : float
+            Width and height of the AOI relative to the grid.
+        """
+        west, south, east, north = self.bounds
+        dx = (east - west) * (1 - fraction) / 2
+        dy = (north - south) * (1 - fraction) / 2
+        rectangle = Geometry.Rectangle([west + dx, south + dy, east - dx, north - dy])
+        return FeatureCollection([Feature(rectangle, {'name': 'aoi'})])
+
+    def stride(self, scale: Optional[float]) -> int:
+        """Sampling stride in pixels for a scale in meters."""
+        if not scale:
+            return 1
+        return max(1, int(round(float(scale) / self.pixel_size)))
+
+    # Synthetic datasets ----------------------------------------------------
+
+    def land_cover(self) -> np.ndarray:
+        """
+        Synthetic land cover map (class IDs 1..n_classes) on the pixel grid.
+
+        The map is a Voronoi partition of seeded random centres, so classes form
+        contiguous patches.
+        """
+        if self._land_cover is None:
+            rng = np.random.default_rng(self.seed)
+            rows, cols = self.shape
+            n_centres = max(self.n_classes * 3, 8)
+            centres = rng.uniform(0, 1, size=(n_centres, 2)) * [rows, cols]
+            labels = np.concatenate([np.arange(self.n_classes), rng.integers(0, self.n_classes, n_centres - self.n_classes)])
+            yy, xx = np.mgrid[0:rows, 0:cols]
+            distance = (yy[..., None] - centres[:, 0]) ** 2 + (xx[..., None] - centres[:, 1]) ** 2
+            self._land_cover = labels[np.argmin(distance, axis=-1)] + 1
+        return self._land_cover
+
+    def _signature(self, bands: Sequence[str]) -> np.ndarray:
+        """Surface reflectance of every class in every band, shape (n_classes, n_bands)."""
+        key = ','.join(bands)
+        if key not in self._signatures:
+            rng = np.random.default_rng(self.seed + len(bands))
+            self._signatures[key] = rng.uniform(0.02, 0.45, size=(self.n_classes, len(bands)))
+        return self._signatures[key]
+
+    def _landsat_layout(self, asset_id: str):
+        """Return (sensor, band names, product) of a Landsat Collection 2 id, or None."""
+        match = _LANDSAT_ID.match(asset_id)
+        if match is None:
+            return None
+        letter, number, product = match.group(1), int(match.group(2)), match.group(3)
+        if letter == 'M':
+            return f"L{number}", SENSOR_BANDS['MSS'], 'raw'
+        if product == '_L2':
+            return f"L{number}", SENSOR_BANDS['OLI_SR' if letter == 'C' else 'TM_SR'], 'sr'
+        if product == '_TOA':
+            layout = {'C': 'OLI_TOA', 'E': 'ETM_TOA', 'T': 'TM_TOA'}[letter]
+            return f"L{number}", SENSOR_BANDS[layout], 'toa'
+        return f"L{number}", SENSOR_BANDS['MSS'], 'raw'
+
+    def add_landsat_collection(self, asset_id: str, start: Optional[str] = None, end: Optional[str] = None,
+                               revisit_days: Optional[int] = None) -> list:
+        """
+        Register a synthetic Landsat collection.
+
+        Images share the pixel grid and alternate between two WRS path/rows. Every
+        image gets a seeded CLOUD_COVER_LAND value and a QA_PIXEL band whose cloud
+        bits cover the same fraction of the grid.
+
+        Parameters
+        ----------
+        asset_id : str
+            Landsat Collection 2 id, e.g. 'LANDSAT/LC08/C02/T1_L2'.
+        start, end : str, optional
+            Date range, defaults to the backend range.
+        revisit_days : int, optional
+            Days between acquisitions, defaults to the backend setting.
+
+        Returns
+        -------
+        list
+            The registered image values.
+        """
+        layout = self._landsat_layout(asset_id)
+        if layout is None:
+            raise EEException(f"Not a Landsat Collection 2 id: {asset_id}")
+        sensor, bands, product = layout
+        start_ms = _parse_date(start or self.start)
+        end_ms = _parse_date(end or self.end)
+        step = (revisit_days or self.revisit_days) * _MS_PER_DAY
+        rng = np.random.default_rng(abs(hash((asset_id, self.seed))) % (2 ** 32))
+        images = []
+        for i, time_start in enumerate(range(start_ms, end_ms, step)):
+            path, row = (124 + i % 2, 62)
+            cloud = float(np.round(rng.uniform(0, 90), 2))
+            date = datetime.datetime.fromtimestamp(time_start / 1000, datetime.timezone.utc)
+            index = f"{sensor.replace('L', 'LC0' if sensor in ('L8', 'L9') else 'LT0')}_{path:03d}{row:03d}_{date:%Y%m%d}"
+            properties = {
+                'system:index': index,
+                'system:time_start': time_start,
+                'system:footprint': self.footprint(),
+                'CLOUD_COVER': cloud,
+                'CLOUD_COVER_LAND': cloud,
+                'WRS_PATH': path,
+                'WRS_ROW': row,
+                'SPACECRAFT_ID': f"LANDSAT_{sensor[1:]}",
+            }
+            seed = int(rng.integers(0, 2 ** 31))
+            images.append(_ImageValue(bands, self._landsat_loader(bands, product, cloud, seed), properties))
+        self.assets[asset_id] = images
+        return images
+
+    def _landsat_loader(self, bands: Sequence[str], product: str, cloud: float, seed: int) -> Callable[[], Dict[str, np.ma.MaskedArray]]:
+        def load():
+            rng = np.random.default_rng(seed)
+            classes = self.land_cover() - 1
+            reflective = [b for b in bands if b != 'QA_PIXEL']
+            signature = self._signature(reflective)
+            arrays = {}
+            for j, band in enumerate(reflective):
+                reflectance = signature[classes, j] + rng.normal(0, 0.01, self.shape)
+                if band.startswith('ST_') or band in ('B6', 'B6_VCID_1', 'B6_VCID_2', 'B10', 'B11'):
+                    value = 290 + 20 * reflectance if product == 'toa' else (290 + 20 * reflectance - 149.0) / 0.00341802
+                elif product == 'sr':
+                    value = np.round((reflectance + 0.2) / 0.0000275)
+                elif product == 'raw':
+                    value = np.round(reflectance * 255)
+                else:
+                    value = reflectance
+                arrays[band] = np.ma.masked_array(value.astype(np.float64), mask=np.zeros(self.shape, bool))
+            if 'QA_PIXEL' in bands:
+                threshold = np.quantile(rng.uniform(size=self.shape), cloud / 100) if cloud > 0 else -1
+                cloudy = rng.uniform(size=self.shape) < threshold if cloud > 0 else np.zeros(self.shape, bool)
+                qa = np.where(cloudy, (1 << 3) | (3 << 8), 1 << 6).astype(np.float64)
+                arrays['QA_PIXEL'] = np.ma.masked_array(qa, mask=np.zeros(self.shape, bool))
+            self.count_pixels(len(bands) * self.shape[0] * self.shape[1])
+            return arrays
+        return load
+
+    def add_image(self, asset_id: str, bands: Dict[str, np.ndarray], properties: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Register an image from NumPy arrays on the pixel grid.
+
+        Parameters
+        ----------
+        asset_id : str
+            Asset id used with ee.Image(asset_id).
+        bands : dict
+            Mapping of band name to a (rows, cols) array. NaN values are masked.
+        properties : dict, optional
+            Image properties.
+        """
+        arrays = {}
+        for name, array in bands.items():
+            array = np.asarray(array, dtype=np.float64)
+            if array.shape != self.shape:
+                raise ValueError(f"Band {name} has shape {array.shape}, expected {self.shape}")
+            arrays[name] = np.ma.masked_invalid(array)
+        props = dict(properties or {})
+        props.setdefault('system:index', asset_id.split('/')[-1])
+        props.setdefault('system:footprint', self.footprint())
+        self.assets[asset_id] = _ImageValue(list(arrays), lambda: arrays, props)
+
+    def add_feature_collection(self, asset_id: str, features: Any) -> None:
+        """
+        Register a feature collection.
+
+        Parameters
+        ----------
+        asset_id : str
+            Asset id used with ee.FeatureCollection(asset_id).
+        features : list of dict or geopandas.GeoDataFrame
+            GeoJSON features, or any object with ``__geo_interface__``.
+        """
+        self.assets[asset_id] = _features_from(features)
+
+    def sample_points(self, n_per_class: int = 50, class_property: str = 'kelas', seed: int = 0) -> 'FeatureCollection':
+        """
+        Random points labelled with the synthetic land cover map.
+
+        Parameters
+        ----------
+        n_per_class : int
+            Points per class (fewer if a class has fewer pixels).
+        class_property : str
+            Property holding the class ID.
+        seed : int
+            Random seed.
+
+        Returns
+        -------
+        ee.FeatureCollection
+            Point features with the class ID property.
+        """
+        rng = np.random.default_rng(seed)
+        land_cover = self.land_cover()
+        features = []
+        for class_id in range(1, self.n_classes + 1):
+            rows, cols = np.nonzero(land_cover == class_id)
+            take = rng.choice(len(rows), size=min(n_per_class, len(rows)), replace=False)
+            for k in take:
+                point = {'type': 'Point', 'coordinates': [float(self.lon[rows[k], cols[k]]), float(self.lat[rows[k], cols[k]])]}
+                features.append(_feature(point, {class_property: class_id}, f"{class_id}_{k}"))
+        return FeatureCollection(_Constant(features))
+
+    def load(self, asset_id: str) -> Any:
+        """Return the value of an asset, generating synthetic Landsat collections on demand."""
+        if asset_id not in self.assets:
+            if self._landsat_layout(asset_id) is None:
+                raise EEException(f"Asset '{asset_id}' not found.")
+            self.add_landsat_collection(asset_id)
+        return self.assets[asset_id]
+
+
+def get_backend() -> FakeBackend:
+    """Get the installed backend, creating a default one if needed."""
+    global _backend
+    if _backend is None:
+        _backend = FakeBackend()
+    return _backend
+
+
+# ---------------------------------------------------------------------------
+# Values
+# ---------------------------------------------------------------------------
+
+class _ImageValue:
+    """Evaluated image: band names, properties and lazily computed masked arrays."""
+    __slots__ = ('band_names', 'properties', '_loader', '_arrays')
+
+    def __init__(self, band_names: Sequence[str], loader: Callable[[], Dict[str, np.ma.MaskedArray]],
+                 properties: Optional[Dict[str, Any]] = None):
+        self.band_names = list(band_names)
+        self.properties = dict(properties or {})
+        self._loader = loader
+        self._arrays = None
+
+    def arrays(self) -> Dict[str, np.ma.MaskedArray]:
+        if self._arrays is None:
+            arrays = self._loader()
+            self._arrays = {name: arrays[name] for name in self.band_names}
+        return self._arrays
+
+    def band(self, name: str) -> np.ma.MaskedArray:
+        return self.arrays()[name]
+
+    def derive(self, band_names: Sequence[str], compute: Callable[[], Dict[str, np.ma.MaskedArray]],
+               properties: Optional[Dict[str, Any]] = None) -> '_ImageValue':
+        """New image whose bands are computed on first access; computed pixels are counted."""
+        def load():
+            arrays = compute()
+            get_backend().count_pixels(sum(a.size for a in arrays.values()))
+            return arrays
+        return _ImageValue(band_names, load, self.properties if properties is None else properties)
+
+
+class _ClassifierValue:
+    """Nearest-centroid classifier standing in for ee.Classifier.smileRandomForest."""
+    def __init__(self, params: Dict[str, Any], mode: str = 'CLASSIFICATION'):
+        self.params = params
+        self.mode = mode
+        self.input_properties = None
+        self.classes = None
+        self.centroids = None
+        self.scale = None
+        self.importance = None
+        self.training_error = None
+
+    def with_mode(self, mode: str) -> '_ClassifierValue':
+        clone = _ClassifierValue(self.params, mode.upper())
+        clone.__dict__.update({k: v for k, v in self.__dict__.items() if k not in ('params', 'mode')})
+        return clone
+
+    def train(self, features: list, class_property: str, input_properties: Sequence[str]) -> '_ClassifierValue':
+        trained = self.with_mode(self.mode)
+        rows = [f['properties'] for f in features
+                if class_property in f['properties'] and all(p in f['properties'] for p in input_properties)]
+        if not rows:
+            raise EEException("Classifier training failed: no training data with the input properties.")
+        X = np.array([[float(r[p]) for p in input_properties] for r in rows])
+        y = np.array([r[class_property] for r in rows], dtype=np.float64)
+        trained.input_properties = list(input_properties)
+        trained.classes = np.unique(y)
+        trained.scale = X.std(axis=0)
+        trained.scale[trained.scale == 0] = 1.0
+        Xs = X / trained.scale
+        trained.centroids = np.array([Xs[y == c].mean(axis=0) for c in trained.classes])
+        between = np.var(trained.centroids, axis=0)
+        total = between.sum() or 1.0
+        trained.importance = {p: float(v / total * 100) for p, v in zip(trained.input_properties, between)}
+        trained.training_error = float(np.mean(trained._predict_labels(X) != y))
+        return trained
+
+    def _distances(self, X: np.ndarray) -> np.ndarray:
+        Xs = X / self.scale
+        return np.sqrt(((Xs[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=-1))
+
+    def _predict_labels(self, X: np.ndarray) -> np.ndarray:
+        return self.classes[np.argmin(self._distances(X), axis=1)]
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Class IDs, or the probability of the highest class ID in PROBABILITY mode."""
+        if self.centroids is None:
+            raise EEException("Classifier has not been trained.")
+        if self.mode == 'PROBABILITY':
+            weights = np.exp(-self._distances(X))
+            weights /= weights.sum(axis=1, keepdims=True)
+            return weights[:, -1]
+        return self._predict_labels(X)
+
+    def explain(self) -> Dict[str, Any]:
+        return {
+            'type': 'NearestCentroid',
+            'numberOfTrees': self.params.get('numberOfTrees'),
+            'importance': dict(self.importance or {}),
+            'outOfBagErrorEstimate': self.training_error,
+            'classes': [float(c) for c in self.classes] if self.classes is not None else []
+        }
+
+
+class _ConfusionValue:
+    """Evaluated confusion matrix, rows are actual and columns predicted values."""
+    def __init__(self, matrix: np.ndarray):
+        self.matrix = matrix
+
+    def accuracy(self) -> float:
+        total = self.matrix.sum()
+        return float(np.trace(self.matrix) / total) if total else 0.0
+
+    def kappa(self) -> float:
+        total = self.matrix.sum()
+        if not total:
+            return 0.0
+        observed = np.trace(self.matrix) / total
+        expected = (self.matrix.sum(axis=0) * self.matrix.sum(axis=1)).sum() / total ** 2
+        return float((observed - expected) / (1 - expected)) if expected != 1 else 0.0
+
+    def producers(self) -> list:
+        rows = self.matrix.sum(axis=1)
+        return [[float(self.matrix[i, i] / rows[i]) if rows[i] else 0.0] for i in range(len(rows))]
+
+    def consumers(self) -> list:
+        cols = self.matrix.sum(axis=0)
+        return [[float(self.matrix[i, i] / cols[i]) if cols[i] else 0.0 for i in range(len(cols))]]
+
+
+class _ReducerValue:
+    """
+    Evaluated reducer: output names, a function of a 1-D array of valid values and
+    optionally a vectorized function reducing a NaN-padded stack along axis 0.
+    """
+    def __init__(self, name: str, outputs: Sequence[str], func: Callable[[np.ndarray], list],
+                 stack_func: Optional[Callable[[np.ndarray], list]] = None):
+        self.name = name
+        self.outputs = list(outputs)
+        self.func = func
+        self.stack_func = stack_func
+
+    def reduce(self, values: np.ndarray) -> list:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        return self.func(values)
+
+    def reduce_stack(self, stack: np.ndarray) -> list:
+        """Reduce along axis 0 of an array where NaN marks masked values; one array per output."""
+        if self.stack_func is not None:
+            with np.errstate(all='ignore'), warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                return [np.asarray(a, dtype=np.float64) for a in self.stack_func(stack)]
+        flat = stack.reshape(stack.shape[0], -1).T
+        out = np.array([[np.nan if v is None else v for v in self.reduce(column)] for column in flat], dtype=np.float64)
+        return [out[:, i].reshape(stack.shape[1:]) for i in range(len(self.outputs))]
+
+
+def _feature(geometry: Optional[Dict[str, Any]], properties: Optional[Dict[str, Any]] = None,
+             feature_id: Optional[str] = None) -> Dict[str, Any]:
+    feature = {'type': 'Feature', 'geometry': geometry, 'properties': dict(properties or {})}
+    if feature_id is not None:
+        feature['id'] = str(feature_id)
+    return feature
+
+
+def _features_from(features: Any) -> list:
+    """Convert GeoJSON features, a FeatureCollection dict or a GeoDataFrame to feature dicts."""
+    if hasattr(features, '__geo_interface__'):
+        features = features.__geo_interface__
+    if isinstance(features, dict) and features.get('type') == 'FeatureCollection':
+        features = features['features']
+    result = []
+    for i, feature in enumerate(features):
+        properties = {k: v for k, v in (feature.get('properties') or {}).items() if v is not None}
+        result.append(_feature(feature.get('geometry'), properties, feature.get('id', i)))
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Date and geometry helpers
+# ---------------------------------------------------------------------------
+
+def _parse_date(value: Any) -> int:
+    """Milliseconds since epoch (UTC) of a date string, datetime or number."""
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return int(value)
+    if isinstance(value, datetime.datetime):
+        return int(value.replace(tzinfo=value.tzinfo or datetime.timezone.utc).timestamp() * 1000)
+    text = str(value)
+    for fmt in ('%Y-%m-%d', '%Y-%m-%dT%H:%M:%S', '%Y-%m', '%Y'):
+        try:
+            parsed = datetime.datetime.strptime(text, fmt).replace(tzinfo=datetime.timezone.utc)
+            return int(parsed.timestamp() * 1000)
+        except ValueError:
+            continue
+    raise EEException(f"Unable to parse date: {value}")
+
+
+def _coordinates(geometry: Dict[str, Any]):
+    """Yield every (x, y) position of a GeoJSON geometry."""
+    if geometry is None:
+        return
+    if geometry['type'] == 'GeometryCollection':
+        for part in geometry['geometries']:
+            yield from _coordinates(part)
+        return
+    def walk(coords):
+        if coords and isinstance(coords[0], (int, float)):
+            yield coords[0], coords[1]
+        else:
+            for c in coords:
+                yield from walk(c)
+    yield from walk(geometry['coordinates'])
+
+
+def _bbox(geometry: Optional[Dict[str, Any]]):
+    points = list(_coordinates(geometry)) if geometry else []
+    if not points:
+        return None
+    xs, ys = zip(*points)
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _bbox_intersects(a, b) -> bool:
+    if a is None or b is None:
+        return False
+    return not (a[2] < b[0] or b[2] < a[0] or a[3] < b[1] or b[3] < a[1])
+
+
+def _polygons(geometry: Dict[str, Any]) -> list:
+    """List of polygons (list of rings) of a geometry."""
+    kind = geometry['type']
+    if kind == 'Polygon':
+        return [geometry['coordinates']]
+    if kind == 'MultiPolygon':
+        return list(geometry['coordinates'])
+    if kind == 'GeometryCollection':
+        return [p for part in geometry['geometries'] for p in _polygons(part)]
+    return []
+
+
+def _points(geometry: Dict[str, Any]) -> list:
+    kind = geometry['type']
+    if kind == 'Point':
+        return [geometry['coordinates']]
+    if kind == 'MultiPoint':
+        return list(geometry['coordinates'])
+    if kind == 'GeometryCollection':
+        return [p for part in geometry['geometries'] for p in _points(part)]
+    return []
+
+
+def _inside_ring(ring, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Even-odd ray casting test of points against one polygon ring."""
+    inside = np.zeros(x.shape, bool)
+    ring = np.asarray(ring, dtype=np.float64)
+    for (x1, y1), (x2, y2) in zip(ring[:-1], ring[1:]):
+        crosses = (y1 > y) != (y2 > y)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_cross = (x2 - x1) * (y - y1) / (y2 - y1) + x1
+        inside ^= crosses & (x < x_cross)
+    return inside
+
+
+def _geometry_mask(geometry: Optional[Dict[str, Any]], backend: FakeBackend) -> np.ndarray:
+    """Boolean mask of the grid pixels covered by a geometry (None covers the grid)."""
+    if geometry is None:
+        return np.ones(backend.shape, bool)
+    mask = np.zeros(backend.shape, bool)
+    for polygon in _polygons(geometry):
+        inside = _inside_ring(polygon[0], backend.lon, backend.lat)
+        for hole in polygon[1:]:
+            inside &= ~_inside_ring(hole, backend.lon, backend.lat)
+        mask |= inside
+    for x, y in _points(geometry):
+        index = _pixel_index(backend, x, y)
+        if index is not None:
+            mask[index] = True
+    return mask
+
+
+def _pixel_index(backend: FakeBackend, x: float, y: float):
+    west, south, east, north = backend.bounds
+    rows, cols = backend.shape
+    if not (west <= x <= east and south <= y <= north):
+        return None
+    col = min(cols - 1, int((x - west) / (east - west) * cols))
+    row = min(rows - 1, int((north - y) / (north - south) * rows))
+    return row, col
+
+
+def _union_geometry(value: Any) -> Optional[Dict[str, Any]]:
+    """Geometry of a geometry value, a feature or a feature collection."""
+    if value is None:
+        return None
+    if isinstance(value, list):
+        parts = [f.get('geometry') for f in value if isinstance(f, dict) and f.get('geometry')]
+        return {'type': 'GeometryCollection', 'geometries': parts}
+    if isinstance(value, dict) and value.get('type') == 'Feature':
+        return value.get('geometry')
+    if isinstance(value, _ImageValue):
+        return value.properties.get('system:footprint')
+    return value
+
+
+# ---------------------------------------------------------------------------
+# Expression nodes
+# ---------------------------------------------------------------------------
+
+_IMPLEMENTATIONS: Dict[str, Callable] = {}
+_var_counter = itertools.count()
+
+
+def _impl(name: str):
+    """Register the evaluation function of an algorithm."""
+    def register(func):
+        _IMPLEMENTATIONS[name] = func
+        return func
+    return register
+
+
+def _free_vars(value: Any) -> frozenset:
+    if isinstance(value, ComputedObject):
+        return value._free
+    if isinstance(value, (list, tuple)):
+        return frozenset().union(*[_free_vars(v) for v in value]) if value else frozenset()
+    if isinstance(value, dict):
+        return frozenset().union(*[_free_vars(v) for v in value.values()]) if value else frozenset()
+    if isinstance(value, _Function):
+        return value.free
+    return frozenset()
+
+
+class _Function:
+    """Python callback traced once with a variable, like ee.CustomFunction."""
+    def __init__(self, func: Callable, arg_type: type = None, n_args: int = 1):
+        self.names = [f"_MAPPING_VAR_{next(_var_counter)}" for _ in range(n_args)]
+        cast = arg_type or ComputedObject
+        variables = [cast(_Variable(name)) for name in self.names]
+        body = func(*variables)
+        self.body = body if isinstance(body, ComputedObject) else _Constant(body)
+        self.free = self.body._free - frozenset(self.names)
+
+    def call(self, evaluator: '_Evaluator', env: Dict[str, Any], *values: Any) -> Any:
+        scope = dict(env)
+        scope.update(zip(self.names, values))
+        return evaluator.evaluate(self.body, scope)
+
+
+class ComputedObject:
+    """
+    Lazy Earth Engine expression: an algorithm name with arguments.
+
+    Only ``getInfo()`` evaluates it, which counts one round trip.
+    """
+    def __init__(self, func: Any = None, args: Optional[Dict[str, Any]] = None, var_name: Optional[str] = None):
+        if isinstance(func, ComputedObject):
+            # Cast: share the expression of another object
+            self._func, self._args, self._var = func._func, func._args, func._var
+            self._free = func._free
+            return
+        if func is not None and not isinstance(func, str):
+            # Promote a Python value to a constant
+            self._func, self._args, self._var = None, {'value': func}, None
+            self._free = _free_vars(func)
+            return
+        self._func = func
+        self._args = args or {}
+        self._var = var_name
+        self._free = frozenset([var_name]) if var_name else _free_vars(self._args)
+
+    @classmethod
+    def _call(cls, func: str, **args: Any):
+        return cls(func, args)
+
+    def getInfo(self) -> Any:
+        """Evaluate the expression (one round trip) and return the client-side value."""
+        backend = get_backend()
+        with backend._lock:
+            backend.round_trips += 1
+        return _to_json(_Evaluator(backend).evaluate(self, {}))
+
+    def serialize(self) -> str:
+        return serializer.toJSON(self)
+
+    def __repr__(self) -> str:
+        return f"fake_ee.{type(self).__name__}({self._func or ('var ' + self._var if self._var else 'constant')})"
+
+
+def _Constant(value: Any) -> ComputedObject:
+    return ComputedObject(None, {'value': value})
+
+
+def _Variable(name: str) -> ComputedObject:
+    return ComputedObject(None, None, var_name=name)
+
+
+class _Evaluator:
+    """Evaluate expression nodes, reusing results of variable-free nodes within one request."""
+    def __init__(self, backend: FakeBackend, pixel_factor: int = 1):
+        self.backend = backend
+        # Backend pixels per output pixel, > 1 inside Image.reproject() to a coarser scale
+        self.pixel_factor = pixel_factor
+        self._memo: Dict[int, Any] = {}
+
+    def evaluate(self, value: Any, env: Dict[str, Any]) -> Any:
+        if isinstance(value, ComputedObject):
+            if value._var is not None:
+                if value._var not in env:
+                    raise EEException(f"Unbound variable {value._var}")
+                return env[value._var]
+            if value._func is None:
+                return self.evaluate(value._args['value'], env)
+            cacheable = not value._free
+            if cacheable and id(value) in self._memo:
+                return self._memo[id(value)][1]
+            implementation = _IMPLEMENTATIONS.get(value._func)
+            if implementation is None:
+                raise EEException(f"fake_ee does not implement {value._func}")
+            self.backend.count_request(value._func)
+            result = implementation(self, env, **value._args)
+            if cacheable:
+                self._memo[id(value)] = (value, result)
+            return result
+        if isinstance(value, (list, tuple)):
+            return [self.evaluate(v, env) for v in value]
+        if isinstance(value, dict):
+            return {k: self.evaluate(v, env) for k, v in value.items()}
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
+
+
+def _to_json(value: Any) -> Any:
+    """Client-side representation of an evaluated value, as returned by getInfo()."""
+    if isinstance(value, _ImageValue):
+        return {
+            'type': 'Image',
+            'bands': [{'id': name, 'data_type': {'type': 'PixelType', 'precision': 'double'}} for name in value.band_names],
+            'properties': _to_json(value.properties)
+        }
+    if isinstance(value, _ConfusionValue):
+        return value.matrix.astype(int).tolist()
+    if isinstance(value, _ClassifierValue):
+        return {'type': 'Classifier', 'mode': value.mode}
+    if isinstance(value, _ReducerValue):
+        return {'type': 'Reducer', 'name': value.name}
+    if isinstance(value, dict):
+        return {k: _to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(v, dict) and v.get('type') == 'Feature' for v in value):
+            return {'type': 'FeatureCollection', 'columns': {}, 'features': [_to_json(v) for v in value]}
+        return [_to_json(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class _Serializer:
+    """Serialize expressions into a flat table of shared values, like ee.serializer."""
+    def toJSON(self, obj: Any, opt_pretty: bool = False) -> str:
+        return json.dumps(self.encode(obj), indent=2 if opt_pretty else None, sort_keys=True, default=str)
+
+    def encode(self, obj: Any) -> Dict[str, Any]:
+        values: Dict[str, Any] = {}
+        ids: Dict[int, str] = {}
+        keep = []
+
+        def ref(value):
+            if isinstance(value, ComputedObject):
+                if value._var is not None:
+                    return {'argumentReference': value._var}
+                if value._func is None:
+                    return ref(value._args['value'])
+                if id(value) not in ids:
+                    keep.append(value)
+                    encoded = {'functionInvocationValue': {
+                        'functionName': value._func,
+                        'arguments': {k: ref(v) for k, v in sorted(value._args.items()) if v is not None}
+                    }}
+                    ids[id(value)] = str(len(values))
+                    values[ids[id(value)]] = encoded
+                return {'valueReference': ids[id(value)]}
+            if isinstance(value, _Function):
+                return {'functionDefinitionValue': {'argumentNames': value.names, 'body': ref(value.body)}}
+            if isinstance(value, (list, tuple)):
+                return {'arrayValue': {'values': [ref(v) for v in value]}}
+            if isinstance(value, dict):
+                return {'dictionaryValue': {'values': {k: ref(v) for k, v in value.items()}}}
+            if isinstance(value, np.generic):
+                value = value.item()
+            return {'constantValue': value}
+
+        result = ref(obj)
+        return {'result': result, 'values': values}
+
+
+serializer = _Serializer()
+
+
+# ---------------------------------------------------------------------------
+# Public API classes
+# ---------------------------------------------------------------------------
+
+def _bands_arg(args: tuple) -> Any:
+    """Accept selectors as varargs strings or a single list / ee.List."""
+    if len(args) == 1:
+        return args[0]
+    return list(args)
+
+
+class Element(ComputedObject):
+    """Base of Image and Feature: property access."""
+    def set(self, *args: Any):
+        properties = args[0] if len(args) == 1 else dict(zip(args[::2], args[1::2]))
+        return type(self)._call('Element.set', object=self, properties=properties)
+
+    def get(self, property: Any) -> ComputedObject:
+        return ComputedObject._call('Element.get', object=self, property=property)
+
+    def propertyNames(self) -> 'List':
+        return List._call('Element.propertyNames', element=self)
+
+    def copyProperties(self, source: Any = None, properties: Any = None, exclude: Any = None) -> 'Element':
+        # Like the client library, the result is a plain Element: cast it with ee.Image(...) to chain image methods
+        return Element._call('Element.copyProperties', destination=self, source=source,
+                             properties=properties, exclude=exclude)
+
+
+class Image(Element):
+    """Lazy image. ee.Image(asset_id), ee.Image(number) or a cast of another object."""
+    def __init__(self, value: Any = None, args: Optional[Dict[str, Any]] = None, var_name: Optional[str] = None):
+        if isinstance(value, str) and args is None and var_name is None:
+            super().__init__('Image.load', {'id': value})
+        elif isinstance(value, (int, float)):
+            super().__init__('Image.constant', {'value': value})
+        elif isinstance(value, (list, tuple)):
+            super().__init__('Image.cat', {'images': list(value)})
+        else:
+            super().__init__(value, args, var_name)
+
+    # Band selection ----------------------------------------------------
+    def select(self, *selectors: Any, **kwargs: Any) -> 'Image':
+        names = kwargs.get('newNames', kwargs.get('opt_names'))
+        if len(selectors) == 2 and isinstance(selectors[0], (list, tuple, List)) and isinstance(selectors[1], (list, tuple, List)):
+            selectors, names = (selectors[0],), selectors[1]
+        return Image._call('Image.select', input=self, bandSelectors=_bands_arg(selectors), newNames=names)
+
+    def rename(self, *names: Any) -> 'Image':
+        return Image._call('Image.rename', input=self, names=_bands_arg(names))
+
+    def addBands(self, srcImg: Any, names: Any = None, overwrite: bool = False) -> 'Image':
+        return Image._call('Image.addBands', dstImg=self, srcImg=srcImg, names=names, overwrite=overwrite)
+
+    def bandNames(self) -> 'List':
+        return List._call('Image.bandNames', image=self)
+
+    @staticmethod
+    def cat(*images: Any) -> 'Image':
+        return Image._call('Image.cat', images=list(images[0]) if len(images) == 1 and isinstance(images[0], (list, tuple)) else list(images))
+
+    @staticmethod
+    def constant(value: Any) -> 'Image':
+        return Image._call('Image.constant', value=value)
+
+    # Masks ---------------------------------------------------------------
+    def updateMask(self, mask: Any) -> 'Image':
+        return Image._call('Image.updateMask', image=self, mask=mask)
+
+    def mask(self, mask: Any = None) -> 'Image':
+        if mask is not None:
+            return self.updateMask(mask)
+        return Image._call('Image.mask', image=self)
+
+    def unmask(self, value: Any = 0, sameFootprint: bool = True) -> 'Image':
+        return Image._call('Image.unmask', input=self, value=value)
+
+    def clip(self, geometry: Any) -> 'Image':
+        return Image._call('Image.clip', input=self, geometry=geometry)
+
+    # Distances -------------------------------------------------------------
+    def fastDistanceTransform(self, neighborhood: Any = 256, units: Any = 'pixels',
+                              metric: Any = 'squared_euclidean') -> 'Image':
+        return Image._call('Image.fastDistanceTransform', input=self, neighborhood=neighborhood, units=units,
+                           metric=metric)
+
+    def cumulativeCost(self, source: Any, maxDistance: Any, geodeticDistance: Any = True) -> 'Image':
+        return Image._call('Image.cumulativeCost', cost=self, source=source, maxDistance=maxDistance,
+                           geodeticDistance=geodeticDistance)
+
+    @staticmethod
+    def pixelArea() -> 'Image':
+        return Image._call('Image.pixelArea')
+
+    # Projections -----------------------------------------------------------
+    def reproject(self, crs: Any, crsTransform: Any = None, scale: Any = None) -> 'Image':
+        return Image._call('Image.reproject', image=self, crs=crs, crsTransform=crsTransform, scale=scale)
+
+    def reduceResolution(self, reducer: Any, bestEffort: Any = False, maxPixels: Any = 64) -> 'Image':
+        return Image._call('Image.reduceResolution', image=self, reducer=reducer, bestEffort=bestEffort,
+                           maxPixels=maxPixels)
+
+    # Pixel operations ------------------------------------------------------
+    def _binary(self, op: str, other: Any) -> 'Image':
+        return Image._call(f"Image.{op}", image1=self, image2=other)
+
+    def _unary(self, op: str) -> 'Image':
+        return Image._call(f"Image.{op}", value=self)
+
+    def add(self, other): return self._binary('add', other)
+    def subtract(self, other): return self._binary('subtract', other)
+    def multiply(self, other): return self._binary('multiply', other)
+    def divide(self, other): return self._binary('divide', other)
+    def pow(self, other): return self._binary('pow', other)
+    def max(self, other): return self._binary('max', other)
+    def min(self, other): return self._binary('min', other)
+    def bitwiseAnd(self, other): return self._binary('bitwiseAnd', other)
+    def bitwiseOr(self, other): return self._binary('bitwiseOr', other)
+    def rightShift(self, other): return self._binary('rightShift', other)
+    def leftShift(self, other): return self._binary('leftShift', other)
+    def eq(self, other): return self._binary('eq', other)
+    def neq(self, other): return self._binary('neq', other)
+    def lt(self, other): return self._binary('lt', other)
+    def lte(self, other): return self._binary('lte', other)
+    def gt(self, other): return self._binary('gt', other)
+    def gte(self, other): return self._binary('gte', other)
+    def And(self, other): return self._binary('and', other)
+    def Or(self, other): return self._binary('or', other)
+    def Not(self): return self._unary('not')
+    def abs(self): return self._unary('abs')
+    def sqrt(self): return self._unary('sqrt')
+    def log(self): return self._unary('log')
+    def exp(self): return self._unary('exp')
+    def round(self): return self._unary('round')
+    def floor(self): return self._unary('floor')
+    def ceil(self): return self._unary('ceil')
+    def byte(self): return self._unary('byte')
+    def int(self): return self._unary('int')
+    def toInt(self): return self._unary('int')
+    def uint8(self): return self._unary('byte')
+    def int16(self): return self._unary('int')
+    def float(self): return self._unary('float')
+    def toFloat(self): return self._unary('float')
+    def double(self): return self._unary('float')
+
+    def normalizedDifference(self, bandNames: Any = None) -> 'Image':
+        return Image._call('Image.normalizedDifference', input=self, bandNames=bandNames)
+
+    def remap(self, from_: Any, to: Any, defaultValue: Any = None, bandName: Any = None, **kwargs: Any) -> 'Image':
+        return Image._call('Image.remap', image=self, **{'from': kwargs.get('from', from_)}, to=to,
+                           defaultValue=defaultValue, bandName=bandName)
+
+    # Arrays --------------------------------------------------------------
+    def toArray(self, axis: int = 0) -> 'Image':
+        return Image._call('Image.toArray', image=self)
+
+    def arrayArgmax(self) -> 'Image':
+        return Image._call('Image.arrayArgmax', image=self)
+
+    def arrayGet(self, position: Any) -> 'Image':
+        return Image._call('Image.arrayGet', image=self, position=position)
+
+    def arrayReduce(self, reducer: Any, axes: Any, fieldAxis: Any = None) -> 'Image':
+        return Image._call('Image.arrayReduce', input=self, reducer=reducer, axes=axes)
+
+    # Classification and reductions ------------------------------------------
+    def classify(self, classifier: Any, outputName: str = 'classification') -> 'Image':
+        return Image._call('Image.classify', image=self, classifier=classifier, outputName=outputName)
+
+    def reduce(self, reducer: Any) -> 'Image':
+        return Image._call('Image.reduce', image=self, reducer=reducer)
+
+    def reduceRegion(self, reducer: Any, geometry: Any = None, scale: Any = None, crs: Any = None,
+                     crsTransform: Any = None, bestEffort: bool = False, maxPixels: Any = None,
+                     tileScale: Any = 1) -> 'Dictionary':
+        return Dictionary._call('Image.reduceRegion', image=self, reducer=reducer, geometry=geometry,
+                                scale=scale, bestEffort=bestEffort, maxPixels=maxPixels)
+
+    def sampleRegions(self, collection: Any, properties: Any = None, scale: Any = None, projection: Any = None,
+                      tileScale: Any = 1, geometries: bool = False) -> 'FeatureCollection':
+        return FeatureCollection._call('Image.sampleRegions', image=self, collection=collection,
+                                       properties=properties, scale=scale, geometries=geometries)
+
+    def geometry(self) -> 'Geometry':
+        return Geometry._call('Image.geometry', image=self)
+
+
+class ImageCollection(ComputedObject):
+    """Lazy image collection. ee.ImageCollection(asset_id) or from a list of images."""
+    def __init__(self, value: Any = None, args: Optional[Dict[str, Any]] = None, var_name: Optional[str] = None):
+        if isinstance(value, str) and args is None and var_name is None:
+            super().__init__('ImageCollection.load', {'id': value})
+        elif isinstance(value, (list, tuple, List)) and args is None:
+            super().__init__('ImageCollection.fromImages', {'images': value})
+        elif isinstance(value, Image):
+            super().__init__('ImageCollection.fromImages', {'images': [value]})
+        else:
+            super().__init__(value, args, var_name)
+
+    def filter(self, filter: Any) -> 'ImageCollection':
+        return ImageCollection._call('Collection.filter', collection=self, filter=filter)
+
+    def filterBounds(self, geometry: Any) -> 'ImageCollection':
+        return self.filter(Filter.bounds(geometry))
+
+    def filterDate(self, start: Any, end: Any = None) -> 'ImageCollection':
+        return self.filter(Filter.date(start, end))
+
+    def filterMetadata(self, name: str, operator: str, value: Any) -> 'ImageCollection':
+        return self.filter(Filter.metadata(name, operator, value))
+
+    def map(self, algorithm: Callable) -> 'ImageCollection':
+        return ImageCollection._call('Collection.map', collection=self, baseAlgorithm=_Function(algorithm, Image))
+
+    def select(self, *selectors: Any, **kwargs: Any) -> 'ImageCollection':
+        return self.map(lambda image: image.select(*selectors, **kwargs))
+
+    def size(self) -> 'Number':
+        return Number._call('Collection.size', collection=self)
+
+    def first(self) -> Image:
+        return Image._call('Collection.first', collection=self)
+
+    def limit(self, max: int, property: Optional[str] = None, ascending: bool = True) -> 'ImageCollection':
+        return ImageCollection._call('Collection.limit', collection=self, limit=max, key=property, ascending=ascending)
+
+    def sort(self, property: str, ascending: bool = True) -> 'ImageCollection':
+        return ImageCollection._call('Collection.limit', collection=self, limit=None, key=property, ascending=ascending)
+
+    def merge(self, other: Any) -> 'ImageCollection':
+        return ImageCollection._call('Collection.merge', collection1=self, collection2=other)
+
+    def toList(self, count: Any, offset: Any = 0) -> 'List':
+        return List._call('Collection.toList', collection=self, count=count, offset=offset)
+
+    def toBands(self) -> Image:
+        return Image._call('ImageCollection.toBands', collection=self)
+
+    def reduce(self, reducer: Any) -> Image:
+        return Image._call('ImageCollection.reduce', collection=self, reducer=reducer)
+
+    # Like Earth Engine, the shortcuts keep the input band names
+    def _reduce_keep_names(self, reducer: Any) -> Image:
+        return Image._call('ImageCollection.reduce', collection=self, reducer=reducer, keepNames=True)
+
+    def median(self) -> Image: return self._reduce_keep_names(Reducer.median())
+    def mean(self) -> Image: return self._reduce_keep_names(Reducer.mean())
+    def min(self) -> Image: return self._reduce_keep_names(Reducer.min())
+    def max(self) -> Image: return self._reduce_keep_names(Reducer.max())
+    def sum(self) -> Image: return self._reduce_keep_names(Reducer.sum())
+    def count(self) -> Image: return self._reduce_keep_names(Reducer.count())
+
+    def mosaic(self) -> Image:
+        return Image._call('ImageCollection.mosaic', collection=self)
+
+    def qualityMosaic(self, qualityBand: str) -> Image:
+        return Image._call('ImageCollection.qualityMosaic', collection=self, qualityBand=qualityBand)
+
+    @staticmethod
+    def fromImages(images: Any) -> 'ImageCollection':
+        return ImageCollection(images if isinstance(images, (list, tuple, List)) else List(images))
+
+    def aggregate_array(self, property: str) -> 'List':
+        return List._call('AggregateFeatureCollection.array', collection=self, property=property)
+
+    def aggregate_min(self, property: str): return Number._call('AggregateFeatureCollection.min', collection=self, property=property)
+    def aggregate_max(self, property: str): return Number._call('AggregateFeatureCollection.max', collection=self, property=property)
+    def aggregate_mean(self, property: str): return Number._call('AggregateFeatureCollection.mean', collection=self, property=property)
+    def aggregate_sum(self, property: str): return Number._call('AggregateFeatureCollection.sum', collection=self, property=property)
+    def aggregate_count(self, property: str): return Number._call('AggregateFeatureCollection.count', collection=self, property=property)
+
+    def aggregate_histogram(self, property: str) -> 'Dictionary':
+        return Dictionary._call('AggregateFeatureCollection.histogram', collection=self, property=property)
+
+    def distinct(self, properties: Any) -> 'ImageCollection':
+        return ImageCollection._call('Collection.distinct', collection=self, properties=properties)
+
+
+class Feature(Element):
+    """Lazy feature. ee.Feature(geometry, properties)."""
+    def __init__(self, geometry: Any = None, properties: Any = None, var_name: Optional[str] = None):
+        if isinstance(geometry, str) and geometry in _IMPLEMENTATIONS and isinstance(properties, dict) and var_name is None:
+            super().__init__(geometry, properties)
+        elif isinstance(geometry, ComputedObject) and not isinstance(geometry, Geometry) and properties is None:
+            super().__init__(geometry)
+        elif var_name is not None:
+            super().__init__(None, None, var_name)
+        else:
+            super().__init__('Feature', {'geometry': geometry, 'metadata': properties or {}})
+
+    @classmethod
+    def _call(cls, func: str, **args: Any):
+        return cls(func, args)
+
+    def geometry(self) -> 'Geometry':
+        return Geometry._call('Feature.geometry', feature=self)
+
+
+class FeatureCollection(ComputedObject):
+    """Lazy feature collection from an asset id, features, or a list of collections."""
+    def __init__(self, value: Any = None, args: Optional[Dict[str, Any]] = None, var_name: Optional[str] = None):
+        if isinstance(value, str) and args is None and var_name is None:
+            super().__init__('Collection.loadTable', {'tableId': value})
+        elif isinstance(value, (Feature, Geometry)):
+            super().__init__('Collection', {'features': [value]})
+        elif isinstance(value, (list, tuple, List)) and args is None:
+            super().__init__('Collection', {'features': value})
+        else:
+            super().__init__(value, args, var_name)
+
+    def filter(self, filter: Any) -> 'FeatureCollection':
+        return FeatureCollection._call('Collection.filter', collection=self, filter=filter)
+
+    def filterBounds(self, geometry: Any) -> 'FeatureCollection':
+        return self.filter(Filter.bounds(geometry))
+
+    def map(self, algorithm: Callable) -> 'FeatureCollection':
+        return FeatureCollection._call('Collection.map', collection=self, baseAlgorithm=_Function(algorithm, Feature))
+
+    def size(self) -> 'Number':
+        return Number._call('Collection.size', collection=self)
+
+    def first(self) -> Feature:
+        return Feature._call('Collection.first', collection=self)
+
+    def limit(self, max: int, property: Optional[str] = None, ascending: bool = True) -> 'FeatureCollection':
+        return FeatureCollection._call('Collection.limit', collection=self, limit=max, key=property, ascending=ascending)
+
+    def sort(self, property: str, ascending: bool = True) -> 'FeatureCollection':
+        return FeatureCollection._call('Collection.limit', collection=self, limit=None, key=property, ascending=ascending)
+
+    def merge(self, other: Any) -> 'FeatureCollection':
+        return FeatureCollection._call('Collection.merge', collection1=self, collection2=other)
+
+    def flatten(self) -> 'FeatureCollection':
+        return FeatureCollection._call('Collection.flatten', collection=self)
+
+    def toList(self, count: Any, offset: Any = 0) -> 'List':
+        return List._call('Collection.toList', collection=self, count=count, offset=offset)
+
+    def randomColumn(self, columnName: str = 'random', seed: int = 0, distribution: str = 'uniform') -> 'FeatureCollection':
+        return FeatureCollection._call('Collection.randomColumn', table=self, columnName=columnName, seed=seed)
+
+    def classify(self, classifier: Any, outputName: str = 'classification') -> 'FeatureCollection':
+        return FeatureCollection._call('FeatureCollection.classify', features=self, classifier=classifier, outputName=outputName)
+
+    def errorMatrix(self, actual: str, predicted: str, order: Any = None) -> 'ConfusionMatrix':
+        return ConfusionMatrix._call('Collection.errorMatrix', collection=self, actual=actual, predicted=predicted, order=order)
+
+    def geometry(self) -> 'Geometry':
+        return Geometry._call('Collection.geometry', collection=self)
+
+    def distinct(self, properties: Any) -> 'FeatureCollection':
+        return FeatureCollection._call('Collection.distinct', collection=self, properties=properties)
+
+    def aggregate_array(self, property: str) -> 'List':
+        return List._call('AggregateFeatureCollection.array', collection=self, property=property)
+
+    def aggregate_min(self, property: str): return Number._call('AggregateFeatureCollection.min', collection=self, property=property)
+    def aggregate_max(self, property: str): return Number._call('AggregateFeatureCollection.max', collection=self, property=property)
+    def aggregate_mean(self, property: str): return Number._call('AggregateFeatureCollection.mean', collection=self, property=property)
+    def aggregate_sum(self, property: str): return Number._call('AggregateFeatureCollection.sum', collection=self, property=property)
+    def aggregate_count(self, property: str): return Number._call('AggregateFeatureCollection.count', collection=self, property=property)
+
+    def aggregate_histogram(self, property: str) -> 'Dictionary':
+        return Dictionary._call('AggregateFeatureCollection.histogram', collection=self, property=property)
+
+
+class Geometry(ComputedObject):
+    """Lazy geometry, evaluated to GeoJSON."""
+    def __init__(self, value: Any = None, args: Optional[Dict[str, Any]] = None, var_name: Optional[str] = None):
+        if isinstance(value, dict) and args is None and 'type' in value:
+            super().__init__('GeometryConstructors.fromGeoJSON', {'geoJson': value})
+        else:
+            super().__init__(value, args, var_name)
+
+    @staticmethod
+    def Point(coords: Any, *args: Any) -> 'Geometry':
+        if args and isinstance(coords, (int, float)):
+            coords = [coords, args[0]]
+        return Geometry({'type': 'Point', 'coordinates': list(coords)})
+
+    @staticmethod
+    def MultiPoint(coords: Any) -> 'Geometry':
+        return Geometry({'type': 'MultiPoint', 'coordinates': [list(c) for c in coords]})
+
+    @staticmethod
+    def Rectangle(coords: Any, *args: Any) -> 'Geometry':
+        if args:
+            coords = [coords] + list(args[:3])
+        flat = list(itertools.chain.from_iterable(coords)) if coords and isinstance(coords[0], (list, tuple)) else list(coords)
+        west, south, east, north = flat
+        return Geometry({'type': 'Polygon', 'coordinates': [[[west, south], [east, south], [east, north],
+                                                             [west, north], [west, south]]]})
+
+    @staticmethod
+    def Polygon(coords: Any, *args: Any) -> 'Geometry':
+        rings = coords if coords and isinstance(coords[0][0], (list, tuple)) else [coords]
+        return Geometry({'type': 'Polygon', 'coordinates': rings})
+
+    @staticmethod
+    def MultiPolygon(coords: Any) -> 'Geometry':
+        return Geometry({'type': 'MultiPolygon', 'coordinates': coords})
+
+    def bounds(self, maxError: Any = None, proj: Any = None) -> 'Geometry':
+        return Geometry._call('Geometry.bounds', geometry=self)
+
+    def buffer(self, distance: Any, maxError: Any = None, proj: Any = None) -> 'Geometry':
+        return Geometry._call('Geometry.buffer', geometry=self, distance=distance)
+
+    def area(self, maxError: Any = None, proj: Any = None) -> 'Number':
+        return Number._call('Geometry.area', geometry=self)
+
+    def contains(self, right: Any, maxError: Any = None, proj: Any = None) -> 'Number':
+        return Number._call('Geometry.contains', left=self, right=right)
+
+
+class Filter(ComputedObject):
+    """Lazy filter, evaluated to a predicate on collection elements."""
+    @staticmethod
+    def _compare(op: str, name: Any, value: Any) -> 'Filter':
+        return Filter._call('Filter.compare', op=op, leftField=name, rightValue=value)
+
+    @staticmethod
+    def eq(name, value): return Filter._compare('eq', name, value)
+    @staticmethod
+    def neq(name, value): return Filter._compare('neq', name, value)
+    @staticmethod
+    def lt(name, value): return Filter._compare('lt', name, value)
+    @staticmethod
+    def lte(name, value): return Filter._compare('lte', name, value)
+    @staticmethod
+    def gt(name, value): return Filter._compare('gt', name, value)
+    @staticmethod
+    def gte(name, value): return Filter._compare('gte', name, value)
+
+    @staticmethod
+    def equals(leftField: Any = None, rightValue: Any = None, rightField: Any = None, leftValue: Any = None) -> 'Filter':
+        if rightField is not None:
+            # Join condition comparing a property of the primary and the secondary element
+            return Filter._call('Filter.equalsFields', leftField=leftField, rightField=rightField)
+        return Filter._compare('eq', leftField, rightValue)
+
+    @staticmethod
+    def inList(name: Any, values: Any) -> 'Filter':
+        return Filter._call('Filter.inList', leftField=name, rightValue=values)
+
+    @staticmethod
+    def notNull(properties: Any) -> 'Filter':
+        return Filter._call('Filter.notNull', properties=properties)
+
+    @staticmethod
+    def date(start: Any, end: Any = None) -> 'Filter':
+        return Filter._call('Filter.dateRangeContains', start=start, end=end)
+
+    @staticmethod
+    def calendarRange(start: Any, end: Any = None, field: str = 'day_of_year') -> 'Filter':
+        return Filter._call('Filter.calendarRange', start=start, end=end, field=field)
+
+    @staticmethod
+    def bounds(geometry: Any, errorMargin: Any = None) -> 'Filter':
+        return Filter._call('Filter.intersects', geometry=geometry)
+
+    @staticmethod
+    def metadata(name: str, operator: str, value: Any) -> 'Filter':
+        op = {'equals': 'eq', 'not_equals': 'neq', 'less_than': 'lt', 'greater_than': 'gt',
+              'not_less_than': 'gte', 'not_greater_than': 'lte'}[operator]
+        return Filter._compare(op, name, value)
+
+    @staticmethod
+    def And(*filters: Any) -> 'Filter':
+        return Filter._call('Filter.and', filters=list(filters))
+
+    @staticmethod
+    def Or(*filters: Any) -> 'Filter':
+        return Filter._call('Filter.or', filters=list(filters))
+
+    def Not(self) -> 'Filter':
+        return Filter._call('Filter.not', filter=self)
+
+
+class Reducer(ComputedObject):
+    """Lazy reducer."""
+    @staticmethod
+    def mean(): return Reducer._call('Reducer.mean')
+    @staticmethod
+    def sum(): return Reducer._call('Reducer.sum')
+    @staticmethod
+    def count(): return Reducer._call('Reducer.count')
+    @staticmethod
+    def min(): return Reducer._call('Reducer.min')
+    @staticmethod
+    def max(): return Reducer._call('Reducer.max')
+    @staticmethod
+    def median(): return Reducer._call('Reducer.median')
+    @staticmethod
+    def stdDev(): return Reducer._call('Reducer.stdDev')
+    @staticmethod
+    def minMax(): return Reducer._call('Reducer.minMax')
+
+    @staticmethod
+    def percentile(percentiles: Any, outputNames: Any = None) -> 'Reducer':
+        return Reducer._call('Reducer.percentile', percentiles=percentiles, outputNames=outputNames)
+
+    def combine(self, reducer2: Any, outputPrefix: str = '', sharedInputs: bool = False) -> 'Reducer':
+        return Reducer._call('Reducer.combine', reducer1=self, reducer2=reducer2, outputPrefix=outputPrefix)
+
+
+class Projection(ComputedObject):
+    """Lazy projection. Only the nominal scale is modelled, see Image.reproject."""
+    def __init__(self, crs: Any = None, args: Optional[Dict[str, Any]] = None, var_name: Optional[str] = None):
+        if isinstance(crs, str) and args is None and var_name is None:
+            super().__init__('Projection', {'crs': crs})
+        else:
+            super().__init__(crs, args, var_name)
+
+    def atScale(self, meters: Any) -> 'Projection':
+        return Projection._call('Projection.atScale', projection=self, meters=meters)
+
+    def nominalScale(self) -> 'Number':
+        return Number._call('Projection.nominalScale', proj=self)
+
+
+class Classifier(ComputedObject):
+    """Lazy classifier. smileRandomForest is backed by a nearest-centroid stand-in."""
+    @staticmethod
+    def smileRandomForest(numberOfTrees: Any = 100, variablesPerSplit: Any = None, minLeafPopulation: Any = 1,
+                          bagFraction: Any = 0.5, maxNodes: Any = None, seed: Any = 0) -> 'Classifier':
+        return Classifier._call('Classifier.smileRandomForest', numberOfTrees=numberOfTrees,
+                                variablesPerSplit=variablesPerSplit, minLeafPopulation=minLeafPopulation,
+                                bagFraction=bagFraction, maxNodes=maxNodes, seed=seed)
+
+    @staticmethod
+    def minimumDistance(metric: str = 'euclidean') -> 'Classifier':
+        return Classifier._call('Classifier.smileRandomForest', numberOfTrees=None, metric=metric)
+
+    def setOutputMode(self, mode: str) -> 'Classifier':
+        return Classifier._call('Classifier.setOutputMode', classifier=self, outputMode=mode)
+
+    def train(self, features: Any, classProperty: str, inputProperties: Any = None, subsampling: Any = 1,
+              subsamplingSeed: Any = 0) -> 'Classifier':
+        return Classifier._call('Classifier.train', classifier=self, features=features,
+                                classProperty=classProperty, inputProperties=inputProperties)
+
+    def explain(self) -> 'Dictionary':
+        return Dictionary._call('Classifier.explain', classifier=self)
+
+
+class ConfusionMatrix(ComputedObject):
+    """Lazy confusion matrix."""
+    def accuracy(self): return Number._call('ConfusionMatrix.accuracy', confusionMatrix=self)
+    def kappa(self): return Number._call('ConfusionMatrix.kappa', confusionMatrix=self)
+    def producersAccuracy(self): return List._call('ConfusionMatrix.producersAccuracy', confusionMatrix=self)
+    def consumersAccuracy(self): return List._call('ConfusionMatrix.consumersAccuracy', confusionMatrix=self)
+    def array(self): return List._call('ConfusionMatrix.array', confusionMatrix=self)
+
+
+class Number(ComputedObject):
+    """Lazy number."""
+    def _binary(self, op: str, other: Any) -> 'Number':
+        return Number._call(f"Number.{op}", left=self, right=other)
+
+    def _unary(self, op: str) -> 'Number':
+        return Number._call(f"Number.{op}", input=self)
+
+    def add(self, other): return self._binary('add', other)
+    def subtract(self, other): return self._binary('subtract', other)
+    def multiply(self, other): return self._binary('multiply', other)
+    def divide(self, other): return self._binary('divide', other)
+    def pow(self, other): return self._binary('pow', other)
+    def max(self, other): return self._binary('max', other)
+    def min(self, other): return self._binary('min', other)
+    def eq(self, other): return self._binary('eq', other)
+    def neq(self, other): return self._binary('neq', other)
+    def lt(self, other): return self._binary('lt', other)
+    def lte(self, other): return self._binary('lte', other)
+    def gt(self, other): return self._binary('gt', other)
+    def gte(self, other): return self._binary('gte', other)
+    def And(self, other): return self._binary('and', other)
+    def Or(self, other): return self._binary('or', other)
+    def sqrt(self): return self._unary('sqrt')
+    def ceil(self): return self._unary('ceil')
+    def floor(self): return self._unary('floor')
+    def round(self): return self._unary('round')
+    def abs(self): return self._unary('abs')
+    def log(self): return self._unary('log')
+    def exp(self): return self._unary('exp')
+    def int(self): return self._unary('int')
+    def toInt(self): return self._unary('int')
+    def float(self): return self._unary('float')
+
+    def format(self, pattern: Optional[str] = None) -> 'String':
+        return String._call('Number.format', number=self, pattern=pattern)
+
+
+class String(ComputedObject):
+    """Lazy string."""
+    def __init__(self, value: Any = None, args: Optional[Dict[str, Any]] = None, var_name: Optional[str] = None):
+        if isinstance(value, str) and args is None and var_name is None:
+            super().__init__(None, {'value': value})
+        else:
+            super().__init__(value, args, var_name)
+
+    def cat(self, other: Any) -> 'String':
+        return String._call('String.cat', string1=self, string2=other)
+
+    def length(self) -> Number:
+        return Number._call('String.length', string=self)
+
+    def replace(self, regex: Any, replacement: Any, flags: Any = None) -> 'String':
+        return String._call('String.replace', input=self, regex=regex, replacement=replacement, flags=flags)
+
+
+class List(ComputedObject):
+    """Lazy list."""
+    def size(self) -> Number:
+        return Number._call('List.size', list=self)
+
+    def length(self) -> Number:
+        return self.size()
+
+    def get(self, index: Any) -> ComputedObject:
+        return ComputedObject._call('List.get', list=self, index=index)
+
+    def map(self, baseAlgorithm: Callable) -> 'List':
+        return List._call('List.map', list=self, baseAlgorithm=_Function(baseAlgorithm))
+
+    def distinct(self) -> 'List':
+        return List._call('List.distinct', list=self)
+
+    def sort(self, keys: Any = None) -> 'List':
+        return List._call('List.sort', list=self, keys=keys)
+
+    def filter(self, filter: Any) -> 'List':
+        return List._call('List.filter', list=self, filter=filter)
+
+    def slice(self, start: Any, end: Any = None, step: Any = None) -> 'List':
+        return List._call('List.slice', list=self, start=start, end=end, step=step)
+
+    def contains(self, element: Any) -> Number:
+        return Number._call('List.contains', list=self, element=element)
+
+    def cat(self, other: Any) -> 'List':
+        return List._call('List.cat', list=self, other=other)
+
+    def add(self, element: Any) -> 'List':
+        return List._call('List.add', list=self, element=element)
+
+    def remove(self, element: Any) -> 'List':
+        return List._call('List.remove', list=self, element=element)
+
+    def reduce(self, reducer: Any) -> ComputedObject:
+        return ComputedObject._call('List.reduce', list=self, reducer=reducer)
+
+    def flatten(self) -> 'List':
+        return List._call('List.flatten', list=self)
+
+    @staticmethod
+    def sequence(start: Any, end: Any = None, step: Any = 1, count: Any = None) -> 'List':
+        return List._call('List.sequence', start=start, end=end, step=step, count=count)
+
+
+class Dictionary(ComputedObject):
+    """Lazy dictionary. ee.Dictionary({...}) evaluates every value."""
+    def __init__(self, value: Any = None, args: Optional[Dict[str, Any]] = None, var_name: Optional[str] = None):
+        if isinstance(value, dict) and args is None and var_name is None:
+            super().__init__('Dictionary', {'values': value})
+        else:
+            super().__init__(value, args, var_name)
+
+    def get(self, key: Any, defaultValue: Any = None) -> ComputedObject:
+        return ComputedObject._call('Dictionary.get', dictionary=self, key=key, defaultValue=defaultValue)
+
+    def getNumber(self, key: Any) -> Number:
+        return Number(self.get(key))
+
+    def keys(self) -> List:
+        return List._call('Dictionary.keys', dictionary=self)
+
+    def values(self, keys: Any = None) -> List:
+        return List._call('Dictionary.values', dictionary=self, keys=keys)
+
+    def set(self, key: Any, value: Any) -> 'Dictionary':
+        return Dictionary._call('Dictionary.set', dictionary=self, key=key, value=value)
+
+    def combine(self, second: Any, overwrite: bool = True) -> 'Dictionary':
+        return Dictionary._call('Dictionary.combine', first=self, second=second, overwrite=overwrite)
+
+
+class Date(ComputedObject):
+    """Lazy date, evaluated to milliseconds since epoch."""
+    def __init__(self, value: Any = None, args: Optional[Dict[str, Any]] = None, var_name: Optional[str] = None):
+        if isinstance(value, (str, int, float, datetime.datetime)) and args is None and var_name is None:
+            super().__init__('Date', {'value': value})
+        else:
+            super().__init__(value, args, var_name)
+
+    def millis(self) -> Number:
+        return Number(self)
+
+    def format(self, pattern: Optional[str] = None) -> String:
+        return String._call('Date.format', date=self, pattern=pattern)
+
+    def get(self, unit: str) -> Number:
+        return Number._call('Date.get', date=self, unit=unit)
+
+
+class Join(ComputedObject):
+    """Lazy join. Only ee.Join.saveFirst is supported."""
+    @staticmethod
+    def saveFirst(matchKey: str, ordering: Any = None, ascending: bool = True, measureKey: Any = None,
+                  outer: bool = False) -> 'Join':
+        return Join._call('Join.saveFirst', matchKey=matchKey, outer=outer)
+
+    def apply(self, primary: Any, secondary: Any, condition: Any) -> 'ImageCollection':
+        return ImageCollection._call('Join.apply', join=self, primary=primary, secondary=secondary,
+                                     condition=condition)
+
+
+class _Algorithms:
+    """ee.Algorithms subset."""
+    @staticmethod
+    def If(condition: Any, trueCase: Any, falseCase: Any = None) -> ComputedObject:
+        return ComputedObject._call('Algorithms.If', condition=condition, trueCase=trueCase, falseCase=falseCase)
+
+    @staticmethod
+    def IsEqual(left: Any, right: Any) -> Number:
+        return Number._call('Algorithms.IsEqual', left=left, right=right)
+
+
+Algorithms = _Algorithms()
+
+
+# ---------------------------------------------------------------------------
+# Evaluation of algorithms
+# ---------------------------------------------------------------------------
+
+def _properties(element: Any) -> Dict[str, Any]:
+    if isinstance(element, _ImageValue):
+        return element.properties
+    if isinstance(element, dict) and element.get('type') == 'Feature':
+        return element['properties']
+    return {'item': element}
+
+
+def _with_properties(element: Any, properties: Dict[str, Any]) -> Any:
+    if isinstance(element, _ImageValue):
+        clone = _ImageValue(element.band_names, element._loader, properties)
+        clone._arrays = element._arrays
+        return clone
+    return dict(element, properties=properties)
+
+
+@_impl('Element.set')
+def _element_set(ev, env, object, properties):
+    element = ev.evaluate(object, env)
+    props = dict(_properties(element))
+    props.update(ev.evaluate(properties, env))
+    return _with_properties(element, props)
+
+
+@_impl('Element.get')
+def _element_get(ev, env, object, property):
+    return _properties(ev.evaluate(object, env)).get(ev.evaluate(property, env))
+
+
+@_impl('Element.propertyNames')
+def _element_property_names(ev, env, element):
+    value = ev.evaluate(element, env)
+    names = list(_properties(value))
+    if isinstance(value, dict) and value.get('type') == 'Feature':
+        names.append('system:index')
+    return names
+
+
+@_impl('List.remove')
+def _list_remove(ev, env, list, element):
+    value = ev.evaluate(element, env)
+    values = ev.evaluate(list, env)
+    if value not in values:
+        return values
+    index = values.index(value)
+    return values[:index] + values[index + 1:]
+
+
+@_impl('Element.copyProperties')
+def _element_copy_properties(ev, env, destination, source, properties, exclude):
+    target = ev.evaluate(destination, env)
+    origin = _properties(ev.evaluate(source, env)) if source is not None else {}
+    names = ev.evaluate(properties, env)
+    excluded = set(ev.evaluate(exclude, env) or [])
+    props = dict(_properties(target))
+    props.update({k: v for k, v in origin.items() if (names is None or k in names) and k not in excluded})
+    return _with_properties(target, props)
+
+
+# Images ----------------------------------------------------------------------
+
+def _image(ev, env, value) -> _ImageValue:
+    result = ev.evaluate(value, env)
+    if isinstance(result, _ImageValue):
+        return result
+    if isinstance(result, (int, float)):
+        return _constant_image(result)
+    if isinstance(result, list):
+        return _concat([_image(ev, env, _Constant(v)) if not isinstance(v, _ImageValue) else v for v in result])
+    raise EEException(f"Expected an image, got {type(result).__name__}")
+
+
+def _constant_image(value: float, name: str = 'constant') -> _ImageValue:
+    backend = get_backend()
+    return _ImageValue([name], lambda: {name: np.ma.masked_array(np.full(backend.shape, float(value)),
+                                                                 mask=np.zeros(backend.shape, bool))})
+
+
+def _concat(images: Sequence[_ImageValue]) -> _ImageValue:
+    names = [n for image in images for n in image.band_names]
+    if len(set(names)) != len(names):
+        raise EEException(f"Image.cat: duplicate band names {names}")
+    first = images[0] if images else _ImageValue([], dict)
+    return first.derive(names, lambda: {n: a for image in images for n, a in image.arrays().items()})
+
+
+def _match_bands(names: Sequence[str], selectors: Sequence[str]) -> list:
+    """Band names matching selectors (names, regular expressions or indexes), in selector order."""
+    selected = []
+    for selector in selectors:
+        if isinstance(selector, (int, np.integer)):
+            matches = [names[int(selector)]]
+        else:
+            pattern = re.compile(f"^(?:{selector})$")
+            matches = [n for n in names if pattern.match(n)]
+        if not matches:
+            raise EEException(f"Image.select: Pattern '{selector}' did not match any bands.")
+        selected.extend(m for m in matches if m not in selected)
+    return selected
+
+
+@_impl('Image.load')
+def _image_load(ev, env, id):
+    value = ev.backend.load(ev.evaluate(id, env))
+    if isinstance(value, list):
+        raise EEException(f"'{id}' is an ImageCollection, not an Image.")
+    return value
+
+
+@_impl('Image.constant')
+def _image_constant(ev, env, value):
+    value = ev.evaluate(value, env)
+    if isinstance(value, list):
+        return _concat([_constant_image(v, f"constant_{i}" if i else 'constant') for i, v in enumerate(value)])
+    return _constant_image(value)
+
+
+@_impl('Image.cat')
+def _image_cat(ev, env, images):
+    return _concat([_image(ev, env, image) for image in images])
+
+
+@_impl('Image.select')
+def _image_select(ev, env, input, bandSelectors, newNames=None):
+    image = _image(ev, env, input)
+    selectors = ev.evaluate(bandSelectors, env)
+    selectors = [selectors] if isinstance(selectors, (str, int)) else selectors
+    selected = _match_bands(image.band_names, selectors)
+    names = ev.evaluate(newNames, env)
+    names = list(selected) if names is None else ([names] if isinstance(names, str) else list(names))
+    if len(names) != len(selected):
+        raise EEException("Image.select: the number of new names must match the number of selected bands.")
+    return image.derive(names, lambda: {new: image.band(old) for old, new in zip(selected, names)})
+
+
+@_impl('Image.rename')
+def _image_rename(ev, env, input, names):
+    image = _image(ev, env, input)
+    names = ev.evaluate(names, env)
+    names = [names] if isinstance(names, str) else list(names)
+    if len(names) != len(image.band_names):
+        raise EEException(f"Image.rename: expected {len(image.band_names)} names, got {len(names)}.")
+    return image.derive(names, lambda: {new: image.band(old) for old, new in zip(image.band_names, names)})
+
+
+@_impl('Image.addBands')
+def _image_add_bands(ev, env, dstImg, srcImg, names=None, overwrite=False):
+    target = _image(ev, env, dstImg)
+    source = _image(ev, env, srcImg)
+    wanted = ev.evaluate(names, env)
+    added = source.band_names if wanted is None else _match_bands(source.band_names, wanted)
+    overwrite = ev.evaluate(overwrite, env)
+    clash = [n for n in added if n in target.band_names]
+    if clash and not overwrite:
+        raise EEException(f"Image.addBands: duplicate band names {clash}")
+    result = [n for n in target.band_names] + [n for n in added if n not in target.band_names]
+
+    def compute():
+        arrays = {n: target.band(n) for n in target.band_names}
+        arrays.update({n: source.band(n) for n in added})
+        return {n: arrays[n] for n in result}
+    return target.derive(result, compute)
+
+
+@_impl('Image.bandNames')
+def _image_band_names(ev, env, image):
+    return list(_image(ev, env, image).band_names)
+
+
+def _broadcast(left: _ImageValue, right: _ImageValue):
+    """Pair bands of two images following Earth Engine rules; returns (output names, pairs)."""
+    if len(right.band_names) == 1:
+        return left.band_names, [(n, right.band_names[0]) for n in left.band_names]
+    if len(left.band_names) == 1:
+        return right.band_names, [(left.band_names[0], n) for n in right.band_names]
+    if len(left.band_names) != len(right.band_names):
+        raise EEException(f"Images must have the same number of bands, got {len(left.band_names)} and {len(right.band_names)}.")
+    return left.band_names, list(zip(left.band_names, right.band_names))
+
+
+_BINARY_OPS = {
+    'add': np.add, 'subtract': np.subtract, 'multiply': np.multiply, 'divide': np.divide,
+    'pow': np.power, 'max': np.maximum, 'min': np.minimum,
+    'bitwiseAnd': lambda a, b: (a.astype(np.int64) & b.astype(np.int64)).astype(np.float64),
+    'bitwiseOr': lambda a, b: (a.astype(np.int64) | b.astype(np.int64)).astype(np.float64),
+    'rightShift': lambda a, b: (a.astype(np.int64) >> b.astype(np.int64)).astype(np.float64),
+    'leftShift': lambda a, b: (a.astype(np.int64) << b.astype(np.int64)).astype(np.float64),
+    'eq': lambda a, b: (a == b).astype(np.float64), 'neq': lambda a, b: (a != b).astype(np.float64),
+    'lt': lambda a, b: (a < b).astype(np.float64), 'lte': lambda a, b: (a <= b).astype(np.float64),
+    'gt': lambda a, b: (a > b).astype(np.float64), 'gte': lambda a, b: (a >= b).astype(np.float64),
+    'and': lambda a, b: ((a != 0) & (b != 0)).astype(np.float64),
+    'or': lambda a, b: ((a != 0) | (b != 0)).astype(np.float64),
+}
+
+_UNARY_OPS = {
+    'not': lambda a: (a == 0).astype(np.float64), 'abs': np.abs, 'sqrt': np.sqrt, 'log': np.log, 'exp': np.exp,
+    'round': np.round, 'floor': np.floor, 'ceil': np.ceil, 'int': np.trunc, 'float': lambda a: a,
+    'byte': lambda a: np.clip(np.trunc(a), 0, 255),
+}
+
+
+def _register_binary_image_op(op: str, func: Callable) -> None:
+    def evaluate(ev, env, image1, image2):
+        left = _image(ev, env, image1)
+        right = _image(ev, env, image2)
+        names, pairs = _broadcast(left, right)
+
+        def compute():
+            arrays = {}
+            for name, (a, b) in zip(names, pairs):
+                x, y = left.band(a), right.band(b)
+                with np.errstate(all='ignore'):
+                    data = func(np.ma.getdata(x), np.ma.getdata(y))
+                mask = np.ma.getmaskarray(x) | np.ma.getmaskarray(y) | ~np.isfinite(data)
+                arrays[name] = np.ma.masked_array(data, mask=mask)
+            return arrays
+        return left.derive(names, compute)
+    _IMPLEMENTATIONS[f"Image.{op}"] = evaluate
+
+
+def _register_unary_image_op(op: str, func: Callable) -> None:
+    def evaluate(ev, env, value):
+        image = _image(ev, env, value)
+
+        def compute():
+            arrays = {}
+            for name in image.band_names:
+                x = image.band(name)
+                with np.errstate(all='ignore'):
+                    data = func(np.ma.getdata(x))
+                arrays[name] = np.ma.masked_array(data, mask=np.ma.getmaskarray(x) | ~np.isfinite(data))
+            return arrays
+        return image.derive(image.band_names, compute)
+    _IMPLEMENTATIONS[f"Image.{op}"] = evaluate
+
+
+for _op, _func in _BINARY_OPS.items():
+    _register_binary_image_op(_op, _func)
+for _op, _func in _UNARY_OPS.items():
+    _register_unary_image_op(_op, _func)
+
+
+@_impl('Image.updateMask')
+def _image_update_mask(ev, env, image, mask):
+    source = _image(ev, env, image)
+    mask_image = _image(ev, env, mask)
+    names, pairs = _broadcast(source, mask_image)
+
+    def compute():
+        arrays = {}
+        for name, (a, b) in zip(names, pairs):
+            m = mask_image.band(b)
+            hidden = np.ma.getmaskarray(m) | (np.ma.getdata(m) == 0)
+            band = source.band(a)
+            arrays[name] = np.ma.masked_array(np.ma.getdata(band), mask=np.ma.getmaskarray(band) | hidden)
+        return arrays
+    return source.derive(names, compute)
+
+
+@_impl('Image.mask')
+def _image_mask(ev, env, image):
+    source = _image(ev, env, image)
+    return source.derive(source.band_names, lambda: {
+        n: np.ma.masked_array((~np.ma.getmaskarray(a)).astype(np.float64), mask=np.zeros(a.shape, bool))
+        for n, a in source.arrays().items()
+    })
+
+
+@_impl('Image.unmask')
+def _image_unmask(ev, env, input, value=0):
+    source = _image(ev, env, input)
+    fill = ev.evaluate(value, env)
+    if isinstance(fill, _ImageValue):
+        # Masked pixels take the value (and the mask) of the first band of the fill image
+        fill_band = fill.band(fill.band_names[0])
+        return source.derive(source.band_names, lambda: {
+            n: np.ma.masked_array(np.where(np.ma.getmaskarray(a), np.ma.getdata(fill_band), np.ma.getdata(a)),
+                                  mask=np.ma.getmaskarray(a) & np.ma.getmaskarray(fill_band))
+            for n, a in source.arrays().items()
+        })
+    return source.derive(source.band_names, lambda: {
+        n: np.ma.masked_array(a.filled(fill), mask=np.zeros(a.shape, bool)) for n, a in source.arrays().items()
+    })
+
+
+@_impl('Image.clip')
+def _image_clip(ev, env, input, geometry):
+    source = _image(ev, env, input)
+    inside = _geometry_mask(_union_geometry(ev.evaluate(geometry, env)), ev.backend)
+    return source.derive(source.band_names, lambda: {
+        n: np.ma.masked_array(np.ma.getdata(a), mask=np.ma.getmaskarray(a) | ~inside.reshape(inside.shape + (1,) * (a.ndim - 2)))
+        for n, a in source.arrays().items()
+    })
+
+
+def _source_pixels(image: _ImageValue) -> np.ndarray:
+    """Unmasked non-zero pixels of the first band, the sources of the distance algorithms."""
+    band = image.band(image.band_names[0])
+    return ~np.ma.getmaskarray(band) & (np.ma.getdata(band) != 0)
+
+
+@_impl('Image.pixelArea')
+def _image_pixel_area(ev, env):
+    return _constant_image(ev.backend.pixel_size ** 2, 'area')
+
+
+@_impl('Projection')
+def _projection(ev, env, crs):
+    return {'crs': ev.evaluate(crs, env), 'scale': None}
+
+
+@_impl('Projection.atScale')
+def _projection_at_scale(ev, env, projection, meters):
+    return dict(ev.evaluate(projection, env), scale=float(ev.evaluate(meters, env)))
+
+
+@_impl('Projection.nominalScale')
+def _projection_nominal_scale(ev, env, proj):
+    return ev.evaluate(proj, env)['scale'] or ev.backend.pixel_size
+
+
+@_impl('Image.reduceResolution')
+def _image_reduce_resolution(ev, env, image, reducer, bestEffort=False, maxPixels=64):
+    # Only has an effect as the input of Image.reproject(), which applies the reducer
+    return _image(ev, env, image)
+
+
+@_impl('Image.reproject')
+def _image_reproject(ev, env, image, crs, crsTransform=None, scale=None):
+    # The backend grid has a single resolution. A coarser scale is emulated on it: the input is evaluated with
+    # neighborhoods counted in output pixels, then every block of output pixel size takes the value of its
+    # center pixel, or of the reducer of a reduceResolution() input
+    projection = ev.evaluate(crs, env)
+    scale = ev.evaluate(scale, env) or (projection.get('scale') if isinstance(projection, dict) else None)
+    factor = ev.backend.stride(scale)
+    reducer = None
+    if isinstance(image, ComputedObject) and image._func == 'Image.reduceResolution':
+        reducer = ev.evaluate(image._args['reducer'], env)
+        max_pixels = ev.evaluate(image._args.get('maxPixels', 64), env)
+        if factor ** 2 > max_pixels and not ev.evaluate(image._args.get('bestEffort', False), env):
+            raise EEException(f"Image.reduceResolution: Too many input pixels per output pixel. "
+                              f"Need {factor ** 2}, but only {max_pixels} allowed.")
+        image = image._args['image']
+    if factor == 1:
+        return _image(ev, env, image)
+    source = _image(_Evaluator(ev.backend, ev.pixel_factor * factor), env, image)
+
+    def compute():
+        rows, cols = ev.backend.shape
+        out = {}
+        for name, band in source.arrays().items():
+            data = np.pad(np.ma.filled(band.astype(float), np.nan), ((0, -rows % factor), (0, -cols % factor)),
+                          constant_values=np.nan)
+            if reducer is None:
+                values = data[factor // 2::factor, factor // 2::factor]
+            else:
+                blocks = data.reshape(data.shape[0] // factor, factor, data.shape[1] // factor, factor)
+                blocks = blocks.transpose(1, 3, 0, 2).reshape(factor * factor, *blocks.shape[::2])
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN blocks
+                    values = reducer.stack_func(blocks)[0]
+            full = np.repeat(np.repeat(values, factor, axis=0), factor, axis=1)[:rows, :cols]
+            out[name] = np.ma.masked_invalid(full)
+        return out
+    return source.derive(source.band_names, compute)
+
+
+@_impl('Image.fastDistanceTransform')
+def _image_fast_distance_transform(ev, env, input, neighborhood=256, units='pixels', metric='squared_euclidean'):
+    source = _image(ev, env, input)
+    neighborhood = float(ev.evaluate(neighborhood, env)) * ev.pixel_factor
+    metric = ev.evaluate(metric, env)
+    if metric != 'squared_euclidean':
+        raise EEException(f"Image.fastDistanceTransform: metric '{metric}' is not supported by the fake backend")
+
+    def compute():
+        # Exact squared Euclidean distance in pixels, brute force over the source pixels
+        sources = np.argwhere(_source_pixels(source))
+        rows, cols = np.indices(get_backend().shape)
+        squared = np.full(rows.shape, np.inf)
+        # Chunks of about 2**20 pixel-source pairs bound the temporary arrays on large grids
+        for chunk in np.array_split(sources, max(1, len(sources) * rows.size // 2 ** 20)) if len(sources) else []:
+            d = (rows[..., None] - chunk[:, 0]) ** 2 + (cols[..., None] - chunk[:, 1]) ** 2
+            squared = np.minimum(squared, d.min(axis=-1))
+        return {'distance': np.ma.masked_array(np.where(np.isfinite(squared), squared, 0),
+                                               mask=squared > neighborhood ** 2)}
+    return source.derive(['distance'], compute)
+
+
+@_impl('Image.cumulativeCost')
+def _image_cumulative_cost(ev, env, cost, source, maxDistance, geodeticDistance=True):
+    cost_image = _image(ev, env, cost)
+    source_image = _image(ev, env, source)
+    max_distance = float(ev.evaluate(maxDistance, env))
+
+    def compute():
+        # Dijkstra on the 8-connected pixel grid; a step costs the mean cost of its pixels times its length in
+        # meters, paths are cut at maxDistance meters
+        import heapq
+        backend = get_backend()
+        band = cost_image.band(cost_image.band_names[0])
+        values, blocked = np.ma.getdata(band), np.ma.getmaskarray(band)
+        rows, cols = backend.shape
+        total = np.full(backend.shape, np.inf)
+        heap = []
+        for r, c in np.argwhere(_source_pixels(source_image) & ~blocked):
+            total[r, c] = 0.0
+            heap.append((0.0, 0.0, int(r), int(c)))
+        heapq.heapify(heap)
+        steps = [(dr, dc, backend.pixel_size * np.hypot(dr, dc))
+                 for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc]
+        while heap:
+            d, travelled, r, c = heapq.heappop(heap)
+            if d > total[r, c]:
+                continue
+            for dr, dc, length in steps:
+                nr, nc = r + dr, c + dc
+                if 0 <= nr < rows and 0 <= nc < cols and not blocked[nr, nc]:
+                    nd = d + length * (values[r, c] + values[nr, nc]) / 2
+                    if nd < total[nr, nc] and travelled + length <= max_distance:
+                        total[nr, nc] = nd
+                        heapq.heappush(heap, (nd, travelled + length, nr, nc))
+        return {'cumulative_cost': np.ma.masked_array(np.where(np.isfinite(total), total, 0),
+                                                      mask=~np.isfinite(total))}
+    return cost_image.derive(['cumulative_cost'], compute)
+
+
+@_impl('Image.normalizedDifference')
+def _image_normalized_difference(ev, env, input, bandNames=None):
+    source = _image(ev, env, input)
+    names = ev.evaluate(bandNames, env) or source.band_names[:2]
+
+    def compute():
+        a, b = source.band(names[0]), source.band(names[1])
+        with np.errstate(all='ignore'):
+            nd = (a - b) / (a + b)
+        return {'nd': np.ma.masked_invalid(nd)}
+    return source.derive(['nd'], compute)
+
+
+@_impl('Image.remap')
+def _image_remap(ev, env, image, to, defaultValue=None, bandName=None, **kwargs):
+    source = _image(ev, env, image)
+    from_values = np.asarray(ev.evaluate(kwargs['from'], env), dtype=np.float64)
+    to_values = np.asarray(ev.evaluate(to, env), dtype=np.float64)
+    default = ev.evaluate(defaultValue, env)
+    band = ev.evaluate(bandName, env) or source.band_names[0]
+    name = 'remapped'
+
+    def compute():
+        data = np.ma.getdata(source.band(band))
+        result = np.full(data.shape, np.nan if default is None else float(default))
+        for f, t in zip(from_values, to_values):
+            result[data == f] = t
+        return {name: np.ma.masked_array(result, mask=np.ma.getmaskarray(source.band(band)) | np.isnan(result))}
+    return source.derive([name], compute)
+
+
+@_impl('Image.toArray')
+def _image_to_array(ev, env, image):
+    source = _image(ev, env, image)
+
+    def compute():
+        bands = [source.band(n) for n in source.band_names]
+        data = np.stack([np.ma.getdata(b) for b in bands], axis=-1)
+        mask = np.any(np.stack([np.ma.getmaskarray(b) for b in bands], axis=-1), axis=-1)
+        return {'array': np.ma.masked_array(data, mask=np.repeat(mask[..., None], data.shape[-1], axis=-1))}
+    return source.derive(['array'], compute)
+
+
+def _array_band(source: _ImageValue, name: str, func: Callable[[np.ndarray], np.ndarray]) -> Dict[str, np.ma.MaskedArray]:
+    band = source.band(name)
+    data = func(np.ma.getdata(band))
+    mask = np.ma.getmaskarray(band)
+    mask = mask.reshape(mask.shape[:2] + (-1,)).any(axis=-1)
+    if data.ndim == 3:
+        mask = np.repeat(mask[..., None], data.shape[-1], axis=-1)
+    return {name: np.ma.masked_array(data, mask=mask)}
+
+
+@_impl('Image.arrayArgmax')
+def _image_array_argmax(ev, env, image):
+    source = _image(ev, env, image)
+    name = source.band_names[0]
+    return source.derive([name], lambda: _array_band(source, name, lambda d: np.argmax(d, axis=-1)[..., None].astype(np.float64)))
+
+
+@_impl('Image.arrayGet')
+def _image_array_get(ev, env, image, position):
+    source = _image(ev, env, image)
+    index = ev.evaluate(position, env)
+    index = index[0] if isinstance(index, list) else index
+    name = source.band_names[0]
+    return source.derive([name], lambda: _array_band(source, name, lambda d: d[..., int(index)]))
+
+
+@_impl('Image.arrayReduce')
+def _image_array_reduce(ev, env, input, reducer, axes):
+    source = _image(ev, env, input)
+    reducer_value = ev.evaluate(reducer, env)
+    name = source.band_names[0]
+    funcs = {'max': np.max, 'min': np.min, 'mean': np.mean, 'sum': np.sum, 'median': np.median}
+    func = funcs.get(reducer_value.name)
+    if func is None:
+        raise EEException(f"arrayReduce does not support {reducer_value.name}")
+    return source.derive([name], lambda: _array_band(source, name, lambda d: func(d, axis=-1)[..., None]))
+
+
+def _feature_matrix(values: Dict[str, np.ma.MaskedArray], names: Sequence[str]):
+    data = np.stack([np.ma.getdata(values[n]) for n in names], axis=-1)
+    mask = np.any(np.stack([np.ma.getmaskarray(values[n]) for n in names], axis=-1), axis=-1)
+    return data, mask
+
+
+@_impl('Image.classify')
+def _image_classify(ev, env, image, classifier, outputName='classification'):
+    source = _image(ev, env, image)
+    model = ev.evaluate(classifier, env)
+    name = ev.evaluate(outputName, env)
+
+    def compute():
+        missing = [p for p in model.input_properties if p not in source.band_names]
+        if missing:
+            raise EEException(f"Image.classify: missing input bands {missing}")
+        data, mask = _feature_matrix(source.arrays(), model.input_properties)
+        result = np.full(mask.shape, np.nan)
+        valid = ~mask
+        if valid.any():
+            result[valid] = model.predict(data[valid])
+        return {name: np.ma.masked_array(result, mask=mask)}
+    return source.derive([name], compute, properties={})
+
+
+@_impl('Image.reduce')
+def _image_reduce(ev, env, image, reducer):
+    source = _image(ev, env, image)
+    reducer_value = ev.evaluate(reducer, env)
+    names = reducer_value.outputs
+
+    def compute():
+        data, mask = _feature_matrix(source.arrays(), source.band_names)
+        stack = np.moveaxis(np.where(mask[..., None], np.nan, data), -1, 0)
+        outputs = reducer_value.reduce_stack(stack)
+        return {n: np.ma.masked_invalid(out) for n, out in zip(names, outputs)}
+    return source.derive(names, compute)
+
+
+@_impl('Image.reduceRegion')
+def _image_reduce_region(ev, env, image, reducer, geometry=None, scale=None, bestEffort=False, maxPixels=None):
+    source = _image(ev, env, image)
+    reducer_value = ev.evaluate(reducer, env)
+    region = _geometry_mask(_union_geometry(ev.evaluate(geometry, env)), ev.backend)
+    stride = ev.backend.stride(ev.evaluate(scale, env))
+    region = region[::stride, ::stride]
+    result = {}
+    for name in source.band_names:
+        band = source.band(name)[::stride, ::stride]
+        values = np.ma.getdata(band)[region & ~np.ma.getmaskarray(band)]
+        ev.backend.count_pixels(int(region.sum()))
+        outputs = reducer_value.reduce(values)
+        if len(reducer_value.outputs) == 1:
+            result[name] = outputs[0]
+        else:
+            result.update({f"{name}_{o}": v for o, v in zip(reducer_value.outputs, outputs)})
+    return result
+
+
+@_impl('Image.sampleRegions')
+def _image_sample_regions(ev, env, image, collection, properties=None, scale=None, geometries=False):
+    source = _image(ev, env, image)
+    features = _collection(ev, env, collection)
+    keep = ev.evaluate(properties, env)
+    stride = ev.backend.stride(ev.evaluate(scale, env))
+    data, mask = _feature_matrix(source.arrays(), source.band_names)
+    samples = []
+    for feature in features:
+        if not feature.get('geometry'):
+            # Like Earth Engine, features without geometry do not cover any pixel
+            continue
+        covered = _geometry_mask(feature.get('geometry'), ev.backend)
+        if stride > 1 and covered.sum() > 1:
+            grid = np.zeros_like(covered)
+            grid[::stride, ::stride] = True
+            covered &= grid
+        rows, cols = np.nonzero(covered & ~mask)
+        ev.backend.count_pixels(len(rows) * len(source.band_names))
+        props = feature['properties'] if keep is None else {k: v for k, v in feature['properties'].items() if k in keep}
+        for r, c in zip(rows, cols):
+            values = dict(props)
+            values.update({n: float(v) for n, v in zip(source.band_names, data[r, c])})
+            point = {'type': 'Point', 'coordinates': [float(ev.backend.lon[r, c]), float(ev.backend.lat[r, c])]}
+            samples.append(_feature(point if ev.evaluate(geometries, env) else None, values,
+                                    f"{feature.get('id', '')}_{r}_{c}"))
+    return samples
+
+
+@_impl('Image.geometry')
+def _image_geometry(ev, env, image):
+    return _image(ev, env, image).properties.get('system:footprint') or ev.backend.footprint()
+
+
+# Collections -------------------------------------------------------------------
+
+def _collection(ev, env, value) -> list:
+    result = ev.evaluate(value, env)
+    if isinstance(result, list):
+        return result
+    if isinstance(result, dict) and result.get('type') == 'Feature':
+        return [result]
+    if isinstance(result, dict) and 'type' in result:
+        return [_feature(result)]
+    raise EEException(f"Expected a collection, got {type(result).__name__}")
+
+
+@_impl('ImageCollection.load')
+def _image_collection_load(ev, env, id):
+    value = ev.backend.load(ev.evaluate(id, env))
+    if not isinstance(value, list):
+        raise EEException(f"'{id}' is an Image, not an ImageCollection.")
+    return list(value)
+
+
+@_impl('ImageCollection.fromImages')
+def _image_collection_from_images(ev, env, images):
+    result = []
+    for i, image in enumerate(_collection(ev, env, images)):
+        image = image if isinstance(image, _ImageValue) else _image(ev, env, _Constant(image))
+        if 'system:index' not in image.properties:
+            image = _with_properties(image, dict(image.properties, **{'system:index': str(i)}))
+        result.append(image)
+    return result
+
+
+@_impl('Collection.loadTable')
+def _collection_load_table(ev, env, tableId):
+    value = ev.backend.load(ev.evaluate(tableId, env))
+    return [dict(f, properties=dict(f['properties'])) for f in value]
+
+
+@_impl('Collection')
+def _collection_from_features(ev, env, features):
+    result = []
+    for i, item in enumerate(ev.evaluate(features, env)):
+        if isinstance(item, dict) and item.get('type') not in ('Feature', None):
+            item = _feature(item, {}, i)
+        result.append(item)
+    return result
+
+
+@_impl('Feature')
+def _feature_constructor(ev, env, geometry, metadata):
+    geometry = _union_geometry(ev.evaluate(geometry, env))
+    return _feature(geometry, ev.evaluate(metadata, env))
+
+
+@_impl('Feature.geometry')
+def _feature_geometry(ev, env, feature):
+    return ev.evaluate(feature, env).get('geometry')
+
+
+@_impl('Collection.geometry')
+def _collection_geometry(ev, env, collection):
+    return _union_geometry(_collection(ev, env, collection))
+
+
+@_impl('Collection.filter')
+def _collection_filter(ev, env, collection, filter):
+    predicate = ev.evaluate(filter, env)
+    return [element for element in _collection(ev, env, collection) if predicate(element)]
+
+
+@_impl('Collection.map')
+def _collection_map(ev, env, collection, baseAlgorithm):
+    return [baseAlgorithm.call(ev, env, element) for element in _collection(ev, env, collection)]
+
+
+@_impl('Collection.size')
+def _collection_size(ev, env, collection):
+    return len(_collection(ev, env, collection))
+
+
+@_impl('Collection.first')
+def _collection_first(ev, env, collection):
+    elements = _collection(ev, env, collection)
+    if not elements:
+        raise EEException("Empty collection.")
+    return elements[0]
+
+
+def _sort_key(value: Any):
+    return (value is None, value if not isinstance(value, str) else 0, str(value))
+
+
+@_impl('Collection.limit')
+def _collection_limit(ev, env, collection, limit=None, key=None, ascending=True):
+    elements = _collection(ev, env, collection)
+    key = ev.evaluate(key, env)
+    if key:
+        elements = sorted(elements, key=lambda e: _sort_key(_properties(e).get(key)), reverse=not ev.evaluate(ascending, env))
+    limit = ev.evaluate(limit, env)
+    return elements[:int(limit)] if limit is not None else elements
+
+
+@_impl('Collection.merge')
+def _collection_merge(ev, env, collection1, collection2):
+    return _collection(ev, env, collection1) + _collection(ev, env, collection2)
+
+
+@_impl('Collection.flatten')
+def _collection_flatten(ev, env, collection):
+    result = []
+    for element in _collection(ev, env, collection):
+        result.extend(element if isinstance(element, list) else [element])
+    return result
+
+
+@_impl('Collection.toList')
+def _collection_to_list(ev, env, collection, count, offset=0):
+    offset = int(ev.evaluate(offset, env) or 0)
+    return _collection(ev, env, collection)[offset:offset + int(ev.evaluate(count, env))]
+
+
+@_impl('Collection.distinct')
+def _collection_distinct(ev, env, collection, properties):
+    names = ev.evaluate(properties, env)
+    names = [names] if isinstance(names, str) else names
+    seen, result = set(), []
+    for element in _collection(ev, env, collection):
+        key = tuple(json.dumps(_properties(element).get(n), default=str) for n in names)
+        if key not in seen:
+            seen.add(key)
+            result.append(element)
+    return result
+
+
+@_impl('Collection.randomColumn')
+def _collection_random_column(ev, env, table, columnName='random', seed=0):
+    elements = _collection(ev, env, table)
+    rng = np.random.default_rng(int(ev.evaluate(seed, env) or 0))
+    values = rng.uniform(size=len(elements))
+    name = ev.evaluate(columnName, env)
+    return [_with_properties(e, dict(_properties(e), **{name: float(v)})) for e, v in zip(elements, values)]
+
+
+@_impl('ImageCollection.toBands')
+def _image_collection_to_bands(ev, env, collection):
+    images = _collection(ev, env, collection)
+    names = [f"{image.properties.get('system:index', i)}_{n}" for i, image in enumerate(images) for n in image.band_names]
+    if not images:
+        return _ImageValue([], dict)
+    return images[0].derive(names, lambda: dict(zip(names, [a for image in images for a in image.arrays().values()])),
+                            properties={})
+
+
+@_impl('ImageCollection.reduce')
+def _image_collection_reduce(ev, env, collection, reducer, keepNames=False):
+    images = _collection(ev, env, collection)
+    reducer_value = ev.evaluate(reducer, env)
+    if not images:
+        return _ImageValue([], dict)
+    bands = images[0].band_names
+
+    def output_name(band: str, output: str) -> str:
+        if len(reducer_value.outputs) > 1:
+            return f"{band}_{output}"
+        return band if keepNames else f"{band}_{reducer_value.name}"
+    names = [output_name(b, o) for b in bands for o in reducer_value.outputs]
+
+    def compute():
+        arrays = {}
+        for b in bands:
+            stack = np.stack([np.ma.filled(image.band(b).astype(np.float64), np.nan) for image in images])
+            for o, out in zip(reducer_value.outputs, reducer_value.reduce_stack(stack)):
+                arrays[output_name(b, o)] = np.ma.masked_invalid(out)
+        return arrays
+    return images[0].derive(names, compute, properties={})
+
+
+@_impl('ImageCollection.mosaic')
+def _image_collection_mosaic(ev, env, collection):
+    images = _collection(ev, env, collection)
+    bands = images[0].band_names if images else []
+
+    def compute():
+        arrays = {}
+        for b in bands:
+            result = images[-1].band(b).copy()
+            for image in reversed(images[:-1]):
+                # Earlier images are placed below later ones
+                layer = image.band(b)
+                fill = np.ma.getmaskarray(result) & ~np.ma.getmaskarray(layer)
+                result[fill] = layer[fill]
+            arrays[b] = result
+        return arrays
+    return images[0].derive(bands, compute, properties={}) if images else _ImageValue([], dict)
+
+
+@_impl('ImageCollection.qualityMosaic')
+def _image_collection_quality_mosaic(ev, env, collection, qualityBand):
+    images = _collection(ev, env, collection)
+    quality_band = ev.evaluate(qualityBand, env)
+    bands = images[0].band_names if images else []
+
+    def compute():
+        quality = np.stack([np.ma.filled(image.band(quality_band).astype(np.float64), -np.inf) for image in images])
+        best = np.argmax(quality, axis=0)
+        empty = np.all(np.isneginf(quality), axis=0)
+        arrays = {}
+        for b in bands:
+            stack = np.ma.stack([image.band(b) for image in images])
+            picked = np.take_along_axis(np.ma.getdata(stack), best[None], axis=0)[0]
+            masked = np.take_along_axis(np.ma.getmaskarray(stack), best[None], axis=0)[0]
+            arrays[b] = np.ma.masked_array(picked, mask=masked | empty)
+        return arrays
+    return images[0].derive(bands, compute, properties={}) if images else _ImageValue([], dict)
+
+
+def _aggregate_values(ev, env, collection, property) -> list:
+    name = ev.evaluate(property, env)
+    return [_properties(e)[name] for e in _collection(ev, env, collection)
+            if _properties(e).get(name) is not None]
+
+
+@_impl('AggregateFeatureCollection.array')
+def _aggregate_array(ev, env, collection, property):
+    return _aggregate_values(ev, env, collection, property)
+
+
+@_impl('AggregateFeatureCollection.min')
+def _aggregate_min(ev, env, collection, property):
+    values = _aggregate_values(ev, env, collection, property)
+    return min(values) if values else None
+
+
+@_impl('AggregateFeatureCollection.max')
+def _aggregate_max(ev, env, collection, property):
+    values = _aggregate_values(ev, env, collection, property)
+    return max(values) if values else None
+
+
+@_impl('AggregateFeatureCollection.mean')
+def _aggregate_mean(ev, env, collection, property):
+    values = _aggregate_values(ev, env, collection, property)
+    return sum(values) / len(values) if values else None
+
+
+@_impl('AggregateFeatureCollection.sum')
+def _aggregate_sum(ev, env, collection, property):
+    return sum(_aggregate_values(ev, env, collection, property))
+
+
+@_impl('AggregateFeatureCollection.count')
+def _aggregate_count(ev, env, collection, property):
+    return len(_aggregate_values(ev, env, collection, property))
+
+
+@_impl('AggregateFeatureCollection.histogram')
+def _aggregate_histogram(ev, env, collection, property):
+    histogram: Dict[str, int] = {}
+    for value in _aggregate_values(ev, env, collection, property):
+        key = str(_to_json(value))
+        histogram[key] = histogram.get(key, 0) + 1
+    return histogram
+
+
+# Filters -----------------------------------------------------------------------
+
+_COMPARE = {
+    'eq': lambda a, b: a == b, 'neq': lambda a, b: a != b, 'lt': lambda a, b: a < b,
+    'lte': lambda a, b: a <= b, 'gt': lambda a, b: a > b, 'gte': lambda a, b: a >= b,
+}
+
+
+@_impl('Filter.compare')
+def _filter_compare(ev, env, op, leftField, rightValue):
+    name = ev.evaluate(leftField, env)
+    value = ev.evaluate(rightValue, env)
+    compare = _COMPARE[op]
+
+    def predicate(element):
+        prop = _properties(element).get(name)
+        if prop is None:
+            return op == 'neq'
+        try:
+            return bool(compare(prop, value))
+        except TypeError:
+            return False
+    return predicate
+
+
+@_impl('Filter.inList')
+def _filter_in_list(ev, env, leftField, rightValue):
+    name = ev.evaluate(leftField, env)
+    values = set(json.dumps(v, default=str) for v in ev.evaluate(rightValue, env))
+    return lambda element: json.dumps(_properties(element).get(name), default=str) in values
+
+
+@_impl('Filter.equalsFields')
+def _filter_equals_fields(ev, env, leftField, rightField):
+    left_name = ev.evaluate(leftField, env)
+    right_name = ev.evaluate(rightField, env)
+    return lambda primary, secondary: \
+        _properties(primary).get(left_name) == _properties(secondary).get(right_name)
+
+
+@_impl('Join.saveFirst')
+def _join_save_first(ev, env, matchKey, outer=False):
+    return {'matchKey': ev.evaluate(matchKey, env), 'outer': bool(ev.evaluate(outer, env))}
+
+
+@_impl('Join.apply')
+def _join_apply(ev, env, join, primary, secondary, condition):
+    spec = ev.evaluate(join, env)
+    matches = ev.evaluate(condition, env)
+    candidates = _collection(ev, env, secondary)
+    joined = []
+    for element in _collection(ev, env, primary):
+        match = next((other for other in candidates if matches(element, other)), None)
+        if match is not None:
+            joined.append(_with_properties(element, {**_properties(element), spec['matchKey']: match}))
+        elif spec['outer']:
+            joined.append(element)
+    return joined
+
+
+@_impl('Filter.notNull')
+def _filter_not_null(ev, env, properties):
+    names = ev.evaluate(properties, env)
+    return lambda element: all(_properties(element).get(n) is not None for n in names)
+
+
+@_impl('Filter.dateRangeContains')
+def _filter_date(ev, env, start, end=None):
+    start_ms = _parse_date(ev.evaluate(start, env))
+    end_value = ev.evaluate(end, env)
+    end_ms = _parse_date(end_value) if end_value is not None else start_ms + 1
+    return lambda element: start_ms <= (_properties(element).get('system:time_start') or -1) < end_ms
+
+
+@_impl('Filter.calendarRange')
+def _filter_calendar_range(ev, env, start, end=None, field='day_of_year'):
+    first = ev.evaluate(start, env)
+    last = ev.evaluate(end, env)
+    last = first if last is None else last
+    unit = ev.evaluate(field, env)
+
+    def predicate(element):
+        time_start = _properties(element).get('system:time_start')
+        if time_start is None:
+            return False
+        date = datetime.datetime.fromtimestamp(time_start / 1000, datetime.timezone.utc)
+        value = {'year': date.year, 'month': date.month, 'day_of_year': date.timetuple().tm_yday,
+                 'day_of_month': date.day}[unit]
+        return first <= value <= last if first <= last else (value >= first or value <= last)
+    return predicate
+
+
+@_impl('Filter.intersects')
+def _filter_intersects(ev, env, geometry):
+    box = _bbox(_union_geometry(ev.evaluate(geometry, env)))
+
+    def predicate(element):
+        if isinstance(element, _ImageValue):
+            footprint = element.properties.get('system:footprint')
+        else:
+            footprint = element.get('geometry') if isinstance(element, dict) else None
+        return _bbox_intersects(box, _bbox(footprint))
+    return predicate
+
+
+@_impl('Filter.and')
+def _filter_and(ev, env, filters):
+    predicates = [ev.evaluate(f, env) for f in filters]
+    return lambda element: all(p(element) for p in predicates)
+
+
+@_impl('Filter.or')
+def _filter_or(ev, env, filters):
+    predicates = [ev.evaluate(f, env) for f in filters]
+    return lambda element: any(p(element) for p in predicates)
+
+
+@_impl('Filter.not')
+def _filter_not(ev, env, filter):
+    predicate = ev.evaluate(filter, env)
+    return lambda element: not predicate(element)
+
+
+# Reducers ------------------------------------------------------------------------
+
+def _safe(func: Callable[[np.ndarray], float]) -> Callable[[np.ndarray], list]:
+    return lambda values: [float(func(values)) if len(values) else None]
+
+
+# name: (outputs, function of valid values, vectorized function of a NaN-padded stack)
+_REDUCERS = {
+    'mean': (['mean'], _safe(np.mean), lambda a: [np.nanmean(a, axis=0)]),
+    'sum': (['sum'], lambda v: [float(np.sum(v))],
+            lambda a: [np.where(np.all(np.isnan(a), axis=0), np.nan, np.nansum(a, axis=0))]),
+    'count': (['count'], lambda v: [int(len(v))], lambda a: [np.sum(~np.isnan(a), axis=0)]),
+    'min': (['min'], _safe(np.min), lambda a: [np.nanmin(a, axis=0)]),
+    'max': (['max'], _safe(np.max), lambda a: [np.nanmax(a, axis=0)]),
+    'median': (['median'], _safe(np.median), lambda a: [np.nanmedian(a, axis=0)]),
+    'stdDev': (['stdDev'], _safe(np.std), lambda a: [np.nanstd(a, axis=0)]),
+    'minMax': (['min', 'max'], lambda v: [float(np.min(v)), float(np.max(v))] if len(v) else [None, None],
+               lambda a: [np.nanmin(a, axis=0), np.nanmax(a, axis=0)]),
+}
+
+for _name, (_outputs, _func, _stack_func) in _REDUCERS.items():
+    _IMPLEMENTATIONS[f"Reducer.{_name}"] = (
+        lambda ev, env, _n=_name, _o=_outputs, _f=_func, _s=_stack_func: _ReducerValue(_n, _o, _f, _s))
+
+
+@_impl('Reducer.percentile')
+def _reducer_percentile(ev, env, percentiles, outputNames=None):
+    values = list(ev.evaluate(percentiles, env))
+    names = ev.evaluate(outputNames, env) or [f"p{int(p) if float(p).is_integer() else p}" for p in values]
+    return _ReducerValue('percentile', names,
+                         lambda v: [float(x) for x in np.percentile(v, values)] if len(v) else [None] * len(values),
+                         lambda a: list(np.nanpercentile(a, values, axis=0)))
+
+
+@_impl('Reducer.combine')
+def _reducer_combine(ev, env, reducer1, reducer2, outputPrefix=''):
+    first = ev.evaluate(reducer1, env)
+    second = ev.evaluate(reducer2, env)
+    prefix = ev.evaluate(outputPrefix, env) or ''
+    stack_func = None
+    if first.stack_func is not None and second.stack_func is not None:
+        stack_func = lambda a: first.stack_func(a) + second.stack_func(a)
+    return _ReducerValue('combined', first.outputs + [prefix + o for o in second.outputs],
+                         lambda v: first.func(v) + second.func(v), stack_func)
+
+
+# Classifiers and confusion matrices --------------------------------------------------
+
+@_impl('Classifier.smileRandomForest')
+def _classifier_random_forest(ev, env, **params):
+    return _ClassifierValue({k: ev.evaluate(v, env) for k, v in params.items()})
+
+
+@_impl('Classifier.setOutputMode')
+def _classifier_set_output_mode(ev, env, classifier, outputMode):
+    return ev.evaluate(classifier, env).with_mode(ev.evaluate(outputMode, env))
+
+
+@_impl('Classifier.train')
+def _classifier_train(ev, env, classifier, features, classProperty, inputProperties=None):
+    model = ev.evaluate(classifier, env)
+    samples = _collection(ev, env, features)
+    class_property = ev.evaluate(classProperty, env)
+    inputs = ev.evaluate(inputProperties, env)
+    if inputs is None:
+        inputs = [k for k in (samples[0]['properties'] if samples else {}) if k != class_property]
+    return model.train(samples, class_property, inputs)
+
+
+@_impl('Classifier.explain')
+def _classifier_explain(ev, env, classifier):
+    return ev.evaluate(classifier, env).explain()
+
+
+@_impl('FeatureCollection.classify')
+def _feature_collection_classify(ev, env, features, classifier, outputName='classification'):
+    model = ev.evaluate(classifier, env)
+    samples = _collection(ev, env, features)
+    name = ev.evaluate(outputName, env)
+    usable = [f for f in samples if all(p in f['properties'] for p in model.input_properties)]
+    if not usable:
+        return []
+    X = np.array([[float(f['properties'][p]) for p in model.input_properties] for f in usable])
+    predictions = model.predict(X)
+    return [dict(f, properties=dict(f['properties'], **{name: _to_json(p)})) for f, p in zip(usable, predictions)]
+
+
+@_impl('Collection.errorMatrix')
+def _collection_error_matrix(ev, env, collection, actual, predicted, order=None):
+    samples = _collection(ev, env, collection)
+    actual_name = ev.evaluate(actual, env)
+    predicted_name = ev.evaluate(predicted, env)
+    pairs = [(int(f['properties'][actual_name]), int(f['properties'][predicted_name])) for f in samples
+             if f['properties'].get(actual_name) is not None and f['properties'].get(predicted_name) is not None]
+    order_values = ev.evaluate(order, env)
+    if order_values is not None:
+        index = {int(v): i for i, v in enumerate(order_values)}
+        size = len(order_values)
+    else:
+        size = max([max(a, p) for a, p in pairs], default=-1) + 1
+        index = {i: i for i in range(size)}
+    matrix = np.zeros((size, size), dtype=np.int64)
+    for a, p in pairs:
+        if a in index and p in index:
+            matrix[index[a], index[p]] += 1
+    return _ConfusionValue(matrix)
+
+
+@_impl('ConfusionMatrix.accuracy')
+def _cm_accuracy(ev, env, confusionMatrix):
+    return ev.evaluate(confusionMatrix, env).accuracy()
+
+
+@_impl('ConfusionMatrix.kappa')
+def _cm_kappa(ev, env, confusionMatrix):
+    return ev.evaluate(confusionMatrix, env).kappa()
+
+
+@_impl('ConfusionMatrix.producersAccuracy')
+def _cm_producers(ev, env, confusionMatrix):
+    return ev.evaluate(confusionMatrix, env).producers()
+
+
+@_impl('ConfusionMatrix.consumersAccuracy')
+def _cm_consumers(ev, env, confusionMatrix):
+    return ev.evaluate(confusionMatrix, env).consumers()
+
+
+@_impl('ConfusionMatrix.array')
+def _cm_array(ev, env, confusionMatrix):
+    return ev.evaluate(confusionMatrix, env).matrix.tolist()
+
+
+# Numbers, strings, lists, dictionaries, dates ----------------------------------------
+
+_NUMBER_BINARY = {
+    'add': lambda a, b: a + b, 'subtract': lambda a, b: a - b, 'multiply': lambda a, b: a * b,
+    'divide': lambda a, b: a / b if b else 0, 'pow': lambda a, b: a ** b,
+    'max': max, 'min': min, 'eq': lambda a, b: int(a == b), 'neq': lambda a, b: int(a != b),
+    'lt': lambda a, b: int(a < b), 'lte': lambda a, b: int(a <= b), 'gt': lambda a, b: int(a > b),
+    'gte': lambda a, b: int(a >= b), 'and': lambda a, b: int(bool(a) and bool(b)),
+    'or': lambda a, b: int(bool(a) or bool(b)),
+}
+
+_NUMBER_UNARY = {
+    'sqrt': lambda a: float(np.sqrt(a)), 'ceil': lambda a: int(np.ceil(a)), 'floor': lambda a: int(np.floor(a)),
+    'round': lambda a: int(np.round(a)), 'abs': abs, 'log': lambda a: float(np.log(a)),
+    'exp': lambda a: float(np.exp(a)), 'int': int, 'float': float,
+}
+
+for _op, _func in _NUMBER_BINARY.items():
+    _IMPLEMENTATIONS[f"Number.{_op}"] = (
+        lambda ev, env, left, right, _f=_func: _f(ev.evaluate(left, env), ev.evaluate(right, env)))
+for _op, _func in _NUMBER_UNARY.items():
+    _IMPLEMENTATIONS[f"Number.{_op}"] = lambda ev, env, input, _f=_func: _f(ev.evaluate(input, env))
+
+
+@_impl('Number.format')
+def _number_format(ev, env, number, pattern=None):
+    value = ev.evaluate(number, env)
+    pattern = ev.evaluate(pattern, env)
+    return pattern % value if pattern else (str(int(value)) if float(value).is_integer() else str(value))
+
+
+@_impl('String.cat')
+def _string_cat(ev, env, string1, string2):
+    return f"{ev.evaluate(string1, env)}{ev.evaluate(string2, env)}"
+
+
+@_impl('String.length')
+def _string_length(ev, env, string):
+    return len(ev.evaluate(string, env))
+
+
+@_impl('String.replace')
+def _string_replace(ev, env, input, regex, replacement, flags=None):
+    count = 0 if 'g' in (ev.evaluate(flags, env) or '') else 1
+    return re.sub(ev.evaluate(regex, env), ev.evaluate(replacement, env), ev.evaluate(input, env), count=count)
+
+
+@_impl('List.size')
+def _list_size(ev, env, list):
+    return len(ev.evaluate(list, env))
+
+
+@_impl('List.get')
+def _list_get(ev, env, list, index):
+    return ev.evaluate(list, env)[int(ev.evaluate(index, env))]
+
+
+@_impl('List.map')
+def _list_map(ev, env, list, baseAlgorithm):
+    return [baseAlgorithm.call(ev, env, item) for item in ev.evaluate(list, env)]
+
+
+@_impl('List.distinct')
+def _list_distinct(ev, env, list):
+    seen, result = set(), []
+    for item in ev.evaluate(list, env):
+        key = json.dumps(_to_json(item), default=str, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            result.append(item)
+    return result
+
+
+@_impl('List.sort')
+def _list_sort(ev, env, list, keys=None):
+    items = ev.evaluate(list, env)
+    sort_keys = ev.evaluate(keys, env)
+    if sort_keys is None:
+        return sorted(items, key=_sort_key)
+    return [item for _, item in sorted(zip(sort_keys, items), key=lambda pair: _sort_key(pair[0]))]
+
+
+@_impl('List.filter')
+def _list_filter(ev, env, list, filter):
+    predicate = ev.evaluate(filter, env)
+    return [item for item in ev.evaluate(list, env) if predicate(item)]
+
+
+@_impl('List.slice')
+def _list_slice(ev, env, list, start, end=None, step=None):
+    items = ev.evaluate(list, env)
+    return items[ev.evaluate(start, env):ev.evaluate(end, env):ev.evaluate(step, env)]
+
+
+@_impl('List.contains')
+def _list_contains(ev, env, list, element):
+    return ev.evaluate(element, env) in ev.evaluate(list, env)
+
+
+@_impl('List.cat')
+def _list_cat(ev, env, list, other):
+    return ev.evaluate(list, env) + ev.evaluate(other, env)
+
+
+@_impl('List.add')
+def _list_add(ev, env, list, element):
+    return ev.evaluate(list, env) + [ev.evaluate(element, env)]
+
+
+@_impl('List.flatten')
+def _list_flatten(ev, env, list):
+    def flat(items):
+        for item in items:
+            if isinstance(item, (tuple, type([]))):
+                yield from flat(item)
+            else:
+                yield item
+    return [x for x in flat(ev.evaluate(list, env))]
+
+
+@_impl('List.reduce')
+def _list_reduce(ev, env, list, reducer):
+    reducer_value = ev.evaluate(reducer, env)
+    outputs = reducer_value.reduce(np.asarray(ev.evaluate(list, env), dtype=np.float64))
+    return outputs[0] if len(outputs) == 1 else dict(zip(reducer_value.outputs, outputs))
+
+
+@_impl('List.sequence')
+def _list_sequence(ev, env, start, end=None, step=1, count=None):
+    start, end, step, count = (ev.evaluate(v, env) for v in (start, end, step, count))
+    if count is not None:
+        return [start + i * step for i in range(int(count))]
+    values = []
+    value = start
+    while value <= end:
+        values.append(value)
+        value += step
+    return values
+
+
+@_impl('Dictionary')
+def _dictionary(ev, env, values):
+    return ev.evaluate(values, env)
+
+
+@_impl('Dictionary.get')
+def _dictionary_get(ev, env, dictionary, key, defaultValue=None):
+    values = ev.evaluate(dictionary, env)
+    name = ev.evaluate(key, env)
+    if name not in values and defaultValue is None:
+        raise EEException(f"Dictionary.get: Dictionary does not contain key: {name}.")
+    return values.get(name, ev.evaluate(defaultValue, env))
+
+
+@_impl('Dictionary.keys')
+def _dictionary_keys(ev, env, dictionary):
+    return sorted(ev.evaluate(dictionary, env))
+
+
+@_impl('Dictionary.values')
+def _dictionary_values(ev, env, dictionary, keys=None):
+    values = ev.evaluate(dictionary, env)
+    names = ev.evaluate(keys, env) or sorted(values)
+    return [values[k] for k in names]
+
+
+@_impl('Dictionary.set')
+def _dictionary_set(ev, env, dictionary, key, value):
+    return dict(ev.evaluate(dictionary, env), **{ev.evaluate(key, env): ev.evaluate(value, env)})
+
+
+@_impl('Dictionary.combine')
+def _dictionary_combine(ev, env, first, second, overwrite=True):
+    a, b = ev.evaluate(first, env), ev.evaluate(second, env)
+    return dict(a, **b) if ev.evaluate(overwrite, env) else dict(b, **a)
+
+
+@_impl('Date')
+def _date(ev, env, value):
+    return _parse_date(ev.evaluate(value, env))
+
+
+@_impl('Date.format')
+def _date_format(ev, env, date, pattern=None):
+    moment = datetime.datetime.fromtimestamp(ev.evaluate(date, env) / 1000, datetime.timezone.utc)
+    pattern = ev.evaluate(pattern, env) or "yyyy-MM-dd'T'HH:mm:ss"
+    for token, fmt in (('yyyy', '%Y'), ('MM', '%m'), ('dd', '%d'), ('HH', '%H'), ('mm', '%M'), ('ss', '%S')):
+        pattern = pattern.replace(token, fmt)
+    return moment.strftime(pattern.replace("'", ''))
+
+
+@_impl('Date.get')
+def _date_get(ev, env, date, unit):
+    moment = datetime.datetime.fromtimestamp(ev.evaluate(date, env) / 1000, datetime.timezone.utc)
+    return getattr(moment, ev.evaluate(unit, env))
+
+
+@_impl('Algorithms.If')
+def _algorithms_if(ev, env, condition, trueCase, falseCase=None):
+    return ev.evaluate(trueCase if ev.evaluate(condition, env) else falseCase, env)
+
+
+@_impl('Algorithms.IsEqual')
+def _algorithms_is_equal(ev, env, left, right):
+    return int(_to_json(ev.evaluate(left, env)) == _to_json(ev.evaluate(right, env)))
+
+
+@_impl('GeometryConstructors.fromGeoJSON')
+def _geometry_from_geojson(ev, env, geoJson):
+    return ev.evaluate(geoJson, env)
+
+
+@_impl('Geometry.bounds')
+def _geometry_bounds(ev, env, geometry):
+    box = _bbox(_union_geometry(ev.evaluate(geometry, env)))
+    west, south, east, north = box
+    return {'type': 'Polygon', 'coordinates': [[[west, south], [east, south], [east, north], [west, north], [west, south]]]}
+
+
+@_impl('Geometry.buffer')
+def _geometry_buffer(ev, env, geometry, distance):
+    box = _bbox(_union_geometry(ev.evaluate(geometry, env)))
+    pad = float(ev.evaluate(distance, env)) / 111320.0
+    west, south, east, north = box[0] - pad, box[1] - pad, box[2] + pad, box[3] + pad
+    return {'type': 'Polygon', 'coordinates': [[[west, south], [east, south], [east, north], [west, north], [west, south]]]}
+
+
+@_impl('Geometry.area')
+def _geometry_area(ev, env, geometry):
+    mask = _geometry_mask(_union_geometry(ev.evaluate(geometry, env)), ev.backend)
+    return float(mask.sum() * ev.backend.pixel_size ** 2)
+
+
+@_impl('Geometry.contains')
+def _geometry_contains(ev, env, left, right):
+    # Bounding box containment, exact for the rectangular footprints of the fake
+    outer = _bbox(_union_geometry(ev.evaluate(left, env)))
+    inner = _bbox(_union_geometry(ev.evaluate(right, env)))
+    if outer is None or inner is None:
+        return 0
+    return int(outer[0] <= inner[0] and outer[1] <= inner[1] and outer[2] >= inner[2] and outer[3] >= inner[3])
+
+
+# ---------------------------------------------------------------------------
+# Batch tasks
+# ---------------------------------------------------------------------------
+
+class FakeTaskService:
+    """
+    Local stand-in for Earth Engine batch tasks.
+
+    A started task advances one state per status request (READY, RUNNING, then
+    COMPLETED after ``polls_to_complete`` requests). On completion an image exported
+    to an asset is evaluated and registered in the backend, so ``ee.Image(asset_id)``
+    loads it; Drive and Cloud Storage exports are recorded in ``outputs``.
+
+    Parameters
+    ----------
+    backend : FakeBackend
+        Backend receiving the exported assets.
+    polls_to_complete : int
+        Status requests before a task completes.
+    fail : callable, optional
+        ``fail(config)`` returning an error message fails the task, e.g. to test retries.
+    """
+    def __init__(self, backend: 'FakeBackend', polls_to_complete: int = 2,
+                 fail: Optional[Callable[[Dict[str, Any]], Optional[str]]] = None):
+        self.backend = backend
+        self.polls_to_complete = polls_to_complete
+        self.fail = fail
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+        self.outputs: Dict[str, Any] = {}
+        self.started = 0
+        self.status_requests = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def start(self, task_type: str, config: Dict[str, Any]) -> str:
+        with self._lock:
+            task_id = f"FAKETASK{next(self._ids):06d}"
+            self.tasks[task_id] = {'id': task_id, 'task_type': task_type, 'config': config, 'state': 'READY',
+                                   'description': config.get('description', ''), 'polls': 0}
+            self.started += 1
+            return task_id
+
+    def cancel(self, task_id: str) -> None:
+        with self._lock:
+            task = self.tasks[task_id]
+            if task['state'] in ('READY', 'RUNNING'):
+                task['state'] = 'CANCELLED'
+
+    def status(self, task_id: str) -> Dict[str, Any]:
+        with self._lock:
+            self.status_requests += 1
+            task = self.tasks.get(task_id)
+            if task is None:
+                return {'id': task_id, 'state': 'UNKNOWN'}
+            if task['state'] in ('READY', 'RUNNING'):
+                task['polls'] += 1
+                if task['polls'] >= self.polls_to_complete:
+                    self._finish(task)
+                else:
+                    task['state'] = 'RUNNING'
+            status = {'id': task_id, 'state': task['state'], 'description': task['description'],
+                      'task_type': task['task_type']}
+            if task.get('error_message'):
+                status['error_message'] = task['error_message']
+            return status
+
+    def _finish(self, task: Dict[str, Any]) -> None:
+        config = task['config']
+        error = self.fail(config) if self.fail else None
+        if error:
+            task['state'], task['error_message'] = 'FAILED', error
+            return
+        value = _Evaluator(self.backend).evaluate(config['element'], {})
+        if isinstance(value, _ImageValue):
+            value.arrays()
+        if config.get('assetId'):
+            self.backend.assets[config['assetId']] = value
+        else:
+            self.outputs[config.get('fileNamePrefix') or config['description']] = value
+        task['state'] = 'COMPLETED'
+
+
+class _Task:
+    """ee.batch.Task subset."""
+    def __init__(self, task_type: str, config: Dict[str, Any]):
+        self.task_type = task_type
+        self.config = config
+        self.id: Optional[str] = None
+
+    def start(self) -> None:
+        self.id = get_backend().tasks.start(self.task_type, self.config)
+
+    def status(self) -> Dict[str, Any]:
+        if self.id is None:
+            return {'state': 'UNSUBMITTED', 'description': self.config.get('description', '')}
+        return get_backend().tasks.status(self.id)
+
+    def cancel(self) -> None:
+        get_backend().tasks.cancel(self.id)
+
+    def active(self) -> bool:
+        return self.status()['state'] in ('READY', 'RUNNING')
+
+
+def _export(task_type: str, element_key: str, destination: Dict[str, str]):
+    def export(*args: Any, **kwargs: Any) -> _Task:
+        config = dict(zip([element_key, 'description'], args), **kwargs)
+        config.setdefault('description', 'myExportTask')
+        config['element'] = config.pop(element_key)
+        config.update({k: v for k, v in destination.items() if k not in config})
+        return _Task(task_type, config)
+    return staticmethod(export)
+
+
+class batch:
+    """ee.batch subset: image and table exports to assets, Drive and Cloud Storage."""
+    Task = _Task
+
+    class Export:
+        class image:
+            toAsset = _export('EXPORT_IMAGE', 'image', {})
+            toDrive = _export('EXPORT_IMAGE', 'image', {'driveFolder': ''})
+            toCloudStorage = _export('EXPORT_IMAGE', 'image', {'bucket': ''})
+
+        class table:
+            toAsset = _export('EXPORT_FEATURES', 'collection', {})
+            toDrive = _export('EXPORT_FEATURES', 'collection', {'driveFolder': ''})
+            toCloudStorage = _export('EXPORT_FEATURES', 'collection', {'bucket': ''})
+
+
+# ---------------------------------------------------------------------------
+# Installation as the ee module
+# ---------------------------------------------------------------------------
+
+class _Data:
+    """ee.data subset."""
+    _cloud_api_user_project = 'fake-project'
+    _credentials = None
+
+    @staticmethod
+    def setCloudApiUserProject(project: str) -> None:
+        _Data._cloud_api_user_project = project
+
+    @staticmethod
+    def getAssetRoots() -> list:
+        return []
+
+    @staticmethod
+    def getAsset(asset_id: str) -> Dict[str, Any]:
+        value = get_backend().assets.get(asset_id)
+        if value is None:
+            raise EEException(f"Asset '{asset_id}' not found.")
+        kind = 'IMAGE' if isinstance(value, _ImageValue) else 'TABLE'
+        return {'type': kind, 'name': asset_id, 'id': asset_id}
+
+    @staticmethod
+    def listAssets(params: Dict[str, Any]) -> Dict[str, Any]:
+        parent = params.get('parent', '').rstrip('/') + '/'
+        return {'assets': [_Data.getAsset(asset_id) for asset_id in sorted(get_backend().assets)
+                           if asset_id.startswith(parent) and '/' not in asset_id[len(parent):]]}
+
+    @staticmethod
+    def deleteAsset(asset_id: str) -> None:
+        if get_backend().assets.pop(asset_id, None) is None:
+            raise EEException(f"Asset '{asset_id}' not found.")
+
+    @staticmethod
+    def getTaskStatus(task_id: Any) -> list:
+        ids = task_id if isinstance(task_id, (list, tuple)) else [task_id]
+        return [get_backend().tasks.status(i) for i in ids]
+
+    @staticmethod
+    def cancelTask(task_id: str) -> None:
+        get_backend().tasks.cancel(task_id)
+
+
+class ServiceAccountCredentials:
+    """Stand-in for ee.ServiceAccountCredentials."""
+    def __init__(self, email: Optional[str] = None, key_file: Optional[str] = None, key_data: Optional[str] = None):
+        self.email = email
+        self.key_file = key_file
+
+
+def Initialize(credentials: Any = None, project: Optional[str] = None, **kwargs: Any) -> None:
+    """No-op replacement of ee.Initialize, records the project."""
+    if project:
+        _Data._cloud_api_user_project = project
+    _Data._credentials = credentials
+
+
+def Authenticate(*args: Any, **kwargs: Any) -> bool:
+    """No-op replacement of ee.Authenticate."""
+    return True
+
+
+def _build_module(backend: FakeBackend) -> types.ModuleType:
+    module = types.ModuleType('ee')
+    module.__doc__ = 'Fake Earth Engine module installed by epistemx.fake_ee'
+    module.__version__ = 'fake'
+    module.__path__ = []
+    api = {
+        'ComputedObject': ComputedObject, 'Element': Element, 'Image': Image, 'ImageCollection': ImageCollection,
+        'Feature': Feature, 'FeatureCollection': FeatureCollection, 'Geometry': Geometry, 'Filter': Filter,
+        'Reducer': Reducer, 'Projection': Projection, 'Classifier': Classifier, 'ConfusionMatrix': ConfusionMatrix, 'Number': Number,
+        'String': String, 'List': List, 'Dictionary': Dictionary, 'Date': Date, 'Algorithms': Algorithms, 'Join': Join,
+        'EEException': EEException, 'Initialize': Initialize, 'Authenticate': Authenticate,
+        'ServiceAccountCredentials': ServiceAccountCredentials, 'serializer': serializer, 'data': _Data,
+        'batch': batch,
+    }
+    for name, value in api.items():
+        setattr(module, name, value)
+    module.fake_backend = backend
+    return module
+
+
+def install(backend: Optional[FakeBackend] = None) -> FakeBackend:
+    """
+    Replace the ``ee`` module by the fake backend.
+
+    ``sys.modules['ee']`` and the ``ee`` attribute of every imported epistemx module
+    are replaced, so both new imports and already imported modules use the fake.
+
+    Parameters
+    ----------
+    backend : FakeBackend, optional
+        Backend to install. Defaults to a new ``FakeBackend()``.
+
+    Returns
+    -------
+    FakeBackend
+        The installed backend, holding the counters.
+    """
+    global _backend
+    _backend = backend or FakeBackend()
+    module = _build_module(_backend)
+    if 'ee' not in _saved_modules:
+        _saved_modules['ee'] = sys.modules.get('ee')
+    sys.modules['ee'] = module
+    for name, loaded in list(sys.modules.items()):
+        if name.startswith('epistemx') and loaded is not None and hasattr(loaded, 'ee') and name != __name__:
+            setattr(loaded, 'ee', module)
+    logger.info("Fake Earth Engine backend installed")
+    return _backend
+
+
+def uninstall() -> None:
+    """Restore the real ``ee`` module in sys.modules and in imported epistemx modules."""
+    global _backend
+    original = _saved_modules.pop('ee', None)
+    if original is None:
+        sys.modules.pop('ee', None)
+    else:
+        sys.modules['ee'] = original
+    for name, loaded in list(sys.modules.items()):
+        if name.startswith('epistemx') and loaded is not None and name != __name__ and \
+                isinstance(getattr(loaded, 'ee', None), types.ModuleType) and hasattr(loaded.ee, 'fake_backend'):
+            if original is None:
+                delattr(loaded, 'ee')
+            else:
+                setattr(loaded, 'ee', original)
+    _backend = None
+    logger.info("Fake Earth Engine backend uninstalled")
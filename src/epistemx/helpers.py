@@ -1,5 +1,8 @@
 import ee
+import math
 from .ee_config import ensure_ee_initialized
+from .asset_cache import resolve_asset_cache
+from .ee_fetch import get_info
 
 # Do not initialize Earth Engine at import time. Initialize when functions are called.
 
@@ -27,13 +30,20 @@ def get_aoi_from_gaul(country="Indonesia", province="Sumatera Selatan"):
     return aoi_fc.geometry()
 
 #############################  Terrain Metric ###########################
-def get_terrain(aoi):
+def get_terrain(aoi, asset_cache=None):
     """
     Return stacked terrain metric, consist of elevation, slope, and aspect data. Further development should used the 
     Indonesian National DEM (DEMNAS), which has higher spatial resolution.
     More data to add:
     1. Global ALOS Landforms (https://developers.google.com/earth-engine/datasets/catalog/CSP_ERGo_1_0_Global_ALOS_landforms#bands)
+        Parameters:
+        aoi (ee.Geometry): Area of interest.
+        asset_cache (asset_cache.AssetCache or bool): Export the stack once and reuse the asset.
+            True uses the default cache (see asset_cache.configure_asset_cache). Default: None (no cache).
     """
+    cache = resolve_asset_cache(asset_cache)
+    if cache is not None:
+        return cache.get_or_create('terrain', lambda: get_terrain(aoi), aoi)
     dem = ee.Image("NASA/NASADEM_HGT/001").select('elevation').clip(aoi)
     #Units are degrees, range is [0,90).
     slope = ee.Terrain.slope(dem).rename('slope')
@@ -44,24 +54,126 @@ def get_terrain(aoi):
     return terrain_metric
 
 ############################# Distance Metric ###########################
-def distance_metric_stack(aoi, max_dist = 500000, in_meters = False):
+DISTANCE_METHODS = ('cumulative_cost', 'distance_transform')
+#Largest fastDistanceTransform neighborhood in pixels, further distances come from coarser pyramid levels
+DISTANCE_TRANSFORM_NEIGHBORHOOD = 256
+#Coarsening between two pyramid levels, and the largest coarsening of a level relative to scale
+#(reduceResolution reads at most 65536, i.e. 256 x 256, input pixels per output pixel)
+PYRAMID_STEP = 8
+MAX_PYRAMID_FACTOR = 256
+
+def _distance_cost(in_meters):
+    #This script is used when in_meters option are set to True. 
+    #However, original script indicate that this process required more computation time
+    if in_meters:
+        return ee.Image.pixelArea().sqrt() 
+    #distance in pixel unit, effective storage use
+    return ee.Image(1)
+
+def _distance_transform_meters(source_mask, neighborhood):
+    #Euclidean distance to the nearest source in meters, masked beyond the neighborhood (in pixels)
+    pixels = source_mask.fastDistanceTransform(neighborhood, 'pixels', 'squared_euclidean').sqrt()
+    return pixels.updateMask(pixels.lte(neighborhood)).multiply(ee.Image.pixelArea().sqrt())
+
+def distance_image(source_mask, max_dist=500000, in_meters=False, method='cumulative_cost', scale=30,
+                   max_neighborhood=DISTANCE_TRANSFORM_NEIGHBORHOOD):
+    """
+    Distance from every pixel to the nearest source pixel, with a uniform cost surface.
+        Parameters:
+        source_mask (ee.Image): Binary mask, non-zero pixels are the sources (starting locations).
+        max_dist (float): Max distance in meters, pixels further away are masked.
+        in_meters (bool): Cost surface of distance_metric_stack, pixel side (True) or 1 (False).
+        method (str): 'cumulative_cost' (ee.Image.cumulativeCost) or 'distance_transform'.
+            With a uniform cost, the cumulative cost is the cost times the distance in meters,
+            so 'distance_transform' computes the Euclidean distance with fastDistanceTransform
+            (one pass instead of an iterative graph search) and scales it by the pixel side
+            and the cost. The results agree up to the path discretization of cumulativeCost
+            (8-connected, a few percent), see validate_distance_transform.
+        scale (float): Pixel size in meters at which the stack is computed ('distance_transform' only).
+        max_neighborhood (int): Largest fastDistanceTransform neighborhood in pixels ('distance_transform' only).
+            Within max_neighborhood * scale meters of a source the distance is computed at scale.
+            Beyond it, up to max_dist, it comes from pyramid levels PYRAMID_STEP times coarser each,
+            with max-pooled sources, so a level is off by up to one of its pixels, at most
+            PYRAMID_STEP / max_neighborhood (about 3 %) of the distances it covers.
+            With the defaults (500 km at 30 m, 256 pixels): 7.68 km at 30 m, 61 km at 240 m,
+            491 km at 1920 m and the rest at 1980 m.
+    Raises:
+        ValueError: If max_dist needs a pyramid level more than MAX_PYRAMID_FACTOR times coarser than scale.
+    """
+    if method not in DISTANCE_METHODS:
+        raise ValueError(f"method must be one of: {list(DISTANCE_METHODS)}")
+    cost_image = _distance_cost(in_meters)
+    if method == 'cumulative_cost':
+        return cost_image.cumulativeCost(source_mask, max_dist)
+    neighborhood = min(int(max_dist // scale) + 1, max_neighborhood)
+    meters = _distance_transform_meters(source_mask, neighborhood)
+    coarsest = math.ceil(max_dist / (neighborhood * scale))
+    if coarsest > MAX_PYRAMID_FACTOR:
+        raise ValueError(f"max_dist of {max_dist} m needs a pyramid level {coarsest} times coarser than "
+                         f"{scale} m (at most {MAX_PYRAMID_FACTOR}), increase scale or lower max_dist")
+    #Far field: the same transform on coarser grids, each expression is computed in the projection of its level
+    sources = source_mask.unmask(0).gt(0).reproject(ee.Projection('EPSG:3857').atScale(scale))
+    factor = 1
+    while factor < coarsest:
+        factor = min(factor * PYRAMID_STEP, coarsest)
+        level = ee.Projection('EPSG:3857').atScale(factor * scale)
+        level_sources = sources.reduceResolution(ee.Reducer.max(), maxPixels=factor ** 2).reproject(level)
+        meters = meters.unmask(_distance_transform_meters(level_sources, neighborhood).reproject(level))
+    return meters.multiply(cost_image).updateMask(meters.lte(max_dist)).rename('cumulative_cost')
+
+def validate_distance_transform(source_mask, region, max_dist=500000, in_meters=False, scale=30, tolerance=0.1,
+                                max_neighborhood=DISTANCE_TRANSFORM_NEIGHBORHOOD):
+    """
+    Compare the 'distance_transform' and 'cumulative_cost' distances of a source mask.
+        Parameters:
+        source_mask (ee.Image): Binary mask of the sources, e.g. roads rasterized over a test area.
+        region (ee.Geometry): Region of the comparison, small enough for cumulativeCost.
+        max_dist, in_meters, scale, max_neighborhood: Same as distance_image.
+        tolerance (float): Maximum mean absolute difference, relative to the mean cumulativeCost distance.
+    Returns:
+        dict: 'mean_abs_error', 'max_abs_error', 'mean_distance', 'relative_error' and
+            'within_tolerance' (one getInfo call).
+    """
+    reference = distance_image(source_mask, max_dist, in_meters, 'cumulative_cost')
+    fast = distance_image(source_mask, max_dist, in_meters, 'distance_transform', scale, max_neighborhood)
+    error = fast.subtract(reference).abs()
+    stats = get_info(ee.Dictionary({
+        'mean_abs_error': error.reduceRegion(ee.Reducer.mean(), region, scale).get('cumulative_cost'),
+        'max_abs_error': error.reduceRegion(ee.Reducer.max(), region, scale).get('cumulative_cost'),
+        'mean_distance': reference.reduceRegion(ee.Reducer.mean(), region, scale).get('cumulative_cost'),
+    }))
+    if stats['mean_distance'] is None:
+        raise ValueError("No pixel of the region is within max_dist of a source")
+    stats['relative_error'] = stats['mean_abs_error'] / stats['mean_distance'] if stats['mean_distance'] else 0.0
+    stats['within_tolerance'] = stats['relative_error'] <= tolerance
+    return stats
+
+def distance_metric_stack(aoi, max_dist = 500000, in_meters = False, asset_cache=None, method='cumulative_cost',
+                          scale=30):
     """
     This function create a distance image based on predefined dataset (road, coastline, river, etc)
         Parameters:
         aoi (ee.Geometry): Area of interest.
         max_dist (float): Max cumulative cost distance (in meters or pixels).
         in_meters (bool): If True, output distance in meters instead of pixels
+        asset_cache (asset_cache.AssetCache or bool): Export the stack once and reuse the asset,
+            the cumulativeCost computations then run only once per AOI and parameters. Default: None (no cache).
+        method (str): 'cumulative_cost' (default) or 'distance_transform', Euclidean distance transforms
+            instead of three cumulativeCost computations, much faster for the uniform cost used here
+            (see distance_image and validate_distance_transform).
+        scale (float): Pixel size in meters of the computation, used by 'distance_transform' (default: 30).
     """
-    #This script is used when in_meters option are set to True. 
-    #However, original script indicate that this process required more computation time
-    if in_meters:
-        cost_image = ee.Image.pixelArea().sqrt() 
-    else:
-    #distance in pixel unit, effective storage use
-        cost_image = ee.Image(1)
-    #This wraps cumulativeCost() code, it did not repeated during the calculation
-    def distance_image(source_mask): #Source mask is binary mask, in which value 1 is unmasked data (starting location)
-        return cost_image.cumulativeCost(source_mask, max_dist)
+    if method not in DISTANCE_METHODS:
+        raise ValueError(f"method must be one of: {list(DISTANCE_METHODS)}")
+    cache = resolve_asset_cache(asset_cache)
+    if cache is not None:
+        params = {'max_dist': max_dist, 'in_meters': in_meters}
+        if method != 'cumulative_cost':
+            #Keep the keys of the stacks cached before the method option
+            params.update(method=method, scale=scale)
+        return cache.get_or_create('distance_metric_stack',
+                                   lambda: distance_metric_stack(aoi, max_dist, in_meters, method=method, scale=scale),
+                                   aoi, params)
     #The Dataset for creating a distance metric, ARE POSSIBLY OUTDATED
     #Natural Earth Coastline data (https://www.naturalearthdata.com/downloads/10m-physical-vectors/10m-coastline/)
     ne_coastline = ee.FeatureCollection(
@@ -89,8 +201,10 @@ def distance_metric_stack(aoi, max_dist = 500000, in_meters = False):
     hrsl_connected = hrsl.int().connectedPixelCount(maxSize=100, eightConnected=True)
     hrsl_masked = hrsl_connected.unmask().gt(3)
     #calculate distance metric
-    dist_roads =distance_image(roads_dist).rename('dist_roads')
-    dist_coast = distance_image(coast_dist).rename('dist_coast')
-    dist_settlement = distance_image(hrsl_masked).rename('dist_settlement')
+    def distance(source_mask):
+        return distance_image(source_mask, max_dist, in_meters, method, scale)
+    dist_roads = distance(roads_dist).rename('dist_roads')
+    dist_coast = distance(coast_dist).rename('dist_coast')
+    dist_settlement = distance(hrsl_masked).rename('dist_settlement')
     # Stack into one image
     return ee.Image.cat(dist_roads, dist_coast, dist_settlement)
@@ -1,14 +1,9 @@
-import streamlit as st
-import geopandas as gpd
-import pandas as pd
 import json
 import ee 
-import geemap
 from .ee_config import ensure_ee_initialized
-from shapely.validation import make_valid
-from shapely.geometry import MultiPoint
 
 # Do not initialize Earth Engine at import time. Initialize when classes are instantiated.
+# streamlit, geopandas, pandas, geemap and shapely are imported on first use to keep import light.
 
 #Based on early experiments, shapefile with complex geometry often cause issues in GEE
 #The following functions are used to handle the common geometry issues
@@ -33,6 +28,7 @@ class shapefile_validator:
         self.verbose = verbose
     def log(self, message, level = "info"):
         if self.verbose:
+            import streamlit as st
             if level == "error":
                 st.error(message)
             elif level == "warning":
@@ -89,6 +85,7 @@ class shapefile_validator:
      #Function to support the validation (validate_and_fix_geometry)
     def _clean_geometries(self, gdf):
         """Remove and fix invalid geometries"""
+        from shapely.validation import make_valid
         original_count = len(gdf)
         
         #Fix invalid geometries
@@ -116,6 +113,7 @@ class shapefile_validator:
      #Function to support the validation (validate_and_fix_geometry). For point data
     def _validate_points(self, gdf):
         """Validate point geometries"""
+        from shapely.geometry import MultiPoint
         point_mask = gdf.geometry.geom_type.isin(['Point', 'MultiPoint'])
         if not point_mask.any():
             return gdf
@@ -225,6 +223,7 @@ class EE_converter:
 
     def log(self, message, level = "info"):
         if self.verbose:
+            import streamlit as st
             if level == "error":
                 st.error(message)
             elif level == "warning":
@@ -238,8 +237,10 @@ class EE_converter:
         """
         GeoDataFrame for single geometry (AOI) to EE geometry conversion with option if failed
         """
+        import geopandas as gpd
         try:
             #Use geemap's built-in function
+            import geemap
             aoi = geemap.gdf_to_ee(gdf)
             self.log("Successfully converted to EE geometry using geemap")
             return aoi
@@ -294,6 +295,7 @@ class EE_converter:
         """
     Convert geodataframe into EE feture collection, build for the region of interest (ROI) data
          """
+        import pandas as pd
         try:
             self.log("Converting training data to Earth Engine FeatureCollection...")
             
@@ -0,0 +1,284 @@
+"""
+Local Composite Module
+
+Median and percentile composites of aligned Landsat scenes on local hardware,
+for reprocessing archives without Earth Engine (inputs from ``local_raster``).
+
+The scenes are never loaded whole. The raster is split into square blocks whose
+size follows a memory budget: one block of every scene is read (memory-mapped
+``.npy`` stacks or rasterio windows of GeoTIFFs), reduced with a NaN-aware median /
+percentile (one sort of the block serves every percentile) and written to a memory-mapped
+``.npy`` output. Blocks are independent and run on a process pool; every worker
+opens the inputs and the output itself, so no pixel data is sent between
+processes and throughput grows with the number of cores until the disks saturate.
+
+Output bands follow Earth Engine naming: band names are unchanged for the median
+and mean, BAND_p10, BAND_p50, ... for percentiles. Pixels without a valid
+observation are NaN.
+
+Example
+-------
+>>> from epistemx.local_composite import composite_scenes
+>>> path, names = composite_scenes(['2024_05_12_sr.tif', '2024_05_28_sr.tif', '2024_06_13_sr.tif'],
+...                                'composite.tif', method='percentile', percentiles=(10, 50, 90),
+...                                memory_mb=1024, max_workers=8)
+"""
+
+import logging
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_MB = 512
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+COMPOSITE_METHODS = ('median', 'mean', 'percentile')
+# Working copies made by the sort and interpolation on top of the block stack
+_REDUCER_OVERHEAD = 3
+_MIN_BLOCK = 64
+
+
+def write_stack(bands: Mapping[str, np.ndarray], path: str) -> List[str]:
+    """
+    Write a scene as a memory-mappable float32 ``.npy`` stack of shape (bands, rows, cols).
+
+    Parameters
+    ----------
+    bands : mapping
+        Band name to 2-D array, e.g. the output of local_raster.process_arrays().
+    path : str
+        Output ``.npy`` file.
+
+    Returns
+    -------
+    list of str
+        Band names in stack order, to pass as ``band_names`` to composite_scenes().
+    """
+    names = list(bands)
+    rows, cols = np.shape(bands[names[0]])
+    stack = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32, shape=(len(names), rows, cols))
+    for i, name in enumerate(names):
+        stack[i] = bands[name]
+    stack.flush()
+    del stack
+    return names
+
+
+def block_size_for_budget(n_scenes: int, n_bands: int, memory_mb: float = DEFAULT_MEMORY_MB,
+                          max_size: Optional[int] = None) -> int:
+    """
+    Side of the largest square block whose reduction fits in a memory budget.
+
+    Parameters
+    ----------
+    n_scenes : int
+        Number of scenes stacked per block.
+    n_bands : int
+        Number of bands reduced.
+    memory_mb : float, default 512
+        Memory budget per worker process, in MB.
+    max_size : int, optional
+        Upper bound, e.g. the larger raster dimension.
+
+    Returns
+    -------
+    int
+        Block side in pixels, a multiple of 64 (at least 64).
+    """
+    # One band at a time is reduced, but every band of the block is read at once
+    bytes_per_pixel = 4 * n_scenes * (n_bands + _REDUCER_OVERHEAD)
+    side = int(np.sqrt(memory_mb * 1024 * 1024 / bytes_per_pixel)) // _MIN_BLOCK * _MIN_BLOCK
+    side = max(side, _MIN_BLOCK)
+    return min(side, max_size) if max_size else side
+
+
+def _is_npy(path: str) -> bool:
+    return path.lower().endswith('.npy')
+
+
+def _raster_info(path: str) -> Tuple[Tuple[int, int], List[str], Optional[Dict[str, Any]]]:
+    """(rows, cols), band names and rasterio profile (None for .npy) of a scene."""
+    if _is_npy(path):
+        stack = np.load(path, mmap_mode='r')
+        return stack.shape[1:], [f"b{i + 1}" for i in range(stack.shape[0])], None
+    from .local_raster import _import_rasterio
+    rasterio, _ = _import_rasterio()
+    with rasterio.open(path) as src:
+        names = [d or f"b{i + 1}" for i, d in enumerate(src.descriptions)]
+        return (src.height, src.width), names, src.profile.copy()
+
+
+def _read_block(path: str, indexes: Sequence[int], rows: slice, cols: slice) -> np.ndarray:
+    """Bands (0-based indexes) of one block of a scene, as float32 (bands, h, w)."""
+    if _is_npy(path):
+        return np.asarray(np.load(path, mmap_mode='r')[list(indexes), rows, cols], dtype=np.float32)
+    from .local_raster import _import_rasterio
+    rasterio, Window = _import_rasterio()
+    with rasterio.open(path) as src:
+        window = Window(cols.start, rows.start, cols.stop - cols.start, rows.stop - rows.start)
+        block = src.read([i + 1 for i in indexes], window=window).astype(np.float32)
+        if src.nodata is not None and not np.isnan(src.nodata):
+            block[block == src.nodata] = np.nan
+        return block
+
+
+def nan_percentiles(stack: np.ndarray, percentiles: Sequence[float]) -> np.ndarray:
+    """
+    Percentiles along axis 0 ignoring NaN, with NumPy's default linear interpolation.
+
+    Equal to ``np.nanpercentile(stack, percentiles, axis=0)``, which falls back to a
+    per-pixel loop when the stack contains NaN; here one sort of the block serves
+    every percentile.
+
+    Parameters
+    ----------
+    stack : np.ndarray
+        (scenes, h, w) values, NaN where masked.
+    percentiles : list of float
+        Percentiles in [0, 100].
+
+    Returns
+    -------
+    np.ndarray
+        (len(percentiles), h, w), NaN where no scene is valid.
+    """
+    ordered = np.sort(stack, axis=0)                                  # NaN sort last
+    valid = np.count_nonzero(~np.isnan(stack), axis=0)
+    last = np.maximum(valid - 1, 0)
+    position = np.asarray(percentiles, dtype=np.float64)[:, None, None] / 100 * last
+    lower = np.floor(position).astype(np.intp)
+    upper = np.minimum(lower + 1, last)
+    low_values = np.take_along_axis(ordered, lower, axis=0)
+    high_values = np.take_along_axis(ordered, upper, axis=0)
+    result = (low_values + (high_values - low_values) * (position - lower)).astype(np.float32)
+    result[:, valid == 0] = np.nan
+    return result
+
+
+def _reduce(stack: np.ndarray, method: str, percentiles: Sequence[float]) -> np.ndarray:
+    """Reduce (scenes, h, w) along the scenes, NaN-aware. Returns (outputs, h, w)."""
+    if method == 'median':
+        return nan_percentiles(stack, [50])
+    if method == 'mean':
+        with warnings.catch_warnings():
+            # All-NaN pixels give NaN without a warning per block
+            warnings.simplefilter('ignore', RuntimeWarning)
+            return np.nanmean(stack, axis=0)[None]
+    return nan_percentiles(stack, percentiles)
+
+
+def _composite_block(task: Tuple) -> int:
+    """Worker: read one block of every scene, reduce every band, write into the output memmap."""
+    scenes, indexes, rows, cols, method, percentiles, output_path, per_band = task
+    blocks = np.stack([_read_block(path, indexes, rows, cols) for path in scenes])   # (scenes, bands, h, w)
+    output = np.load(output_path, mmap_mode='r+')
+    for b in range(len(indexes)):
+        output[b * per_band:(b + 1) * per_band, rows, cols] = _reduce(blocks[:, b], method, percentiles)
+    output.flush()
+    return blocks.shape[-1] * blocks.shape[-2]
+
+
+def composite_scenes(scenes: Sequence[str], output_path: str, method: str = 'median',
+                     percentiles: Sequence[float] = DEFAULT_PERCENTILES, bands: Optional[Sequence[str]] = None,
+                     band_names: Optional[Sequence[str]] = None, memory_mb: float = DEFAULT_MEMORY_MB,
+                     block_size: Optional[int] = None, max_workers: Optional[int] = None) -> Tuple[str, List[str]]:
+    """
+    Composite aligned scenes block by block on a process pool.
+
+    Parameters
+    ----------
+    scenes : list of str
+        Aligned scenes on the same grid: ``.npy`` stacks (bands, rows, cols), e.g. from
+        write_stack(), or GeoTIFFs, e.g. from local_raster.process_scene(). NaN (or the
+        GeoTIFF nodata) marks masked pixels.
+    output_path : str
+        ``.npy`` output, or ``.tif`` (GeoTIFF inputs only, needs rasterio). A ``.tif``
+        output is computed into '<output_path>.npy' first and then copied block by block.
+    method : str, default 'median'
+        'median', 'mean' or 'percentile'.
+    percentiles : list of float
+        Percentiles of method='percentile', computed in one pass (default: 10, 25, 50, 75, 90).
+    bands : list of str, optional
+        Bands to composite (default: all).
+    band_names : list of str, optional
+        Band names of ``.npy`` stacks, in stack order (default: b1, b2, ...).
+    memory_mb : float, default 512
+        Memory budget of one worker, sets the block size (see block_size_for_budget).
+    block_size : int, optional
+        Block side in pixels, overrides memory_mb.
+    max_workers : int, optional
+        Worker processes (default: number of CPUs). 1 runs in the calling process.
+
+    Returns
+    -------
+    tuple : (str, list of str)
+        Output path and output band names.
+    """
+    if method not in COMPOSITE_METHODS:
+        raise ValueError(f"method must be one of: {list(COMPOSITE_METHODS)}")
+    if not scenes:
+        raise ValueError("At least one scene is required")
+    scenes = [os.path.abspath(path) for path in scenes]
+    shape, file_names, profile = _raster_info(scenes[0])
+    names = list(band_names) if band_names else file_names
+    for path in scenes[1:]:
+        if _raster_info(path)[0] != shape:
+            raise ValueError(f"{path} is not aligned with {scenes[0]}: shapes differ")
+    selected = list(bands) if bands else names
+    missing = [b for b in selected if b not in names]
+    if missing:
+        raise ValueError(f"Bands {missing} not found, bands are {names}")
+    indexes = [names.index(b) for b in selected]
+    if method == 'percentile':
+        output_names = [f"{b}_p{int(q) if float(q).is_integer() else q}" for b in selected for q in percentiles]
+    else:
+        output_names = selected
+    per_band = len(output_names) // len(selected)
+
+    to_tiff = not _is_npy(output_path)
+    if to_tiff and profile is None:
+        raise ValueError("GeoTIFF output needs GeoTIFF inputs (georeferencing), use a .npy output")
+    array_path = f"{output_path}.npy" if to_tiff else output_path
+    rows, cols = shape
+    size = block_size or block_size_for_budget(len(scenes), len(selected), memory_mb, max(rows, cols))
+    output = np.lib.format.open_memmap(array_path, mode='w+', dtype=np.float32, shape=(len(output_names), rows, cols))
+    del output
+
+    tasks = [(scenes, indexes, slice(r, min(r + size, rows)), slice(c, min(c + size, cols)),
+              method, tuple(percentiles), array_path, per_band)
+             for r in range(0, rows, size) for c in range(0, cols, size)]
+    workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    logger.info(f"Compositing {len(scenes)} scenes ({method}) in {len(tasks)} blocks of {size}px "
+                f"on {workers} processes")
+    if workers == 1:
+        for task in tasks:
+            _composite_block(task)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_composite_block, tasks))
+
+    if to_tiff:
+        _write_tiff(array_path, output_path, profile, output_names, size)
+        os.remove(array_path)
+    return output_path, output_names
+
+
+def _write_tiff(array_path: str, output_path: str, profile: Dict[str, Any], names: Sequence[str], size: int) -> None:
+    from .local_raster import _import_rasterio
+    rasterio, Window = _import_rasterio()
+    stack = np.load(array_path, mmap_mode='r')
+    profile = dict(profile, driver='GTiff', count=len(names), dtype='float32', nodata=np.nan, tiled=True,
+                   blockxsize=512, blockysize=512, compress='deflate')
+    rows, cols = stack.shape[1:]
+    with rasterio.open(output_path, 'w', **profile) as dst:
+        for r in range(0, rows, size):
+            for c in range(0, cols, size):
+                window = Window(c, r, min(size, cols - c), min(size, rows - r))
+                dst.write(np.asarray(stack[:, r:r + window.height, c:c + window.width]), window=window)
+        for i, name in enumerate(names, start=1):
+            dst.set_band_description(i, name)
@@ -0,0 +1,456 @@
+"""
+Local Distance Raster Module
+
+Local counterpart of ``helpers.distance_metric_stack``: Euclidean distance to the
+nearest road (OSM + RBI), coastline and settlement pixel, computed with SciPy on
+local hardware from vector files standing in for the Earth Engine assets, so the
+distance covariates of a whole country can be computed once and reused.
+
+- ``RasterGrid``: the output grid, in a projected CRS with meters as unit
+- ``rasterize()``: burns lines and points (pixels they cross) and fills polygons
+  (pixel centres inside) into a boolean mask, with shapely only
+- ``settlement_mask()``: populated pixels of an aligned raster (e.g. HRSL) in
+  clusters of at least ``min_pixels`` 8-connected pixels, as the Earth Engine stack,
+  labelled block by block (a smaller cluster always fits in a ``min_pixels`` halo)
+- ``blockwise_distance()``: exact Euclidean distance transform
+  (``scipy.ndimage.distance_transform_edt``) of square blocks extended by a halo of
+  ``max_dist``, at most ``block_size`` pixels, on a thread pool. Every source within
+  the halo distance of a block lies in its halo, so block results equal the
+  whole-raster transform up to that distance. Further, up to ``max_dist``, distances
+  come from a level ``PYRAMID_STEP`` times coarser with max-pooled sources (off by at
+  most one coarse pixel diagonal); pixels beyond ``max_dist`` are NaN, as masked by
+  ``cumulativeCost``.
+- ``distance_stack()``: rasterizes the sources into memory-mapped masks and writes
+  the dist_roads, dist_coast and dist_settlement bands into a memory-mapped
+  ``.npy`` stack, copied to a GeoTIFF when the output is a ``.tif``
+
+Distances are in meters (``units='pixels'`` divides them by the resolution). A
+worker holds a window of at most 3 x ``block_size`` pixels per side, whatever
+``max_dist``: with the defaults (500 km at 30 m, 2048 pixel blocks) distances are
+exact up to 61 km, within 340 m (240 m level) up to 491 km and within 2.7 km
+(1920 m level) beyond.
+
+scipy (distance transform) and rasterio (GeoTIFF inputs and outputs) are optional
+dependencies, installed with ``pip install epistemx[local]``.
+
+Example
+-------
+>>> from epistemx.local_distance import RasterGrid, distance_stack
+>>> grid = RasterGrid.from_bounds((300000, 9500000, 500000, 9700000), 30, 'EPSG:32748')
+>>> path, names = distance_stack(grid, 'distance.tif', roads=['road_osm.gpkg', 'road_rbi.shp'],
+...                              coast='coastline_ne_10m.shp', settlements='hrsl_pop.tif',
+...                              max_dist=20000, max_workers=8)
+"""
+
+import logging
+import math
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_DIST = 500000
+DEFAULT_BLOCK_SIZE = 2048
+DEFAULT_MAX_WORKERS = 4
+# Coarsening of the level giving the distances beyond the halo
+PYRAMID_STEP = 8
+DISTANCE_UNITS = ('meters', 'pixels')
+_POLYGON_TYPES = ('Polygon', 'MultiPolygon')
+
+
+@dataclass
+class RasterGrid:
+    """
+    North-up raster grid in a projected CRS.
+
+    Attributes
+    ----------
+    west, north : float
+        Coordinates of the upper left corner.
+    resolution : float
+        Pixel size in CRS units (meters).
+    rows, cols : int
+        Grid size in pixels.
+    crs : str
+        Projected CRS, e.g. 'EPSG:32748' (UTM 48S).
+    """
+    west: float
+    north: float
+    resolution: float
+    rows: int
+    cols: int
+    crs: str
+
+    @classmethod
+    def from_bounds(cls, bounds: Sequence[float], resolution: float, crs: str) -> 'RasterGrid':
+        """Grid covering (west, south, east, north) bounds in ``crs`` at ``resolution``."""
+        west, south, east, north = bounds
+        return cls(west, north, resolution, int(math.ceil((north - south) / resolution)),
+                   int(math.ceil((east - west) / resolution)), crs)
+
+    @classmethod
+    def from_raster(cls, path: str) -> 'RasterGrid':
+        """Grid of an existing north-up GeoTIFF (needs rasterio)."""
+        from .local_raster import _import_rasterio
+        rasterio, _ = _import_rasterio()
+        with rasterio.open(path) as src:
+            if src.transform.b or src.transform.d or src.transform.a != -src.transform.e:
+                raise ValueError(f"{path} is not a north-up grid with square pixels")
+            return cls(src.transform.c, src.transform.f, src.transform.a, src.height, src.width, src.crs.to_string())
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.rows, self.cols
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        return (self.west, self.north - self.rows * self.resolution,
+                self.west + self.cols * self.resolution, self.north)
+
+    def index(self, x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Row and column of the pixels containing the points (x, y)."""
+        rows = np.floor((self.north - np.asarray(y)) / self.resolution).astype(np.int64)
+        cols = np.floor((np.asarray(x) - self.west) / self.resolution).astype(np.int64)
+        return rows, cols
+
+    def profile(self) -> dict:
+        """rasterio profile (crs, transform, size) of the grid."""
+        from .local_raster import _import_rasterio
+        _import_rasterio()
+        from rasterio.transform import from_origin
+        return {'crs': self.crs, 'transform': from_origin(self.west, self.north, self.resolution, self.resolution),
+                'width': self.cols, 'height': self.rows}
+
+
+def _read_geometries(sources: Any, grid: RasterGrid) -> List[Any]:
+    """Geometries of vector files / GeoDataFrames in the grid CRS, limited to the grid bounds."""
+    import geopandas as gpd
+    if sources is None:
+        return []
+    if isinstance(sources, (str, os.PathLike, gpd.GeoDataFrame, gpd.GeoSeries)):
+        sources = [sources]
+    geometries = []
+    for source in sources:
+        frame = source if isinstance(source, (gpd.GeoDataFrame, gpd.GeoSeries)) else gpd.read_file(source)
+        if frame.crs is None:
+            raise ValueError(f"{source} has no CRS")
+        frame = frame.to_crs(grid.crs)
+        west, south, east, north = grid.bounds
+        frame = frame.cx[west:east, south:north]
+        geometries.extend(g for g in frame.geometry if g is not None and not g.is_empty)
+    return geometries
+
+
+def _burn_lines(geometry: Any, grid: RasterGrid, mask: np.ndarray) -> None:
+    import shapely
+    # Vertices at most half a pixel apart fall in every pixel the line crosses (up to corner cuts)
+    coords = shapely.get_coordinates(shapely.segmentize(geometry, grid.resolution / 2))
+    if not len(coords):
+        return
+    rows, cols = grid.index(coords[:, 0], coords[:, 1])
+    inside = (rows >= 0) & (rows < grid.rows) & (cols >= 0) & (cols < grid.cols)
+    mask[rows[inside], cols[inside]] = True
+
+
+def _fill_polygon(geometry: Any, grid: RasterGrid, mask: np.ndarray, chunk_rows: int = 256) -> None:
+    import shapely
+    shapely.prepare(geometry)
+    minx, miny, maxx, maxy = geometry.bounds
+    row0, col0 = grid.index(minx, maxy)
+    row1, col1 = grid.index(maxx, miny)
+    row0, col0 = max(int(row0), 0), max(int(col0), 0)
+    row1, col1 = min(int(row1), grid.rows - 1), min(int(col1), grid.cols - 1)
+    if row0 > row1 or col0 > col1:
+        return
+    xs = grid.west + (np.arange(col0, col1 + 1) + 0.5) * grid.resolution
+    for start in range(row0, row1 + 1, chunk_rows):
+        stop = min(start + chunk_rows, row1 + 1)
+        ys = grid.north - (np.arange(start, stop) + 0.5) * grid.resolution
+        x, y = np.meshgrid(xs, ys)
+        mask[start:stop, col0:col1 + 1] |= shapely.contains_xy(geometry, x, y)
+
+
+def rasterize(sources: Any, grid: RasterGrid, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Rasterize vector sources into a boolean mask of the grid.
+
+    Lines and points mark the pixels they cross. Polygons mark the pixels whose
+    centre is inside, and their boundary, so small polygons are never lost.
+
+    Parameters
+    ----------
+    sources : str, GeoDataFrame or list of them
+        Vector files (any format read by geopandas) or GeoDataFrames, reprojected to the grid CRS.
+    grid : RasterGrid
+        Output grid.
+    out : np.ndarray, optional
+        Preallocated boolean array (e.g. a memmap) of the grid shape, marked in place.
+
+    Returns
+    -------
+    np.ndarray of bool
+    """
+    mask = np.zeros(grid.shape, dtype=bool) if out is None else out
+    geometries = _read_geometries(sources, grid)
+    _rasterize_parts(geometries, grid, mask)
+    logger.info(f"Rasterized {len(geometries)} features, {int(np.count_nonzero(mask))} source pixels")
+    return mask
+
+
+def _rasterize_parts(geometries: Sequence[Any], grid: RasterGrid, mask: np.ndarray) -> None:
+    for geometry in geometries:
+        if geometry.geom_type in _POLYGON_TYPES:
+            _fill_polygon(geometry, grid, mask)
+            _burn_lines(geometry.boundary, grid, mask)
+        elif geometry.geom_type == 'GeometryCollection':
+            _rasterize_parts(list(geometry.geoms), grid, mask)
+        else:
+            _burn_lines(geometry, grid, mask)
+
+
+def settlement_mask(population: Union[str, np.ndarray], grid: RasterGrid, min_pixels: int = 4,
+                    threshold: float = 0, out: Optional[np.ndarray] = None,
+                    block_size: int = DEFAULT_BLOCK_SIZE) -> np.ndarray:
+    """
+    Settlement pixels of a population raster aligned with the grid.
+
+    The raster is read and labelled block by block: a cluster smaller than
+    ``min_pixels`` spans fewer than ``min_pixels`` pixels, so labelling a block
+    extended by a halo of ``min_pixels`` gives the same result as the whole raster.
+
+    Parameters
+    ----------
+    population : str or np.ndarray
+        Population per pixel on the grid: an array, a ``.npy`` file or a GeoTIFF (needs rasterio).
+    grid : RasterGrid
+        Output grid, the raster must have its shape.
+    min_pixels : int, default 4
+        Minimum size of a cluster of 8-connected populated pixels, as the
+        ``connectedPixelCount(...).gt(3)`` of distance_metric_stack.
+    threshold : float, default 0
+        Pixels with a population above the threshold are populated.
+    out : np.ndarray, optional
+        Preallocated boolean array (e.g. a memmap) of the grid shape.
+    block_size : int, default 2048
+        Block side in pixels, without the halo.
+
+    Returns
+    -------
+    np.ndarray of bool
+    """
+    from scipy import ndimage
+    from .local_composite import _raster_info, _read_block
+    if isinstance(population, (str, os.PathLike)) and str(population).lower().endswith('.npy'):
+        population = np.load(population, mmap_mode='r')
+    if isinstance(population, (str, os.PathLike)):
+        path = str(population)
+        shape = _raster_info(path)[0]
+        read = lambda rows, cols: _read_block(path, [0], rows, cols)[0]
+    else:
+        shape = np.shape(population)
+        read = lambda rows, cols: np.asarray(population[rows, cols], dtype=np.float32)
+    if tuple(shape) != grid.shape:
+        raise ValueError(f"Population raster has shape {tuple(shape)}, expected the grid shape {grid.shape}")
+    if out is None:
+        out = np.zeros(grid.shape, dtype=bool)
+    halo = min_pixels if min_pixels > 1 else 0
+    structure = np.ones((3, 3), dtype=bool)
+    for rows, cols in _blocks(grid.shape, block_size):
+        r0, r1 = max(rows.start - halo, 0), min(rows.stop + halo, grid.rows)
+        c0, c1 = max(cols.start - halo, 0), min(cols.stop + halo, grid.cols)
+        populated = np.nan_to_num(read(slice(r0, r1), slice(c0, c1))) > threshold
+        if halo and populated.any():
+            labels, _ = ndimage.label(populated, structure=structure)
+            sizes = np.bincount(labels.ravel())
+            sizes[0] = 0
+            populated = sizes[labels] >= min_pixels
+        out[rows, cols] = populated[rows.start - r0:rows.stop - r0, cols.start - c0:cols.stop - c0]
+    return out
+
+
+def _blocks(shape: Tuple[int, int], block_size: int) -> List[Tuple[slice, slice]]:
+    rows, cols = shape
+    return [(slice(r, min(r + block_size, rows)), slice(c, min(c + block_size, cols)))
+            for r in range(0, rows, block_size) for c in range(0, cols, block_size)]
+
+
+def _max_pool(source: np.ndarray, factor: int, block_size: int) -> np.ndarray:
+    """Boolean mask ``factor`` times coarser, True where any pixel of the block is a source."""
+    rows, cols = np.shape(source)
+    pooled = np.zeros((-(-rows // factor), -(-cols // factor)), dtype=bool)
+    step = factor * max(1, block_size // factor)
+    for r in range(0, rows, step):
+        part = np.asarray(source[r:r + step], dtype=bool)
+        part = np.pad(part, ((0, -part.shape[0] % factor), (0, -cols % factor)))
+        pooled[r // factor:r // factor + part.shape[0] // factor] = (
+            part.reshape(part.shape[0] // factor, factor, -1, factor).any(axis=(1, 3)))
+    return pooled
+
+
+def _distance_block(source: np.ndarray, out: np.ndarray, rows: slice, cols: slice, halo: int,
+                    resolution: float, max_dist: float, scale: float, far: Optional[np.ndarray] = None,
+                    factor: int = 1) -> int:
+    """
+    Distance transform of one block extended by the halo, written into ``out[rows, cols]``.
+    Pixels beyond the halo distance take the distance of the coarser level ``far``, if given.
+    """
+    from scipy import ndimage
+    r0, r1 = max(rows.start - halo, 0), min(rows.stop + halo, source.shape[0])
+    c0, c1 = max(cols.start - halo, 0), min(cols.stop + halo, source.shape[1])
+    window = np.asarray(source[r0:r1, c0:c1], dtype=bool)
+    block = np.full((rows.stop - rows.start, cols.stop - cols.start), np.nan)
+    if window.any():
+        distance = ndimage.distance_transform_edt(~window, sampling=resolution)
+        distance = distance[rows.start - r0:rows.stop - r0, cols.start - c0:cols.stop - c0]
+        # A closer source may lie outside the window beyond the halo distance
+        block = np.where(distance <= min(max_dist, halo * resolution), distance, np.nan)
+    if far is not None:
+        coarse = far[np.ix_(np.arange(rows.start, rows.stop) // factor, np.arange(cols.start, cols.stop) // factor)]
+        block = np.where(np.isnan(block) & (coarse <= max_dist), coarse, block)
+    out[rows, cols] = (block / scale).astype(np.float32)
+    return int(np.count_nonzero(~np.isnan(block)))
+
+
+def blockwise_distance(source: np.ndarray, resolution: float, max_dist: float = DEFAULT_MAX_DIST,
+                       out: Optional[np.ndarray] = None, block_size: int = DEFAULT_BLOCK_SIZE,
+                       max_workers: int = DEFAULT_MAX_WORKERS, units: str = 'meters') -> np.ndarray:
+    """
+    Euclidean distance to the nearest source pixel, block by block on a thread pool.
+
+    Parameters
+    ----------
+    source : np.ndarray
+        Boolean (or 0/1) source mask, may be memory-mapped.
+    resolution : float
+        Pixel size in meters.
+    max_dist : float, default 500000
+        Max distance in meters. Further pixels are NaN.
+    out : np.ndarray, optional
+        Preallocated float32 array (e.g. a memmap band) of the source shape.
+    block_size : int, default 2048
+        Block side in pixels, without the halo. The halo is max_dist, at most block_size
+        pixels; further distances come from a PYRAMID_STEP times coarser level.
+    max_workers : int, default 4
+        Blocks transformed at the same time.
+    units : str, default 'meters'
+        'meters' or 'pixels'.
+
+    Returns
+    -------
+    np.ndarray of float32
+    """
+    if units not in DISTANCE_UNITS:
+        raise ValueError(f"units must be one of: {list(DISTANCE_UNITS)}")
+    rows, cols = np.shape(source)
+    if out is None:
+        out = np.empty((rows, cols), dtype=np.float32)
+    halo = int(math.ceil(max_dist / resolution))
+    far = None
+    if halo > block_size and max(rows, cols) > block_size:
+        # Cap the window at 3 x block_size per side; the far field comes from a coarser level, recursively
+        # (a raster within one block is a single window, exact at any distance)
+        halo = block_size
+        logger.info(f"Distances beyond {halo * resolution:.0f} m from a {PYRAMID_STEP}x coarser level")
+        # The coarse level reaches one coarse pixel diagonal further, the max_dist cut is made at this level
+        coarse_resolution = resolution * PYRAMID_STEP
+        far = blockwise_distance(_max_pool(source, PYRAMID_STEP, block_size), coarse_resolution,
+                                 max_dist + coarse_resolution * math.sqrt(2), block_size=block_size,
+                                 max_workers=max_workers)
+    scale = resolution if units == 'pixels' else 1.0
+    blocks = _blocks((rows, cols), block_size)
+    logger.info(f"Distance transform of {len(blocks)} blocks of {block_size}px with a {halo}px halo")
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='epistemx-distance') as pool:
+        list(pool.map(lambda block: _distance_block(source, out, block[0], block[1], halo, resolution,
+                                                    max_dist, scale, far, PYRAMID_STEP), blocks))
+    return out
+
+
+def distance_stack(grid: RasterGrid, output_path: str, roads: Any = None, coast: Any = None,
+                   settlements: Any = None, max_dist: float = DEFAULT_MAX_DIST, units: str = 'meters',
+                   min_settlement_pixels: int = 4, block_size: int = DEFAULT_BLOCK_SIZE,
+                   max_workers: int = DEFAULT_MAX_WORKERS, work_dir: Optional[str] = None) -> Tuple[str, List[str]]:
+    """
+    Distance to roads, coastline and settlements on a local grid, as distance_metric_stack.
+
+    Parameters
+    ----------
+    grid : RasterGrid
+        Output grid.
+    output_path : str
+        ``.npy`` stack (bands, rows, cols) or ``.tif`` (needs rasterio). A ``.tif`` output is
+        computed into '<output_path>.npy' first and then copied block by block.
+    roads : str, GeoDataFrame or list of them, optional
+        Road vectors, e.g. the OSM and RBI road files. Band 'dist_roads'.
+    coast : str, GeoDataFrame or list of them, optional
+        Coastline vectors, e.g. Natural Earth 10m coastline. Band 'dist_coast'.
+    settlements : str, np.ndarray, GeoDataFrame or list, optional
+        Population raster aligned with the grid (array, ``.npy`` or GeoTIFF, see
+        settlement_mask) or settlement vectors. Band 'dist_settlement'.
+    max_dist : float, default 500000
+        Max distance in meters, see blockwise_distance.
+    units : str, default 'meters'
+        'meters' or 'pixels'.
+    min_settlement_pixels : int, default 4
+        Minimum populated cluster size of a settlement raster.
+    block_size, max_workers : int
+        See blockwise_distance.
+    work_dir : str, optional
+        Folder of the temporary memory-mapped source masks (default: a temporary folder).
+
+    Returns
+    -------
+    tuple : (str, list of str)
+        Output path and band names, in the order dist_roads, dist_coast, dist_settlement
+        (bands without sources are left out).
+    """
+    if units not in DISTANCE_UNITS:
+        raise ValueError(f"units must be one of: {list(DISTANCE_UNITS)}")
+    sources = [(name, value) for name, value in
+               (('dist_roads', roads), ('dist_coast', coast), ('dist_settlement', settlements))
+               if value is not None]
+    if not sources:
+        raise ValueError("At least one of roads, coast or settlements is required")
+    to_tiff = not output_path.lower().endswith('.npy')
+    if to_tiff:
+        profile = grid.profile()
+    array_path = f"{output_path}.npy" if to_tiff else output_path
+    names = [name for name, _ in sources]
+    output = np.lib.format.open_memmap(array_path, mode='w+', dtype=np.float32, shape=(len(names),) + grid.shape)
+
+    scratch = tempfile.mkdtemp(prefix='epistemx_distance_', dir=work_dir)
+    try:
+        for i, (name, value) in enumerate(sources):
+            mask = np.lib.format.open_memmap(os.path.join(scratch, f"{name}.npy"), mode='w+', dtype=bool,
+                                             shape=grid.shape)
+            if name == 'dist_settlement' and _is_raster(value):
+                settlement_mask(value, grid, min_settlement_pixels, out=mask, block_size=block_size)
+            else:
+                rasterize(value, grid, out=mask)
+            logger.info(f"Computing {name}")
+            blockwise_distance(mask, grid.resolution, max_dist, out=output[i], block_size=block_size,
+                               max_workers=max_workers, units=units)
+            del mask
+        output.flush()
+        del output
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    if to_tiff:
+        from .local_composite import _write_tiff
+        _write_tiff(array_path, output_path, profile, names, block_size)
+        os.remove(array_path)
+    logger.info(f"Distance stack written to {output_path}")
+    return output_path, names
+
+
+def _is_raster(value: Any) -> bool:
+    if isinstance(value, np.ndarray):
+        return True
+    return isinstance(value, (str, os.PathLike)) and str(value).lower().endswith(('.npy', '.tif', '.tiff', '.vrt'))
@@ -0,0 +1,273 @@
+"""
+Local Landsat Raster Module
+
+NumPy counterpart of the per-image preprocessing of ``Reflectance_Data`` for
+Landsat Collection 2 surface reflectance tiles exported from Earth Engine (or
+downloaded from USGS), so they can be processed on local nodes without Earth Engine:
+
+- ``qa_mask()``: same QA_PIXEL bit logic as ``Reflectance_Data.prepare_image``
+  (cloud and shadow bits, cloud/shadow/cirrus confidence below thresholds)
+- ``scale_reflectance()``: DN * scale + offset (0.0000275 and -0.2 for Collection 2 SR)
+- band selection, scaling and QA layout per sensor from the ``sensors`` registry, so
+  registered sensors are processed as in Earth Engine (``LANDSAT_SR_BANDS`` lists the
+  built-in Landsat SR sensors)
+
+Masked pixels are NaN in the float32 output, where Earth Engine masks them.
+
+``process_arrays()`` works on any mapping of band name to 2-D array, including
+``np.memmap`` / ``np.load(..., mmap_mode='r')`` arrays, and processes blocks of rows
+so only one block is in memory at a time. ``process_scene()`` reads a GeoTIFF / COG
+with rasterio in windows and writes a float32 GeoTIFF, and ``process_tiles()`` runs
+several tiles on a thread pool (reads, writes and NumPy operations on large arrays
+release the GIL).
+
+rasterio is an optional dependency (``pip install epistemx[local]``), imported when
+a file is read or written.
+
+Example
+-------
+>>> from epistemx.local_raster import process_tiles
+>>> outputs = process_tiles(['LC08_124062_20240512.tif', 'LC08_124063_20240512.tif'], 'L8',
+...                         output_dir='processed', max_workers=4)
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .sensors import LANDSAT_C2_QA, SR_OFFSET, SR_SCALE, band_selection, get_sensor
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_BLOCK_SIZE = 1024
+DEFAULT_MAX_WORKERS = 4
+# Source bands and standardized names of the built-in SR sensors, from the sensors registry
+LANDSAT_SR_BANDS: Dict[str, Tuple[List[str], List[str]]] = {
+    sensor: band_selection(sensor) for sensor in ('L4', 'L5', 'L7', 'L8', 'L9')
+}
+
+
+def qa_mask(qa: np.ndarray, cloud_conf_thresh: int = 2, shadow_conf_thresh: int = 2,
+            cirrus_conf_thresh: int = 2, layout: Optional[Mapping[str, int]] = None) -> np.ndarray:
+    """
+    Clear-pixel mask from a Collection 2 QA_PIXEL array (True = keep).
+
+    Parameters
+    ----------
+    qa : np.ndarray
+        QA_PIXEL values.
+    cloud_conf_thresh, shadow_conf_thresh, cirrus_conf_thresh : int
+        Confidence thresholds (0=None, 1=Low, 2=Med, 3=High), pixels below are kept.
+    layout : mapping, optional
+        QA bit layout of the sensors registry (default: Collection 2 QA_PIXEL,
+        cloud bit 3, shadow bit 4, confidence bits 8-9, 10-11 and 14-15).
+
+    Returns
+    -------
+    np.ndarray of bool
+    """
+    layout = LANDSAT_C2_QA if layout is None else layout
+    qa = np.asarray(qa).astype(np.uint16, copy=False)
+    bits = sum(1 << layout[key] for key in ('cloud_bit', 'shadow_bit') if key in layout)
+    clear = (qa & bits) == 0
+    for key, thresh in (('cloud_confidence', cloud_conf_thresh), ('shadow_confidence', shadow_conf_thresh),
+                        ('cirrus_confidence', cirrus_conf_thresh)):
+        if key in layout:
+            clear &= ((qa >> layout[key]) & 3) < thresh
+    return clear
+
+
+def scale_reflectance(dn: np.ndarray, scale: float = SR_SCALE, offset: float = SR_OFFSET) -> np.ndarray:
+    """Surface reflectance from Collection 2 Level-2 digital numbers, as float32."""
+    return np.asarray(dn, dtype=np.float32) * np.float32(scale) + np.float32(offset)
+
+
+def _band_names(sensor: str) -> Tuple[List[str], List[str]]:
+    return band_selection(sensor)
+
+
+def _source_bands(sensor: str) -> List[str]:
+    """Bands read from a scene: the sensor bands and its QA band."""
+    qa_band = get_sensor(sensor)['qa_band']
+    return _band_names(sensor)[0] + ([qa_band] if qa_band else [])
+
+
+def process_block(bands: Mapping[str, np.ndarray], sensor: str, nodata: Optional[float] = None,
+                  cloud_conf_thresh: int = 2, shadow_conf_thresh: int = 2,
+                  cirrus_conf_thresh: int = 2) -> Dict[str, np.ndarray]:
+    """
+    Mask, scale and rename one block of a Landsat scene, following the sensors registry.
+
+    Parameters
+    ----------
+    bands : mapping
+        Source band name ('SR_B1', ..., 'QA_PIXEL') to array of digital numbers.
+    sensor : str
+        Registered sensor ('L4', 'L5', 'L7', 'L8', 'L9' for SR data).
+    nodata : float, optional
+        Fill value of the source bands, masked as well.
+    cloud_conf_thresh, shadow_conf_thresh, cirrus_conf_thresh : int
+        See qa_mask().
+
+    Returns
+    -------
+    dict
+        Standardized band name to float32 reflectance, NaN where masked.
+    """
+    spec = get_sensor(sensor)
+    sources, names = _band_names(sensor)
+    missing = [b for b in _source_bands(sensor) if b not in bands]
+    if missing:
+        raise ValueError(f"Missing bands {missing} for sensor {sensor}")
+    clear = True
+    if spec['qa_band']:
+        clear = qa_mask(bands[spec['qa_band']], cloud_conf_thresh, shadow_conf_thresh, cirrus_conf_thresh,
+                        spec['qa'])
+    scale = 1.0 if spec['scale'] is None else spec['scale']
+    offset = 0.0 if spec['offset'] is None else spec['offset']
+    output = {}
+    for source, name in zip(sources, names):
+        dn = np.asarray(bands[source])
+        valid = clear & ~np.isnan(dn) if np.issubdtype(dn.dtype, np.floating) else clear
+        if nodata is not None:
+            valid = valid & (dn != nodata)
+        output[name] = np.where(valid, scale_reflectance(dn, scale, offset), np.float32(np.nan))
+    return output
+
+
+def process_arrays(bands: Mapping[str, np.ndarray], sensor: str, block_rows: int = DEFAULT_BLOCK_SIZE,
+                   out: Optional[Mapping[str, np.ndarray]] = None, **mask_kwargs: Any) -> Dict[str, np.ndarray]:
+    """
+    Mask, scale and rename a whole scene, one block of rows at a time.
+
+    Parameters
+    ----------
+    bands : mapping
+        Source band name to 2-D array. Memory-mapped arrays are only read block by block.
+    sensor : str
+        Registered sensor ('L4', 'L5', 'L7', 'L8', 'L9' for SR data).
+    block_rows : int, default 1024
+        Rows per block.
+    out : mapping, optional
+        Standardized band name to preallocated float32 arrays (e.g. np.memmap) to write into.
+    **mask_kwargs
+        nodata and confidence thresholds, see process_block().
+
+    Returns
+    -------
+    dict
+        Standardized band name to float32 array.
+    """
+    sources, names = _band_names(sensor)
+    rows, cols = np.shape(bands[sources[0]])
+    if out is None:
+        out = {name: np.empty((rows, cols), dtype=np.float32) for name in names}
+    for start in range(0, rows, block_rows):
+        block = slice(start, min(start + block_rows, rows))
+        result = process_block({name: array[block] for name, array in bands.items()}, sensor, **mask_kwargs)
+        for name in names:
+            out[name][block] = result[name]
+    return dict(out)
+
+
+def _import_rasterio():
+    try:
+        import rasterio
+        from rasterio.windows import Window
+    except ImportError as e:
+        raise ImportError("rasterio is required to read and write rasters, install it with "
+                          "'pip install epistemx[local]'") from e
+    return rasterio, Window
+
+
+def process_scene(path: str, sensor: str, output_path: Optional[str] = None,
+                  band_names: Optional[Sequence[str]] = None, block_size: int = DEFAULT_BLOCK_SIZE,
+                  **mask_kwargs: Any) -> str:
+    """
+    Mask, scale and rename a Landsat SR GeoTIFF in windows and write a float32 GeoTIFF.
+
+    Parameters
+    ----------
+    path : str
+        Multi-band GeoTIFF / COG with the SR bands and QA_PIXEL. Band names are read
+        from the band descriptions (set by Earth Engine exports) unless given.
+    sensor : str
+        Registered sensor ('L4', 'L5', 'L7', 'L8', 'L9' for SR data).
+    output_path : str, optional
+        Output file (default: '<name>_sr.tif' next to the input).
+    band_names : list of str, optional
+        Source band names in file order, if the file has no band descriptions.
+    block_size : int, default 1024
+        Window width and height in pixels.
+    **mask_kwargs
+        Confidence thresholds, see process_block(). nodata defaults to the file nodata.
+
+    Returns
+    -------
+    str
+        Output path. Bands are named with the standardized names, NaN is nodata.
+    """
+    rasterio, Window = _import_rasterio()
+    _, names = _band_names(sensor)
+    output_path = output_path or f"{os.path.splitext(path)[0]}_sr.tif"
+    with rasterio.open(path) as src:
+        file_bands = list(band_names or src.descriptions)
+        missing = [b for b in _source_bands(sensor) if b not in file_bands]
+        if missing:
+            raise ValueError(f"{path} has no bands {missing} (bands: {file_bands}), pass band_names")
+        indexes = {b: file_bands.index(b) + 1 for b in _source_bands(sensor)}
+        mask_kwargs.setdefault('nodata', src.nodata)
+        profile = src.profile.copy()
+        profile.update(driver='GTiff', count=len(names), dtype='float32', nodata=np.nan, tiled=True,
+                       blockxsize=512, blockysize=512, compress='deflate')
+        with rasterio.open(output_path, 'w', **profile) as dst:
+            for row in range(0, src.height, block_size):
+                for col in range(0, src.width, block_size):
+                    window = Window(col, row, min(block_size, src.width - col), min(block_size, src.height - row))
+                    block = {b: src.read(i, window=window) for b, i in indexes.items()}
+                    result = process_block(block, sensor, **mask_kwargs)
+                    for i, name in enumerate(names, start=1):
+                        dst.write(result[name], i, window=window)
+            for i, name in enumerate(names, start=1):
+                dst.set_band_description(i, name)
+    logger.info(f"Processed {path} -> {output_path}")
+    return output_path
+
+
+def process_tiles(paths: Sequence[str], sensor: str, output_dir: Optional[str] = None,
+                  max_workers: int = DEFAULT_MAX_WORKERS, **kwargs: Any) -> List[str]:
+    """
+    Process several tiles with process_scene() on a thread pool.
+
+    Parameters
+    ----------
+    paths : list of str
+        Input GeoTIFF / COG tiles.
+    sensor : str
+        Sensor type of the tiles.
+    output_dir : str, optional
+        Output folder (default: next to every input).
+    max_workers : int, default 4
+        Number of tiles processed at the same time.
+    **kwargs
+        Other arguments of process_scene().
+
+    Returns
+    -------
+    list of str
+        Output paths, in input order.
+    """
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    def run(path):
+        output_path = None
+        if output_dir:
+            output_path = os.path.join(output_dir, f"{os.path.splitext(os.path.basename(path))[0]}_sr.tif")
+        return process_scene(path, sensor, output_path, **kwargs)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='epistemx-tile') as pool:
+        return list(pool.map(run, paths))
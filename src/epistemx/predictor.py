@@ -4,6 +4,7 @@ from typing import List, Optional, Dict, Any
 from dataclasses import dataclass
 from enum import Enum
 from .ee_config import ensure_ee_initialized
+from .asset_cache import resolve_asset_cache
 # Do not initialize Earth Engine at import time. Initialize when classes are instantiated.
 
 """
@@ -360,9 +361,15 @@ class spectral_transformation_calcultator:
     def calculate_index(self, image: ee.Image,
                         index: Optional[List[str]] = None,
                         categories: Optional[List[indexcategory]] = None,
+                        asset_cache: Any = None,
+                        region: Optional[ee.Geometry] = None,
                         ):
         """
         Perform spectral transformation on specified spectral index
+
+        With asset_cache (an asset_cache.AssetCache, or True for the default cache), the
+        index stack is exported once to an asset over region, keyed by the input image and
+        the indices, and later calls return the asset.
         """
 
         logger.info('Starting spectral indices calculation')
@@ -379,6 +386,13 @@ class spectral_transformation_calcultator:
             ]
         else:
             indices_to_calculate = list(self.avaliable_indices.keys())
+        cache = resolve_asset_cache(asset_cache)
+        if cache is not None:
+            if region is None:
+                raise ValueError("region is required to cache the index stack")
+            return cache.get_or_create('spectral_indices',
+                                       lambda: self.calculate_index(image, indices_to_calculate),
+                                       region, {'image': image, 'indices': indices_to_calculate})
         logger.info(f"Calculating {len(indices_to_calculate)} indices: {indices_to_calculate}")
         transformed = []
         self.calculated_count = 0
@@ -4,7 +4,6 @@ Module 3 Backend - Training Data Management
 This module provides training data loading and processing functionality.
 """
 
-import streamlit as st
 import pandas as pd
 import geopandas as gpd
 import numpy as np
@@ -13,6 +12,7 @@ from typing import Dict, List, Optional, Tuple, Any, Union
 import warnings
 import logging
 from shapely.geometry import shape
+from .ee_fetch import DeferredFetch, get_info
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -30,23 +30,11 @@ try:
                 if training_ee_path:
                     logger.info(f"Loading training data from EE asset: {training_ee_path}")
                     
-                    # Test Earth Engine authentication and asset access
-                    try:
-                        # Load from Earth Engine asset
-                        training_fc = ee.FeatureCollection(training_ee_path)
-                        
-                        # Get initial count
-                        initial_count = training_fc.size().getInfo()
-                        logger.info(f"Initial feature count: {initial_count}")
-                        
-                        if initial_count == 0:
-                            raise Exception(f"Earth Engine asset '{training_ee_path}' contains 0 features")
-                            
-                    except Exception as ee_error:
-                        logger.error(f"Failed to access Earth Engine asset: {ee_error}")
-                        raise Exception(f"Cannot access Earth Engine asset '{training_ee_path}': {str(ee_error)}")
+                    # Load from Earth Engine asset
+                    training_fc = ee.FeatureCollection(training_ee_path)
                     
-                    # Filter by AOI if provided
+                    # Filter by AOI if provided (server side, counted together with the initial size below)
+                    filtered_fc = None
                     if aoi_geometry:
                         logger.info("Filtering by AOI bounds...")
                         logger.info(f"AOI geometry type: {type(aoi_geometry)}")
@@ -56,32 +44,63 @@ try:
                                 # It's a GeoDataFrame - get the first geometry
                                 geom = aoi_geometry.geometry.iloc[0]
                                 ee_geom = ee.Geometry(geom.__geo_interface__)
-                                training_fc = training_fc.filterBounds(ee_geom)
+                                filtered_fc = training_fc.filterBounds(ee_geom)
                             elif hasattr(aoi_geometry, '__geo_interface__'):
                                 # It's a shapely geometry
                                 ee_geom = ee.Geometry(aoi_geometry.__geo_interface__)
-                                training_fc = training_fc.filterBounds(ee_geom)
+                                filtered_fc = training_fc.filterBounds(ee_geom)
                             else:
                                 # Assume it's already an EE geometry
-                                training_fc = training_fc.filterBounds(aoi_geometry)
-                            
-                            filtered_count = training_fc.size().getInfo()
-                            logger.info(f"Features after AOI filter: {filtered_count}")
-                            
-                            if filtered_count == 0:
-                                logger.warning("AOI filtering resulted in 0 features - using original dataset")
-                                # Reload original dataset without AOI filter
-                                training_fc = ee.FeatureCollection(training_ee_path)
+                                filtered_fc = training_fc.filterBounds(aoi_geometry)
                         except Exception as filter_error:
                             logger.error(f"AOI filtering failed: {filter_error}")
                             logger.info("Using original dataset without AOI filter")
                             # Keep original training_fc without filtering
+                            filtered_fc = None
+                    
+                    # Test Earth Engine authentication and asset access
+                    try:
+                        # Get initial count and the count after AOI filtering in a single request
+                        counts = DeferredFetch({'initial_count': training_fc.size()})
+                        if filtered_fc is not None:
+                            counts.add('filtered_count', filtered_fc.size())
+                        try:
+                            counts = counts.resolve()
+                        except Exception as batch_error:
+                            if filtered_fc is None:
+                                raise
+                            # Count the asset alone: if it is unreadable this raises and the asset
+                            # error is reported below, otherwise the AOI filter is what failed
+                            initial_count = get_info(training_fc.size())
+                            logger.error(f"AOI filtering failed: {batch_error}")
+                            logger.info("Using original dataset without AOI filter")
+                            filtered_fc = None
+                            counts = {'initial_count': initial_count}
+                        initial_count = counts['initial_count']
+                        logger.info(f"Initial feature count: {initial_count}")
+                        
+                        if initial_count == 0:
+                            raise Exception(f"Earth Engine asset '{training_ee_path}' contains 0 features")
+                            
+                    except Exception as ee_error:
+                        logger.error(f"Failed to access Earth Engine asset: {ee_error}")
+                        raise Exception(f"Cannot access Earth Engine asset '{training_ee_path}': {str(ee_error)}")
+                    
+                    collection_size = initial_count
+                    if filtered_fc is not None:
+                        filtered_count = counts['filtered_count']
+                        logger.info(f"Features after AOI filter: {filtered_count}")
+                        
+                        if filtered_count == 0:
+                            logger.warning("AOI filtering resulted in 0 features - using original dataset")
+                        else:
+                            training_fc = filtered_fc
+                            collection_size = filtered_count
                     
                     # Manual conversion to GeoDataFrame with size limit
                     logger.info("Converting to GeoDataFrame...")
                     
                     # Check collection size and implement stratified sampling for large datasets
-                    collection_size = training_fc.size().getInfo()
                     logger.info(f"Collection size: {collection_size}")
                     
                     # If collection is larger than 5000, use stratified sampling to ensure class representation
@@ -91,9 +110,15 @@ try:
                         try:
                             # Get unique classes and their counts
                             class_field = 'kelas'  # The field containing class information
-                            unique_classes = training_fc.aggregate_array(class_field).distinct().getInfo()
+                            unique_classes = get_info(training_fc.aggregate_array(class_field).distinct())
                             logger.info(f"Found {len(unique_classes)} unique classes: {unique_classes}")
                             
+                            # Count every class in a single request instead of once per class
+                            class_sizes = DeferredFetch({
+                                f"class_{i}": training_fc.filter(ee.Filter.eq(class_field, class_value)).size()
+                                for i, class_value in enumerate(unique_classes)
+                            }).resolve()
+                            
                             # Calculate samples per class (aim for 5000 total)
                             target_total = 5000
                             base_samples_per_class = target_total // len(unique_classes)
@@ -115,7 +140,7 @@ try:
                                     
                                     # Filter by class and get count
                                     class_fc = training_fc.filter(ee.Filter.eq(class_field, class_value))
-                                    class_size = class_fc.size().getInfo()
+                                    class_size = class_sizes[f"class_{i}"]
                                     
                                     if class_size == 0:
                                         logger.warning(f"Class {class_value} has no features, skipping")
@@ -133,7 +158,7 @@ try:
                                         logger.info(f"Class {class_value}: sampling {actual_samples} from {class_size} features")
                                     
                                     # Get the features
-                                    class_info = sampled_fc.getInfo()
+                                    class_info = get_info(sampled_fc)
                                     class_features = class_info['features']
                                     
                                     all_features.extend(class_features)
@@ -163,13 +188,13 @@ try:
                             logger.info("Falling back to simple random sampling")
                             # Fallback to simple random sampling
                             training_fc = training_fc.randomColumn('random', 42).sort('random').limit(5000)
-                            info = training_fc.getInfo()
+                            info = get_info(training_fc)
                             features = info['features']
                         
                     else:
                         # For collections <= 5000, load normally
                         logger.info(f"Collection size ({collection_size}) is within normal limits, loading directly")
-                        info = training_fc.getInfo()
+                        info = get_info(training_fc)
                         features = info['features']
                     
                     if collection_size == 0:
@@ -349,7 +374,7 @@ try:
                     # Filter non-null first
                     non_null_fc = training_data.filter(ee.Filter.notNull([class_field]))
                     # Get distinct classes
-                    classes = non_null_fc.aggregate_array(class_field).distinct().getInfo()
+                    classes = get_info(non_null_fc.aggregate_array(class_field).distinct())
                     logger.info(f"Unique classes in EE FeatureCollection: {classes}")
                     
                     for cls in classes:
@@ -374,7 +399,7 @@ try:
                     else:
                         filtered_fc = ee.FeatureCollection([])
                     
-                    filtered_count = filtered_fc.size().getInfo()
+                    filtered_count = get_info(filtered_fc.size())
                     logger.info(f"Features after class validation: {filtered_count}")
                     
                     train_data_dict['training_data'] = filtered_fc
@@ -2,14 +2,11 @@ import ee
 import pandas as pd
 import numpy as np
 from .ee_config import ensure_ee_initialized
-import matplotlib.pyplot as plt
-from matplotlib.patches import Ellipse
-import matplotlib.transforms as transforms
-import plotly.graph_objects as go
-import plotly.express as px
+from .ee_fetch import DeferredFetch, get_info
 from .ee_config import ensure_ee_initialized
 
 # Do not initialize Earth Engine at import time. Initialize when classes are instantiated.
+# matplotlib and plotly are imported inside the plotting methods to keep module import light.
 # Module 4: Region of Interest Separability Analysis
 ## System Response 4.1 Separability Analysis
 class sample_quality:
@@ -36,22 +33,23 @@ class sample_quality:
         self.class_property = class_property
         self.class_name_property = class_name_property
         self.region = region
-        self.band_names = self.image.bandNames().getInfo()
+        self.band_names = get_info(self.image.bandNames())
         self.class_mapping = None
     def get_display_property(self):
         """
         Helper functions to determine which properties (column in the training data) to display
         """
         return self.class_name_property if self.class_name_property else self.class_property
-    def class_renaming(self):
+    def class_renaming(self, use_cache=True):
         """
         Function to mapped between class ID and class names
+        Set use_cache=False to bypass the Earth Engine result cache (see ee_cache).
         """
         if self.class_mapping is None and self.class_name_property:
             try:
                 #mapped the combination between ID and names
                 pairs = self.training_data.distinct([self.class_property, self.class_name_property])
-                pair_info = pairs.getInfo()
+                pair_info = get_info(pairs, use_cache=use_cache)
                 mapping = {}
                 for features in pair_info['features']:
                     prop = features['properties']
@@ -86,27 +84,26 @@ class sample_quality:
 
     #Basic statistic of the training data:
     #Note that this process applied to training data before pixel value is extracted
-    def sample_stats(self):
+    def sample_stats(self, use_cache=True):
         """
         Get basic statistics about the training dataset. 
+        Set use_cache=False to bypass the Earth Engine result cache (see ee_cache).
         """
         try:
             # Perfom in server side to minimize computational load
             class_counts = self.training_data.aggregate_histogram(self.class_property)
             total_samples = self.training_data.size()
             unique_classes = self.training_data.aggregate_array(self.class_property).distinct()
-            # Get class names if available
-            class_names = None
-            if self.class_name_property:
-                class_names = self.training_data.aggregate_histogram(self.class_name_property)            
-            #return the dictionary
-            results = ee.Dictionary({
+            fetch = DeferredFetch({
                 'class_counts': class_counts,
                 'total_samples': total_samples,
                 'unique_classes': unique_classes
-            }).getInfo()
-            if class_names:
-                results['class_names'] = class_names            
+            }, use_cache=use_cache)
+            # Get class names if available
+            if self.class_name_property:
+                fetch.add('class_names', self.training_data.aggregate_histogram(self.class_name_property))
+            #return the dictionary
+            results = fetch.resolve()
             # Process results client-side
             class_counts_dict = results['class_counts']
             total_count = results['total_samples']
@@ -202,7 +199,7 @@ class sample_quality:
                 tileScale=16  # Increase tile scale to handle larger computations
             )
             # Single getInfo() call to get all data
-            sample_data = training_sample.getInfo()
+            sample_data = get_info(training_sample)
             if 'features' not in sample_data or len(sample_data['features']) == 0:
                 print("Warning: No spectral data extracted. Check your training data quantity. Increase pixel size to reduce the size of sample")
                 return pd.DataFrame()
@@ -629,6 +626,7 @@ class spectral_plotter:
         classes = sorted(df[self.class_property].unique())
         class_mapping = self.sq.class_renaming()
         #Histogram plotting function
+        import plotly.graph_objects as go
         for band in bands:
             figs = go.Figure()
             for class_id in classes:
@@ -713,6 +711,7 @@ class spectral_plotter:
         else:
             df_plot['Class_Display'] = df_plot[self.class_property].map(lambda x: f"Class {x}")
         #core function for box plot visualiazation
+        import plotly.express as px
         for band in bands:
             fig = px.box(
                 df_plot, 
@@ -796,6 +795,7 @@ class spectral_plotter:
             df_plot['Class_Display'] = df_plot[self.class_property].map(lambda x: f"Class {x}")
         
         # Create scatter plot
+        import plotly.express as px
         fig = px.scatter(
             df_plot,
             x=x_band,
@@ -879,6 +879,7 @@ class spectral_plotter:
             print(f"Band {y_band} not found. Available bands: {available_bands}")
             return None
         # Create the plot
+        import matplotlib.pyplot as plt
         fig, ax = plt.subplots(figsize=figsize)
         # Get unique classes and create color mapping
         classes = sorted(df[self.class_property].unique())
@@ -929,6 +930,8 @@ class spectral_plotter:
     def add_elipse(self, ax, x, y, color, n_std = 2, alpha=0.2):
         """
         """
+        from matplotlib.patches import Ellipse
+        import matplotlib.transforms as transforms
         try:
             cov = np.cov(x, y)
             pearson = cov[0,1]/np.sqrt(cov[0,0] * cov[1,1])
@@ -1004,6 +1007,7 @@ class spectral_plotter:
         else:
             df_plot['Class_Display'] = df_plot[self.class_property].map(lambda x: f"Class {x}")
         
+        import plotly.express as px
         fig = px.scatter_3d(
             df_plot,
             x=x_band,
@@ -0,0 +1,420 @@
+"""
+Earth Engine Scene Catalog Module
+
+Local, incrementally synced catalog of Landsat scene metadata.
+
+``get_optical_data()`` and ``get_thermal_bands()`` query scene metadata from Earth
+Engine every time the date range or cloud threshold changes. The catalog keeps the
+metadata of every scene (system:index, acquisition time, scene cloud cover, WRS
+path/row) in a local SQLite file, keyed by the dataset key of
+``Reflectance_Data.OPTICAL_DATASETS`` / ``THERMAL_DATASETS`` and a hash of the AOI.
+
+- ``sync()`` fetches only the date ranges that were not synced before, one year per
+  request, and records the covered range. The last ``settle_days`` are never marked
+  as synced, so recently processed scenes are picked up by the next sync.
+- ``query()`` / ``count()`` / ``scene_ids()`` filter by date window and cloud cover
+  with an indexed local query.
+- ``statistics()`` builds the same dictionary as ``Reflectance_Stats.get_collection_statistics``.
+
+Only the selected scene ids are sent to Earth Engine (``ee.Filter.inList('system:index', ids)``).
+
+The metadata source is pluggable: ``fetch_fn(dataset, aoi, start, end)`` returns a
+list of scene dictionaries, so a local fixture can stand in for Earth Engine.
+
+Example
+-------
+>>> from epistemx.scene_catalog import SceneCatalog
+>>> catalog = SceneCatalog()
+>>> collection, stats = Reflectance_Data().get_optical_data(aoi, 2015, 2024, cloud_cover=20, catalog=catalog)
+>>> catalog.count('L8_SR', aoi, '2020-01-01', '2021-01-01', max_cloud=10)
+14
+"""
+
+import contextlib
+import ee
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from .ee_fetch import get_info
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATALOG_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'epistemx')
+DEFAULT_SETTLE_DAYS = 30        # recent scenes may still be processed or reprocessed
+DAY_MS = 24 * 60 * 60 * 1000
+
+# Scene dictionary fields returned by a fetch function
+SCENE_FIELDS = ('scene_id', 'time_start', 'cloud_cover', 'wrs_path', 'wrs_row')
+
+
+def _to_millis(date: Any) -> int:
+    """Convert 'YYYY-MM-DD' (UTC), a datetime or milliseconds to epoch milliseconds."""
+    if isinstance(date, (int, float)):
+        return int(date)
+    if isinstance(date, str):
+        date = datetime.strptime(date[:10], '%Y-%m-%d')
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return int(date.timestamp() * 1000)
+
+
+def _to_date(millis: int) -> str:
+    return datetime.fromtimestamp(millis / 1000, timezone.utc).strftime('%Y-%m-%d')
+
+
+def aoi_key(aoi: Any) -> str:
+    """
+    Hash identifying an AOI, from its serialized Earth Engine expression.
+
+    Parameters
+    ----------
+    aoi : ee.FeatureCollection, ee.Geometry or JSON-compatible value
+        Area of interest.
+
+    Returns
+    -------
+    str
+        Hex digest (16 characters).
+    """
+    if isinstance(aoi, ee.ComputedObject):
+        serialized = ee.serializer.toJSON(aoi)
+    else:
+        serialized = json.dumps(aoi, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()[:16]
+
+
+def _dataset_config(dataset: str) -> Dict[str, Any]:
+    from .data_acquisition import Reflectance_Data
+    datasets = {**Reflectance_Data.OPTICAL_DATASETS, **Reflectance_Data.THERMAL_DATASETS}
+    if dataset not in datasets:
+        raise ValueError(f"dataset must be one of: {list(datasets.keys())}")
+    return datasets[dataset]
+
+
+def fetch_scene_metadata(dataset: str, aoi: Any, start: str, end: str) -> List[Dict[str, Any]]:
+    """
+    Fetch the metadata of every scene of a dataset intersecting an AOI, in one request.
+
+    Parameters
+    ----------
+    dataset : str
+        Dataset key, e.g. 'L8_SR' or 'L8_TOA'.
+    aoi : ee.FeatureCollection or ee.Geometry
+        Area of interest.
+    start, end : str
+        Date window 'YYYY-MM-DD', end exclusive (as ``filterDate``).
+
+    Returns
+    -------
+    list of dict
+        One dictionary per scene with the keys of ``SCENE_FIELDS``.
+    """
+    config = _dataset_config(dataset)
+    properties = ['system:index', 'system:time_start', config['cloud_property'], 'WRS_PATH', 'WRS_ROW']
+    #Scenes missing a property would misalign the aggregated lists
+    collection = (ee.ImageCollection(config['collection'])
+                  .filterBounds(aoi)
+                  .filterDate(start, end)
+                  .filter(ee.Filter.notNull(properties)))
+    #The catalog is the cache of this request
+    info = get_info(ee.Dictionary({name: collection.aggregate_array(prop)
+                                   for name, prop in zip(SCENE_FIELDS, properties)}), use_cache=False)
+    return [dict(zip(SCENE_FIELDS, values)) for values in zip(*(info[name] for name in SCENE_FIELDS))]
+
+
+def statistics_from_scenes(scenes: Sequence[Dict[str, Any]], summary_only: bool = False) -> Dict[str, Any]:
+    """
+    Build collection statistics from catalog scenes, in the format of
+    ``Reflectance_Stats.get_collection_statistics``.
+
+    Parameters
+    ----------
+    scenes : list of dict
+        Scenes returned by ``SceneCatalog.query()``.
+    summary_only : bool, default False
+        Leave the per-scene lists ('values', 'individual_dates', 'Scene_ids') empty.
+
+    Returns
+    -------
+    dict
+        Collection statistics.
+    """
+    if not scenes:
+        return {
+            'total_images': 0,
+            'date_range': "No images found",
+            'cloud_cover': {'min': None, 'max': None, 'mean': None, 'values': []},
+            'path_row_tiles': [],
+            'unique_tiles': 0,
+            'individual_dates': [],
+            'monthly_histogram': {},
+            'Scene_ids': [],
+            'summary_only': summary_only
+        }
+    cloud_values = [s['cloud_cover'] for s in scenes]
+    times = [s['time_start'] for s in scenes]
+    dates_readable = [datetime.fromtimestamp(t / 1000).strftime('%Y-%m-%d') for t in times]
+    monthly: Dict[str, int] = {}
+    for t in times:
+        month = _to_date(t)[:7]
+        monthly[month] = monthly.get(month, 0) + 1
+    path_rows = sorted({(s['wrs_path'], s['wrs_row']) for s in scenes})
+    return {
+        'total_images': len(scenes),
+        'date_range': f"{min(dates_readable)} to {max(dates_readable)}",
+        'cloud_cover': {
+            'min': min(cloud_values),
+            'max': max(cloud_values),
+            'mean': sum(cloud_values) / len(cloud_values),
+            'values': [] if summary_only else cloud_values
+        },
+        'path_row_tiles': path_rows,
+        'unique_tiles': len(path_rows),
+        'individual_dates': [] if summary_only else dates_readable,
+        'monthly_histogram': dict(sorted(monthly.items())),
+        'Scene_ids': [] if summary_only else [s['scene_id'] for s in scenes],
+        'summary_only': summary_only
+    }
+
+
+class SceneCatalog:
+    """
+    Local SQLite catalog of scene metadata, synced incrementally by date.
+
+    Example
+    -------
+    >>> from epistemx.scene_catalog import SceneCatalog
+    >>> catalog = SceneCatalog('/tmp/scenes.sqlite')
+    >>> catalog.sync('L8_SR', aoi, '2015-01-01', '2025-01-01')
+    >>> ids = catalog.scene_ids('L8_SR', aoi, '2020-01-01', '2021-01-01', max_cloud=20)
+    """
+    def __init__(self, path: Optional[str] = None,
+                 fetch_fn: Optional[Callable[[str, Any, str, str], List[Dict[str, Any]]]] = None,
+                 settle_days: float = DEFAULT_SETTLE_DAYS):
+        """
+        Initialize the catalog and create the SQLite file if needed.
+
+        Parameters
+        ----------
+        path : str, optional
+            Path of the SQLite file. Defaults to scene_catalog.sqlite in
+            ``EPISTEMX_CACHE_DIR`` or ~/.cache/epistemx.
+        fetch_fn : callable, optional
+            ``fetch_fn(dataset, aoi, start, end)`` returning a list of scene dictionaries
+            (keys of ``SCENE_FIELDS``). Defaults to ``fetch_scene_metadata`` (Earth Engine).
+        settle_days : float, default 30
+            Scenes acquired within this many days before now are fetched again on every sync.
+        """
+        if path is None:
+            cache_dir = os.environ.get('EPISTEMX_CACHE_DIR') or DEFAULT_CATALOG_DIR
+            path = os.path.join(cache_dir, 'scene_catalog.sqlite')
+        self.path = path
+        self.fetch_fn = fetch_fn or fetch_scene_metadata
+        self.settle_days = settle_days
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS scenes ("
+                " dataset TEXT NOT NULL,"
+                " aoi_key TEXT NOT NULL,"
+                " scene_id TEXT NOT NULL,"
+                " time_start INTEGER NOT NULL,"
+                " cloud_cover REAL,"
+                " wrs_path INTEGER,"
+                " wrs_row INTEGER,"
+                " PRIMARY KEY (dataset, aoi_key, scene_id))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_scenes_time ON scenes (dataset, aoi_key, time_start)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS synced ("
+                " dataset TEXT NOT NULL,"
+                " aoi_key TEXT NOT NULL,"
+                " start_ms INTEGER NOT NULL,"
+                " end_ms INTEGER NOT NULL,"
+                " synced_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_synced ON synced (dataset, aoi_key)")
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection, commit (or roll back) the transaction and close it on exit."""
+        # sqlite3's own context manager only ends the transaction, it does not close the connection
+        with contextlib.closing(sqlite3.connect(self.path, timeout=30)) as conn, conn:
+            yield conn
+
+    def _synced_ranges(self, conn: sqlite3.Connection, dataset: str, key: str) -> List[Tuple[int, int]]:
+        rows = conn.execute("SELECT start_ms, end_ms FROM synced WHERE dataset = ? AND aoi_key = ? ORDER BY start_ms",
+                            (dataset, key)).fetchall()
+        merged: List[Tuple[int, int]] = []
+        for start, end in rows:
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    def missing_ranges(self, dataset: str, aoi: Any, start: Any, end: Any) -> List[Tuple[str, str]]:
+        """
+        Date ranges of a window that were not synced yet.
+
+        Parameters
+        ----------
+        dataset : str
+            Dataset key, e.g. 'L8_SR'.
+        aoi : ee.FeatureCollection or ee.Geometry
+            Area of interest.
+        start, end : str
+            Date window 'YYYY-MM-DD', end exclusive.
+
+        Returns
+        -------
+        list of tuple
+            (start, end) date strings of the gaps, in order.
+        """
+        start_ms, end_ms = _to_millis(start), _to_millis(end)
+        with self._lock, self._connect() as conn:
+            covered = self._synced_ranges(conn, dataset, aoi_key(aoi))
+        gaps = []
+        cursor = start_ms
+        for range_start, range_end in covered:
+            if range_end <= cursor:
+                continue
+            if range_start >= end_ms:
+                break
+            if range_start > cursor:
+                gaps.append((cursor, range_start))
+            cursor = max(cursor, range_end)
+        if cursor < end_ms:
+            gaps.append((cursor, end_ms))
+        return [(_to_date(a), _to_date(b)) for a, b in gaps]
+
+    def sync(self, dataset: str, aoi: Any, start: Any, end: Any) -> int:
+        """
+        Fetch the metadata of scenes in the date ranges that were not synced yet.
+
+        Gaps are fetched one year at a time and recorded as synced after each year,
+        so an interrupted sync resumes where it stopped.
+
+        Parameters
+        ----------
+        dataset : str
+            Dataset key, e.g. 'L8_SR'.
+        aoi : ee.FeatureCollection or ee.Geometry
+            Area of interest.
+        start, end : str
+            Date window 'YYYY-MM-DD', end exclusive.
+
+        Returns
+        -------
+        int
+            Number of scenes fetched.
+        """
+        key = aoi_key(aoi)
+        settled_ms = _to_millis(datetime.now(timezone.utc) - timedelta(days=self.settle_days))
+        fetched = 0
+        for gap_start, gap_end in self.missing_ranges(dataset, aoi, start, end):
+            chunk_start = _to_millis(gap_start)
+            gap_end_ms = _to_millis(gap_end)
+            while chunk_start < gap_end_ms:
+                year_end = _to_millis(f"{int(_to_date(chunk_start)[:4]) + 1}-01-01")
+                chunk_end = min(year_end, gap_end_ms)
+                scenes = self.fetch_fn(dataset, aoi, _to_date(chunk_start), _to_date(chunk_end))
+                self.add_scenes(dataset, aoi, scenes)
+                fetched += len(scenes)
+                #Recent scenes may still change, do not mark them as synced
+                synced_end = min(chunk_end, settled_ms)
+                if synced_end > chunk_start:
+                    with self._lock, self._connect() as conn:
+                        conn.execute("INSERT INTO synced (dataset, aoi_key, start_ms, end_ms, synced_at) "
+                                     "VALUES (?, ?, ?, ?, ?)", (dataset, key, chunk_start, synced_end, time.time()))
+                logger.info(f"Synced {len(scenes)} {dataset} scenes from {_to_date(chunk_start)} to {_to_date(chunk_end)}")
+                chunk_start = chunk_end
+        return fetched
+
+    def add_scenes(self, dataset: str, aoi: Any, scenes: Sequence[Dict[str, Any]]) -> None:
+        """
+        Insert or update scenes of a dataset and AOI.
+
+        Parameters
+        ----------
+        dataset : str
+            Dataset key, e.g. 'L8_SR'.
+        aoi : ee.FeatureCollection or ee.Geometry
+            Area of interest.
+        scenes : list of dict
+            Scenes with the keys of ``SCENE_FIELDS``.
+        """
+        key = aoi_key(aoi)
+        rows = [(dataset, key, s['scene_id'], int(s['time_start']), s.get('cloud_cover'), s.get('wrs_path'),
+                 s.get('wrs_row')) for s in scenes]
+        with self._lock, self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO scenes (dataset, aoi_key, scene_id, time_start, cloud_cover, "
+                             "wrs_path, wrs_row) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def query(self, dataset: str, aoi: Any, start: Any, end: Any, max_cloud: Optional[float] = None,
+              sync: bool = True) -> List[Dict[str, Any]]:
+        """
+        Scenes of a dataset and AOI acquired in a date window, ordered by acquisition time.
+
+        Parameters
+        ----------
+        dataset : str
+            Dataset key, e.g. 'L8_SR'.
+        aoi : ee.FeatureCollection or ee.Geometry
+            Area of interest.
+        start, end : str
+            Date window 'YYYY-MM-DD', end exclusive.
+        max_cloud : float, optional
+            Keep scenes with cloud cover strictly below this value.
+        sync : bool, default True
+            Sync missing date ranges first.
+
+        Returns
+        -------
+        list of dict
+            Scenes with the keys of ``SCENE_FIELDS``.
+        """
+        if sync:
+            self.sync(dataset, aoi, start, end)
+        sql = ("SELECT scene_id, time_start, cloud_cover, wrs_path, wrs_row FROM scenes "
+               "WHERE dataset = ? AND aoi_key = ? AND time_start >= ? AND time_start < ?")
+        params: List[Any] = [dataset, aoi_key(aoi), _to_millis(start), _to_millis(end)]
+        if max_cloud is not None:
+            sql += " AND cloud_cover < ?"
+            params.append(max_cloud)
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(sql + " ORDER BY time_start", params).fetchall()
+        return [dict(zip(SCENE_FIELDS, row)) for row in rows]
+
+    def count(self, dataset: str, aoi: Any, start: Any, end: Any, max_cloud: Optional[float] = None,
+              sync: bool = True) -> int:
+        """Number of scenes matching ``query()``."""
+        return len(self.query(dataset, aoi, start, end, max_cloud, sync))
+
+    def scene_ids(self, dataset: str, aoi: Any, start: Any, end: Any, max_cloud: Optional[float] = None,
+                  sync: bool = True) -> List[str]:
+        """system:index of the scenes matching ``query()``."""
+        return [s['scene_id'] for s in self.query(dataset, aoi, start, end, max_cloud, sync)]
+
+    def statistics(self, dataset: str, aoi: Any, start: Any, end: Any, max_cloud: Optional[float] = None,
+                   sync: bool = True, summary_only: bool = False) -> Dict[str, Any]:
+        """Collection statistics of the scenes matching ``query()`` (see ``statistics_from_scenes``)."""
+        return statistics_from_scenes(self.query(dataset, aoi, start, end, max_cloud, sync), summary_only)
+
+    def clear(self, dataset: Optional[str] = None) -> None:
+        """Remove every scene and synced range, or only those of one dataset."""
+        with self._lock, self._connect() as conn:
+            if dataset is None:
+                conn.execute("DELETE FROM scenes")
+                conn.execute("DELETE FROM synced")
+            else:
+                conn.execute("DELETE FROM scenes WHERE dataset = ?", (dataset,))
+                conn.execute("DELETE FROM synced WHERE dataset = ?", (dataset,))
@@ -0,0 +1,136 @@
+"""
+Landsat Sensor Registry Module
+
+Declarative band metadata per sensor, shared by the Earth Engine preprocessing
+(``Reflectance_Data.prepare_image``) and the local NumPy backend (``local_raster``).
+``Reflectance_Data.OPTICAL_DATASETS`` entries point to a sensor with their 'sensor'
+key; the registry tells how an image of that sensor is preprocessed:
+
+- ``bands``: source band name to standardized name ('SR_B5' -> 'NIR'), in output order.
+  Only these bands (and the QA band) are read, every other band is dropped first.
+- ``scale`` / ``offset``: DN * scale + offset (None for uncalibrated MSS data)
+- ``qa_band`` / ``qa``: the QA band and its bit layout, the single bits set for
+  clouds and shadows, and the first bit of the 2-bit confidence fields
+
+New sensors or band selections are registered without code changes::
+
+    from epistemx.sensors import register_sensor
+    register_sensor('L8_VIS', {'SR_B2': 'BLUE', 'SR_B3': 'GREEN', 'SR_B4': 'RED'},
+                    scale=0.0000275, offset=-0.2)
+    Reflectance_Data.register_optical_dataset('L8_VIS', 'LANDSAT/LC08/C02/T1_L2', 'L8_VIS',
+                                              'Landsat 8 visible bands')
+
+This module does not import Earth Engine, so the local backend can use it.
+"""
+
+import copy
+import logging
+import threading
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Collection 2 Level-2 surface reflectance scale factor and offset
+SR_SCALE = 0.0000275
+SR_OFFSET = -0.2
+# Collection 2 QA_PIXEL layout: single bits and the first bit of the 2-bit confidence fields
+# https://www.usgs.gov/landsat-missions/landsat-collection-2-quality-assessment-bands
+LANDSAT_C2_QA = {
+    'cloud_bit': 3,
+    'shadow_bit': 4,
+    'cloud_confidence': 8,
+    'shadow_confidence': 10,
+    'cirrus_confidence': 14,
+}
+
+_TM_BANDS = {'SR_B1': 'BLUE', 'SR_B2': 'GREEN', 'SR_B3': 'RED', 'SR_B4': 'NIR', 'SR_B5': 'SWIR1', 'SR_B7': 'SWIR2'}
+_OLI_BANDS = {'SR_B1': 'AEROSOL', 'SR_B2': 'BLUE', 'SR_B3': 'GREEN', 'SR_B4': 'RED', 'SR_B5': 'NIR',
+              'SR_B6': 'SWIR1', 'SR_B7': 'SWIR2'}
+_MSS_BANDS = {'B4': 'GREEN', 'B5': 'RED', 'B6': 'NIR1', 'B7': 'NIR2'}
+
+SENSORS: Dict[str, Dict[str, Any]] = {}
+_sensors_lock = threading.Lock()
+
+
+def register_sensor(sensor: str, bands: Mapping[str, str], scale: Optional[float] = None,
+                    offset: Optional[float] = None, qa_band: Optional[str] = 'QA_PIXEL',
+                    qa: Optional[Mapping[str, int]] = None) -> Dict[str, Any]:
+    """
+    Register (or replace) the band metadata of a sensor.
+
+    Parameters
+    ----------
+    sensor : str
+        Sensor key, the 'sensor' of the OPTICAL_DATASETS entries, e.g. 'L8'.
+    bands : mapping
+        Source band name to standardized name, in output order.
+    scale, offset : float, optional
+        DN * scale + offset. None leaves the digital numbers unscaled.
+    qa_band : str, optional
+        QA band used for masking. None disables the cloud mask.
+    qa : mapping, optional
+        QA bit layout (keys of LANDSAT_C2_QA, missing keys are not tested). Default: LANDSAT_C2_QA.
+
+    Returns
+    -------
+    dict
+        The registered sensor entry.
+    """
+    if not bands:
+        raise ValueError(f"Sensor {sensor} needs at least one band")
+    unknown = set(qa or {}) - set(LANDSAT_C2_QA)
+    if unknown:
+        raise ValueError(f"Unknown QA fields {sorted(unknown)}, must be in {list(LANDSAT_C2_QA)}")
+    entry = {
+        'bands': dict(bands),
+        'scale': scale,
+        'offset': offset,
+        'qa_band': qa_band,
+        'qa': dict(LANDSAT_C2_QA if qa is None else qa),
+    }
+    with _sensors_lock:
+        SENSORS[sensor] = entry
+    logger.debug(f"Registered sensor {sensor}: {list(entry['bands'].values())}")
+    return entry
+
+
+def get_sensor(sensor: str) -> Dict[str, Any]:
+    """Band metadata of a registered sensor (a copy), see register_sensor()."""
+    with _sensors_lock:
+        if sensor not in SENSORS:
+            raise ValueError(f"Unsupported sensor type: {sensor}, must be one of {list(SENSORS)}")
+        return copy.deepcopy(SENSORS[sensor])
+
+
+def band_selection(sensor: str, bands: Optional[List[str]] = None) -> Tuple[List[str], List[str]]:
+    """
+    Source band names and standardized names of a sensor, in output order.
+
+    Parameters
+    ----------
+    sensor : str
+        Registered sensor.
+    bands : list of str, optional
+        Standardized names to keep (default: all), e.g. Reflectance_Data.HARMONIZED_BANDS.
+
+    Returns
+    -------
+    tuple : (list of str, list of str)
+    """
+    mapping = get_sensor(sensor)['bands']
+    if bands is None:
+        return list(mapping), list(mapping.values())
+    by_name = {name: source for source, name in mapping.items()}
+    missing = [b for b in bands if b not in by_name]
+    if missing:
+        raise ValueError(f"Sensor {sensor} has no bands {missing}, bands are {list(by_name)}")
+    return [by_name[b] for b in bands], list(bands)
+
+
+for _sensor in ('L4', 'L5', 'L7'):
+    register_sensor(_sensor, _TM_BANDS, SR_SCALE, SR_OFFSET)
+for _sensor in ('L8', 'L9'):
+    register_sensor(_sensor, _OLI_BANDS, SR_SCALE, SR_OFFSET)
+for _sensor in ('L1', 'L2', 'L3'):
+    register_sensor(_sensor, _MSS_BANDS)
@@ -0,0 +1,361 @@
+"""
+Earth Engine Temporal Chunking Module
+
+Composite statistics over long date ranges (decades of Landsat scenes) without
+reducing thousands of scenes in one Earth Engine computation.
+
+A single map/reduce over the whole range of ``get_optical_data()`` runs out of
+memory or times out on interactive requests. Instead, the range is split into
+windows (years, seasons or a number of months) and every window is reduced to a
+partial state of mergeable statistics: per band sum, sum of squares, count, min
+and max. The window states are merged into mean, standard deviation, min, max,
+count and sum over the whole range, which are exact.
+
+Median and percentiles are order statistics and cannot be merged from partial
+states; build them per window with ``composite.Reflectance_Composite``.
+
+- ``temporal_windows()``: split a date range into contiguous windows
+- ``window_state()`` / ``merge_states()``: partial state of one window, merge of several
+- ``chunked_composite()``: filter and reduce every window with ``get_optical_data()``,
+  up to ``max_workers`` windows at a time. With ``asset_prefix`` every window state is
+  exported to an asset (``ee_graph.materialize``), so the merge only references small
+  assets. With ``state_path`` completed windows are recorded in a JSON file and a
+  rerun after a failure resumes with the windows that did not finish.
+
+Example
+-------
+>>> from epistemx.temporal_chunks import chunked_composite
+>>> image, report = chunked_composite(aoi, 1990, 2024, 'L5_SR', window='year',
+...                                   asset_prefix='projects/my-project/assets/epistemx/l5',
+...                                   state_path='l5_windows.json')
+>>> report['completed']
+35
+"""
+
+import ee
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from .composite import DEFAULT_SEASONS
+from .ee_fetch import get_info
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_STATISTICS = ('mean', 'stdDev', 'min', 'max', 'count')
+MERGEABLE_STATISTICS = ('mean', 'stdDev', 'min', 'max', 'count', 'sum')
+# Partial state bands, BAND_<suffix>
+_STATE_SUFFIXES = ('sum', 'sumsq', 'count', 'min', 'max')
+
+
+def _parse_date(value: Any, is_start: bool) -> date:
+    if isinstance(value, int) or (isinstance(value, str) and len(value) == 4 and value.isdigit()):
+        # A year covers the whole year, the end is exclusive
+        return date(int(value), 1, 1) if is_start else date(int(value) + 1, 1, 1)
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    if isinstance(value, date):
+        return value
+    raise ValueError("Date must be either YYYY or YYYY-MM-DD format")
+
+
+def _add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def temporal_windows(start_date: Any, end_date: Any, window: Any = 'year',
+                     seasons: Optional[Dict[str, Tuple[int, int]]] = None) -> List[Tuple[str, str, str]]:
+    """
+    Split a date range into contiguous windows.
+
+    Parameters
+    ----------
+    start_date : int or str
+        Year or 'YYYY-MM-DD' (inclusive).
+    end_date : int or str
+        Year (inclusive) or 'YYYY-MM-DD' (exclusive, as ``ee.ImageCollection.filterDate``).
+    window : str or int, default 'year'
+        'year', 'season' or a number of months.
+    seasons : dict, optional
+        Season name to (first month, last month) used by window='season'. The seasons
+        must cover the year without overlapping. Default: dry (May-October) and wet
+        (November-April).
+
+    Returns
+    -------
+    list of tuple
+        (window id, start date, exclusive end date), e.g. ('2020', '2020-01-01', '2021-01-01')
+        or ('2020_wet', '2020-11-01', '2021-05-01'). Windows are clipped to the range.
+    """
+    start = _parse_date(start_date, is_start=True)
+    end = _parse_date(end_date, is_start=False)
+    if end <= start:
+        raise ValueError(f"End date {end} must be after start date {start}")
+    if window == 'year':
+        boundaries = [(str(year), date(year, 1, 1)) for year in range(start.year, end.year + 1)]
+    elif window == 'season':
+        seasons = seasons or DEFAULT_SEASONS
+        firsts = sorted((first, name) for name, (first, _) in seasons.items())
+        months = sum((last - first) % 12 + 1 for first, last in seasons.values())
+        if months != 12 or len({first for first, _ in firsts}) != len(firsts):
+            raise ValueError("Seasons must cover the twelve months of the year without overlapping")
+        # A season is labelled with the year in which it starts
+        boundaries = [(f"{year}_{name}", date(year, first, 1))
+                      for year in range(start.year - 1, end.year + 1) for first, name in firsts]
+    elif isinstance(window, int) and window > 0:
+        first = date(start.year, start.month, 1)
+        boundaries = []
+        while first < end:
+            boundaries.append((first.strftime('%Y-%m'), first))
+            first = _add_months(first, window)
+    else:
+        raise ValueError("window must be 'year', 'season' or a positive number of months")
+
+    windows = []
+    next_starts = [b[1] for b in boundaries[1:]] + [date.max]
+    for (window_id, window_start), window_end in zip(boundaries, next_starts):
+        window_start, window_end = max(window_start, start), min(window_end, end)
+        if window_start < window_end:
+            windows.append((window_id, window_start.isoformat(), window_end.isoformat()))
+    return windows
+
+
+def window_state(collection: Any, bands: Optional[Sequence[str]] = None) -> Any:
+    """
+    Partial state of a window: per band sum, sum of squares, count, min and max.
+
+    Parameters
+    ----------
+    collection : ee.ImageCollection
+        Masked collection of the window (not empty).
+    bands : list of str, optional
+        Bands to reduce (default: all).
+
+    Returns
+    -------
+    ee.Image
+        Bands BAND_sum, BAND_count, BAND_min, BAND_max and BAND_sumsq.
+    """
+    if bands:
+        collection = collection.select(list(bands))
+    reducer = (ee.Reducer.sum()
+               .combine(reducer2=ee.Reducer.count(), sharedInputs=True)
+               .combine(reducer2=ee.Reducer.min(), sharedInputs=True)
+               .combine(reducer2=ee.Reducer.max(), sharedInputs=True))
+    squares = collection.map(lambda img: img.pow(2)).sum()
+    squares = squares.rename(squares.bandNames().map(lambda band: ee.String(band).cat('_sumsq')))
+    return collection.reduce(reducer).addBands(squares)
+
+
+def merge_states(states: Sequence[Any], statistics: Sequence[str] = DEFAULT_STATISTICS) -> Any:
+    """
+    Merge window states into statistics over all windows.
+
+    Parameters
+    ----------
+    states : list of ee.Image
+        Window states from window_state(), with the same bands.
+    statistics : list of str
+        Any of 'mean', 'stdDev', 'min', 'max', 'count', 'sum' (default: mean, stdDev, min, max, count).
+
+    Returns
+    -------
+    ee.Image
+        Bands BAND_<statistic>, grouped by statistic. Pixels without observations are masked.
+    """
+    unknown = [s for s in statistics if s not in MERGEABLE_STATISTICS]
+    if unknown:
+        raise ValueError(f"Statistics {unknown} cannot be merged, must be among {list(MERGEABLE_STATISTICS)}")
+    if not states:
+        raise ValueError("At least one window state is required")
+    merged = ee.ImageCollection.fromImages(list(states))
+
+    def renamed(image, suffix, statistic):
+        return image.rename(image.bandNames().map(
+            lambda band: ee.String(band).replace(f"_{suffix}$", f"_{statistic}")))
+    total = merged.select('.*_sum').sum()
+    count = merged.select('.*_count').sum()
+    #Pixels without observations are masked, so the mean and variance are not divided by zero
+    count = count.updateMask(count.gt(0))
+    mean = total.divide(count)
+    outputs = {
+        'sum': lambda: total,
+        'count': lambda: count,
+        'mean': lambda: renamed(mean, 'sum', 'mean'),
+        'stdDev': lambda: renamed(merged.select('.*_sumsq').sum().divide(count).subtract(mean.pow(2))
+                                  .max(0).sqrt(), 'sumsq', 'stdDev'),
+        'min': lambda: merged.select('.*_min').min(),
+        'max': lambda: merged.select('.*_max').max()
+    }
+    image = None
+    for statistic in statistics:
+        band = outputs[statistic]()
+        image = band if image is None else image.addBands(band)
+    return image
+
+
+def _state_key(aoi: Any, params: Dict[str, Any]) -> str:
+    serialized = ee.serializer.toJSON(aoi) if isinstance(aoi, ee.ComputedObject) else json.dumps(aoi, default=str)
+    options = dict(params.get('options') or {})
+    if options.get('catalog') is not None:
+        # A SceneCatalog is identified by its file, its repr differs in every process
+        options['catalog'] = options['catalog'].path
+    try:
+        payload = json.dumps(dict(params, options=options), sort_keys=True) + serialized
+    except TypeError as e:
+        # str() of an arbitrary object embeds its address, the key would never match on resume
+        raise ValueError(f"Cannot resume from state_path with non JSON-serializable arguments: {e}") from e
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def _load_state(path: Optional[str], key: str) -> Dict[str, Any]:
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        state = json.load(f)
+    if state.get('key') != key:
+        logger.warning(f"Window state file {path} belongs to other parameters, starting over")
+        return {}
+    return state.get('windows', {})
+
+
+def _save_state(path: Optional[str], key: str, windows: Dict[str, Any]) -> None:
+    if not path:
+        return
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w') as f:
+        json.dump({'key': key, 'windows': windows}, f, indent=2, sort_keys=True)
+    os.replace(temporary, path)
+
+
+def chunked_composite(aoi: Any, start_date: Any, end_date: Any, optical_data: str = 'L8_SR', cloud_cover: float = 30,
+                      window: Any = 'year', statistics: Sequence[str] = DEFAULT_STATISTICS,
+                      bands: Optional[Sequence[str]] = None, seasons: Optional[Dict[str, Tuple[int, int]]] = None,
+                      asset_prefix: Optional[str] = None, scale: float = 30,
+                      max_workers: int = DEFAULT_MAX_WORKERS, state_path: Optional[str] = None,
+                      data: Any = None, **optical_kwargs: Any) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Mergeable composite statistics of a long date range, reduced window by window.
+
+    Every window is filtered, masked and scaled with ``Reflectance_Data.get_optical_data()``
+    and reduced to a partial state (window_state). Empty windows are skipped. The states
+    are merged with merge_states().
+
+    Parameters
+    ----------
+    aoi : ee.FeatureCollection or ee.Geometry
+        Area of interest.
+    start_date, end_date : int or str
+        Year or 'YYYY-MM-DD', see temporal_windows().
+    optical_data : str, default 'L8_SR'
+        Key of Reflectance_Data.OPTICAL_DATASETS.
+    cloud_cover : float, default 30
+        Maximum scene cloud cover on land.
+    window : str or int, default 'year'
+        'year', 'season' or a number of months.
+    statistics : list of str
+        Merged statistics, see merge_states().
+    bands : list of str, optional
+        Renamed bands to reduce, e.g. ['RED', 'NIR'] (default: all).
+    seasons : dict, optional
+        Seasons of window='season', see temporal_windows().
+    asset_prefix : str, optional
+        Export every window state to the asset '<asset_prefix>_<window id>' and merge the
+        assets. Existing assets are reused. None keeps the window states as expressions.
+    scale : float, default 30
+        Export scale of the window states in meters.
+    max_workers : int, default 4
+        Number of windows processed at the same time.
+    state_path : str, optional
+        JSON file recording the completed windows. A rerun with the same parameters
+        skips them, so an interrupted run resumes at window granularity.
+    data : Reflectance_Data, optional
+        Instance used to build the window collections.
+    **optical_kwargs
+        Other arguments of get_optical_data (aoi_cloud_cover, catalog, ...).
+
+    Returns
+    -------
+    tuple : (ee.Image, dict)
+        Merged statistics, and a report with the windows ('windows': id to status and
+        number of images), 'completed', 'empty' and 'images'.
+
+    Raises
+    ------
+    ValueError
+        If ``state_path`` is given with arguments that cannot be serialized into its key.
+    RuntimeError
+        If any window failed. Completed windows are kept in ``state_path``.
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    if data is None:
+        from .data_acquisition import Reflectance_Data
+        data = Reflectance_Data(log_level=logging.WARNING)
+    windows = temporal_windows(start_date, end_date, window, seasons)
+    key = ''
+    if state_path:
+        key = _state_key(aoi, {'optical_data': optical_data, 'cloud_cover': cloud_cover, 'window': window,
+                               'seasons': seasons, 'bands': bands, 'asset_prefix': asset_prefix, 'scale': scale,
+                               'options': optical_kwargs})
+    done = _load_state(state_path, key)
+    lock = threading.Lock()
+    states: Dict[str, Any] = {}
+    region = aoi.geometry() if isinstance(aoi, (ee.FeatureCollection, ee.Feature)) else aoi
+
+    def process(window_id, window_start, window_end):
+        record = done.get(window_id)
+        if record is None:
+            collection, _ = data.get_optical_data(aoi, window_start, window_end, optical_data, cloud_cover,
+                                                  verbose=False, compute_detailed_stats=False, **optical_kwargs)
+            images = get_info(collection.size())
+            record = {'images': images, 'status': 'empty' if images == 0 else 'completed'}
+            if images:
+                state = window_state(collection, bands)
+                if asset_prefix:
+                    from .ee_graph import materialize
+                    record['asset_id'] = f"{asset_prefix}_{window_id}"
+                    state = materialize(state, record['asset_id'], region=region, scale=scale)
+                states[window_id] = state
+            with lock:
+                done[window_id] = record
+                _save_state(state_path, key, done)
+            logger.info(f"Window {window_id} ({window_start} to {window_end}): {images} images")
+        elif record['status'] == 'completed':
+            if record.get('asset_id'):
+                states[window_id] = ee.Image(record['asset_id'])
+            else:
+                collection, _ = data.get_optical_data(aoi, window_start, window_end, optical_data, cloud_cover,
+                                                      verbose=False, compute_detailed_stats=False, **optical_kwargs)
+                states[window_id] = window_state(collection, bands)
+
+    failed = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(windows)), thread_name_prefix='epistemx-window') as pool:
+        futures = {pool.submit(process, *w): w[0] for w in windows}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                failed[futures[future]] = str(e)
+                logger.error(f"Window {futures[future]} failed: {e}")
+    if failed:
+        raise RuntimeError(f"{len(failed)} of {len(windows)} windows failed ({', '.join(sorted(failed))}); "
+                           f"rerun with the same state_path to resume. First error: {next(iter(failed.values()))}")
+
+    ordered = [states[window_id] for window_id, _, _ in windows if window_id in states]
+    if not ordered:
+        raise ValueError(f"No images found for {optical_data} between {windows[0][1]} and {windows[-1][2]}")
+    report = {
+        'windows': {window_id: done[window_id] for window_id, _, _ in windows},
+        'completed': len(ordered),
+        'empty': sum(1 for window_id, _, _ in windows if done[window_id]['status'] == 'empty'),
+        'images': sum(done[window_id]['images'] for window_id, _, _ in windows)
+    }
+    return merge_states(ordered, statistics), report